@@ -0,0 +1,491 @@
+# app/audit_journal.py
+
+"""
+Módulo do Diário de Auditoria (Audit Journal)
+
+Subsistema opcional (AUDIT_JOURNAL_ENABLED) que grava cada log de atividade
+(ver app/logging_utils.py) em um diário local, somente de acréscimo, fora do
+banco de dados principal. O diário é à prova de adulteração: cada registro
+guarda o hash SHA-256 do registro anterior encadeado com o seu conteúdo, de
+modo que qualquer alteração, remoção ou reordenação quebra a cadeia.
+
+A cadeia sozinha não detecta a remoção dos últimos registros (o que sobra
+continua íntegro). Por isso, a cada gravação, o hash do último registro e a
+quantidade total de registros são guardados em uma âncora fora dos segmentos
+('journal.head'), comparada pela verificação. A âncora detecta o truncamento
+acidental ou por quem só altera os segmentos; como a cadeia não usa chave
+secreta, quem puder reescrever o diário e a âncora juntos ainda pode recalcular
+os hashes. Para se proteger disso, copie periodicamente a âncora (ou o
+resultado de /admin/audit-journal/verify) para outro armazenamento.
+
+Formato (binário, inteiros big-endian):
+
+- O diário é dividido em segmentos ('journal_00000001.seg', ...) de até
+  AUDIT_JOURNAL_SEGMENT_MAX_BYTES. Ao atingir o limite, um novo segmento é criado.
+- Cabeçalho do segmento: assinatura 'EQAJ', versão (1 byte) e o hash do último
+  registro do segmento anterior (32 bytes; zeros no primeiro segmento).
+- Registro: tamanho do conteúdo (4 bytes), instante em microssegundos desde a
+  época Unix (8 bytes), hash (32 bytes) e o conteúdo em JSON (UTF-8).
+  hash = SHA-256(hash anterior + instante + conteúdo).
+
+A leitura usa arquivos mapeados em memória (mmap): as buscas filtradas pulam
+segmentos inteiros e registros fora do período apenas pelo cabeçalho, sem
+decodificar o JSON. A cadeia é verificada periodicamente pela tarefa agendada
+`audit_journal_verify` e sob demanda pela rota /admin/audit-journal/verify.
+
+Vários processos da API podem escrever no mesmo diário: as gravações são
+serializadas por um lock de arquivo ('journal.lock', apenas em sistemas POSIX)
+e, antes de gravar, cada processo relê o final do diário se outro processo
+tiver gravado depois dele. O instante dos registros é obtido já com o lock e
+nunca é anterior ao do último registro gravado, para que o diário fique em
+ordem cronológica (a leitura por período depende dessa ordem).
+
+Dependências:
+- hashlib, mmap, struct: Para o encadeamento, a leitura e o formato binário.
+- fcntl: Para o lock entre processos (opcional; ausente no Windows).
+- app.config: Para as opções do subsistema.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas um processo deve escrever no diário
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EQAJ"
+VERSION = 1
+GENESIS_HASH = bytes(32)
+
+# Cabeçalho do segmento: assinatura, versão e hash do último registro do segmento anterior.
+SEGMENT_HEADER = struct.Struct(">4sB32s")
+# Cabeçalho do registro: tamanho do conteúdo, instante (µs desde a época) e hash.
+RECORD_HEADER = struct.Struct(">IQ32s")
+
+_SEGMENT_NAME = re.compile(r"^journal_(\d{8})\.seg$")
+ANCHOR_NAME = "journal.head"
+
+@dataclass
+class JournalRecord:
+    """Um registro lido do diário."""
+    segment: str
+    offset: int
+    timestamp: datetime
+    hash: str
+    entry: dict
+
+@dataclass
+class JournalVerification:
+    """Resultado da verificação da cadeia de hashes."""
+    ok: bool
+    segments: int
+    records: int
+    error: str | None = None
+    segment: str | None = None
+    offset: int | None = None
+
+def segment_name(index: int) -> str:
+    return f"journal_{index:08d}.seg"
+
+def list_segments(directory: Path) -> list[tuple[int, Path]]:
+    """Segmentos do diário, em ordem."""
+    if not directory.is_dir():
+        return []
+    segments = []
+    for path in directory.iterdir():
+        match = _SEGMENT_NAME.match(path.name)
+        if match:
+            segments.append((int(match.group(1)), path))
+    return sorted(segments)
+
+def read_anchor(directory: Path) -> tuple[int, bytes] | None:
+    """Âncora do diário: (quantidade de registros, hash do último registro), ou None se ausente."""
+    try:
+        anchor = json.loads((directory / ANCHOR_NAME).read_text())
+        return int(anchor["records"]), bytes.fromhex(anchor["hash"])
+    except FileNotFoundError:
+        return None
+
+def record_hash(previous: bytes, micros: int, body: bytes) -> bytes:
+    return hashlib.sha256(previous + micros.to_bytes(8, "big") + body).digest()
+
+def _micros(moment: datetime) -> int:
+    return int(moment.timestamp() * 1_000_000)
+
+def _from_micros(micros: int) -> datetime:
+    return datetime.fromtimestamp(micros / 1_000_000, tz=timezone.utc)
+
+def _scan_tail(data, start: int = SEGMENT_HEADER.size) -> tuple[int, bytes | None, int | None]:
+    """
+    Percorre os registros completos de um segmento a partir de `start`, apenas
+    pelos tamanhos. Retorna o fim do último registro completo, o seu hash e o
+    seu instante.
+    """
+    offset, last_hash, last_micros = start, None, None
+    while offset + RECORD_HEADER.size <= len(data):
+        length, micros, stored_hash = RECORD_HEADER.unpack_from(data, offset)
+        end = offset + RECORD_HEADER.size + length
+        if end > len(data):
+            break
+        offset, last_hash, last_micros = end, stored_hash, micros
+    return offset, last_hash, last_micros
+
+# --- Escrita ---
+
+class AuditJournal:
+    """Escritor do diário: acrescenta registros ao segmento atual, com rotação."""
+
+    def __init__(self, directory: str | Path, segment_max_bytes: int, fsync: bool = False):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self._lock_file = None
+        self._segment_index = 0
+        self._offset = 0
+        self._last_hash = GENESIS_HASH
+        self._last_micros = 0
+
+    def append(self, entries: list[dict], moment: datetime | None = None):
+        """
+        Acrescenta as entradas ao diário, encadeadas, com uma única escrita por
+        segmento. O instante é `moment` (ou o atual), obtido com o lock e ajustado
+        para não ser anterior ao último registro gravado.
+        """
+        if not entries:
+            return
+        with self._lock:
+            self._acquire_file_lock()
+            try:
+                self._sync_tail()
+                anchored = self._anchored_records()
+                micros = max(_micros(moment or datetime.now(timezone.utc)), self._last_micros)
+                chunk = bytearray()
+                for entry in entries:
+                    body = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+                    size = RECORD_HEADER.size + len(body)
+                    if self._offset + len(chunk) + size > self.segment_max_bytes and self._offset + len(chunk) > SEGMENT_HEADER.size:
+                        self._write(chunk)
+                        chunk = bytearray()
+                        self._rotate()
+                    self._last_hash = record_hash(self._last_hash, micros, body)
+                    chunk += RECORD_HEADER.pack(len(body), micros, self._last_hash) + body
+                self._write(chunk)
+                self._last_micros = micros
+                if anchored is not None:
+                    self._write_anchor(anchored + len(entries))
+            finally:
+                self._release_file_lock()
+
+    def close(self):
+        with self._lock:
+            for handle in (self._file, self._lock_file):
+                if handle:
+                    handle.close()
+            self._file = self._lock_file = None
+
+    def _write(self, chunk: bytes):
+        if not chunk:
+            return
+        self._file.write(chunk)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._offset += len(chunk)
+
+    def _acquire_file_lock(self):
+        if self._lock_file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.directory / "journal.lock", "a+b")
+        if fcntl:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release_file_lock(self):
+        if fcntl and self._lock_file:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _sync_tail(self):
+        """
+        Garante que o estado em memória (segmento, posição e último hash) reflita
+        o final do diário, que pode ter sido estendido por outro processo.
+        """
+        segments = list_segments(self.directory)
+        if not segments:
+            self._create_segment(1, GENESIS_HASH)
+            return
+        index, path = segments[-1]
+        if index == self._segment_index and self._file and path.stat().st_size == self._offset:
+            return
+
+        if self._file:
+            self._file.close()
+        with open(path, "r+b") as segment:
+            data = segment.read()
+            if len(data) < SEGMENT_HEADER.size:
+                raise RuntimeError(f"Segmento do diário de auditoria corrompido: {path.name}")
+            _, _, previous_hash = SEGMENT_HEADER.unpack_from(data)
+            offset, last_hash, last_micros = _scan_tail(data)
+            if offset < len(data):
+                # Registro incompleto (gravação interrompida): descartado
+                logger.warning("Diário de auditoria: %s byte(s) incompletos descartados no fim de %s.", len(data) - offset, path.name)
+                segment.truncate(offset)
+        self._segment_index, self._offset = index, offset
+        self._last_hash = last_hash or previous_hash
+        if last_micros is None and len(segments) > 1:
+            # Segmento recém-criado, ainda vazio: o último registro está no anterior
+            with open(segments[-2][1], "rb") as previous:
+                last_micros = _scan_tail(previous.read())[2]
+        self._last_micros = last_micros or 0
+        self._file = open(path, "ab")
+
+    def _anchored_records(self) -> int | None:
+        """
+        Quantidade de registros do diário antes desta gravação, segundo a âncora.
+
+        Se a âncora estiver atrasada (gravação interrompida entre o segmento e a
+        âncora) ou ausente (diário anterior à âncora), os registros são recontados.
+        Se o diário não contiver o hash da âncora, ele foi truncado ou alterado:
+        a âncora é preservada, para que a verificação acuse a falha, e None é retornado.
+        """
+        anchor = read_anchor(self.directory)
+        if anchor is not None and anchor[1] == self._last_hash:
+            return anchor[0]
+        count, anchor_found = 0, anchor is None or anchor[0] == 0
+        for stored_hash in _record_hashes(self.directory):
+            count += 1
+            if anchor is not None and count == anchor[0] and stored_hash == anchor[1]:
+                anchor_found = True
+        if not anchor_found:
+            logger.error("Diário de auditoria: o diário não contém o último registro da âncora; a âncora não será atualizada.")
+            return None
+        return count
+
+    def _write_anchor(self, records: int):
+        """Grava a âncora de forma atômica (arquivo temporário + rename)."""
+        temporary = self.directory / f"{ANCHOR_NAME}.tmp"
+        with open(temporary, "w") as anchor:
+            json.dump({"records": records, "hash": self._last_hash.hex()}, anchor)
+            anchor.flush()
+            if self.fsync:
+                os.fsync(anchor.fileno())
+        os.replace(temporary, self.directory / ANCHOR_NAME)
+
+    def _rotate(self):
+        self._file.close()
+        self._create_segment(self._segment_index + 1, self._last_hash)
+
+    def _create_segment(self, index: int, previous_hash: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / segment_name(index)
+        self._file = open(path, "ab")
+        self._file.write(SEGMENT_HEADER.pack(MAGIC, VERSION, previous_hash))
+        self._file.flush()
+        self._segment_index, self._offset, self._last_hash = index, SEGMENT_HEADER.size, previous_hash
+
+_journal: AuditJournal | None = None
+_journal_lock = threading.Lock()
+
+def get_journal() -> AuditJournal:
+    """Retorna o escritor do diário deste processo, criado na primeira chamada."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = AuditJournal(settings.AUDIT_JOURNAL_DIR, settings.AUDIT_JOURNAL_SEGMENT_MAX_BYTES, settings.AUDIT_JOURNAL_FSYNC)
+        return _journal
+
+def close_journal():
+    """Fecha o escritor do diário (usado no desligamento e nos testes)."""
+    global _journal
+    with _journal_lock:
+        if _journal is not None:
+            _journal.close()
+            _journal = None
+
+# --- Leitura ---
+
+def _first_timestamp(data) -> int | None:
+    if len(data) < SEGMENT_HEADER.size + RECORD_HEADER.size:
+        return None
+    return RECORD_HEADER.unpack_from(data, SEGMENT_HEADER.size)[1]
+
+def _open_segment(path: Path):
+    """Abre um segmento mapeado em memória (somente leitura), ou None se estiver vazio."""
+    with open(path, "rb") as segment:
+        if os.fstat(segment.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _record_hashes(directory: Path) -> Iterator[bytes]:
+    """Hashes de todos os registros completos do diário, em ordem, lidos apenas pelos cabeçalhos."""
+    for _, path in list_segments(directory):
+        data = _open_segment(path)
+        if data is None:
+            continue
+        try:
+            offset = SEGMENT_HEADER.size
+            while offset + RECORD_HEADER.size <= len(data):
+                length, _, stored_hash = RECORD_HEADER.unpack_from(data, offset)
+                if offset + RECORD_HEADER.size + length > len(data):
+                    break
+                yield stored_hash
+                offset += RECORD_HEADER.size + length
+        finally:
+            data.close()
+
+def iter_records(directory: str | Path | None = None, start: datetime | None = None, end: datetime | None = None) -> Iterator[JournalRecord]:
+    """
+    Percorre os registros do diário em ordem, opcionalmente dentro do período
+    [start, end]. Os segmentos são lidos por mmap; segmentos e registros fora do
+    período são pulados pelo cabeçalho, sem decodificar o conteúdo.
+    """
+    directory = Path(directory or settings.AUDIT_JOURNAL_DIR)
+    start_us = _micros(start) if start else None
+    end_us = _micros(end) if end else None
+    segments = list_segments(directory)
+
+    for position, (_, path) in enumerate(segments):
+        data = _open_segment(path)
+        if data is None:
+            continue
+        try:
+            first = _first_timestamp(data)
+            if first is None:
+                continue
+            if end_us is not None and first > end_us:
+                break  # Os segmentos seguintes são todos posteriores ao período
+            if start_us is not None and position + 1 < len(segments):
+                next_data = _open_segment(segments[position + 1][1])
+                next_first = _first_timestamp(next_data) if next_data is not None else None
+                if next_data is not None:
+                    next_data.close()
+                if next_first is not None and next_first < start_us:
+                    continue  # O segmento inteiro é anterior ao período
+
+            offset = SEGMENT_HEADER.size
+            while offset + RECORD_HEADER.size <= len(data):
+                length, micros, stored_hash = RECORD_HEADER.unpack_from(data, offset)
+                body_start = offset + RECORD_HEADER.size
+                if body_start + length > len(data):
+                    break
+                if end_us is not None and micros > end_us:
+                    return
+                if start_us is None or micros >= start_us:
+                    yield JournalRecord(
+                        segment=path.name, offset=offset, timestamp=_from_micros(micros),
+                        hash=stored_hash.hex(), entry=json.loads(data[body_start:body_start + length])
+                    )
+                offset = body_start + length
+        finally:
+            data.close()
+
+def scan_journal(
+    directory: str | Path | None = None, start: datetime | None = None, end: datetime | None = None,
+    level: str | None = None, user_id: int | None = None, action: str | None = None,
+    entity_type: str | None = None, entity_id: int | None = None
+) -> Iterator[JournalRecord]:
+    """Busca filtrada no diário, com os mesmos filtros da listagem de logs."""
+    filters = {"level": level.upper() if level else None, "user_id": user_id, "action": action, "entity_type": entity_type, "entity_id": entity_id}
+    filters = {key: value for key, value in filters.items() if value is not None}
+    for record in iter_records(directory, start, end):
+        if all(record.entry.get(key) == value for key, value in filters.items()):
+            yield record
+
+# --- Verificação ---
+
+def verify_journal(directory: str | Path | None = None) -> JournalVerification:
+    """
+    Verifica a cadeia de hashes de todo o diário: a sequência dos segmentos, os
+    cabeçalhos, o hash de cada registro e, pela âncora, se os últimos registros
+    não foram removidos.
+    """
+    directory = Path(directory or settings.AUDIT_JOURNAL_DIR)
+    # A âncora é lida antes dos segmentos: gravações concorrentes só podem deixá-la atrás do diário
+    anchor = read_anchor(directory)
+    segments = list_segments(directory)
+    previous = GENESIS_HASH
+    records = 0
+    anchored_hash = None
+
+    def failure(message: str, path: Path | None = None, offset: int | None = None) -> JournalVerification:
+        return JournalVerification(False, len(segments), records, message, path.name if path else None, offset)
+
+    for position, (index, path) in enumerate(segments):
+        if index != position + 1:
+            return failure(f"Segmento ausente antes de {path.name}.", path)
+        data = _open_segment(path)
+        if data is None or len(data) < SEGMENT_HEADER.size:
+            if data is not None:
+                data.close()
+            return failure("Cabeçalho do segmento ausente.", path, 0)
+        try:
+            magic, version, header_hash = SEGMENT_HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                return failure("Assinatura ou versão do segmento inválida.", path, 0)
+            if header_hash != previous:
+                return failure("O cabeçalho do segmento não continua a cadeia do segmento anterior.", path, 0)
+
+            offset = SEGMENT_HEADER.size
+            while offset < len(data):
+                if offset + RECORD_HEADER.size > len(data):
+                    break
+                length, micros, stored_hash = RECORD_HEADER.unpack_from(data, offset)
+                body_start = offset + RECORD_HEADER.size
+                if body_start + length > len(data):
+                    break
+                if record_hash(previous, micros, data[body_start:body_start + length]) != stored_hash:
+                    return failure("Hash do registro não confere (registro alterado, removido ou reordenado).", path, offset)
+                previous = stored_hash
+                records += 1
+                if anchor is not None and records == anchor[0]:
+                    anchored_hash = stored_hash
+                offset = body_start + length
+            if offset < len(data) and position + 1 < len(segments):
+                # Apenas o último segmento pode terminar em um registro ainda sendo gravado
+                return failure("Registro incompleto no meio do diário.", path, offset)
+        finally:
+            data.close()
+
+    if anchor is None:
+        if records:
+            return failure("Âncora do diário ausente.")
+    elif records < anchor[0]:
+        return failure(f"O diário tem {records} registro(s), mas a âncora indica {anchor[0]} (registros finais removidos).")
+    elif anchor[0] and anchored_hash != anchor[1]:
+        return failure("O hash do último registro ancorado não confere com a âncora.")
+    return JournalVerification(True, len(segments), records)
+
+def verify_audit_journal(db: Session) -> bool:
+    """
+    Tarefa agendada: verifica a cadeia do diário e registra uma falha como log
+    de erro (no banco e no próprio diário), para que seja vista pelos administradores.
+    """
+    from app.logging_utils import create_log
+
+    result = verify_journal()
+    if result.ok:
+        logger.info("Diário de auditoria verificado: %s registro(s) em %s segmento(s).", result.records, result.segments)
+        return True
+    logger.error("Diário de auditoria adulterado ou corrompido: %s (%s, posição %s).", result.error, result.segment, result.offset)
+    create_log(
+        db, None, "ERROR", f"Falha na verificação do diário de auditoria: {result.error} ({result.segment}, posição {result.offset}).",
+        action="audit.journal_verification_failed", payload={"segment": result.segment, "offset": result.offset, "error": result.error}
+    )
+    return False
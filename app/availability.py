@@ -0,0 +1,114 @@
+# app/availability.py
+
+"""
+Módulo de Disponibilidade das Unidades de Equipamento
+
+A disponibilidade de uma unidade é derivada das suas reservas, e não de um
+status gravado manualmente. O campo `EquipmentUnit.status` representa apenas
+o estado operacional da unidade ('available' ou 'maintenance').
+
+Regras:
+- Uma unidade pode ser reservada para um período se não estiver em manutenção
+  e não houver nenhuma reserva ativa ('pending' ou 'approved') que se sobreponha
+  ao período. Assim, uma mesma unidade pode ter várias reservas futuras.
+- O status "atual" de uma unidade (exibido no inventário) é 'reserved' se houver
+  uma reserva aprovada em andamento (ou atrasada, ainda não devolvida),
+  'pending' se houver uma solicitação pendente cobrindo o momento atual, e
+  'available' caso contrário.
+
+O mapa de unidades ocupadas "agora" é mantido em um cache de curta duração,
+invalidado pelas rotas que criam ou alteram reservas.
+
+Dependências:
+- sqlalchemy: Para as consultas de intervalo (apoiadas por índices em 'reservations').
+- app.cache_utils: Para o cache de curta duração.
+- app.config: Para o tempo de vida do cache.
+"""
+
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.cache_utils import TTLCache
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+
+# Status de reserva que ocupam uma unidade.
+ACTIVE_RESERVATION_STATUSES = ('pending', 'approved')
+
+# Estados operacionais que podem ser gravados em `EquipmentUnit.status`.
+UNIT_OPERATIONAL_STATUSES = ('available', 'maintenance')
+
+# Cache do mapa {unit_id: status atual} das unidades ocupadas neste momento.
+_units_now_cache = TTLCache(ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS, maxsize=1)
+
+def overlapping_reservation_clause(start: datetime, end: datetime):
+    """Condição SQL para reservas ativas que se sobrepõem ao período [start, end)."""
+    return and_(
+        Reservation.status.in_(ACTIVE_RESERVATION_STATUSES),
+        Reservation.start_time < end,
+        Reservation.end_time > start
+    )
+
+def occupying_now_clause(now: datetime):
+    """
+    Condição SQL para reservas que ocupam a unidade no instante `now`.
+    Reservas aprovadas cujo prazo já passou (atrasadas) continuam ocupando a
+    unidade até serem devolvidas.
+    """
+    return and_(
+        Reservation.status.in_(ACTIVE_RESERVATION_STATUSES),
+        Reservation.start_time <= now,
+        or_(Reservation.end_time > now, Reservation.status == 'approved')
+    )
+
+def occupied_units_subquery(now: datetime):
+    """Subconsulta com os IDs (distintos) das unidades ocupadas no instante `now`."""
+    return select(Reservation.unit_id).where(occupying_now_clause(now)).distinct().subquery()
+
+def find_conflicting_reservation(db: Session, unit_id: int, start: datetime, end: datetime,
+                                 exclude_id: int | None = None) -> Reservation | None:
+    """Retorna uma reserva ativa da unidade que se sobreponha ao período (exceto `exclude_id`), se existir."""
+    query = db.query(Reservation).filter(
+        Reservation.unit_id == unit_id,
+        overlapping_reservation_clause(start, end)
+    )
+    if exclude_id is not None:
+        query = query.filter(Reservation.id != exclude_id)
+    return query.first()
+
+def is_unit_bookable(db: Session, unit: EquipmentUnit, start: datetime, end: datetime) -> bool:
+    """Verifica se a unidade pode ser reservada para o período informado."""
+    return unit.status != 'maintenance' and find_conflicting_reservation(db, unit.id, start, end) is None
+
+def units_in_use_now(db: Session) -> dict[int, str]:
+    """
+    Retorna o mapa {unit_id: 'reserved' | 'pending'} das unidades ocupadas agora.
+    O resultado é mantido em cache por AVAILABILITY_CACHE_TTL_SECONDS.
+    """
+    def load():
+        now = datetime.now(timezone.utc)
+        in_use = {}
+        for unit_id, reservation_status in db.query(Reservation.unit_id, Reservation.status).filter(occupying_now_clause(now)):
+            # Uma reserva aprovada prevalece sobre uma solicitação pendente
+            if in_use.get(unit_id) != 'reserved':
+                in_use[unit_id] = 'reserved' if reservation_status == 'approved' else 'pending'
+        return in_use
+
+    return _units_now_cache.get_or_set("units_in_use", load)
+
+def annotate_current_status(db: Session, units: Iterable[EquipmentUnit]):
+    """
+    Preenche o atributo transitório `current_status` de cada unidade, usado
+    pelo schema `EquipmentUnitOut` no lugar do estado operacional.
+    """
+    in_use = units_in_use_now(db)
+    for unit in units:
+        unit.current_status = 'maintenance' if unit.status == 'maintenance' else in_use.get(unit.id, 'available')
+
+def invalidate_availability_cache():
+    """Descarta o mapa de unidades ocupadas. Deve ser chamada após alterações em reservas."""
+    _units_now_cache.invalidate()
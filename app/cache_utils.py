@@ -0,0 +1,83 @@
+# app/cache_utils.py
+
+"""
+Módulo Utilitário de Cache em Memória
+
+Este módulo fornece um cache simples, em memória e com tempo de expiração
+(TTL), usado para guardar por poucos segundos resultados de consultas
+frequentes e caras. Cada processo da API mantém o seu próprio cache; por isso,
+os valores devem tolerar um pequeno atraso, limitado pelo TTL, e as rotas que
+alteram os dados de origem devem chamar `invalidate` após o commit.
+
+Dependências:
+- threading: Para proteger o cache do acesso concorrente das rotas síncronas,
+  que o FastAPI executa em um pool de threads.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Cache chave/valor em que cada entrada expira após `ttl_seconds`.
+
+    Quando o número de entradas atinge `maxsize`, as entradas expiradas são
+    descartadas e, se ainda necessário, a mais antiga é removida.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor da chave, ou `default` se ela não existir ou tiver expirado."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Armazena um valor, que expira após o TTL do cache."""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou, se ausente, calcula-o com `factory` e o armazena.
+        O cálculo ocorre fora do lock, para não bloquear as demais chaves.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            if self.ttl_seconds > 0:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None):
+        """Remove uma chave do cache, ou todas as entradas se nenhuma chave for informada."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def _evict(self):
+        """Descarta as entradas expiradas e, se o cache continuar cheio, a mais antiga."""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
@@ -0,0 +1,205 @@
+# app/compression.py
+
+"""
+Módulo de Compressão das Respostas HTTP (gzip e Brotli)
+
+Este módulo fornece um middleware ASGI que comprime as respostas da API
+conforme o cabeçalho `Accept-Encoding` do cliente. As páginas de reservas
+(com usuário, setor, unidade e tipo aninhados) e as listagens grandes de
+tipos de equipamento são JSON muito repetitivo e diminuem de 5 a 20 vezes.
+
+Regras:
+- Brotli é preferido quando o cliente o aceita e o pacote `brotli` está
+  instalado; caso contrário, é usado o gzip.
+- Apenas os tipos de conteúdo da lista permitida são comprimidos (imagens,
+  por exemplo, já são comprimidas).
+- Respostas completas menores que o tamanho mínimo são enviadas sem compressão,
+  pois o ganho não compensa o custo de CPU.
+- Respostas em streaming (ex: exportação de logs) são comprimidas bloco a bloco,
+  sem acumular o corpo em memória.
+
+Dependências:
+- zlib: Para a compressão gzip.
+- brotli (opcional): Para a compressão Brotli.
+- app.config: Para os limites e a lista de tipos de conteúdo.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - o Brotli é opcional
+    brotli = None
+
+# Status cujas respostas não têm corpo e nunca são comprimidas.
+_NO_BODY_STATUSES = {204, 304}
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Converte o cabeçalho Accept-Encoding em um dicionário {codificação: peso q}."""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+def choose_encoding(header: str, brotli_enabled: bool = True) -> str | None:
+    """Escolhe a codificação da resposta ('br', 'gzip' ou None) a partir do Accept-Encoding."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None and brotli_enabled else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+class _Compressor:
+    """Compressor incremental com a mesma interface para gzip e Brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: formato gzip (cabeçalho e CRC), e não zlib puro
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Comprime um bloco; com `flush`, emite tudo o que já pode ser descomprimido pelo cliente."""
+        if self.encoding == "br":
+            return self._br.process(data) + (self._br.flush() if flush else b"")
+        return self._gz.compress(data) + (self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compressão gzip/Brotli.
+
+    Args:
+        app: Aplicação ASGI envolvida.
+        minimum_size: Tamanho mínimo (em bytes) de uma resposta completa para ser comprimida.
+        content_types: Prefixos dos tipos de conteúdo comprimíveis (ex: 'application/json', 'text/').
+        gzip_level: Nível de compressão do gzip (1 a 9).
+        brotli_quality: Qualidade da compressão Brotli (0 a 11).
+        brotli_enabled: Se o Brotli pode ser oferecido (além de o pacote estar instalado).
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, content_types: tuple = ("application/json", "text/"),
+                 gzip_level: int = 6, brotli_quality: int = 4, brotli_enabled: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled
+
+    async def __call__(self, scope, receive, send):
+        # Respostas a HEAD não têm corpo, mas informam o Content-Length original
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding, self.brotli_enabled)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """Estado da compressão de uma única resposta."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    def _is_compressible(self, message) -> bool:
+        if message["status"] in _NO_BODY_STATUSES:
+            return False
+        headers = {name.lower(): value for name, value in message.get("headers", [])}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+        return content_type.startswith(self.middleware.content_types)
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # O início da resposta é retido até o primeiro bloco do corpo, que
+            # define se a resposta é completa (e pequena) ou em streaming.
+            self.start_message = message
+            self.passthrough = not self._is_compressible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+            headers = _append_vary(headers)
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Resposta completa e pequena: enviada sem compressão
+                self.passthrough = True
+                await self._send({**start, "headers": headers + [(b"content-length", str(len(body)).encode())]})
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers.append((b"content-encoding", self.encoding.encode()))
+            if not more_body:
+                compressed = self.compressor.finish(body)
+                headers.append((b"content-length", str(len(compressed)).encode()))
+                await self._send({**start, "headers": headers})
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send({**start, "headers": headers})
+
+        # Streaming: cada bloco é comprimido e liberado imediatamente
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.compressor.finish(body)})
+
+def _append_vary(headers: list) -> list:
+    """Adiciona 'Accept-Encoding' ao cabeçalho Vary, para o cache correto em proxies."""
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
@@ -15,6 +15,8 @@ Dependências:
 - pydantic_settings: Para carregar e validar as variáveis de ambiente.
 """
 
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -47,6 +49,91 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60  # Tempo de validade do token de acesso em minutos
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7     # Tempo de validade do refresh token em dias
 
+    # --- Tarefas agendadas (scheduler interno) ---
+    SCHEDULER_ENABLED: bool = False                   # Se as tarefas periódicas devem rodar neste processo
+    OVERDUE_REMINDER_INTERVAL_SECONDS: int = 900      # Intervalo entre as verificações de reservas atrasadas
+    OVERDUE_REMINDER_BATCH_SIZE: int = 20             # Quantidade de e-mails de atraso enviados por lote
+    OVERDUE_REMINDER_BATCH_DELAY_SECONDS: float = 2.0 # Pausa entre lotes, para respeitar o limite do servidor SMTP
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = 300     # Intervalo entre as varreduras de reservas pendentes expiradas
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500           # Quantidade de reservas processadas por transação na varredura
+    PENDING_RESERVATION_SLA_HOURS: int = 48           # Prazo para um gerente analisar uma reserva pendente antes que ela expire
+    NO_SHOW_GRACE_MINUTES: int = 60                   # Tolerância, após o início, para a retirada de uma reserva aprovada antes que ela expire (0 desativa)
+
+    # --- Observabilidade ---
+    METRICS_ENABLED: bool = False                     # Coleta métricas e expõe a rota /metrics (sem autenticação: restrinja-a à rede interna)
+    LOG_LAZY_LOADS: bool = False                      # (Homologação) Registra cada carregamento lazy com a pilha de chamadas
+    SLOW_QUERY_LOG_ENABLED: bool = False              # Registra os comandos SQL mais lentos que o limite abaixo
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0            # Duração a partir da qual um comando é considerado lento
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0               # Fração (0 a 1) dos comandos lentos que são registrados
+    SLOW_QUERY_EXPLAIN: bool = False                  # Captura o EXPLAIN (ANALYZE, BUFFERS) dos comandos lentos (PostgreSQL)
+    SLOW_QUERY_FLUSH_INTERVAL_SECONDS: int = 60       # Intervalo de gravação dos registros em memória na tabela
+    SLOW_QUERY_FLUSH_THRESHOLD: int = 500             # Registros em memória que disparam a gravação, mesmo sem o agendador (0 desativa)
+    SLOW_QUERY_LOG_PARAMETERS: bool = False           # Grava os valores dos parâmetros (podem conter dados sensíveis); senão, apenas os tipos
+    SLOW_QUERY_RETENTION_DAYS: int = 30               # Dias em que os registros de consultas lentas são mantidos
+    SLOW_QUERY_RETENTION_INTERVAL_SECONDS: int = 86400  # Intervalo entre as remoções dos registros antigos
+
+    # --- Compressão das respostas ---
+    COMPRESSION_ENABLED: bool = True                  # Se as respostas devem ser comprimidas (gzip/Brotli) conforme o Accept-Encoding
+    COMPRESSION_MINIMUM_SIZE: int = 1024              # Tamanho mínimo (bytes) de uma resposta para ser comprimida
+    COMPRESSION_GZIP_LEVEL: int = 6                   # Nível do gzip (1 = mais rápido, 9 = menor)
+    COMPRESSION_BROTLI_ENABLED: bool = True           # Oferece Brotli quando o pacote 'brotli' estiver instalado
+    COMPRESSION_BROTLI_QUALITY: int = 4               # Qualidade do Brotli (0 a 11); valores altos custam muita CPU
+    COMPRESSION_CONTENT_TYPES: List[str] = ["application/json", "text/"]  # Prefixos dos tipos de conteúdo comprimíveis
+
+    # --- Agregados do painel de análise ---
+    ANALYTICS_TIMEZONE: str = "UTC"                   # Fuso dos dias e horas dos agregados (ex: "America/Sao_Paulo"); ao mudar, recalcule o histórico
+    ROLLUP_REFRESH_INTERVAL_SECONDS: int = 3600       # Intervalo entre os recálculos dos agregados dos dias recentes
+    ROLLUP_REFRESH_DAYS: int = 2                      # Quantidade de dias (incluindo hoje) recalculados a cada rodada
+    UTILIZATION_DEFAULT_WINDOW_DAYS: int = 30         # Janela padrão da análise de utilização das unidades
+    UTILIZATION_SATURATION_PERCENT: float = 90.0      # Utilização a partir da qual uma unidade é considerada saturada
+    UTILIZATION_CACHE_TTL_SECONDS: float = 300.0      # Validade do resultado da análise de utilização de cada janela
+    POPULARITY_REFRESH_INTERVAL_SECONDS: int = 300    # Intervalo entre as recargas do ranking de popularidade em memória de cada processo
+    FORECAST_HISTORY_WEEKS: int = 104                 # Semanas de histórico usadas na previsão de demanda (104 = sazonalidade anual)
+    FORECAST_HORIZON_WEEKS: int = 8                   # Semanas futuras previstas
+    FORECAST_TRAINING_INTERVAL_SECONDS: int = 86400   # Intervalo entre os treinamentos da previsão de demanda
+
+    # --- Relatórios (geração assíncrona) ---
+    REPORTS_STORAGE_DIR: str = "storage/reports"      # Diretório onde os arquivos dos relatórios gerados são gravados
+    REPORT_RETENTION_DAYS: int = 7                    # Dias em que o arquivo de um relatório fica disponível para download
+    REPORT_RETENTION_INTERVAL_SECONDS: int = 3600     # Intervalo entre as remoções dos relatórios expirados
+    REPORT_WORKER_POLL_SECONDS: float = 5.0           # Intervalo entre as verificações da fila pelo worker de relatórios
+    REPORT_JOB_TIMEOUT_MINUTES: int = 60              # Tempo após o qual um relatório em execução é considerado interrompido
+
+    # --- Retenção dos logs de atividade ---
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 12           # Meses completos de logs mantidos no banco (além do mês atual)
+    ACTIVITY_LOG_PARTITIONS_AHEAD: int = 2            # Partições mensais criadas com antecedência (PostgreSQL)
+    ACTIVITY_LOG_ARCHIVE_DIR: str = "storage/log_archive"  # Diretório dos arquivos .csv.gz dos meses arquivados
+    ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS: int = 86400  # Intervalo entre as rodadas de manutenção dos logs
+
+    # --- Compactação do histórico das unidades ---
+    UNIT_HISTORY_COMPACT_AFTER_DAYS: int = 180        # Idade a partir da qual os eventos rotineiros das unidades são resumidos
+    UNIT_HISTORY_COMPACTION_INTERVAL_SECONDS: int = 86400  # Intervalo entre as rodadas de compactação do histórico
+
+    # --- Diário de auditoria (local, encadeado por hashes) ---
+    ACTIVITY_LOG_DB_ENABLED: bool = True              # Grava os logs de atividade na tabela 'activity_logs'
+    AUDIT_JOURNAL_ENABLED: bool = False               # Grava os logs de atividade também no diário de auditoria local
+    AUDIT_JOURNAL_DIR: str = "storage/audit_journal"  # Diretório dos segmentos do diário
+    AUDIT_JOURNAL_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024  # Tamanho a partir do qual um novo segmento é criado
+    AUDIT_JOURNAL_FSYNC: bool = False                 # Força a gravação em disco (fsync) a cada escrita; mais seguro e mais lento
+    AUDIT_JOURNAL_VERIFY_INTERVAL_SECONDS: int = 3600 # Intervalo entre as verificações da cadeia de hashes
+
+    # --- Caches em memória ---
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 5.0       # Validade do mapa de unidades ocupadas "agora"
+    EQUIPMENT_TYPE_CACHE_TTL_SECONDS: float = 30.0    # Validade do detalhe (tipo + unidades) em cache de cada tipo de equipamento
+
+    # --- Servidor de produção (python -m app.server) ---
+    SERVER_HOST: str = "0.0.0.0"                      # Endereço em que o servidor escuta
+    SERVER_PORT: int = 8000                           # Porta em que o servidor escuta
+    SERVER_WORKERS: int = 0                           # Processos de trabalho (0 = um por CPU disponível, limitado por DB_MAX_CONNECTIONS)
+    SERVER_THREADPOOL_SIZE: int = 0                   # Threads das rotas síncronas por processo (0 = DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    SERVER_KEEPALIVE_SECONDS: int = 5                 # Tempo ocioso das conexões keep-alive; atrás de um balanceador, use um valor maior que o dele
+    SERVER_BACKLOG: int = 2048                        # Conexões aguardando aceitação na fila do socket compartilhado
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30         # Tempo para concluir as requisições em andamento ao encerrar um processo
+    DB_POOL_SIZE: int = 10                            # Conexões mantidas abertas no pool de cada processo (abertas antes de aceitar tráfego)
+    DB_MAX_OVERFLOW: int = 20                         # Conexões extras, além do pool, abertas nos picos
+    DB_POOL_RECYCLE_SECONDS: int = 1800               # Idade a partir da qual uma conexão do pool é reaberta
+    DB_MAX_CONNECTIONS: int = 90                      # Limite de conexões da API no banco (processos × (pool + extras)); 0 = sem verificação
+
     class Config:
         """
         Classe de configuração interna para o Pydantic, que especifica de onde
@@ -15,19 +15,47 @@ Principais componentes:
 Dependências:
 - sqlalchemy: A biblioteca ORM para Python.
 - app.config: Para obter a string de conexão do banco de dados (DATABASE_URL).
+- app.metrics: Para contar os comandos SQL e o tempo de banco de cada requisição.
+- app.query_budget: Para registrar carregamentos lazy em homologação.
+- app.slow_query_log: Para registrar os comandos SQL lentos (opcional).
 """
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.config import settings
+from app.metrics import instrument_engine
+from app.query_budget import enable_lazy_load_logging
+from app.slow_query_log import install_slow_query_log
 
 # Cria a URL de conexão a partir das configurações carregadas do arquivo .env
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 # Cria o "motor" (engine) do SQLAlchemy. A engine é o ponto central de comunicação
 # com o banco de dados e gerencia um pool de conexões para otimizar o desempenho.
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# O tamanho do pool vale para cada processo do servidor (ver app/server.py); o
+# SQLite usa o pool padrão do SQLAlchemy.
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+else:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+
+# Registra os eventos de instrumentação das consultas (ver app/metrics.py).
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+
+# Em homologação, registra no log os carregamentos lazy (possíveis N+1).
+if settings.LOG_LAZY_LOADS:
+    enable_lazy_load_logging()
+
+# Mede os comandos SQL e registra os que ultrapassarem SLOW_QUERY_THRESHOLD_MS.
+if settings.SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine)
 
 # Cria uma fábrica de sessões (SessionLocal). Cada instância de SessionLocal
 # representará uma "conversa" individual com o banco de dados.
@@ -179,24 +179,27 @@ async def send_new_reservation_to_managers_email(managers: List[User], reservati
     fm = FastMail(conf)
     await fm.send_message(message, template_name="new_reservation_for_manager.html")
 
-async def send_reservation_overdue_email(reservation: Reservation):
+def reservation_overdue_template_body(reservation: Reservation) -> dict:
     """
-    Envia um e-mail de lembrete de devolução para uma reserva atrasada.
-
-    Args:
-        reservation (Reservation): O objeto da reserva atrasada.
+    Monta os dados do template do e-mail de atraso. Requer a reserva com o
+    usuário, a unidade e o tipo de equipamento já carregados.
     """
-    template_body = {
+    return {
         "username": reservation.user.username,
         "equipment_name": reservation.equipment_unit.equipment_type.name,
         "unit_identifier": reservation.equipment_unit.identifier_code or f"ID {reservation.equipment_unit.id}",
         "equipment_serial_number": reservation.equipment_unit.serial_number,
         "end_time": reservation.end_time.strftime('%d/%m/%Y às %H:%M'),
     }
-    
+
+async def send_overdue_email_message(recipient: str, template_body: dict):
+    """
+    Envia o e-mail de atraso a partir de dados já montados (ver
+    `reservation_overdue_template_body`), sem acessar o banco de dados.
+    """
     message = MessageSchema(
         subject="[AVISO] Devolução de Equipamento Atrasada",
-        recipients=[reservation.user.email],
+        recipients=[recipient],
         template_body=template_body,
         subtype="html"
     )
@@ -204,6 +207,15 @@ async def send_reservation_overdue_email(reservation: Reservation):
     fm = FastMail(conf)
     await fm.send_message(message, template_name="reservation_overdue.html")
 
+async def send_reservation_overdue_email(reservation: Reservation):
+    """
+    Envia um e-mail de lembrete de devolução para uma reserva atrasada.
+
+    Args:
+        reservation (Reservation): O objeto da reserva atrasada.
+    """
+    await send_overdue_email_message(reservation.user.email, reservation_overdue_template_body(reservation))
+
 async def send_reservation_returned_email(reservation: Reservation):
     """
     Envia um e-mail de confirmação de devolução de equipamento.
@@ -0,0 +1,184 @@
+# app/forecasting.py
+
+"""
+Módulo de Previsão de Demanda por Tipo de Equipamento
+
+Apoia as decisões de compra prevendo, para as próximas semanas, a demanda de
+cada tipo de equipamento:
+
+- o pico semanal de reservas simultâneas, comparado com a quantidade de
+  unidades do tipo (se o pico previsto for maior, faltarão unidades);
+- a quantidade de reservas que começam em cada semana.
+
+O histórico (FORECAST_HISTORY_WEEKS semanas) é montado a partir das reservas,
+em uma única consulta colunar, como uma matriz tipo × hora de simultaneidade
+(eventos +1/-1 por hora acumulados com NumPy), reduzida ao pico de cada semana.
+
+Cada série semanal recebe um modelo de suavização exponencial com tendência
+amortecida (Holt) e, quando há ao menos dois anos de histórico, sazonalidade
+anual de 52 semanas (Holt-Winters aditivo), que captura os picos de início de
+semestre. Os parâmetros são escolhidos por busca em grade, minimizando o erro
+quadrático das previsões de um passo. Todas as séries e todas as combinações
+da grade são ajustadas juntas, em lote, com operações vetorizadas do NumPy.
+
+O treinamento é feito fora das requisições, pela tarefa agendada
+`demand_forecast` (app/jobs/demand_forecast.py), que grava o resultado na
+tabela 'demand_forecasts'; a rota /dashboard/forecast apenas o lê.
+
+Dependências:
+- numpy: Para a montagem das séries e o ajuste dos modelos em lote.
+- sqlalchemy: Para a leitura das reservas.
+- app.rollups: Para o início das semanas no fuso do painel de análise.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from itertools import product
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.equipment_type import EquipmentType
+from app.rollups import local_day, day_start
+
+# Status de reserva que representam demanda (inclusive as não atendidas a tempo).
+DEMAND_STATUSES = ('pending', 'approved', 'returned', 'expired')
+
+# Duração da sazonalidade anual, em semanas.
+SEASON_LENGTH = 52
+
+# Amortecimento da tendência nas previsões (1 = tendência linear sem amortecimento).
+TREND_DAMPING = 0.9
+
+# Grade de parâmetros da suavização: nível (alpha), tendência (beta) e sazonalidade (gamma).
+ALPHAS = (0.1, 0.3, 0.5, 0.8)
+BETAS = (0.0, 0.05, 0.2)
+GAMMAS = (0.05, 0.2, 0.4)
+
+HOURS_PER_WEEK = 7 * 24
+
+@dataclass
+class WeeklyHistory:
+    """Histórico semanal dos tipos de equipamento (uma linha por tipo)."""
+    type_ids: list[int]
+    first_week: date
+    peak: np.ndarray            # (tipos, semanas): pico de reservas simultâneas
+    reservations: np.ndarray    # (tipos, semanas): reservas iniciadas na semana
+
+@dataclass
+class FittedForecast:
+    """Previsões de um conjunto de séries: (séries, horizonte) e o modelo usado."""
+    values: np.ndarray
+    model: str
+
+def week_start(moment: datetime) -> date:
+    """Segunda-feira da semana de uma data, no fuso do painel de análise."""
+    day = local_day(moment)
+    return day - timedelta(days=day.weekday())
+
+def load_weekly_history(db: Session, weeks: int, now: datetime | None = None) -> WeeklyHistory:
+    """
+    Monta o histórico das últimas `weeks` semanas completas (até a segunda-feira
+    da semana atual) para todos os tipos de equipamento.
+    """
+    first_week = week_start(now or datetime.now(timezone.utc)) - timedelta(weeks=weeks)
+    origin = day_start(first_week)
+    hours = weeks * HOURS_PER_WEEK
+    history_end = origin + timedelta(hours=hours)
+
+    type_ids = [type_id for (type_id,) in db.execute(select(EquipmentType.id).order_by(EquipmentType.id))]
+    peak = np.zeros((len(type_ids), weeks))
+    reservations = np.zeros((len(type_ids), weeks))
+    if not type_ids or weeks <= 0:
+        return WeeklyHistory(type_ids, first_week, peak, reservations)
+
+    rows = db.execute(
+        select(EquipmentUnit.type_id, Reservation.start_time, Reservation.end_time)
+        .join(Reservation.equipment_unit)
+        .where(Reservation.status.in_(DEMAND_STATUSES), Reservation.start_time < history_end, Reservation.end_time > origin)
+    ).all()
+    if not rows:
+        return WeeklyHistory(type_ids, first_week, peak, reservations)
+
+    row_types, starts, ends = zip(*rows)
+    type_index = np.searchsorted(np.array(type_ids), np.array(row_types))
+    origin_ts = origin.timestamp()
+    start_hours = (np.array([_timestamp(moment) for moment in starts]) - origin_ts) / 3600
+    end_hours = (np.array([_timestamp(moment) for moment in ends]) - origin_ts) / 3600
+
+    # Simultaneidade por hora: +1 na hora de início e -1 após a hora de término, acumulados
+    first_hour = np.clip(np.floor(start_hours), 0, hours).astype(np.int64)
+    last_hour = np.clip(np.ceil(end_hours), 0, hours).astype(np.int64)
+    diff = np.zeros((len(type_ids), hours + 1), dtype=np.int64)
+    np.add.at(diff, (type_index, first_hour), 1)
+    np.add.at(diff, (type_index, last_hour), -1)
+    concurrency = np.cumsum(diff[:, :hours], axis=1)
+    peak = concurrency.reshape(len(type_ids), weeks, HOURS_PER_WEEK).max(axis=2).astype(np.float64)
+
+    # Reservas iniciadas em cada semana do histórico
+    started = (start_hours >= 0) & (start_hours < hours)
+    np.add.at(reservations, (type_index[started], (start_hours[started] // HOURS_PER_WEEK).astype(np.int64)), 1)
+    return WeeklyHistory(type_ids, first_week, peak, reservations)
+
+def _timestamp(moment: datetime) -> float:
+    # Datas sem fuso (como as do SQLite) são UTC
+    return (moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment).timestamp()
+
+def fit_and_forecast(series: np.ndarray, horizon: int) -> FittedForecast:
+    """
+    Ajusta, em lote, um modelo de suavização exponencial a cada linha de `series`
+    (séries × semanas) e retorna as previsões das próximas `horizon` semanas.
+
+    Todas as combinações da grade de parâmetros são avaliadas ao mesmo tempo
+    (matrizes combinações × séries); para cada série é usada a combinação de
+    menor erro quadrático nas previsões de um passo.
+    """
+    n_series, length = series.shape
+    if n_series == 0 or length < 2:
+        last = series[:, -1:] if length else np.zeros((n_series, 1))
+        return FittedForecast(np.repeat(last, horizon, axis=1), "naive")
+
+    seasonal = length >= 2 * SEASON_LENGTH
+    grid = np.array(list(product(ALPHAS, BETAS, GAMMAS if seasonal else (0.0,))))
+    alpha, beta, gamma = (grid[:, i][:, None] for i in range(3))
+    n_combos = len(grid)
+
+    if seasonal:
+        first_season = series[:, :SEASON_LENGTH]
+        level = np.broadcast_to(first_season.mean(axis=1), (n_combos, n_series)).copy()
+        trend = np.broadcast_to(
+            (series[:, SEASON_LENGTH:2 * SEASON_LENGTH].mean(axis=1) - first_season.mean(axis=1)) / SEASON_LENGTH,
+            (n_combos, n_series)
+        ).copy()
+        season = np.broadcast_to(first_season - first_season.mean(axis=1, keepdims=True), (n_combos, n_series, SEASON_LENGTH)).copy()
+    else:
+        level = np.broadcast_to(series[:, 0], (n_combos, n_series)).copy()
+        trend = np.broadcast_to(series[:, 1] - series[:, 0], (n_combos, n_series)).copy()
+        season = np.zeros((n_combos, n_series, 1))
+
+    sse = np.zeros((n_combos, n_series))
+    for t in range(length):
+        position = t % season.shape[2]
+        observed = series[:, t]
+        seasonal_term = season[:, :, position]
+        error = observed - (level + TREND_DAMPING * trend + seasonal_term)
+        sse += error ** 2
+        new_level = alpha * (observed - seasonal_term) + (1 - alpha) * (level + TREND_DAMPING * trend)
+        trend = beta * (new_level - level) + (1 - beta) * TREND_DAMPING * trend
+        if seasonal:
+            season[:, :, position] = gamma * (observed - new_level) + (1 - gamma) * seasonal_term
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_series)
+    level, trend, season = level[best, columns], trend[best, columns], season[best, columns]
+
+    steps = np.arange(1, horizon + 1)
+    damped_trend = np.cumsum(TREND_DAMPING ** steps)
+    values = level[:, None] + damped_trend[None, :] * trend[:, None]
+    if seasonal:
+        values += season[:, (length + steps - 1) % SEASON_LENGTH]
+    return FittedForecast(np.clip(values, 0, None), "holt_winters" if seasonal else "holt")
@@ -0,0 +1,81 @@
+# app/jobs/demand_forecast.py
+
+"""
+Tarefa Agendada e Comando: Treinamento da Previsão de Demanda
+
+Monta o histórico semanal de todos os tipos de equipamento, ajusta os modelos
+de suavização exponencial em lote (ver app/forecasting.py) e substitui, em uma
+única transação, as previsões gravadas na tabela 'demand_forecasts'.
+
+Roda periodicamente pelo agendador interno (FORECAST_TRAINING_INTERVAL_SECONDS)
+e pode ser executada manualmente, por exemplo logo após a implantação:
+    python -m app.jobs.demand_forecast
+
+Dependências:
+- numpy / app.forecasting: Para a montagem das séries e o ajuste dos modelos.
+- sqlalchemy: Para a gravação das previsões em lote.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.demand_forecast import DemandForecast
+from app.forecasting import load_weekly_history, fit_and_forecast
+# Registra todos os modelos, para que os relacionamentos possam ser resolvidos.
+import app.models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+def train_demand_forecasts(db: Session, now: datetime | None = None) -> int:
+    """
+    Treina os modelos e grava as previsões das próximas FORECAST_HORIZON_WEEKS semanas.
+
+    Returns:
+        int: Quantidade de previsões (tipo × semana) gravadas.
+    """
+    now = now or datetime.now(timezone.utc)
+    horizon = settings.FORECAST_HORIZON_WEEKS
+    history = load_weekly_history(db, settings.FORECAST_HISTORY_WEEKS, now)
+
+    # As séries de pico e de reservas são ajustadas juntas, em um único lote
+    forecast = fit_and_forecast(np.vstack((history.peak, history.reservations)), horizon)
+    n_types = len(history.type_ids)
+    peaks, reservations = forecast.values[:n_types], forecast.values[n_types:]
+
+    first_forecast_week = history.first_week + timedelta(weeks=history.peak.shape[1])
+    rows = [
+        {
+            "equipment_type_id": type_id,
+            "week_start": first_forecast_week + timedelta(weeks=step),
+            "predicted_peak": round(float(peaks[i, step]), 2),
+            "predicted_reservations": round(float(reservations[i, step]), 2),
+            "model": forecast.model,
+            "generated_at": now,
+        }
+        for i, type_id in enumerate(history.type_ids)
+        for step in range(horizon)
+    ]
+
+    db.execute(delete(DemandForecast))
+    if rows:
+        db.execute(insert(DemandForecast), rows)
+    db.commit()
+    logger.info("Previsão de demanda gerada para %s tipo(s) de equipamento (modelo: %s).", n_types, forecast.model)
+    return len(rows)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    db = SessionLocal()
+    try:
+        train_demand_forecasts(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
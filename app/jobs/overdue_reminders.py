@@ -0,0 +1,163 @@
+# app/jobs/overdue_reminders.py
+
+"""
+Tarefa Agendada: Lembretes de Reservas Atrasadas
+
+Encontra, com uma única consulta indexada, todas as reservas aprovadas cujo
+prazo de devolução já passou e que ainda não receberam lembrete, e envia os
+e-mails em lotes com pausa entre eles (para respeitar o limite do servidor SMTP).
+
+Cada lote é "reservado" na tabela 'reservation_notifications' antes do envio,
+de modo que o mesmo lembrete nunca seja enviado duas vezes, mesmo que a tarefa
+rode novamente ou em outro processo. Se o envio de um e-mail falhar, o registro
+correspondente é removido para que a próxima execução tente de novo.
+
+Os dados dos e-mails são montados logo após a consulta, antes de qualquer
+commit (que expiraria os objetos carregados e faria cada envio consultar o
+banco de novo), e todo o acesso ao banco roda em threads, fora do event loop
+da API.
+
+Dependências:
+- sqlalchemy: Para as consultas e inserções em lote.
+- app.email_utils: Para o envio do e-mail de atraso.
+- app.logging_utils: Para o registro dos envios em lote.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation_notification import ReservationNotification
+from app.email_utils import reservation_overdue_template_body, send_overdue_email_message
+from app.logging_utils import create_logs, LogEntry
+
+# Tipo de notificação registrado para os lembretes de atraso.
+OVERDUE_NOTIFICATION = "overdue"
+
+@dataclass
+class OverdueReminder:
+    """Dados de um lembrete de atraso, montados antes do envio (sem acesso ao banco)."""
+    reservation_id: int
+    user_id: int
+    username: str
+    recipient: str
+    template_body: dict
+
+def find_unnotified_overdue_reservations(db: Session, now: datetime) -> list[Reservation]:
+    """Retorna as reservas atrasadas que ainda não receberam o lembrete automático."""
+    return (
+        db.query(Reservation)
+        .outerjoin(
+            ReservationNotification,
+            and_(
+                ReservationNotification.reservation_id == Reservation.id,
+                ReservationNotification.kind == OVERDUE_NOTIFICATION
+            )
+        )
+        .filter(
+            Reservation.status == 'approved',
+            Reservation.end_time < now,
+            ReservationNotification.id.is_(None)
+        )
+        .options(
+            joinedload(Reservation.user),
+            joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
+        )
+        .order_by(Reservation.end_time.asc())
+        .all()
+    )
+
+def load_overdue_reminders(db: Session, now: datetime) -> list[OverdueReminder]:
+    """Monta os lembretes das reservas atrasadas que ainda não receberam o lembrete automático."""
+    return [
+        OverdueReminder(
+            reservation_id=reservation.id, user_id=reservation.user_id, username=reservation.user.username,
+            recipient=reservation.user.email, template_body=reservation_overdue_template_body(reservation)
+        )
+        for reservation in find_unnotified_overdue_reservations(db, now)
+    ]
+
+async def send_overdue_reminder_email(reminder: OverdueReminder):
+    """Envia o e-mail de um lembrete de atraso."""
+    await send_overdue_email_message(reminder.recipient, reminder.template_body)
+
+def _claim_batch(db: Session, batch: list[OverdueReminder]):
+    """Registra o lote antes do envio, impedindo duplicidades."""
+    db.execute(
+        insert(ReservationNotification),
+        [{"reservation_id": reminder.reservation_id, "kind": OVERDUE_NOTIFICATION} for reminder in batch]
+    )
+    db.commit()
+
+def _record_batch_results(db: Session, batch: list[OverdueReminder], results: list) -> int:
+    """
+    Libera para nova tentativa os envios que falharam e registra os logs do lote.
+
+    Returns:
+        int: Quantidade de envios que falharam.
+    """
+    failed_ids = [reminder.reservation_id for reminder, result in zip(batch, results) if isinstance(result, Exception)]
+    if failed_ids:
+        db.query(ReservationNotification).filter(
+            ReservationNotification.reservation_id.in_(failed_ids),
+            ReservationNotification.kind == OVERDUE_NOTIFICATION
+        ).delete(synchronize_session=False)
+
+    log_entries = []
+    for reminder, result in zip(batch, results):
+        if isinstance(result, Exception):
+            log_entries.append(LogEntry(
+                None, "ERROR", f"Falha ao enviar o lembrete automático de atraso da reserva ID {reminder.reservation_id}: {result}",
+                action="reservation.overdue_reminder_failed", entity_type="reservation", entity_id=reminder.reservation_id,
+                payload={"error": str(result)}
+            ))
+        else:
+            log_entries.append(LogEntry(
+                None, "INFO", f"Lembrete automático de atraso enviado para a reserva ID {reminder.reservation_id} do usuário '{reminder.username}'.",
+                action="reservation.overdue_reminder_sent", entity_type="reservation", entity_id=reminder.reservation_id,
+                payload={"recipient_id": reminder.user_id}
+            ))
+    create_logs(db, log_entries)
+    return len(failed_ids)
+
+async def send_overdue_reminders(db: Session, send_email=send_overdue_reminder_email, now: datetime | None = None) -> int:
+    """
+    Envia os lembretes de atraso pendentes, em lotes.
+
+    Args:
+        db (Session): Sessão de banco de dados da tarefa.
+        send_email (Callable): Função assíncrona de envio, que recebe um OverdueReminder (substituível nos testes).
+        now (datetime | None): Instante de referência; por padrão, o horário atual.
+
+    Returns:
+        int: Quantidade de lembretes enviados com sucesso.
+    """
+    now = now or datetime.now(timezone.utc)
+    reminders = await asyncio.to_thread(load_overdue_reminders, db, now)
+    batch_size = max(1, settings.OVERDUE_REMINDER_BATCH_SIZE)
+    sent = 0
+
+    for start in range(0, len(reminders), batch_size):
+        batch = reminders[start:start + batch_size]
+
+        # 1. Registra o lote antes do envio, impedindo duplicidades
+        await asyncio.to_thread(_claim_batch, db, batch)
+
+        # 2. Envia os e-mails do lote em paralelo
+        results = await asyncio.gather(*(send_email(reminder) for reminder in batch), return_exceptions=True)
+
+        # 3. Libera para nova tentativa os envios que falharam e registra os logs do lote
+        failed = await asyncio.to_thread(_record_batch_results, db, batch, results)
+        sent += len(batch) - failed
+
+        # 4. Aguarda antes do próximo lote (limite de envio)
+        if start + batch_size < len(reminders):
+            await asyncio.sleep(settings.OVERDUE_REMINDER_BATCH_DELAY_SECONDS)
+
+    return sent
@@ -0,0 +1,154 @@
+# app/jobs/report_worker.py
+
+"""
+Worker de Relatórios
+
+Processa, fora dos processos da API, a fila de relatórios solicitados pelos
+administradores (tabela 'report_jobs'): agrega as reservas do período, gera o
+arquivo CSV ou PDF (app/reports.py), grava-o no armazenamento local e marca a
+solicitação como concluída, com a data de expiração do arquivo.
+
+Várias instâncias do worker podem rodar ao mesmo tempo: cada solicitação é
+reservada com `SELECT ... FOR UPDATE SKIP LOCKED` (PostgreSQL) antes de ser
+marcada como 'running'. Solicitações presas em 'running' por mais tempo que
+REPORT_JOB_TIMEOUT_MINUTES (ex: worker interrompido) voltam para a fila; a
+verificação é feita na partida e periodicamente durante o laço do worker.
+
+Uso (a partir da raiz do projeto):
+    python -m app.jobs.report_worker            # processa a fila continuamente
+    python -m app.jobs.report_worker --once     # processa o que houver na fila e encerra
+
+Dependências:
+- sqlalchemy: Para a reserva das solicitações na fila.
+- app.reports: Para a agregação, a geração e o armazenamento dos arquivos.
+- app.logging_utils: Para o registro das conclusões e falhas.
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.report_job import ReportJob
+from app.reports import RENDERERS, build_report_data, store_report
+from app.logging_utils import create_log
+# Registra todos os modelos, para que os relacionamentos possam ser resolvidos.
+import app.models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Intervalo, em segundos, entre as verificações de solicitações presas em 'running'.
+REQUEUE_CHECK_SECONDS = 60
+
+def claim_next_job(db: Session) -> ReportJob | None:
+    """Reserva a próxima solicitação da fila, marcando-a como 'running'."""
+    job = (
+        db.query(ReportJob)
+        .filter(ReportJob.status == 'queued')
+        .order_by(ReportJob.created_at, ReportJob.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+    job.status = 'running'
+    job.started_at = datetime.now(timezone.utc)
+    db.commit()
+    return job
+
+def run_report_job(db: Session, job: ReportJob):
+    """
+    Gera o arquivo de uma solicitação já reservada e registra o resultado.
+
+    O log é gravado só depois de o status final ter sido confirmado: uma falha
+    no log não pode marcar como 'failed' um relatório já gerado (o que deixaria
+    o arquivo sem dono até a limpeza).
+    """
+    try:
+        content = RENDERERS[job.format](build_report_data(db, job))
+        job.file_path = store_report(job, content)
+        job.file_size = len(content)
+        job.status = 'completed'
+        job.finished_at = datetime.now(timezone.utc)
+        job.expires_at = job.finished_at + timedelta(days=settings.REPORT_RETENTION_DAYS)
+        db.commit()
+        log_args = ("INFO", f"Relatório ID {job.id} ({job.format.upper()}) gerado com sucesso.")
+        log_kwargs = {"action": "report.completed", "payload": {"format": job.format}}
+    except Exception as exc:
+        logger.exception("Falha ao gerar o relatório ID %s.", job.id)
+        db.rollback()
+        job.status = 'failed'
+        job.error = str(exc)[:1000]
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        log_args = ("ERROR", f"Falha ao gerar o relatório ID {job.id}: {exc}")
+        log_kwargs = {"action": "report.failed", "payload": {"error": str(exc)}}
+
+    try:
+        create_log(db, job.requested_by, *log_args, entity_type="report", entity_id=job.id, **log_kwargs)
+    except Exception:
+        logger.exception("Falha ao registrar o log do relatório ID %s.", job.id)
+        db.rollback()
+
+def requeue_stale_jobs(db: Session, now: datetime | None = None) -> int:
+    """Devolve para a fila as solicitações presas em 'running' além do tempo limite."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+    count = db.query(ReportJob).filter(ReportJob.status == 'running', ReportJob.started_at < cutoff).update(
+        {ReportJob.status: 'queued', ReportJob.started_at: None}, synchronize_session=False
+    )
+    db.commit()
+    return count
+
+def process_pending_reports(db: Session, limit: int | None = None) -> int:
+    """
+    Processa as solicitações da fila, uma de cada vez.
+
+    Returns:
+        int: Quantidade de solicitações processadas (concluídas ou com falha).
+    """
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job(db)
+        if job is None:
+            break
+        run_report_job(db, job)
+        processed += 1
+    return processed
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de geração de relatórios do EquipControl.")
+    parser.add_argument("--once", action="store_true", help="Processa a fila atual e encerra.")
+    parser.add_argument("--poll-interval", type=float, default=settings.REPORT_WORKER_POLL_SECONDS,
+                        help="Intervalo, em segundos, entre as verificações da fila vazia.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db = SessionLocal()
+    try:
+        last_requeue = None
+        while True:
+            # Devolve para a fila, periodicamente, os relatórios de workers interrompidos
+            if last_requeue is None or time.monotonic() - last_requeue >= REQUEUE_CHECK_SECONDS:
+                requeued = requeue_stale_jobs(db)
+                if requeued:
+                    logger.warning("%s relatório(s) interrompido(s) voltaram para a fila.", requeued)
+                last_requeue = time.monotonic()
+            processed = process_pending_reports(db)
+            if processed:
+                logger.info("%s relatório(s) processado(s).", processed)
+            if args.once:
+                break
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# app/jobs/reservation_sweeper.py
+
+"""
+Tarefa Agendada: Varredura de Reservas Pendentes Expiradas e Não Retiradas
+
+Reservas pendentes ocupam o horário da unidade até que um gerente as
+analise, bloqueando o inventário. Esta tarefa expira automaticamente as
+solicitações que ultrapassaram o prazo de análise (PENDING_RESERVATION_SLA_HOURS)
+ou cujo horário de início já passou, liberando esses horários.
+
+Da mesma forma, expira as reservas aprovadas cuja unidade não foi retirada
+(sem `picked_up_at`, registrado pela rota /admin/reservations/{id}/pickup) até
+NO_SHOW_GRACE_MINUTES após o início, liberando o restante do horário.
+
+Também normaliza unidades que ainda tenham gravados os antigos status
+'pending' ou 'reserved' (hoje derivados das reservas, ver app/availability.py)
+sem nenhuma reserva ativa, devolvendo-as para 'available'.
+
+Todo o trabalho é feito com UPDATEs em conjunto, em uma transação por lote,
+com os registros de histórico e de log inseridos em lote.
+
+Dependências:
+- sqlalchemy: Para as atualizações e inserções em lote.
+- app.logging_utils: Para o registro dos logs em lote.
+- app.rollups: Para manter os agregados do painel de análise.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.unit_history import UnitHistory
+from app.logging_utils import create_logs, LogEntry
+from app.availability import ACTIVE_RESERVATION_STATUSES, invalidate_availability_cache
+from app.type_details import invalidate_type_detail_cache
+from app.rollups import record_bulk_status_change
+
+def _units_without_active_reservations(db: Session, held_statuses, unit_ids=None) -> list[int]:
+    """
+    Retorna as unidades em um dos status indicados que não têm reserva ativa.
+    Se `unit_ids` for informado, a busca é restrita a essas unidades.
+    """
+    active_units = select(Reservation.unit_id).where(Reservation.status.in_(ACTIVE_RESERVATION_STATUSES))
+    query = db.query(EquipmentUnit.id).filter(
+        EquipmentUnit.status.in_(held_statuses),
+        EquipmentUnit.id.not_in(active_units)
+    )
+    if unit_ids is not None:
+        query = query.filter(EquipmentUnit.id.in_(unit_ids))
+    return [unit_id for (unit_id,) in query]
+
+def _expire_in_batches(db: Session, old_status: str, criteria, history_notes: str, log_message: str, payload: dict) -> int:
+    """
+    Expira, em lotes (uma transação por lote), as reservas em `old_status` que
+    atendem aos critérios, com o histórico das unidades e os logs inseridos em lote.
+    `log_message` recebe o ID da reserva em '{id}'.
+
+    Returns:
+        int: Quantidade de reservas expiradas.
+    """
+    batch_size = max(1, settings.RESERVATION_SWEEP_BATCH_SIZE)
+    expired = 0
+
+    while True:
+        batch = (
+            db.query(Reservation.id, Reservation.unit_id)
+            .filter(Reservation.status == old_status, *criteria)
+            .order_by(Reservation.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        reservation_ids = [r.id for r in batch]
+
+        # 1. Expira as reservas do lote (atualizando os agregados do painel na mesma transação)
+        record_bulk_status_change(db, reservation_ids, old_status, 'expired')
+        db.query(Reservation).filter(
+            Reservation.id.in_(reservation_ids),
+            Reservation.status == old_status
+        ).update({Reservation.status: 'expired'}, synchronize_session=False)
+
+        # 2. Registra o histórico das unidades e os logs do lote
+        history_rows = [
+            {"unit_id": r.unit_id, "event_type": "reservation_expired", "reservation_id": r.id, "notes": history_notes}
+            for r in batch
+        ]
+        db.execute(insert(UnitHistory), history_rows)
+        create_logs(db, [
+            LogEntry(
+                None, "INFO", log_message.format(id=r.id),
+                action="reservation.expired", entity_type="reservation", entity_id=r.id,
+                payload={"unit_id": r.unit_id, **payload}
+            )
+            for r in batch
+        ])
+        expired += len(batch)
+
+    return expired
+
+def expire_pending_reservations(db: Session, now: datetime) -> int:
+    """
+    Expira as reservas pendentes fora do prazo, em lotes, liberando seus horários.
+
+    Returns:
+        int: Quantidade de reservas expiradas.
+    """
+    sla_cutoff = now - timedelta(hours=settings.PENDING_RESERVATION_SLA_HOURS)
+    return _expire_in_batches(
+        db, 'pending', [or_(Reservation.created_at < sla_cutoff, Reservation.start_time < now)],
+        "Reserva pendente expirada automaticamente por falta de análise no prazo.",
+        f"Reserva ID {{id}} expirada automaticamente (pendente fora do prazo de {settings.PENDING_RESERVATION_SLA_HOURS}h).",
+        {"sla_hours": settings.PENDING_RESERVATION_SLA_HOURS}
+    )
+
+def expire_no_show_reservations(db: Session, now: datetime) -> int:
+    """
+    Expira as reservas aprovadas cuja unidade não foi retirada até
+    NO_SHOW_GRACE_MINUTES após o início, liberando o restante do horário
+    (0 desativa a expiração).
+
+    Returns:
+        int: Quantidade de reservas expiradas.
+    """
+    if settings.NO_SHOW_GRACE_MINUTES <= 0:
+        return 0
+    cutoff = now - timedelta(minutes=settings.NO_SHOW_GRACE_MINUTES)
+    return _expire_in_batches(
+        db, 'approved', [Reservation.picked_up_at.is_(None), Reservation.start_time < cutoff],
+        "Reserva aprovada expirada automaticamente: a unidade não foi retirada.",
+        f"Reserva ID {{id}} expirada automaticamente (unidade não retirada em até {settings.NO_SHOW_GRACE_MINUTES} min após o início).",
+        {"grace_minutes": settings.NO_SHOW_GRACE_MINUTES, "no_show": True}
+    )
+
+def release_orphaned_units(db: Session) -> int:
+    """
+    Devolve para 'available' as unidades presas em 'pending' ou 'reserved'
+    sem nenhuma reserva ativa.
+
+    Returns:
+        int: Quantidade de unidades liberadas.
+    """
+    orphaned = _units_without_active_reservations(db, ['pending', 'reserved'])
+    if not orphaned:
+        return 0
+
+    db.query(EquipmentUnit).filter(EquipmentUnit.id.in_(orphaned)).update(
+        {EquipmentUnit.status: 'available'}, synchronize_session=False
+    )
+    db.execute(insert(UnitHistory), [
+        {"unit_id": unit_id, "event_type": "status_released", "notes": "Unidade liberada automaticamente: nenhuma reserva ativa encontrada."}
+        for unit_id in orphaned
+    ])
+    create_logs(db, [LogEntry(
+        None, "WARNING", f"{len(orphaned)} unidade(s) sem reserva ativa foram liberadas automaticamente.",
+        action="unit.released", entity_type="unit", payload={"unit_ids": list(orphaned)}
+    )])
+    return len(orphaned)
+
+def sweep_reservations(db: Session, now: datetime | None = None) -> dict:
+    """
+    Executa uma rodada completa da varredura.
+
+    Returns:
+        dict: Quantidade de reservas expiradas (pendentes e não retiradas) e de unidades liberadas.
+    """
+    now = now or datetime.now(timezone.utc)
+    result = {
+        "expired_reservations": expire_pending_reservations(db, now),
+        "no_show_reservations": expire_no_show_reservations(db, now),
+        "released_units": release_orphaned_units(db),
+    }
+    if any(result.values()):
+        invalidate_availability_cache()
+        invalidate_type_detail_cache()
+    return result
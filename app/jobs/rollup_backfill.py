@@ -0,0 +1,98 @@
+# app/jobs/rollup_backfill.py
+
+"""
+Tarefa Agendada e Comando: Recálculo dos Agregados do Painel de Análise
+
+Recalcula os baldes da tabela 'reservation_rollups' a partir das reservas
+(ver app/rollups.py):
+
+- a tarefa agendada `rollup_refresh` recalcula os últimos ROLLUP_REFRESH_DAYS
+  dias, corrigindo qualquer divergência das atualizações incrementais;
+- o comando abaixo recalcula todo o histórico (ou um período), mês a mês, em
+  uma transação por mês. Deve ser executado após a criação da tabela e após
+  uma mudança de ANALYTICS_TIMEZONE.
+
+Uso (a partir da raiz do projeto):
+    python -m app.jobs.rollup_backfill
+    python -m app.jobs.rollup_backfill --start 2024-01-01 --end 2024-12-31
+
+Dependências:
+- sqlalchemy: Para a busca do período com reservas.
+- app.rollups: Para o recálculo dos baldes.
+"""
+
+import argparse
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.reservation import Reservation
+from app.models.reservation_rollup import ReservationRollup
+from app.rollups import local_day, rebuild_rollups
+# Registra todos os modelos, para que os relacionamentos possam ser resolvidos.
+import app.models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+def refresh_recent_rollups(db: Session, now: datetime | None = None) -> int:
+    """
+    Recalcula os baldes dos dias recentes (incluindo hoje).
+
+    Returns:
+        int: Quantidade de baldes gravados.
+    """
+    today = local_day(now or datetime.now(timezone.utc))
+    start_day = today - timedelta(days=max(1, settings.ROLLUP_REFRESH_DAYS) - 1)
+    return rebuild_rollups(db, start_day, today)
+
+def _month_ranges(start_day: date, end_day: date):
+    """Divide o período em intervalos de, no máximo, um mês-calendário."""
+    current = start_day
+    while current <= end_day:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield current, min(end_day, next_month - timedelta(days=1))
+        current = next_month
+
+def backfill_rollups(db: Session, start_day: date | None = None, end_day: date | None = None) -> int:
+    """
+    Recalcula os baldes de um período, mês a mês. Sem período informado, cobre
+    desde a reserva (ou o balde) mais antigo até hoje.
+
+    Returns:
+        int: Quantidade de baldes gravados.
+    """
+    if start_day is None:
+        first_reservation = db.query(func.min(Reservation.created_at)).scalar()
+        first_rollup = db.query(func.min(ReservationRollup.day)).scalar()
+        candidates = [day for day in (first_reservation and local_day(first_reservation), first_rollup) if day]
+        if not candidates:
+            return 0
+        start_day = min(candidates)
+    end_day = end_day or local_day(datetime.now(timezone.utc))
+
+    written = 0
+    for month_start, month_end in _month_ranges(start_day, end_day):
+        written += rebuild_rollups(db, month_start, month_end)
+        logger.info("Agregados recalculados de %s a %s.", month_start, month_end)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula os agregados de reservas do painel de análise.")
+    parser.add_argument("--start", type=date.fromisoformat, help="Primeiro dia (AAAA-MM-DD). Padrão: a reserva mais antiga.")
+    parser.add_argument("--end", type=date.fromisoformat, help="Último dia (AAAA-MM-DD). Padrão: hoje.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db = SessionLocal()
+    try:
+        written = backfill_rollups(db, args.start, args.end)
+        logger.info("%s balde(s) gravado(s).", written)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
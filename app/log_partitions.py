@@ -0,0 +1,296 @@
+# app/log_partitions.py
+
+"""
+Módulo de Particionamento e Retenção dos Logs de Atividade
+
+No PostgreSQL, a tabela 'activity_logs' é particionada por intervalo mensal de
+'created_at' (ver docs/gestao_equipamentos_db.sql). Com isso:
+
+- as consultas da listagem e da exportação de logs, que filtram por período,
+  leem apenas as partições dos meses envolvidos (partition pruning);
+- os meses antigos são removidos desanexando e apagando a partição inteira,
+  sem DELETEs linha a linha nem inchaço da tabela.
+
+A tarefa agendada `activity_log_maintenance` (ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS):
+
+1. cria com antecedência as partições do mês atual e dos próximos
+   ACTIVITY_LOG_PARTITIONS_AHEAD meses (logs sem partição vão para a partição
+   padrão 'activity_logs_default');
+2. arquiva os meses que saíram da janela de retenção (ACTIVITY_LOG_RETENTION_MONTHS)
+   em arquivos CSV compactados (ACTIVITY_LOG_ARCHIVE_DIR/activity_logs_AAAA_MM.csv.gz)
+   e remove esses meses do banco.
+
+Em bancos sem particionamento (como o SQLite dos testes ou uma instalação
+PostgreSQL ainda não convertida), os meses antigos são exportados e removidos
+com consultas comuns, mês a mês.
+
+Dependências:
+- sqlalchemy: Para as consultas de catálogo, o DDL das partições e a remoção das linhas.
+- psycopg2: Para a exportação das partições com COPY (apenas no PostgreSQL).
+- app.models.activity_log: O modelo da tabela de logs.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.activity_log import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "activity_logs"
+DEFAULT_PARTITION = "activity_logs_default"
+
+# Colunas exportadas nos arquivos de arquivamento, na ordem da tabela.
+ARCHIVE_COLUMNS = ("id", "user_id", "level", "message", "created_at", "action", "entity_type", "entity_id", "payload")
+
+# Linhas lidas por vez na exportação sem particionamento.
+EXPORT_BATCH_SIZE = 1000
+
+_PARTITION_NAME = re.compile(r"^activity_logs_p(\d{4})_(\d{2})$")
+
+# --- Meses e nomes ---
+
+def month_start(moment: date) -> date:
+    """Primeiro dia do mês de uma data."""
+    return date(moment.year, moment.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    """Primeiro dia do mês `months` meses após (ou antes de) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """Intervalo [início, fim) de um mês, em UTC."""
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc)
+
+def partition_name(month: date) -> str:
+    """Nome da partição de um mês (ex.: 'activity_logs_p2025_03')."""
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+def partition_month(name: str) -> date | None:
+    """Mês de uma partição a partir do seu nome, ou None se não for uma partição mensal."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def retention_cutoff(now: datetime | None = None) -> date:
+    """Primeiro mês mantido no banco: os meses anteriores são arquivados."""
+    now = now or datetime.now(timezone.utc)
+    return add_months(month_start(now.astimezone(timezone.utc).date()), -settings.ACTIVITY_LOG_RETENTION_MONTHS)
+
+def archive_path(month: date) -> Path:
+    """
+    Caminho do arquivo de arquivamento de um mês. Se o mês já tiver um arquivo
+    (por exemplo, linhas que chegaram à partição padrão), usa um sufixo numérico.
+    """
+    directory = Path(settings.ACTIVITY_LOG_ARCHIVE_DIR)
+    path = directory / f"{PARENT_TABLE}_{month:%Y_%m}.csv.gz"
+    suffix = 1
+    while path.exists():
+        path = directory / f"{PARENT_TABLE}_{month:%Y_%m}.{suffix}.csv.gz"
+        suffix += 1
+    return path
+
+def _write_archive(month: date, write) -> Path:
+    """
+    Grava o arquivo compactado de um mês de forma atômica (arquivo temporário +
+    rename). `write` recebe o arquivo gzip aberto em modo binário.
+    """
+    path = archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(temp_path, "wb") as archive:
+        write(archive)
+    os.replace(temp_path, path)
+    return path
+
+# --- Partições (PostgreSQL) ---
+
+def is_partitioned(db: Session) -> bool:
+    """Indica se 'activity_logs' é uma tabela particionada do PostgreSQL."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+def list_partitions(db: Session) -> dict[date, str]:
+    """Partições mensais anexadas à tabela de logs, por mês (a partição padrão fica de fora)."""
+    names = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalars()
+    partitions = {}
+    for name in names:
+        month = partition_month(name)
+        if month:
+            partitions[month] = name
+    return partitions
+
+def _default_partition_has_rows(db: Session, start: datetime, end: datetime) -> bool:
+    """Indica se a partição padrão guarda logs do intervalo [start, end)."""
+    if db.execute(text("SELECT to_regclass(:table)"), {"table": DEFAULT_PARTITION}).scalar() is None:
+        return False
+    return db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"
+    ), {"start": start, "end": end}).scalar()
+
+def _create_partition(db: Session, month: date):
+    """
+    Cria a partição de um mês. O PostgreSQL recusa a criação enquanto a
+    partição padrão guardar linhas do mês (ex.: logs copiados na conversão da
+    tabela ou gravados antes da partição existir); nesse caso, a partição padrão
+    é desanexada, as linhas do mês são movidas para a nova partição e a
+    partição padrão é anexada de novo, na mesma transação.
+    """
+    name = partition_name(month)
+    start, end = month_bounds(month)
+    create = text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    if not _default_partition_has_rows(db, start, end):
+        db.execute(create)
+        return
+
+    in_month = {"start": start, "end": end}
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(create)
+    moved = db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), in_month).rowcount
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info("%s log(s) de %s movido(s) da partição padrão para '%s'.", moved, f"{month:%Y-%m}", name)
+
+def ensure_partitions(db: Session, now: datetime | None = None) -> list[str]:
+    """
+    Cria as partições do mês atual e dos próximos ACTIVITY_LOG_PARTITIONS_AHEAD
+    meses que ainda não existem, movendo para elas os logs desses meses que
+    estiverem na partição padrão. Os índices da tabela principal são criados
+    automaticamente em cada nova partição.
+
+    Returns:
+        list[str]: Nomes das partições criadas.
+    """
+    now = now or datetime.now(timezone.utc)
+    current = month_start(now.astimezone(timezone.utc).date())
+    existing = list_partitions(db)
+    created = []
+    for offset in range(settings.ACTIVITY_LOG_PARTITIONS_AHEAD + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        _create_partition(db, month)
+        created.append(partition_name(month))
+    db.commit()
+    if created:
+        logger.info("Partições de logs criadas: %s.", ", ".join(created))
+    return created
+
+def _archive_partition(db: Session, month: date, name: str) -> Path:
+    """
+    Exporta uma partição com COPY para o arquivo compactado do mês e, em seguida,
+    desanexa e apaga a partição na mesma transação.
+    """
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        path = _write_archive(
+            month, lambda archive: cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+        )
+    finally:
+        cursor.close()
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    db.commit()
+    return path
+
+# --- Arquivamento sem particionamento ---
+
+def _archive_month_rows(db: Session, month: date) -> int:
+    """Exporta e remove as linhas de um mês com consultas comuns. Retorna a quantidade de linhas."""
+    start, end = month_bounds(month)
+    in_month = (ActivityLog.created_at >= start, ActivityLog.created_at < end)
+    count = db.query(func.count(ActivityLog.id)).filter(*in_month).scalar()
+    if not count:
+        return 0
+
+    def write(archive):
+        text_archive = io.TextIOWrapper(archive, encoding="utf-8", newline="")
+        writer = csv.writer(text_archive)
+        writer.writerow(ARCHIVE_COLUMNS)
+        rows = db.execute(
+            select(*(getattr(ActivityLog, column) for column in ARCHIVE_COLUMNS))
+            .where(*in_month).order_by(ActivityLog.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        # O payload é gravado em JSON, como no COPY das partições
+        writer.writerows((*row[:-1], json.dumps(row[-1]) if row[-1] is not None else None) for row in rows)
+        text_archive.flush()
+        text_archive.detach()
+
+    _write_archive(month, write)
+    db.execute(delete(ActivityLog).where(*in_month))
+    db.commit()
+    return count
+
+def archive_expired_logs(db: Session, now: datetime | None = None) -> int:
+    """
+    Arquiva e remove do banco os meses anteriores à janela de retenção.
+
+    No PostgreSQL particionado, as partições antigas são exportadas e apagadas;
+    as linhas antigas que estiverem fora delas (na partição padrão ou em uma
+    tabela não particionada) são exportadas e removidas mês a mês.
+
+    Returns:
+        int: Quantidade de meses arquivados.
+    """
+    cutoff = retention_cutoff(now)
+    archived = 0
+
+    if is_partitioned(db):
+        for month, name in sorted(list_partitions(db).items()):
+            if month < cutoff:
+                path = _archive_partition(db, month, name)
+                logger.info("Partição '%s' arquivada em '%s'.", name, path)
+                archived += 1
+
+    oldest = db.query(func.min(ActivityLog.created_at)).scalar()
+    if oldest is not None:
+        if oldest.tzinfo is None:
+            # Datas sem fuso (como as do SQLite) são UTC
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        month = month_start(oldest.astimezone(timezone.utc).date())
+        while month < cutoff:
+            rows = _archive_month_rows(db, month)
+            if rows:
+                logger.info("%s log(s) de %s arquivado(s).", rows, f"{month:%Y-%m}")
+                archived += 1
+            month = add_months(month, 1)
+    return archived
+
+def maintain_activity_logs(db: Session, now: datetime | None = None) -> int:
+    """
+    Tarefa agendada: cria as próximas partições (quando a tabela é particionada)
+    e arquiva os meses fora da janela de retenção.
+
+    Returns:
+        int: Quantidade de meses arquivados.
+    """
+    if is_partitioned(db):
+        ensure_partitions(db, now)
+    return archive_expired_logs(db, now)
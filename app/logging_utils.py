@@ -3,20 +3,54 @@
 """
 Módulo Utilitário para Criação de Logs de Atividade
 
-Este módulo fornece uma função utilitária para registrar eventos
-importantes da aplicação (logs de atividade) diretamente no banco de dados.
+Este módulo fornece funções utilitárias para registrar eventos
+importantes da aplicação (logs de atividade) diretamente no banco de dados,
+tanto individualmente quanto em lote.
 Centralizar a criação de logs em uma única função promove consistência
 e facilita a manutenção.
 
+Além da mensagem legível, cada log pode ter campos estruturados, usados nas
+consultas de auditoria por índice (ex: "todas as ações na reserva 123"):
+
+- action: Código da ação, no formato '<entidade>.<verbo>' (ex: 'reservation.status_changed').
+- entity_type / entity_id: A entidade afetada (ex: 'reservation', 123).
+- payload: Detalhes adicionais em JSON (ex: {"old_status": "pending", "new_status": "approved"}).
+
+O autor da ação continua sendo o `user_id` (None para ações do sistema).
+
+Os logs são gravados na tabela 'activity_logs' (ACTIVITY_LOG_DB_ENABLED) e/ou
+no diário de auditoria local, encadeado por hashes (AUDIT_JOURNAL_ENABLED, ver
+app/audit_journal.py). O diário recebe o log após o commit da transação.
+
 Dependências:
 - sqlalchemy.orm.Session: Para interagir com a sessão do banco de dados.
 - app.models.activity_log.ActivityLog: O modelo da tabela onde os logs são salvos.
+- app.audit_journal: Para a gravação no diário de auditoria.
 """
 
+from datetime import datetime, timezone
+from typing import Any, Iterable, NamedTuple
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.models.activity_log import ActivityLog
+from app.audit_journal import get_journal
 
-def create_log(db: Session, user_id: int | None, level: str, message: str):
+class LogEntry(NamedTuple):
+    """Uma entrada de log para `create_logs`, com os mesmos campos de `create_log`."""
+    user_id: int | None
+    level: str
+    message: str
+    action: str | None = None
+    entity_type: str | None = None
+    entity_id: int | None = None
+    payload: dict[str, Any] | None = None
+
+def create_log(
+    db: Session, user_id: int | None, level: str, message: str, *,
+    action: str | None = None, entity_type: str | None = None,
+    entity_id: int | None = None, payload: dict[str, Any] | None = None
+):
     """
     Cria e salva uma nova entrada de log no banco de dados.
 
@@ -29,16 +63,45 @@ def create_log(db: Session, user_id: int | None, level: str, message: str):
                               para ações iniciadas pelo sistema (ex: tarefas agendadas).
         level (str): O nível do log (ex: 'INFO', 'WARNING', 'ERROR').
         message (str): A mensagem descritiva do evento que está sendo registrado.
+        action (str | None): Código da ação (ex: 'unit.updated').
+        entity_type (str | None): Tipo da entidade afetada (ex: 'unit').
+        entity_id (int | None): ID da entidade afetada.
+        payload (dict | None): Detalhes estruturados do evento.
     """
-    # Cria uma instância do modelo ActivityLog com os dados fornecidos
-    log_entry = ActivityLog(
-        user_id=user_id,
-        level=level.upper(),  # Garante que o nível do log seja sempre em maiúsculas
-        message=message
-    )
-    
-    # Adiciona o novo registro de log à sessão do banco de dados
-    db.add(log_entry)
+    entry = LogEntry(user_id, level.upper(), message, action, entity_type, entity_id, payload)
+    if settings.ACTIVITY_LOG_DB_ENABLED:
+        # Cria uma instância do modelo ActivityLog com os dados fornecidos
+        # (o nível do log é sempre gravado em maiúsculas)
+        db.add(ActivityLog(**entry._asdict()))
     
     # Confirma (salva) a transação no banco de dados
-    db.commit()
\ No newline at end of file
+    db.commit()
+    _append_to_journal([entry])
+
+def create_logs(db: Session, entries: Iterable[LogEntry | tuple]):
+    """
+    Cria e salva várias entradas de log com um único INSERT em lote.
+
+    Usada por operações em massa (ex: atualizações de usuários em lote, tarefas
+    agendadas), que de outra forma fariam um commit por registro de log.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        entries (Iterable[LogEntry | tuple]): Entradas `LogEntry` (ou tuplas na mesma
+                                   ordem, ao menos (user_id, level, message)), com o
+                                   mesmo significado dos argumentos de `create_log`.
+    """
+    entries = [LogEntry(*entry) for entry in entries]
+    entries = [entry._replace(level=entry.level.upper()) for entry in entries]
+    if entries and settings.ACTIVITY_LOG_DB_ENABLED:
+        db.execute(insert(ActivityLog), [entry._asdict() for entry in entries])
+    db.commit()
+    _append_to_journal(entries)
+
+def _append_to_journal(entries: list[LogEntry]):
+    """Grava as entradas no diário de auditoria, quando habilitado."""
+    if settings.AUDIT_JOURNAL_ENABLED and entries:
+        created_at = datetime.now(timezone.utc)
+        get_journal().append(
+            [{"created_at": created_at.isoformat(), **entry._asdict()} for entry in entries], created_at
+        )
@@ -0,0 +1,179 @@
+# app/maintenance.py
+
+"""
+Módulo dos Chamados de Manutenção das Unidades
+
+Uma unidade vai para manutenção com a abertura de um chamado (tabela
+'maintenance_tickets'): na devolução com defeito de uma reserva, pela troca
+manual do status da unidade ou pela rota de abertura de chamados. O chamado
+fica na fila de atendimento, ordenada por prioridade e idade, até ser fechado;
+o fechamento devolve a unidade para 'available' e registra o evento no
+histórico da unidade.
+
+Cada fechamento também é somado, na mesma transação, aos baldes da tabela
+'maintenance_rollups' (dia de fechamento × tipo de equipamento × prioridade),
+de onde saem as métricas de vazão e de tempo de reparo, sem percorrer os
+chamados nem o texto do histórico das unidades.
+
+Dependências:
+- sqlalchemy: Para as consultas da fila e o upsert dos baldes.
+- app.rollups: Para o dia (no fuso ANALYTICS_TIMEZONE) dos fechamentos.
+"""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, Query, joinedload
+
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.maintenance_rollup import MaintenanceRollup
+from app.models.maintenance_ticket import MaintenanceTicket, PRIORITY_LEVELS
+from app.models.unit_history import UnitHistory
+from app.rollups import local_day
+from app.schemas.maintenance import MaintenanceStatsOut, MaintenanceTypeStatsOut
+
+# Prioridade padrão dos chamados abertos automaticamente (devolução com defeito ou troca manual de status).
+DEFAULT_PRIORITY = PRIORITY_LEVELS.index('normal')
+
+# Ordenações da fila de chamados em aberto.
+QUEUE_ORDERS = {
+    "priority": (MaintenanceTicket.priority, MaintenanceTicket.opened_at, MaintenanceTicket.id),
+    "age": (MaintenanceTicket.opened_at, MaintenanceTicket.id),
+}
+
+def _utc(moment: datetime) -> datetime:
+    """Datas sem fuso (como as do SQLite) são UTC."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+def repair_hours(ticket: MaintenanceTicket) -> float:
+    """Tempo de reparo de um chamado fechado (da abertura ao fechamento), em horas."""
+    return max(0.0, (_utc(ticket.closed_at) - _utc(ticket.opened_at)).total_seconds() / 3600)
+
+# --- Abertura e fechamento ---
+
+def find_open_ticket(db: Session, unit_id: int, *, for_update: bool = False) -> MaintenanceTicket | None:
+    """Chamado em aberto de uma unidade, se houver (bloqueado até o fim da transação, com `for_update`)."""
+    query = db.query(MaintenanceTicket).filter(
+        MaintenanceTicket.unit_id == unit_id, MaintenanceTicket.closed_at.is_(None)
+    )
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+def open_ticket(
+    db: Session, unit: EquipmentUnit, *, opened_by_id: int | None, priority: int = DEFAULT_PRIORITY,
+    description: str | None = None, reservation_id: int | None = None, assignee_id: int | None = None
+) -> MaintenanceTicket:
+    """
+    Abre um chamado para a unidade e a coloca em manutenção, na transação
+    corrente (sem commit). O evento do histórico fica a cargo de quem chama.
+    """
+    ticket = MaintenanceTicket(
+        unit_id=unit.id, reservation_id=reservation_id, status='open', priority=priority,
+        description=description, opened_by_id=opened_by_id, assignee_id=assignee_id,
+        opened_at=datetime.now(timezone.utc)
+    )
+    unit.status = 'maintenance'
+    db.add(ticket)
+    return ticket
+
+def close_ticket(
+    db: Session, ticket: MaintenanceTicket, *, closed_by_id: int | None,
+    resolution_notes: str | None = None, now: datetime | None = None
+):
+    """
+    Fecha o chamado na transação corrente (sem commit): devolve a unidade para
+    'available', registra o evento no histórico da unidade e soma o chamado aos
+    baldes de manutenção.
+    """
+    ticket.status = 'closed'
+    ticket.closed_at = now or datetime.now(timezone.utc)
+    ticket.closed_by_id = closed_by_id
+    ticket.resolution_notes = resolution_notes
+
+    unit = ticket.unit
+    unit.status = 'available'
+    notes = f"Reparo concluído (chamado ID {ticket.id})."
+    if resolution_notes:
+        notes += f" Obs: {resolution_notes}"
+    db.add(UnitHistory(unit_id=unit.id, event_type='maintenance_completed', notes=notes, user_id=closed_by_id))
+    record_ticket_closed(db, ticket, unit.type_id)
+
+def record_ticket_closed(db: Session, ticket: MaintenanceTicket, type_id: int):
+    """Soma um chamado fechado ao seu balde, na transação corrente (sem commit)."""
+    key = {"day": local_day(_utc(ticket.closed_at)), "equipment_type_id": type_id, "priority": ticket.priority}
+    hours = repair_hours(ticket)
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(MaintenanceRollup).values(**key, tickets_closed=1, repair_hours=hours)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "tickets_closed": MaintenanceRollup.tickets_closed + statement.excluded.tickets_closed,
+                "repair_hours": MaintenanceRollup.repair_hours + statement.excluded.repair_hours,
+            }
+        ))
+    else:
+        filters = [getattr(MaintenanceRollup, column) == value for column, value in key.items()]
+        updated = db.query(MaintenanceRollup).filter(*filters).update({
+            MaintenanceRollup.tickets_closed: MaintenanceRollup.tickets_closed + 1,
+            MaintenanceRollup.repair_hours: MaintenanceRollup.repair_hours + hours,
+        }, synchronize_session=False)
+        if not updated:
+            db.execute(insert(MaintenanceRollup).values(**key, tickets_closed=1, repair_hours=hours))
+
+# --- Leitura ---
+
+def tickets_query(db: Session) -> Query:
+    """Consulta dos chamados com a unidade e o técnico responsável."""
+    return db.query(MaintenanceTicket).options(joinedload(MaintenanceTicket.unit), joinedload(MaintenanceTicket.assignee))
+
+def open_queue(db: Session, order: str = "priority") -> Query:
+    """
+    Fila dos chamados em aberto, por prioridade (e idade) ou apenas por idade,
+    dos mais antigos para os mais recentes. Atendida pelos índices parciais dos
+    chamados em aberto.
+    """
+    return tickets_query(db).filter(MaintenanceTicket.closed_at.is_(None)).order_by(*QUEUE_ORDERS[order])
+
+def maintenance_stats(db: Session, start_day: date, end_day: date) -> MaintenanceStatsOut:
+    """
+    Métricas da manutenção: a fila atual (chamados em aberto por prioridade e o
+    mais antigo) e, a partir dos baldes, os chamados fechados e o tempo médio de
+    reparo entre `start_day` e `end_day` (inclusive, no fuso ANALYTICS_TIMEZONE).
+    """
+    open_counts = dict(
+        db.query(MaintenanceTicket.priority, func.count(MaintenanceTicket.id))
+        .filter(MaintenanceTicket.closed_at.is_(None))
+        .group_by(MaintenanceTicket.priority)
+        .all()
+    )
+    oldest_open_at = db.query(func.min(MaintenanceTicket.opened_at)).filter(MaintenanceTicket.closed_at.is_(None)).scalar()
+
+    rows = (
+        db.query(MaintenanceRollup.equipment_type_id, EquipmentType.name,
+                 func.sum(MaintenanceRollup.tickets_closed), func.sum(MaintenanceRollup.repair_hours))
+        .outerjoin(EquipmentType, EquipmentType.id == MaintenanceRollup.equipment_type_id)
+        .filter(MaintenanceRollup.day >= start_day, MaintenanceRollup.day <= end_day)
+        .group_by(MaintenanceRollup.equipment_type_id, EquipmentType.name)
+        .all()
+    )
+    by_type = sorted(
+        (MaintenanceTypeStatsOut(type_id=type_id, type_name=name, tickets_closed=int(closed), avg_repair_hours=round(hours / closed, 2))
+         for type_id, name, closed, hours in rows if closed),
+        key=lambda stats: (-stats.tickets_closed, stats.type_id)
+    )
+    tickets_closed = sum(stats.tickets_closed for stats in by_type)
+    total_hours = sum(hours for _, _, closed, hours in rows if closed)
+
+    return MaintenanceStatsOut(
+        open_tickets=sum(open_counts.values()),
+        open_by_priority={label: open_counts.get(level, 0) for level, label in enumerate(PRIORITY_LEVELS)},
+        oldest_open_at=_utc(oldest_open_at) if oldest_open_at else None,
+        tickets_closed=tickets_closed,
+        avg_repair_hours=round(total_hours / tickets_closed, 2) if tickets_closed else 0.0,
+        by_type=by_type,
+    )
@@ -0,0 +1,239 @@
+# app/metrics.py
+
+"""
+Módulo de Métricas e Instrumentação das Requisições
+
+Este módulo coleta, em memória, métricas de desempenho da API e as exporta
+no formato texto do Prometheus (servido pela rota /metrics):
+
+- Latência por rota (histograma), contagem de requisições por status e
+  requisições em andamento.
+- Tamanho das respostas por rota (histograma).
+- Quantidade de comandos SQL e tempo gasto no banco por requisição, obtidos
+  pelos eventos `before_cursor_execute`/`after_cursor_execute` da engine.
+
+As rotas são identificadas pelo seu modelo de caminho (ex: '/equipments/types/{type_id}'),
+e não pela URL concreta, para manter a quantidade de séries limitada. Cada
+processo da API mantém os seus próprios contadores.
+
+Dependências:
+- sqlalchemy: Para os eventos de execução de comandos na engine.
+- contextvars: Para associar os comandos SQL à requisição em andamento, inclusive
+  nas rotas síncronas executadas no pool de threads.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (em segundos) dos buckets do histograma de latência.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites (em bytes) dos buckets do histograma de tamanho das respostas.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Limites dos buckets do histograma de comandos SQL por requisição.
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Rótulo usado para requisições que não correspondem a nenhuma rota da API.
+UNMATCHED_ROUTE = "unmatched"
+
+@dataclass
+class RequestStats:
+    """Contadores de banco de dados acumulados durante uma requisição."""
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    scope: dict | None = field(default=None, repr=False)  # Escopo ASGI da requisição
+    finished: bool = False                                # Resposta já enviada (tarefas em segundo plano não contam)
+
+    @property
+    def route(self) -> str | None:
+        """Método e modelo da rota em atendimento (ex: 'GET /admin/logs'), se já identificada."""
+        route = (self.scope or {}).get("route")
+        return f"{self.scope['method']} {route.path}" if route is not None else None
+
+# Estatísticas da requisição em andamento no contexto atual (None fora de requisições).
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+def active_request_stats() -> RequestStats | None:
+    """Estatísticas da requisição em andamento, ou None se não houver (ou se a resposta já foi enviada)."""
+    stats = current_request_stats.get()
+    return stats if stats is not None and not stats.finished else None
+
+class Histogram:
+    """Histograma cumulativo com rótulos, no modelo do Prometheus."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # rótulos -> [contagens por bucket, soma, total]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total_sum, total_count) in sorted(self._series.items()):
+            base = _format_labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {total_count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total_sum}")
+            lines.append(f"{self.name}_count{{{base}}} {total_count}")
+        return lines
+
+class MetricsRegistry:
+    """Conjunto de métricas da API, protegido por lock para o acesso concorrente."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera todas as métricas (usado nos testes)."""
+        with self._lock:
+            self.in_progress = 0
+            self.requests_total: dict[tuple, int] = {}
+            self.sql_statements_total: dict[tuple, int] = {}
+            self.sql_seconds_total: dict[tuple, float] = {}
+            self.latency = Histogram("http_request_duration_seconds", "Latência das requisições HTTP, por rota.", LATENCY_BUCKETS)
+            self.response_size = Histogram("http_response_size_bytes", "Tamanho do corpo das respostas HTTP, por rota.", SIZE_BUCKETS)
+            self.sql_per_request = Histogram("db_statements_per_request", "Quantidade de comandos SQL executados por requisição.", SQL_COUNT_BUCKETS)
+
+    def request_started(self):
+        with self._lock:
+            self.in_progress += 1
+
+    def request_finished(self, method: str, route: str, status_code: int, duration: float, size: int, stats: RequestStats):
+        """Registra o resultado de uma requisição concluída."""
+        route_labels = (method, route)
+        with self._lock:
+            self.in_progress -= 1
+            key = (method, route, str(status_code))
+            self.requests_total[key] = self.requests_total.get(key, 0) + 1
+            self.sql_statements_total[route_labels] = self.sql_statements_total.get(route_labels, 0) + stats.sql_count
+            self.sql_seconds_total[route_labels] = self.sql_seconds_total.get(route_labels, 0.0) + stats.sql_seconds
+            self.latency.observe(route_labels, duration)
+            self.response_size.observe(route_labels, size)
+            self.sql_per_request.observe(route_labels, stats.sql_count)
+
+    def render(self) -> str:
+        """Gera o texto de exposição no formato do Prometheus."""
+        route_names = ("method", "route")
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_progress Requisições HTTP em andamento.",
+                "# TYPE http_requests_in_progress gauge",
+                f"http_requests_in_progress {self.in_progress}",
+            ]
+            lines += _render_counter("http_requests_total", "Total de requisições HTTP, por rota e status.", ("method", "route", "status"), self.requests_total)
+            lines += self.latency.render(route_names)
+            lines += self.response_size.render(route_names)
+            lines += self.sql_per_request.render(route_names)
+            lines += _render_counter("db_statements_total", "Total de comandos SQL executados, por rota.", route_names, self.sql_statements_total)
+            lines += _render_counter("db_query_seconds_total", "Tempo total gasto em comandos SQL, por rota.", route_names, self.sql_seconds_total)
+        return "\n".join(lines) + "\n"
+
+# Registro único de métricas do processo.
+registry = MetricsRegistry()
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+def _render_counter(name: str, help_text: str, label_names: tuple, values: dict) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f"{name}{{{_format_labels(label_names, labels)}}} {value}" for labels, value in sorted(values.items())]
+    return lines
+
+# --- Instrumentação da Engine do SQLAlchemy ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = active_request_stats()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+def instrument_engine(engine: Engine):
+    """Registra os eventos que contam comandos SQL e tempo de banco por requisição."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# --- Middleware ASGI ---
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP: latência, status, tamanho da
+    resposta e os comandos SQL executados enquanto ela era processada.
+
+    A medição termina no envio da última parte do corpo da resposta, e não no
+    fim da chamada da aplicação: as tarefas em segundo plano (BackgroundTasks,
+    ex: envio de e-mails), executadas depois da resposta, não entram na
+    latência, nas requisições em andamento nem nos comandos SQL da rota.
+
+    É implementado diretamente sobre o protocolo ASGI (sem BaseHTTPMiddleware)
+    para não adicionar uma tarefa extra nem bufferizar o corpo das respostas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = current_request_stats.set(stats)
+        response = {"status": 500, "size": 0}
+
+        def finish():
+            if stats.finished:
+                return
+            stats.finished = True
+            # O roteador do Starlette grava a rota encontrada no próprio 'scope'
+            route = scope.get("route")
+            registry.request_finished(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                response["status"],
+                time.perf_counter() - started,
+                response["size"],
+                stats
+            )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+                current_request_stats.set(None)
+
+        registry.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()  # Sem resposta completa (ex: erro ou desconexão)
+            current_request_stats.reset(token)
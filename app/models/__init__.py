@@ -0,0 +1,32 @@
+# app/models/__init__.py
+
+"""
+Pacote dos modelos ORM da aplicação.
+
+Importa todos os modelos, para que os relacionamentos declarados por nome
+(ex: relationship("MaintenanceTicket")) possam ser resolvidos em qualquer
+ponto de entrada: a API, as tarefas executadas pela linha de comando
+(app/jobs) e os scripts de benchmark. Basta `import app.models`.
+
+Ao criar um modelo, acrescente o seu módulo aqui.
+"""
+
+from app.models import (  # noqa: F401
+    activity_log,
+    demand_forecast,
+    equipment_type,
+    equipment_unit,
+    google_token,
+    maintenance_rollup,
+    maintenance_ticket,
+    report_job,
+    reservation,
+    reservation_notification,
+    reservation_rollup,
+    sector,
+    slow_query_log,
+    token_blacklist,
+    unit_history,
+    user,
+    user_reservation_rollup,
+)
@@ -7,11 +7,12 @@ Esta tabela é usada para auditoria e registro de eventos importantes no sistema
 como logins, criação de usuários, alterações de status de reservas, etc.
 
 Dependências:
-- sqlalchemy: Para a definição do modelo e suas colunas.
+- sqlalchemy: Para a definição do modelo e suas colunas (JSONB no PostgreSQL).
 - app.database.Base: A classe base declarativa para os modelos ORM.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -21,6 +22,21 @@ class ActivityLog(Base):
     """
     __tablename__ = 'activity_logs'
 
+    # --- Índices ---
+    # Atendem aos filtros e à ordenação da listagem de logs (app/routes/admin.py).
+    # No PostgreSQL a tabela é particionada por mês em 'created_at' (ver
+    # docs/gestao_equipamentos_db.sql e app/log_partitions.py) e cada índice é
+    # criado automaticamente em todas as partições.
+    __table_args__ = (
+        Index('ix_activity_logs_created_at', 'created_at'),
+        Index('ix_activity_logs_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_activity_logs_level_created_at', 'level', 'created_at'),
+        # Consultas de auditoria pelos campos estruturados
+        Index('ix_activity_logs_action_created_at', 'action', 'created_at'),
+        Index('ix_activity_logs_entity', 'entity_type', 'entity_id', 'created_at'),
+        Index('ix_activity_logs_payload', 'payload', postgresql_using='gin'),
+    )
+
     # --- Colunas da Tabela ---
     id = Column(Integer, primary_key=True, index=True)
     
@@ -32,10 +48,22 @@ class ActivityLog(Base):
     
     # Mensagem descritiva detalhando o evento que ocorreu.
     message = Column(Text, nullable=False)
+
+    # --- Campos estruturados (ver app/logging_utils.py) ---
+    # Código da ação, no formato '<entidade>.<verbo>' (ex: 'reservation.status_changed').
+    action = Column(String(50), nullable=True)
+
+    # Entidade afetada pela ação (ex: 'reservation' e o ID da reserva).
+    entity_type = Column(String(30), nullable=True)
+    entity_id = Column(Integer, nullable=True)
+
+    # Detalhes adicionais do evento. JSONB (com índice GIN) no PostgreSQL.
+    payload = Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql'), nullable=True)
     
     # Data e hora em que o log foi criado. 'server_default=func.now()' garante
     # que o banco de dados preencha este campo automaticamente com o timestamp atual.
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # É a chave de particionamento da tabela, por isso não pode ser nulo.
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # --- Relacionamento ORM ---
     # Define a relação com a tabela 'users', criando a referência inversa no modelo User.
@@ -0,0 +1,36 @@
+# app/models/demand_forecast.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'demand_forecasts'.
+
+Cada registro é a previsão de demanda de um tipo de equipamento para uma
+semana futura, gerada pela tarefa agendada de previsão de demanda
+(app/jobs/demand_forecast.py) e servida pela rota /dashboard/forecast.
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, String, Date, Float, DateTime, ForeignKey, UniqueConstraint
+from app.database import Base
+
+class DemandForecast(Base):
+    """
+    Representa a demanda prevista de um tipo de equipamento em uma semana.
+    """
+    __tablename__ = 'demand_forecasts'
+
+    __table_args__ = (
+        UniqueConstraint('equipment_type_id', 'week_start', name='uq_demand_forecast_type_week'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+    equipment_type_id = Column(Integer, ForeignKey('equipment_types.id', ondelete='CASCADE'), nullable=False)
+    week_start = Column(Date, nullable=False)                 # Segunda-feira da semana prevista
+
+    predicted_peak = Column(Float, nullable=False)            # Pico previsto de reservas simultâneas
+    predicted_reservations = Column(Float, nullable=False)    # Quantidade prevista de reservas iniciadas na semana
+    model = Column(String(20), nullable=False)                # Modelo usado: 'holt_winters', 'holt' ou 'naive'
+    generated_at = Column(DateTime(timezone=True), nullable=False)  # Data do treinamento que gerou a previsão
@@ -34,7 +34,8 @@ class EquipmentUnit(Base):
     # Número de série do fabricante, que também deve ser único.
     serial_number = Column(String(100), unique=True, nullable=False)
     
-    # Status atual da unidade (ex: 'available', 'reserved', 'maintenance').
+    # Estado operacional da unidade ('available' ou 'maintenance'). Se a unidade está
+    # reservada ou não é calculado a partir das reservas (ver app/availability.py).
     status = Column(String(20), nullable=False, default='available')
 
     # --- Relacionamentos ORM ---
@@ -51,4 +52,7 @@ class EquipmentUnit(Base):
     # Relacionamento um-para-muitos com UnitHistory.
     # Registra todos os eventos históricos associados a esta unidade.
     # A cascata também se aplica aqui, deletando o histórico se a unidade for removida.
-    history = relationship("UnitHistory", back_populates="unit", cascade="all, delete-orphan")
\ No newline at end of file
+    history = relationship("UnitHistory", back_populates="unit", cascade="all, delete-orphan")
+
+    # Relacionamento um-para-muitos com MaintenanceTicket (chamados de manutenção da unidade).
+    maintenance_tickets = relationship("MaintenanceTicket", back_populates="unit", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,42 @@
+# app/models/maintenance_rollup.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'maintenance_rollups'.
+
+Cada registro é um "balde" pré-agregado dos chamados de manutenção fechados:
+a quantidade de chamados e a soma dos tempos de reparo (da abertura ao
+fechamento) de um dia de fechamento × tipo de equipamento × prioridade. As
+métricas de vazão e de tempo de reparo da manutenção leem estes baldes em vez
+de percorrer os chamados (ver app/maintenance.py).
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, Date, Float, UniqueConstraint
+from app.database import Base
+
+class MaintenanceRollup(Base):
+    """
+    Representa os chamados fechados de um balde (dia, tipo, prioridade).
+    """
+    __tablename__ = 'maintenance_rollups'
+
+    # Um único registro por balde. O índice da restrição, iniciado pelo dia,
+    # também atende às consultas por período.
+    __table_args__ = (
+        UniqueConstraint('day', 'equipment_type_id', 'priority', name='uq_maintenance_rollups_bucket'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # --- Dimensões do balde ---
+    day = Column(Date, nullable=False)                     # Dia de fechamento dos chamados (no fuso ANALYTICS_TIMEZONE)
+    equipment_type_id = Column(Integer, nullable=False)    # Tipo de equipamento da unidade
+    priority = Column(SmallInteger, nullable=False)        # Prioridade dos chamados
+
+    # --- Medidas ---
+    tickets_closed = Column(Integer, nullable=False, default=0)
+    repair_hours = Column(Float, nullable=False, default=0.0)  # Soma dos tempos de reparo, em horas
@@ -0,0 +1,84 @@
+# app/models/maintenance_ticket.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'maintenance_tickets'.
+
+Cada registro é um chamado de manutenção de uma unidade de equipamento: aberto
+quando a unidade vai para manutenção (na devolução com defeito ou manualmente)
+e fechado quando o reparo termina, o que devolve a unidade para 'available'
+(ver app/maintenance.py).
+
+Dependências:
+- sqlalchemy: Para a definição do modelo, colunas, índices e relacionamentos.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, ForeignKey, Index, func, text
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+# Prioridades, da mais urgente (0) para a menos urgente (3). O nível é gravado na coluna 'priority'.
+PRIORITY_LEVELS = ('urgent', 'high', 'normal', 'low')
+
+# Condição dos chamados em aberto, usada nos índices parciais.
+OPEN_TICKET_CONDITION = text("closed_at IS NULL")
+
+class MaintenanceTicket(Base):
+    """
+    Representa um chamado de manutenção de uma unidade de equipamento.
+    """
+    __tablename__ = 'maintenance_tickets'
+
+    # --- Índices ---
+    # Parciais, apenas dos chamados em aberto: a fila cresce e diminui, enquanto
+    # os chamados fechados (a maior parte da tabela) ficam fora dos índices.
+    __table_args__ = (
+        # Fila de atendimento: prioridade e, dentro dela, os mais antigos primeiro
+        Index('ix_maintenance_tickets_queue', 'priority', 'opened_at', 'id',
+              postgresql_where=OPEN_TICKET_CONDITION, sqlite_where=OPEN_TICKET_CONDITION),
+        # Chamados em aberto por idade
+        Index('ix_maintenance_tickets_open_age', 'opened_at', 'id',
+              postgresql_where=OPEN_TICKET_CONDITION, sqlite_where=OPEN_TICKET_CONDITION),
+        # No máximo um chamado em aberto por unidade
+        Index('uq_maintenance_tickets_open_unit', 'unit_id', unique=True,
+              postgresql_where=OPEN_TICKET_CONDITION, sqlite_where=OPEN_TICKET_CONDITION),
+        # Chamados de uma unidade (e a remoção em cascata)
+        Index('ix_maintenance_tickets_unit_id', 'unit_id', 'opened_at'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Unidade em manutenção.
+    unit_id = Column(Integer, ForeignKey('equipment_units.id', ondelete='CASCADE'), nullable=False)
+
+    # Reserva cuja devolução com defeito abriu o chamado, se houver.
+    reservation_id = Column(Integer, ForeignKey('reservations.id', ondelete='SET NULL'), nullable=True)
+
+    # Situação: 'open', 'in_progress' ou 'closed'.
+    status = Column(String(20), nullable=False, default='open')
+
+    # Prioridade na fila: 0 (urgente) a 3 (baixa). Ver PRIORITY_LEVELS.
+    priority = Column(SmallInteger, nullable=False, default=2)
+
+    # Descrição do defeito e observações do reparo.
+    description = Column(Text, nullable=True)
+    resolution_notes = Column(Text, nullable=True)
+
+    # --- Responsáveis ---
+    opened_by_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    assignee_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)   # Técnico responsável pelo reparo
+    closed_by_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+
+    # --- Datas ---
+    opened_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # --- Relacionamentos ORM ---
+    unit = relationship("EquipmentUnit", back_populates="maintenance_tickets")
+    assignee = relationship("User", foreign_keys=[assignee_id])
+
+    @property
+    def priority_label(self) -> str:
+        """Nome da prioridade do chamado (ex: 'urgent')."""
+        return PRIORITY_LEVELS[self.priority]
@@ -0,0 +1,61 @@
+# app/models/report_job.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'report_jobs'.
+
+Cada registro é uma solicitação de relatório (CSV ou PDF) feita por um
+administrador. O relatório é gerado fora dos processos da API, pelo worker
+de relatórios (app/jobs/report_worker.py), e o arquivo resultante é gravado
+no armazenamento local até a data de expiração.
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class ReportJob(Base):
+    """
+    Representa uma solicitação de geração de relatório e o seu andamento.
+    """
+    __tablename__ = 'report_jobs'
+
+    # Índice usado pelo worker para buscar a próxima solicitação da fila.
+    __table_args__ = (
+        Index('ix_report_jobs_status_created_at', 'status', 'created_at'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Administrador que solicitou o relatório.
+    requested_by = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+
+    # Situação: 'queued', 'running', 'completed', 'failed' ou 'expired'.
+    status = Column(String(20), nullable=False, default='queued')
+
+    # Formato do arquivo: 'csv' ou 'pdf'.
+    format = Column(String(10), nullable=False)
+
+    # --- Especificação do relatório ---
+    start_date = Column(DateTime(timezone=True), nullable=False)
+    end_date = Column(DateTime(timezone=True), nullable=False)
+    sector_id = Column(Integer, ForeignKey('sectors.id', ondelete='SET NULL'), nullable=True)
+    type_id = Column(Integer, ForeignKey('equipment_types.id', ondelete='SET NULL'), nullable=True)
+
+    # --- Resultado ---
+    file_path = Column(String(500), nullable=True)  # Caminho do arquivo gerado, relativo ao diretório de relatórios
+    file_size = Column(Integer, nullable=True)      # Tamanho do arquivo, em bytes
+    error = Column(Text, nullable=True)             # Mensagem de erro, em caso de falha
+
+    # --- Datas ---
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # Data a partir da qual o arquivo é removido
+
+    # --- Relacionamentos ---
+    requester = relationship("User")
@@ -11,7 +11,7 @@ Dependências:
 - app.database.Base: A classe base declarativa para os modelos ORM.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -22,6 +22,23 @@ class Reservation(Base):
     """
     __tablename__ = 'reservations'
 
+    # --- Índices ---
+    # O primeiro atende às buscas por status e data de término, como a detecção de
+    # reservas atrasadas ('approved' com end_time no passado) feita pelas tarefas agendadas.
+    # O segundo atende às consultas de sobreposição de horários de uma unidade,
+    # usadas para calcular a disponibilidade (ver app/availability.py).
+    # O terceiro (parcial) contém apenas as reservas ativas, para que a busca da
+    # reserva ativa de cada unidade não cresça com o histórico (ver app/type_details.py).
+    __table_args__ = (
+        Index('ix_reservations_status_end_time', 'status', 'end_time'),
+        Index('ix_reservations_unit_time', 'unit_id', 'start_time', 'end_time'),
+        Index(
+            'ix_reservations_active_unit', 'unit_id', 'id',
+            postgresql_where=text("status IN ('pending', 'approved')"),
+            sqlite_where=text("status IN ('pending', 'approved')")
+        ),
+    )
+
     # --- Colunas da Tabela ---
     id = Column(Integer, primary_key=True, index=True)
     
@@ -34,12 +51,16 @@ class Reservation(Base):
     start_time = Column(DateTime(timezone=True), nullable=False) # Data e hora de início da reserva
     end_time = Column(DateTime(timezone=True), nullable=False)   # Data e hora de término da reserva
     
-    # Status atual da reserva (ex: 'pending', 'approved', 'rejected', 'returned').
+    # Status atual da reserva (ex: 'pending', 'approved', 'rejected', 'returned', 'expired').
     status = Column(String(20), nullable=False, default='pending')
     
     # Campo para armazenar observações do gerente no momento da devolução.
     return_notes = Column(Text, nullable=True)
 
+    # Data e hora em que a unidade foi retirada. Reservas aprovadas sem retirada
+    # expiram após NO_SHOW_GRACE_MINUTES (ver app/jobs/reservation_sweeper.py).
+    picked_up_at = Column(DateTime(timezone=True), nullable=True)
+
     # Data e hora em que a solicitação de reserva foi criada.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
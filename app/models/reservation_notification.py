@@ -0,0 +1,39 @@
+# app/models/reservation_notification.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'reservation_notifications'.
+
+Esta tabela registra quais notificações automáticas já foram enviadas para
+cada reserva (ex: lembrete de atraso), garantindo que as tarefas agendadas
+não enviem o mesmo aviso mais de uma vez.
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, func
+from app.database import Base
+
+class ReservationNotification(Base):
+    """
+    Representa uma notificação já enviada (ou em envio) para uma reserva.
+    """
+    __tablename__ = 'reservation_notifications'
+
+    # Cada tipo de notificação só pode ser registrado uma vez por reserva.
+    __table_args__ = (
+        UniqueConstraint('reservation_id', 'kind', name='uq_reservation_notification_kind'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Reserva à qual a notificação se refere. O registro é removido junto com a reserva.
+    reservation_id = Column(Integer, ForeignKey('reservations.id', ondelete='CASCADE'), nullable=False)
+
+    # Tipo da notificação (ex: 'overdue').
+    kind = Column(String(30), nullable=False)
+
+    # Data e hora em que a notificação foi registrada.
+    sent_at = Column(DateTime(timezone=True), server_default=func.now())
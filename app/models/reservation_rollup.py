@@ -0,0 +1,43 @@
+# app/models/reservation_rollup.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'reservation_rollups'.
+
+Cada registro é um "balde" pré-agregado das reservas: a quantidade de reservas
+e as horas reservadas de um dia × hora de início × tipo de equipamento × setor
+× status. O painel de análise e os gráficos de tendência leem estes baldes em
+vez de agregar a tabela 'reservations' a cada requisição (ver app/rollups.py).
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, Float, UniqueConstraint
+from app.database import Base
+
+class ReservationRollup(Base):
+    """
+    Representa a contagem agregada das reservas de um balde (dia, hora, tipo, setor, status).
+    """
+    __tablename__ = 'reservation_rollups'
+
+    # Um único registro por balde. O índice da restrição, iniciado pelo dia,
+    # também atende às consultas por período do painel.
+    __table_args__ = (
+        UniqueConstraint('day', 'start_hour', 'equipment_type_id', 'sector_id', 'status', name='uq_reservation_rollups_bucket'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # --- Dimensões do balde ---
+    day = Column(Date, nullable=False)                     # Dia de criação da reserva (no fuso ANALYTICS_TIMEZONE)
+    start_hour = Column(SmallInteger, nullable=False)      # Hora (0 a 23) de início da reserva (no fuso ANALYTICS_TIMEZONE)
+    equipment_type_id = Column(Integer, nullable=False)    # Tipo de equipamento da unidade reservada
+    sector_id = Column(Integer, nullable=False, default=0) # Setor do usuário (0 = usuário sem setor)
+    status = Column(String(20), nullable=False)            # Status da reserva
+
+    # --- Medidas ---
+    reservation_count = Column(Integer, nullable=False, default=0)
+    reserved_hours = Column(Float, nullable=False, default=0.0)  # Soma das durações das reservas, em horas
@@ -0,0 +1,44 @@
+# app/models/slow_query_log.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'slow_query_logs'.
+
+Esta tabela armazena os comandos SQL que ultrapassaram o limite de tempo
+configurado (SLOW_QUERY_THRESHOLD_MS), junto com os parâmetros, a rota que
+os originou e, opcionalmente, o plano de execução (EXPLAIN).
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, func
+from app.database import Base
+
+class SlowQueryLog(Base):
+    """
+    Representa uma execução lenta de um comando SQL.
+    """
+    __tablename__ = 'slow_query_logs'
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Hash do comando normalizado, que agrupa as execuções de uma mesma consulta.
+    fingerprint = Column(String(40), nullable=False, index=True)
+
+    # Comando SQL e parâmetros utilizados (truncados; por padrão, apenas os tipos dos parâmetros).
+    statement = Column(Text, nullable=False)
+    parameters = Column(Text, nullable=True)
+
+    # Rota da API que executou o comando (ex: 'GET /admin/logs'). Nulo fora de requisições.
+    route = Column(String(255), nullable=True)
+
+    # Duração da execução, em milissegundos.
+    duration_ms = Column(Float, nullable=False)
+
+    # Saída do EXPLAIN (ANALYZE, BUFFERS), quando habilitada.
+    explain = Column(Text, nullable=True)
+
+    # Data e hora do registro (usada na remoção dos registros antigos).
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -4,14 +4,16 @@
 Define o modelo ORM do SQLAlchemy para a tabela 'unit_history'.
 
 Esta tabela registra o histórico de eventos de uma unidade de equipamento
-específica, como sua criação, devolução ou envio para manutenção.
+específica, como sua criação, devolução ou envio para manutenção. Os eventos
+rotineiros antigos são resumidos em registros 'history_compacted' (ver
+app/unit_history.py).
 
 Dependências:
 - sqlalchemy: Para a definição do modelo, colunas e relacionamentos.
 - app.database.Base: A classe base declarativa para os modelos ORM.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -21,6 +23,11 @@ class UnitHistory(Base):
     """
     __tablename__ = 'unit_history'
 
+    # Índice da linha do tempo de cada unidade, na ordem da paginação (mais recentes primeiro).
+    __table_args__ = (
+        Index('ix_unit_history_unit_id_created_at', 'unit_id', text('created_at DESC'), text('id DESC')),
+    )
+
     # --- Colunas da Tabela ---
     id = Column(Integer, primary_key=True, index=True)
     
@@ -33,8 +40,8 @@ class UnitHistory(Base):
     # Observações adicionais sobre o evento (ex: descrição de um defeito).
     notes = Column(Text, nullable=True)
     
-    # Data e hora em que o evento foi registrado.
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Data e hora em que o evento foi registrado (nos resumos, a do último evento resumido).
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # ID do gerente ou administrador que registrou o evento (pode ser nulo).
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
@@ -42,6 +49,9 @@ class UnitHistory(Base):
     # ID da reserva associada ao evento, se aplicável (ex: na devolução).
     reservation_id = Column(Integer, ForeignKey('reservations.id'), nullable=True)
 
+    # Apenas nos resumos ('history_compacted'): quantidade de eventos resumidos por tipo.
+    event_counts = Column(JSON, nullable=True)
+
     # --- Relacionamentos ORM ---
     # Relacionamento com a unidade de equipamento.
     unit = relationship("EquipmentUnit", back_populates="history")
@@ -0,0 +1,42 @@
+# app/models/user_reservation_rollup.py
+
+"""
+Define o modelo ORM do SQLAlchemy para a tabela 'user_reservation_rollups'.
+
+Cada registro é um "balde" pré-agregado das reservas de um usuário: a
+quantidade de reservas criadas por ele em um dia × tipo de equipamento ×
+setor. O ranking de usuários que mais reservam do painel de análise lê estes
+baldes em vez de agrupar a tabela 'reservations' (ver app/rollups.py). O
+status não é uma dimensão, pois o ranking conta as reservas de todos os status.
+
+Dependências:
+- sqlalchemy: Para a definição do modelo e suas colunas.
+- app.database.Base: A classe base declarativa para os modelos ORM.
+"""
+
+from sqlalchemy import Column, Integer, Date, UniqueConstraint
+from app.database import Base
+
+class UserReservationRollup(Base):
+    """
+    Representa a contagem agregada das reservas de um balde (dia, usuário, tipo, setor).
+    """
+    __tablename__ = 'user_reservation_rollups'
+
+    # Um único registro por balde. O índice da restrição, iniciado pelo dia,
+    # também atende às consultas por período do ranking.
+    __table_args__ = (
+        UniqueConstraint('day', 'user_id', 'equipment_type_id', 'sector_id', name='uq_user_reservation_rollups_bucket'),
+    )
+
+    # --- Colunas da Tabela ---
+    id = Column(Integer, primary_key=True, index=True)
+
+    # --- Dimensões do balde ---
+    day = Column(Date, nullable=False)                     # Dia de criação da reserva (no fuso ANALYTICS_TIMEZONE)
+    user_id = Column(Integer, nullable=False)              # Usuário que criou a reserva
+    equipment_type_id = Column(Integer, nullable=False)    # Tipo de equipamento da unidade reservada
+    sector_id = Column(Integer, nullable=False, default=0) # Setor do usuário (0 = usuário sem setor)
+
+    # --- Medidas ---
+    reservation_count = Column(Integer, nullable=False, default=0)
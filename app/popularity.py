@@ -0,0 +1,161 @@
+# app/popularity.py
+
+"""
+Módulo do Ranking de Popularidade dos Tipos de Equipamento (GET /equipments/stats/popular)
+
+Mantém em memória, em cada processo da API, a quantidade de reservas por tipo
+de equipamento em janelas deslizantes (últimos 7, 30 e 90 dias, e todo o
+histórico) e, para cada janela, os tipos mais reservados já ordenados. A rota
+apenas lê os primeiros itens de uma dessas listas, sem agregar a tabela
+'reservations'.
+
+Os contadores vêm dos agregados 'reservation_rollups' (app/rollups.py), que já
+são atualizados na mesma transação de cada nova reserva e persistem as contagens
+por dia de criação × tipo. O índice em memória é:
+- carregado dos agregados na primeira leitura e a cada virada de dia (quando
+  as janelas deslizam e os dias mais antigos deixam de contar);
+- incrementado pela rota de criação de reservas, após o commit;
+- recarregado pela tarefa agendada `popularity_refresh`
+  (POPULARITY_REFRESH_INTERVAL_SECONDS), que traz as reservas criadas por
+  outros processos e corrige qualquer divergência.
+
+Dependências:
+- sqlalchemy: Para a leitura dos agregados.
+- app.rollups: Para o dia (no fuso ANALYTICS_TIMEZONE) de cada reserva.
+"""
+
+import heapq
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.reservation_rollup import ReservationRollup
+from app.rollups import local_day
+
+# Janelas aceitas pelo parâmetro `window` da rota: quantidade de dias (incluindo hoje), ou None para todo o histórico.
+POPULARITY_WINDOWS: dict[str, int | None] = {"7d": 7, "30d": 30, "90d": 90, "all": None}
+
+# Quantidade de tipos retornados pela rota.
+POPULAR_TYPES_LIMIT = 5
+
+# Tipos mantidos em cada ranking: uma folga além do limite cobre tipos removidos,
+# que a rota descarta ao buscar os tipos no banco.
+RANKING_SIZE = POPULAR_TYPES_LIMIT * 2
+
+_LONGEST_WINDOW = max(days for days in POPULARITY_WINDOWS.values() if days)
+
+class PopularityIndex:
+    """
+    Contadores de reservas por tipo em cada janela e o ranking (top-k) de cada uma.
+
+    Entre duas cargas, os contadores só aumentam: um tipo fora do ranking só
+    entra nele ao ultrapassar o último colocado, o que permite manter cada
+    ranking incrementalmente em O(k). A redução das contagens, com o
+    deslizamento das janelas, é tratada recarregando o índice a cada novo dia.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_day: date | None = None
+        self._counts: dict[str, dict[int, int]] = {}
+        self._rankings: dict[str, list[int]] = {}
+
+    def _window_start(self, window: str) -> date | None:
+        days = POPULARITY_WINDOWS[window]
+        return self._loaded_day - timedelta(days=days - 1) if days else None
+
+    def load(self, db: Session, now: datetime | None = None):
+        """Recarrega os contadores e os rankings a partir dos agregados das reservas."""
+        today = local_day(now or datetime.now(timezone.utc))
+        since = today - timedelta(days=_LONGEST_WINDOW - 1)
+
+        daily = (
+            db.query(ReservationRollup.equipment_type_id, ReservationRollup.day, func.sum(ReservationRollup.reservation_count))
+            .filter(ReservationRollup.day >= since)
+            .group_by(ReservationRollup.equipment_type_id, ReservationRollup.day)
+            .all()
+        )
+        totals = (
+            db.query(ReservationRollup.equipment_type_id, func.sum(ReservationRollup.reservation_count))
+            .group_by(ReservationRollup.equipment_type_id)
+            .all()
+        )
+
+        counts = {window: defaultdict(int) for window in POPULARITY_WINDOWS}
+        counts["all"].update({type_id: int(total) for type_id, total in totals})
+        for type_id, day, count in daily:
+            for window, days in POPULARITY_WINDOWS.items():
+                if days and day > today - timedelta(days=days):
+                    counts[window][type_id] += int(count)
+
+        rankings = {
+            window: heapq.nsmallest(
+                RANKING_SIZE, (type_id for type_id, count in window_counts.items() if count > 0),
+                key=lambda type_id, window_counts=window_counts: (-window_counts[type_id], type_id)
+            )
+            for window, window_counts in counts.items()
+        }
+        with self._lock:
+            self._counts, self._rankings, self._loaded_day = counts, rankings, today
+
+    def record(self, type_id: int, created_at: datetime):
+        """
+        Soma uma nova reserva aos contadores das janelas que incluem o seu dia.
+        Antes da primeira carga, não faz nada (a carga já lerá a reserva dos agregados).
+        """
+        day = local_day(created_at)
+        with self._lock:
+            if self._loaded_day is None:
+                return
+            for window, window_counts in self._counts.items():
+                start = self._window_start(window)
+                if start is not None and not start <= day <= self._loaded_day:
+                    continue
+                window_counts[type_id] += 1
+                self._promote(window, type_id)
+
+    def _promote(self, window: str, type_id: int):
+        """Reposiciona no ranking da janela um tipo cuja contagem aumentou."""
+        counts, ranking = self._counts[window], self._rankings[window]
+        key = lambda ranked_id: (-counts[ranked_id], ranked_id)
+        if type_id in ranking:
+            ranking.remove(type_id)
+        elif len(ranking) >= RANKING_SIZE and key(type_id) >= key(ranking[-1]):
+            return
+        position = len(ranking)
+        while position > 0 and key(ranking[position - 1]) > key(type_id):
+            position -= 1
+        ranking.insert(position, type_id)
+        del ranking[RANKING_SIZE:]
+
+    def top(self, db: Session, window: str, now: datetime | None = None) -> list[tuple[int, int]]:
+        """
+        Retorna o ranking da janela como pares (ID do tipo, reservas), do mais
+        reservado para o menos, carregando o índice se ele ainda não foi
+        carregado hoje.
+        """
+        if self._loaded_day != local_day(now or datetime.now(timezone.utc)):
+            self.load(db, now)
+        with self._lock:
+            counts = self._counts[window]
+            return [(type_id, counts[type_id]) for type_id in self._rankings[window]]
+
+    def clear(self):
+        """Descarta o índice, que será recarregado na próxima leitura."""
+        with self._lock:
+            self._loaded_day = None
+            self._counts, self._rankings = {}, {}
+
+# Índice deste processo.
+popularity_index = PopularityIndex()
+
+def record_new_reservation(type_id: int, created_at: datetime):
+    """Soma uma reserva recém-criada (após o commit) ao índice deste processo."""
+    popularity_index.record(type_id, created_at)
+
+def refresh_popularity_index(db: Session):
+    """Tarefa agendada: recarrega o índice deste processo a partir dos agregados."""
+    popularity_index.load(db)
@@ -0,0 +1,163 @@
+# app/projection.py
+
+"""
+Módulo de Projeção de Campos (Sparse Fieldsets) das Listagens
+
+Permite que o cliente escolha, pelo parâmetro `fields`, quais atributos e
+objetos aninhados devem ser retornados em uma listagem. Exemplo, para as
+reservas:
+
+    ?fields=id,status,start_time,end_time,user.username,equipment_unit.equipment_type.name
+
+A partir da lista de campos, o módulo monta:
+- um schema de saída reduzido (derivado do schema completo, com os mesmos
+  tipos, aliases e validações), usado na serialização da página;
+- as opções de carregamento do SQLAlchemy: `load_only` para as colunas pedidas
+  e `joinedload` apenas para os relacionamentos pedidos, de modo que o SQL busque
+  somente o necessário e nenhum carregamento lazy seja disparado.
+
+Um objeto aninhado informado sem subcampos (ex: `user`) é retornado completo.
+
+Dependências:
+- pydantic: Para derivar os schemas reduzidos.
+- sqlalchemy: Para a inspeção dos modelos e as opções de carregamento.
+- fastapi: Para o erro de parâmetro inválido.
+"""
+
+import typing
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models.user import User
+
+# Atributos computados dos modelos e os relacionamentos dos quais dependem.
+COMPUTED_ATTRIBUTE_DEPENDENCIES = {
+    (User, "has_google_token"): ("google_token",),
+}
+
+# Árvore de campos: {nome: subárvore}, em que a subárvore é None para campos simples.
+FieldTree = dict[str, "FieldTree | None"]
+
+def _nested_model(annotation) -> type[BaseModel] | None:
+    """Retorna o schema aninhado de um campo (ex: UserOut em `Optional[UserOut]` ou `List[UserOut]`)."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+def _full_tree(schema: type[BaseModel]) -> FieldTree:
+    tree = {}
+    for name, field in schema.model_fields.items():
+        nested = _nested_model(field.annotation)
+        tree[name] = _full_tree(nested) if nested is not None else None
+    return tree
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> FieldTree | None:
+    """
+    Converte o parâmetro `fields` em uma árvore de campos validada contra o schema.
+
+    Returns:
+        A árvore de campos, com os objetos aninhados sem subcampos já expandidos,
+        ou None se nenhum campo foi informado (resposta completa).
+
+    Raises:
+        HTTPException (400): Se algum campo não existir no schema.
+    """
+    if not fields or not fields.strip():
+        return None
+
+    tree: FieldTree = {}
+    for path in (part.strip() for part in fields.split(",")):
+        if not path:
+            continue
+        node, current_schema = tree, schema
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            field = current_schema.model_fields.get(name) if current_schema is not None else None
+            if field is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Campo inválido em 'fields': '{path}'.")
+            nested = _nested_model(field.annotation)
+            is_last = depth == len(names) - 1
+            if is_last:
+                # Objeto aninhado sem subcampos: retornado completo
+                node[name] = _full_tree(nested) if nested is not None else None
+            else:
+                if nested is None:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Campo inválido em 'fields': '{path}'.")
+                if node.get(name) is None:
+                    node[name] = {}
+                node, current_schema = node[name], nested
+    return tree or None
+
+def _freeze(tree: FieldTree | None):
+    if tree is None:
+        return None
+    return tuple(sorted((name, _freeze(sub)) for name, sub in tree.items()))
+
+def _replace_model(annotation, old: type, new: type):
+    """Substitui um schema aninhado dentro de uma anotação de tipo (ex: Optional[old] -> Optional[new])."""
+    if annotation is old:
+        return new
+    args = typing.get_args(annotation)
+    if not args:
+        return annotation
+    replaced = tuple(_replace_model(arg, old, new) for arg in args)
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        return typing.Union[replaced]
+    if origin is list:
+        return typing.List[replaced[0]]
+    return annotation.copy_with(replaced) if hasattr(annotation, "copy_with") else origin[replaced]
+
+@lru_cache(maxsize=256)
+def _projected_schema(schema: type[BaseModel], frozen_tree) -> type[BaseModel]:
+    definitions = {}
+    for name, subtree in frozen_tree:
+        field = schema.model_fields[name]
+        annotation = field.annotation
+        nested = _nested_model(annotation)
+        if nested is not None and subtree is not None:
+            annotation = _replace_model(annotation, nested, _projected_schema(nested, subtree))
+        definitions[name] = (annotation, field)
+    return create_model(
+        f"{schema.__name__}Projection",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+def projected_schema(schema: type[BaseModel], tree: FieldTree | None) -> type[BaseModel]:
+    """Retorna (em cache) o schema reduzido aos campos da árvore, ou o próprio schema se a árvore for None."""
+    if tree is None:
+        return schema
+    return _projected_schema(schema, _freeze(tree))
+
+def loader_options(model: type, tree: FieldTree) -> list:
+    """
+    Monta as opções de carregamento do SQLAlchemy para uma árvore de campos:
+    `load_only` com as colunas pedidas e `joinedload` (recursivo) para cada
+    relacionamento pedido. Os relacionamentos não pedidos não são carregados.
+    """
+    mapper = inspect(model)
+    tree = dict(tree)
+
+    # Atributos computados: garante que os relacionamentos dos quais dependem sejam carregados
+    for name in list(tree):
+        for dependency in COMPUTED_ATTRIBUTE_DEPENDENCIES.get((model, name), ()):
+            tree.setdefault(dependency, {})
+
+    columns = [getattr(model, name) for name in tree if name in mapper.column_attrs]
+    # A chave primária é sempre carregada pelo SQLAlchemy, mesmo sem ser pedida
+    options = [load_only(*columns)] if columns else [load_only(*[getattr(model, c.key) for c in mapper.primary_key])]
+
+    for name, subtree in tree.items():
+        if name in mapper.relationships:
+            related = mapper.relationships[name].mapper.class_
+            options.append(joinedload(getattr(model, name)).options(*loader_options(related, subtree or {})))
+    return options
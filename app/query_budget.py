@@ -0,0 +1,90 @@
+# app/query_budget.py
+
+"""
+Módulo de Orçamento de Consultas (Detecção de N+1)
+
+Este módulo ajuda a encontrar rotas que emitem consultas extras sem perceber,
+tipicamente carregamentos "lazy" de relacionamentos disparados pelos schemas
+de saída (ex: `ReservationOut` acessando `reservation.user.sector`).
+
+Principais componentes:
+- `QueryCounter`: Gerenciador de contexto que registra os comandos SQL
+  executados em uma engine e falha se um orçamento declarado for excedido.
+  Nos testes, é oferecido pela fixture `query_budget` (tests/conftest.py).
+- `enable_lazy_load_logging`: Modo para homologação (staging) que registra no
+  log cada carregamento lazy, com a pilha de chamadas que o originou.
+
+Dependências:
+- sqlalchemy: Para os eventos de execução da engine e das sessões ORM.
+- app.config: Para habilitar o registro de carregamentos lazy.
+"""
+
+import logging
+import traceback
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, ORMExecuteState
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    """Erro lançado quando um bloco executa mais consultas do que o orçamento permite."""
+
+class QueryCounter:
+    """
+    Registra os comandos SQL executados em uma engine enquanto o contexto está ativo.
+
+    Exemplo:
+        with QueryCounter(engine, budget=4) as counter:
+            client.get("/admin/users/1/history", headers=headers)
+        # Lança QueryBudgetExceeded, listando os comandos, se mais de 4 forem executados.
+
+    Attributes:
+        statements (list[str]): Comandos SQL executados, na ordem.
+    """
+
+    def __init__(self, engine: Engine, budget: int | None = None):
+        self.engine = engine
+        self.budget = budget
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "after_cursor_execute", self._record)
+        if exc_type is None and self.budget is not None and self.count > self.budget:
+            listing = "\n".join(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(self.statements, start=1))
+            raise QueryBudgetExceeded(f"Foram executados {self.count} comandos SQL (orçamento: {self.budget}):\n{listing}")
+        return False
+
+# --- Modo de homologação: registro de carregamentos lazy ---
+
+def _log_lazy_load(orm_execute_state: ORMExecuteState):
+    """Registra um aviso com a pilha de chamadas quando um relacionamento é carregado de forma lazy."""
+    if orm_execute_state.is_relationship_load and orm_execute_state.lazy_loaded_from is not None:
+        instance = orm_execute_state.lazy_loaded_from
+        stack = "".join(traceback.format_stack(limit=25)[:-1])
+        logger.warning(
+            "Carregamento lazy em %s (ID %s). Considere usar joinedload/selectinload na consulta de origem.\n%s",
+            instance.class_.__name__, instance.identity, stack
+        )
+
+def enable_lazy_load_logging():
+    """Ativa o registro de carregamentos lazy em todas as sessões ORM."""
+    if not event.contains(Session, "do_orm_execute", _log_lazy_load):
+        event.listen(Session, "do_orm_execute", _log_lazy_load)
+
+def disable_lazy_load_logging():
+    """Desativa o registro de carregamentos lazy."""
+    if event.contains(Session, "do_orm_execute", _log_lazy_load):
+        event.remove(Session, "do_orm_execute", _log_lazy_load)
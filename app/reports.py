@@ -0,0 +1,243 @@
+# app/reports.py
+
+"""
+Módulo de Geração de Relatórios de Reservas (CSV e PDF)
+
+Monta, a partir de uma especificação (período, setor e tipo de equipamento),
+o relatório consolidado de reservas usado nas análises mensais:
+
+- resumo por status;
+- reservas e horas reservadas por tipo de equipamento e por setor;
+- volume de reservas por dia.
+
+As reservas do período são lidas em lotes (`yield_per`) e agregadas em uma
+única passagem, de forma independente do banco de dados. O resultado é
+gravado no diretório de relatórios (REPORTS_STORAGE_DIR), em CSV ou em PDF.
+O PDF é gerado por um escritor mínimo próprio (texto com a fonte Courier),
+sem dependências externas.
+
+Este módulo é usado pelo worker de relatórios (app/jobs/report_worker.py) e
+pela tarefa de retenção, nunca diretamente pelas rotas da API.
+
+Dependências:
+- sqlalchemy: Para a leitura das reservas.
+- csv, io: Para a geração do CSV.
+- app.config: Para o diretório de armazenamento e a retenção dos arquivos.
+"""
+
+import csv
+import io
+import logging
+import os
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.equipment_type import EquipmentType
+from app.models.user import User
+from app.models.sector import Sector
+from app.models.report_job import ReportJob
+
+logger = logging.getLogger(__name__)
+
+# Formatos de relatório suportados.
+REPORT_FORMATS = ("csv", "pdf")
+
+# Quantidade de reservas lidas do banco por lote durante a agregação.
+REPORT_BATCH_SIZE = 2000
+
+STATUS_LABELS = {
+    'pending': 'Pendentes', 'approved': 'Aprovadas', 'rejected': 'Rejeitadas',
+    'returned': 'Devolvidas', 'expired': 'Expiradas',
+}
+
+@dataclass
+class ReportData:
+    """Resultado consolidado de um relatório."""
+    start_date: datetime
+    end_date: datetime
+    sector_name: str | None = None
+    type_name: str | None = None
+    total: int = 0
+    by_status: Counter = field(default_factory=Counter)
+    # nome -> [reservas, horas reservadas]
+    by_type: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    by_sector: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    by_day: Counter = field(default_factory=Counter)
+
+def build_report_data(db: Session, job: ReportJob) -> ReportData:
+    """
+    Agrega as reservas criadas no período do relatório (mesmo critério do painel
+    de análise), aplicando os filtros opcionais de setor e tipo de equipamento.
+    """
+    data = ReportData(start_date=job.start_date, end_date=job.end_date)
+    if job.sector_id:
+        data.sector_name = db.query(Sector.name).filter(Sector.id == job.sector_id).scalar()
+    if job.type_id:
+        data.type_name = db.query(EquipmentType.name).filter(EquipmentType.id == job.type_id).scalar()
+
+    query = (
+        db.query(Reservation.status, Reservation.start_time, Reservation.end_time, Reservation.created_at,
+                 EquipmentType.name, Sector.name)
+        .join(Reservation.equipment_unit)
+        .join(EquipmentUnit.equipment_type)
+        .join(Reservation.user)
+        .outerjoin(User.sector)
+        .filter(Reservation.created_at >= job.start_date, Reservation.created_at <= job.end_date)
+    )
+    if job.sector_id:
+        query = query.filter(User.sector_id == job.sector_id)
+    if job.type_id:
+        query = query.filter(EquipmentUnit.type_id == job.type_id)
+
+    for status, start_time, end_time, created_at, type_name, sector_name in query.yield_per(REPORT_BATCH_SIZE):
+        hours = max(0.0, (end_time - start_time).total_seconds() / 3600)
+        data.total += 1
+        data.by_status[status] += 1
+        data.by_type[type_name][0] += 1
+        data.by_type[type_name][1] += hours
+        sector_entry = data.by_sector[sector_name or "Sem setor"]
+        sector_entry[0] += 1
+        sector_entry[1] += hours
+        data.by_day[created_at.date()] += 1
+    return data
+
+def _report_title(data: ReportData) -> list[str]:
+    filters = [f"Setor: {data.sector_name or 'Todos'}", f"Tipo de equipamento: {data.type_name or 'Todos'}"]
+    return [
+        "Relatório de Reservas - EquipControl",
+        f"Período: {data.start_date:%d/%m/%Y %H:%M} a {data.end_date:%d/%m/%Y %H:%M}",
+        " | ".join(filters),
+        f"Gerado em: {datetime.now(timezone.utc):%d/%m/%Y %H:%M} UTC",
+    ]
+
+def _ranked(entries: dict) -> list[tuple]:
+    return sorted(entries.items(), key=lambda item: (-item[1][0], item[0]))
+
+def render_csv(data: ReportData) -> bytes:
+    """Gera o relatório em CSV (UTF-8 com BOM, separado por ';', para abrir direto em planilhas)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    for line in _report_title(data):
+        writer.writerow([line])
+
+    writer.writerow([])
+    writer.writerow(["Status", "Reservas"])
+    writer.writerow(["Total", data.total])
+    for status, count in sorted(data.by_status.items()):
+        writer.writerow([STATUS_LABELS.get(status, status), count])
+
+    for title, entries in (("Tipo de equipamento", data.by_type), ("Setor", data.by_sector)):
+        writer.writerow([])
+        writer.writerow([title, "Reservas", "Horas reservadas"])
+        for name, (count, hours) in _ranked(entries):
+            writer.writerow([name, count, f"{hours:.1f}".replace(".", ",")])
+
+    writer.writerow([])
+    writer.writerow(["Dia", "Reservas"])
+    for day, count in sorted(data.by_day.items()):
+        writer.writerow([day.strftime("%d/%m/%Y"), count])
+    return ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+def render_pdf(data: ReportData) -> bytes:
+    """Gera o relatório em PDF, com as mesmas seções do CSV em texto tabulado."""
+    lines = _report_title(data) + ["", f"Total de reservas: {data.total}"]
+    lines += [f"  {STATUS_LABELS.get(status, status):<20}{count:>10}" for status, count in sorted(data.by_status.items())]
+
+    for title, entries in (("Por tipo de equipamento", data.by_type), ("Por setor", data.by_sector)):
+        lines += ["", title, f"  {'Nome':<50}{'Reservas':>10}{'Horas':>12}"]
+        lines += [f"  {name[:48]:<50}{count:>10}{hours:>12.1f}" for name, (count, hours) in _ranked(entries)]
+
+    lines += ["", "Reservas por dia", f"  {'Dia':<20}{'Reservas':>10}"]
+    lines += [f"  {day:%d/%m/%Y}{'':<10}{count:>10}" for day, count in sorted(data.by_day.items())]
+    return _pdf_document(lines)
+
+# --- Escritor mínimo de PDF ---
+
+_PDF_LINES_PER_PAGE = 60
+
+def _pdf_escape(text: str) -> bytes:
+    encoded = text.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def _pdf_document(lines: list[str]) -> bytes:
+    """Monta um PDF (A4, fonte Courier 9pt) com as linhas de texto, paginadas."""
+    pages = [lines[i:i + _PDF_LINES_PER_PAGE] for i in range(0, len(lines), _PDF_LINES_PER_PAGE)] or [[]]
+    # Objetos: 1 catálogo, 2 árvore de páginas, 3 fonte, depois (página, conteúdo) para cada página
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page_lines in pages:
+        stream = b"BT /F1 9 Tf 12 TL 36 806 Td " + b" ".join(b"(" + _pdf_escape(line) + b") '" for line in page_lines) + b" ET"
+        content_id = len(objects) + 2
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents "
+            + str(content_id).encode() + b" 0 R >>"
+        )
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(f"{i} 0 R".encode() for i in page_ids) + b"] /Count " + str(len(page_ids)).encode() + b" >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(output)
+
+RENDERERS = {"csv": render_csv, "pdf": render_pdf}
+
+# --- Armazenamento local ---
+
+def storage_dir() -> Path:
+    return Path(settings.REPORTS_STORAGE_DIR)
+
+def report_file_path(job: ReportJob) -> Path:
+    """Caminho absoluto do arquivo de um relatório já gerado."""
+    return storage_dir() / job.file_path
+
+def store_report(job: ReportJob, content: bytes) -> str:
+    """
+    Grava o arquivo do relatório de forma atômica (arquivo temporário + rename)
+    e retorna o seu caminho relativo ao diretório de relatórios.
+    """
+    relative = f"{job.created_at:%Y/%m}/report_{job.id}.{job.format}" if job.created_at else f"report_{job.id}.{job.format}"
+    path = storage_dir() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+    return relative
+
+def purge_expired_reports(db: Session, now: datetime | None = None) -> int:
+    """
+    Remove os arquivos dos relatórios cuja retenção terminou e marca as
+    solicitações como 'expired'.
+
+    Returns:
+        int: Quantidade de relatórios expirados.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired_jobs = db.query(ReportJob).filter(ReportJob.status == 'completed', ReportJob.expires_at <= now).all()
+    for job in expired_jobs:
+        if job.file_path:
+            try:
+                report_file_path(job).unlink(missing_ok=True)
+            except OSError:
+                logger.exception("Falha ao remover o arquivo do relatório ID %s.", job.id)
+                continue
+        job.status = 'expired'
+        job.file_path = None
+    if expired_jobs:
+        db.commit()
+    return len(expired_jobs)
@@ -0,0 +1,360 @@
+# app/rollups.py
+
+"""
+Módulo de Agregados (Rollups) das Reservas para o Painel de Análise
+
+Mantém a tabela 'reservation_rollups', com a quantidade de reservas e as horas
+reservadas por dia × hora de início × tipo de equipamento × setor × status.
+O painel de análise (app/routes/dashboard.py) lê estes baldes em vez de
+agregar a tabela 'reservations' a cada requisição, e os gráficos por dia da
+semana, por hora e por semana saem das mesmas consultas. O ranking de usuários
+lê a tabela 'user_reservation_rollups', com a quantidade de reservas por dia ×
+usuário × tipo de equipamento × setor.
+
+Os baldes são mantidos de duas formas:
+- incrementalmente, na mesma transação das escritas de reservas (criação,
+  mudança de status, expiração automática e remoção em cascata junto com um
+  usuário, uma unidade ou um tipo de equipamento) e das mudanças que alteram as
+  dimensões das reservas existentes (setor de um usuário, tipo de uma unidade),
+  com um upsert que soma os deltas;
+- por recálculo a partir das reservas, feito pela tarefa agendada
+  `rollup_refresh` para os dias mais recentes e pelo comando
+  `python -m app.jobs.rollup_backfill` para todo o histórico.
+
+As atualizações incrementais usam o setor atual do usuário e o tipo atual da
+unidade, assim como o recálculo; por isso, ao mudar o setor de um usuário ou o
+tipo de uma unidade, os baldes das suas reservas são movidos na mesma transação.
+
+Os dias e as horas são calculados no fuso ANALYTICS_TIMEZONE; ao alterá-lo,
+todo o histórico deve ser recalculado.
+
+Dependências:
+- sqlalchemy: Para as consultas, o upsert e as inserções em lote.
+- zoneinfo: Para o fuso horário dos baldes.
+- app.config: Para o fuso horário dos baldes.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, Query
+
+from app.config import settings
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.user import User
+from app.models.reservation_rollup import ReservationRollup
+from app.models.user_reservation_rollup import UserReservationRollup
+
+# Chave de um balde: (dia, hora de início, tipo de equipamento, setor, status).
+RollupKey = tuple[date, int, int, int, str]
+KEY_COLUMNS = ("day", "start_hour", "equipment_type_id", "sector_id", "status")
+
+# Chave de um balde por usuário: (dia, usuário, tipo de equipamento, setor).
+UserRollupKey = tuple[date, int, int, int]
+USER_KEY_COLUMNS = ("day", "user_id", "equipment_type_id", "sector_id")
+
+# Setor registrado para os usuários sem setor.
+NO_SECTOR = 0
+
+# Quantidade de reservas lidas por lote (e de baldes gravados por comando) no recálculo.
+ROLLUP_BATCH_SIZE = 2000
+
+def _local(moment: datetime) -> datetime:
+    """Converte uma data para o fuso dos agregados (datas sem fuso, como as do SQLite, são UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(ZoneInfo(settings.ANALYTICS_TIMEZONE))
+
+def local_day(moment: datetime) -> date:
+    """Dia de uma data no fuso dos agregados."""
+    return _local(moment).date()
+
+def day_start(day: date) -> datetime:
+    """Início (meia-noite no fuso dos agregados) de um dia, em UTC."""
+    return datetime.combine(day, time.min, tzinfo=ZoneInfo(settings.ANALYTICS_TIMEZONE)).astimezone(timezone.utc)
+
+def rollup_key(status: str, start_time: datetime, created_at: datetime, type_id: int, sector_id: int | None) -> RollupKey:
+    return (local_day(created_at), _local(start_time).hour, type_id, sector_id or NO_SECTOR, status)
+
+def user_rollup_key(created_at: datetime, user_id: int, type_id: int, sector_id: int | None) -> UserRollupKey:
+    return (local_day(created_at), user_id, type_id, sector_id or NO_SECTOR)
+
+def duration_hours(start_time: datetime, end_time: datetime) -> float:
+    return max(0.0, (end_time - start_time).total_seconds() / 3600)
+
+def source_query(db: Session) -> Query:
+    """
+    Consulta das reservas com as colunas usadas nos baldes:
+    (status, start_time, end_time, created_at, type_id, sector_id, user_id).
+    """
+    return (
+        db.query(Reservation.status, Reservation.start_time, Reservation.end_time, Reservation.created_at,
+                 EquipmentUnit.type_id, User.sector_id, Reservation.user_id)
+        .join(Reservation.equipment_unit)
+        .join(Reservation.user)
+    )
+
+def aggregate(rows, user_buckets: dict[UserRollupKey, int] | None = None) -> dict[RollupKey, list]:
+    """
+    Agrupa as linhas de `source_query` em baldes: chave -> [reservas, horas reservadas].
+    Se `user_buckets` for informado, soma nele também os baldes por usuário.
+    """
+    buckets = defaultdict(lambda: [0, 0.0])
+    for status, start_time, end_time, created_at, type_id, sector_id, *user_id in rows:
+        bucket = buckets[rollup_key(status, start_time, created_at, type_id, sector_id)]
+        bucket[0] += 1
+        bucket[1] += duration_hours(start_time, end_time)
+        if user_buckets is not None:
+            key = user_rollup_key(created_at, user_id[0], type_id, sector_id)
+            user_buckets[key] = user_buckets.get(key, 0) + 1
+    return buckets
+
+# --- Atualização incremental ---
+
+def _upsert_bucket(db: Session, model, key: dict, measures: dict):
+    """Soma as medidas ao balde `key` da tabela do `model`, criando-o se não existir."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(model).values(**key, **measures)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in measures}
+        )
+        db.execute(statement)
+    else:
+        filters = [getattr(model, column) == value for column, value in key.items()]
+        updated = db.query(model).filter(*filters).update(
+            {getattr(model, name): getattr(model, name) + value for name, value in measures.items()},
+            synchronize_session=False
+        )
+        if not updated:
+            db.execute(insert(model).values(**key, **measures))
+
+def apply_deltas(db: Session, deltas: dict[RollupKey, list]):
+    """
+    Soma os deltas aos baldes, na transação corrente (sem commit). Os baldes são
+    atualizados em ordem de chave, para evitar deadlocks entre escritas concorrentes.
+    """
+    for key in sorted(deltas):
+        count, hours = deltas[key]
+        if not count and not hours:
+            continue
+        _upsert_bucket(db, ReservationRollup, dict(zip(KEY_COLUMNS, key)), {"reservation_count": count, "reserved_hours": hours})
+
+def apply_user_deltas(db: Session, deltas: dict[UserRollupKey, int]):
+    """Soma os deltas aos baldes por usuário, na transação corrente (sem commit), em ordem de chave."""
+    for key in sorted(deltas):
+        if deltas[key]:
+            _upsert_bucket(db, UserReservationRollup, dict(zip(USER_KEY_COLUMNS, key)), {"reservation_count": deltas[key]})
+
+def record_reservation_status(db: Session, reservation: Reservation, old_status: str | None, type_id: int, sector_id: int | None):
+    """
+    Atualiza os baldes de uma reserva recém-criada (`old_status` None) ou que
+    mudou de status. Deve ser chamada antes do commit da escrita da reserva.
+    """
+    if old_status == reservation.status:
+        return
+    hours = duration_hours(reservation.start_time, reservation.end_time)
+    deltas = defaultdict(lambda: [0, 0.0])
+    if old_status is not None:
+        old_key = rollup_key(old_status, reservation.start_time, reservation.created_at, type_id, sector_id)
+        deltas[old_key][0] -= 1
+        deltas[old_key][1] -= hours
+    new_key = rollup_key(reservation.status, reservation.start_time, reservation.created_at, type_id, sector_id)
+    deltas[new_key][0] += 1
+    deltas[new_key][1] += hours
+    apply_deltas(db, deltas)
+    if old_status is None:
+        apply_user_deltas(db, {user_rollup_key(reservation.created_at, reservation.user_id, type_id, sector_id): 1})
+
+def record_bulk_status_change(db: Session, reservation_ids: list[int], old_status: str, new_status: str):
+    """
+    Atualiza os baldes de um lote de reservas que passará de `old_status` para
+    `new_status`. Deve ser chamada antes da atualização em lote das reservas.
+    """
+    rows = source_query(db).filter(Reservation.id.in_(reservation_ids), Reservation.status == old_status).all()
+    deltas = defaultdict(lambda: [0, 0.0])
+    for _, start_time, end_time, created_at, type_id, sector_id, _ in rows:
+        hours = duration_hours(start_time, end_time)
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            bucket = deltas[rollup_key(status, start_time, created_at, type_id, sector_id)]
+            bucket[0] += sign
+            bucket[1] += sign * hours
+    apply_deltas(db, deltas)
+
+def record_reservations_deleted(db: Session, *criteria):
+    """
+    Desconta dos baldes as reservas que atendem aos critérios (ex:
+    `Reservation.user_id == 5` ou `EquipmentUnit.type_id == 2`), antes que sejam
+    removidas em cascata junto com o usuário, a unidade ou o tipo de equipamento.
+    Deve ser chamada antes da remoção, na mesma transação.
+    """
+    user_buckets = {}
+    buckets = aggregate(source_query(db).filter(*criteria).yield_per(ROLLUP_BATCH_SIZE), user_buckets)
+    apply_deltas(db, {key: [-count, -hours] for key, (count, hours) in buckets.items()})
+    apply_user_deltas(db, {key: -count for key, count in user_buckets.items()})
+
+def _move_buckets(db: Session, rows: list, *, type_id: int | None = None, sector_id: int | None = None,
+                  move_sector: bool = False):
+    """
+    Move as reservas (linhas de `source_query`) dos baldes atuais para os baldes
+    com o novo tipo (`type_id`) ou setor (`move_sector`/`sector_id`).
+    """
+    user_buckets, moved_user_buckets = {}, {}
+    buckets = aggregate(rows, user_buckets)
+    moved = aggregate(
+        [(status, start_time, end_time, created_at, type_id if type_id is not None else row_type,
+          sector_id if move_sector else row_sector, user_id)
+         for status, start_time, end_time, created_at, row_type, row_sector, user_id in rows],
+        moved_user_buckets
+    )
+    deltas = defaultdict(lambda: [0, 0.0])
+    for sign, source in ((-1, buckets), (1, moved)):
+        for key, (count, hours) in source.items():
+            deltas[key][0] += sign * count
+            deltas[key][1] += sign * hours
+    apply_deltas(db, deltas)
+    user_deltas = defaultdict(int)
+    for sign, source in ((-1, user_buckets), (1, moved_user_buckets)):
+        for key, count in source.items():
+            user_deltas[key] += sign * count
+    apply_user_deltas(db, user_deltas)
+
+def record_sector_change(db: Session, user_ids: list[int], new_sector_id: int | None):
+    """
+    Move as reservas dos usuários para os baldes do novo setor. Deve ser chamada
+    antes de atualizar `User.sector_id`, na mesma transação.
+    """
+    if not user_ids:
+        return
+    rows = source_query(db).filter(Reservation.user_id.in_(user_ids), func.coalesce(User.sector_id, NO_SECTOR) != (new_sector_id or NO_SECTOR)).all()
+    _move_buckets(db, rows, sector_id=new_sector_id, move_sector=True)
+
+def record_unit_type_change(db: Session, unit_id: int, new_type_id: int):
+    """
+    Move as reservas da unidade para os baldes do novo tipo de equipamento. Deve
+    ser chamada antes de atualizar `EquipmentUnit.type_id`, na mesma transação.
+    """
+    rows = source_query(db).filter(Reservation.unit_id == unit_id, EquipmentUnit.type_id != new_type_id).all()
+    _move_buckets(db, rows, type_id=new_type_id)
+
+# --- Recálculo ---
+
+def rebuild_rollups(db: Session, start_day: date, end_day: date) -> int:
+    """
+    Recalcula, a partir das reservas, os baldes dos dias entre `start_day` e
+    `end_day` (inclusive), em uma única transação.
+
+    Os baldes por usuário do período são recalculados na mesma leitura das
+    reservas. No PostgreSQL, as tabelas de baldes ficam bloqueadas para escrita
+    durante o recálculo, para que nenhuma atualização incremental concorrente se perca.
+
+    Returns:
+        int: Quantidade de baldes gravados (sem contar os baldes por usuário).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE reservation_rollups, user_reservation_rollups IN EXCLUSIVE MODE"))
+
+    for model in (ReservationRollup, UserReservationRollup):
+        db.query(model).filter(model.day >= start_day, model.day <= end_day).delete(synchronize_session=False)
+
+    rows = source_query(db).filter(
+        Reservation.created_at >= day_start(start_day),
+        Reservation.created_at < day_start(end_day + timedelta(days=1))
+    ).yield_per(ROLLUP_BATCH_SIZE)
+    user_buckets = {}
+    entries = [
+        dict(zip(KEY_COLUMNS, key), reservation_count=count, reserved_hours=hours)
+        for key, (count, hours) in aggregate(rows, user_buckets).items()
+    ]
+    user_entries = [dict(zip(USER_KEY_COLUMNS, key), reservation_count=count) for key, count in user_buckets.items()]
+    for model, batch in ((ReservationRollup, entries), (UserReservationRollup, user_entries)):
+        for i in range(0, len(batch), ROLLUP_BATCH_SIZE):
+            db.execute(insert(model), batch[i:i + ROLLUP_BATCH_SIZE])
+    db.commit()
+    return len(entries)
+
+# --- Leitura ---
+
+@dataclass
+class RollupSummary:
+    """Totais de um período, nas dimensões usadas pelo painel de análise."""
+    total: int = 0
+    by_status: dict[str, int] = field(default_factory=dict)
+    by_type: dict[int, int] = field(default_factory=dict)     # type_id -> reservas
+    by_sector: dict[int, int] = field(default_factory=dict)   # sector_id -> reservas (NO_SECTOR = sem setor)
+    by_day: dict[date, int] = field(default_factory=dict)
+    by_hour: dict[int, int] = field(default_factory=dict)     # hora de início -> reservas
+    reserved_hours_by_hour: dict[int, float] = field(default_factory=dict)
+
+def summarize_rollups(db: Session, start_day: date | None = None, end_day: date | None = None,
+                      sector_id: int | None = None, type_id: int | None = None) -> RollupSummary:
+    """Totaliza os baldes de um período (dias inclusive), com os filtros opcionais de setor e tipo."""
+    filters = []
+    if start_day:
+        filters.append(ReservationRollup.day >= start_day)
+    if end_day:
+        filters.append(ReservationRollup.day <= end_day)
+    if sector_id:
+        filters.append(ReservationRollup.sector_id == sector_id)
+    if type_id:
+        filters.append(ReservationRollup.equipment_type_id == type_id)
+
+    def grouped(column, measure=ReservationRollup.reservation_count) -> dict:
+        rows = db.query(column, func.sum(measure)).filter(*filters).group_by(column).all()
+        return {key: value for key, value in rows if value}
+
+    by_status = {status: int(count) for status, count in grouped(ReservationRollup.status).items()}
+    return RollupSummary(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_type={key: int(count) for key, count in grouped(ReservationRollup.equipment_type_id).items()},
+        by_sector={key: int(count) for key, count in grouped(ReservationRollup.sector_id).items()},
+        by_day={key: int(count) for key, count in grouped(ReservationRollup.day).items()},
+        by_hour={key: int(count) for key, count in grouped(ReservationRollup.start_hour).items()},
+        reserved_hours_by_hour={key: float(hours) for key, hours in grouped(ReservationRollup.start_hour, ReservationRollup.reserved_hours).items()},
+    )
+
+def top_users(db: Session, start_day: date | None = None, end_day: date | None = None,
+              sector_id: int | None = None, type_id: int | None = None, limit: int = 5) -> list[tuple[str, int]]:
+    """Usuários que mais criaram reservas no período, a partir dos baldes por usuário: [(username, reservas)]."""
+    filters = []
+    if start_day:
+        filters.append(UserReservationRollup.day >= start_day)
+    if end_day:
+        filters.append(UserReservationRollup.day <= end_day)
+    if sector_id:
+        filters.append(UserReservationRollup.sector_id == sector_id)
+    if type_id:
+        filters.append(UserReservationRollup.equipment_type_id == type_id)
+
+    count = func.sum(UserReservationRollup.reservation_count)
+    rows = (
+        db.query(User.username, count)
+        .select_from(UserReservationRollup)
+        .join(User, User.id == UserReservationRollup.user_id)
+        .filter(*filters)
+        .group_by(User.id, User.username)
+        .having(count > 0)
+        .order_by(count.desc(), User.username)
+        .limit(limit)
+        .all()
+    )
+    return [(username, int(total)) for username, total in rows]
+
+def summarize_buckets(buckets: dict[RollupKey, list]) -> RollupSummary:
+    """Totaliza baldes calculados em memória (ver `aggregate`), com o mesmo formato de `summarize_rollups`."""
+    summary = RollupSummary()
+    for (day, start_hour, type_id, sector_id, status), (count, hours) in buckets.items():
+        summary.total += count
+        for totals, key in ((summary.by_status, status), (summary.by_type, type_id), (summary.by_sector, sector_id),
+                            (summary.by_day, day), (summary.by_hour, start_hour)):
+            totals[key] = totals.get(key, 0) + count
+        summary.reserved_hours_by_hour[start_hour] = summary.reserved_hours_by_hour.get(start_hour, 0.0) + hours
+    return summary
@@ -14,11 +14,13 @@ Dependências:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, func, desc, asc, case
 from typing import List, Optional
 from datetime import datetime, timezone
 import asyncio
+import json
 import math
 
 from app.database import get_db, SessionLocal
@@ -29,16 +31,31 @@ from app.models.equipment_unit import EquipmentUnit
 from app.models.equipment_type import EquipmentType
 from app.models.google_token import GoogleOAuthToken
 from app.models.unit_history import UnitHistory
+from app.models.reservation_notification import ReservationNotification
+from app.jobs.overdue_reminders import OVERDUE_NOTIFICATION
+from app.availability import find_conflicting_reservation, invalidate_availability_cache
+from app.type_details import invalidate_type_detail_cache
+from app.rollups import record_reservation_status, record_reservations_deleted, record_sector_change
+from app.maintenance import find_open_ticket, open_ticket
+from app.slow_query_log import flush_slow_queries, top_slow_queries
+from app.audit_journal import scan_journal, verify_journal
+from app.config import settings
 from app.schemas.reservation import ReservationOut
-from app.schemas.admin import ReservationStatusUpdate, UserRoleUpdate, UserSectorUpdate, UserStatusUpdate
+from app.schemas.admin import (
+    ReservationStatusUpdate, UserRoleUpdate, UserSectorUpdate, UserStatusUpdate,
+    UserBulkUpdate, UserBulkUpdateResult, UserBulkError
+)
 from app.schemas.user import UserOut
 from app.schemas.pagination import Page
+from app.schemas.common import MessageOut
+from app.serialization import page_response
+from app.projection import parse_fields, projected_schema, loader_options
 from app.security import get_current_admin_user, get_current_manager_user
 from app.google_calendar_utils import get_calendar_service, create_calendar_event
 from app.models.activity_log import ActivityLog
-from app.schemas.logs import ActivityLogOut
+from app.schemas.logs import ActivityLogOut, SlowQueryStatsOut, JournalVerificationOut
 from app.email_utils import send_reservation_status_email, send_reservation_overdue_email, send_reservation_returned_email
-from app.logging_utils import create_log
+from app.logging_utils import create_log, create_logs, LogEntry
 
 # Cria um roteador para agrupar todos os endpoints de administração
 router = APIRouter(
@@ -46,6 +63,17 @@ router = APIRouter(
     tags=["Admin Management"]
 )
 
+# Quantidade máxima de IDs enviados em cada cláusula IN nas operações em lote.
+BULK_CHUNK_SIZE = 500
+
+# Quantidade de logs lidos do banco (e enviados ao cliente) por bloco na exportação.
+LOG_EXPORT_BATCH_SIZE = 1000
+
+def _chunks(values: list, size: int = BULK_CHUNK_SIZE):
+    """Divide uma lista em blocos de tamanho fixo para as consultas em lote."""
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
 # --- TAREFAS EM SEGUNDO PLANO ---
 
 def approve_and_create_calendar_event(reservation_id: int):
@@ -66,16 +94,28 @@ def approve_and_create_calendar_event(reservation_id: int):
         google_token = db.query(GoogleOAuthToken).filter(GoogleOAuthToken.user_id == reservation.user.id).first()
         
         if google_token:
-            create_log(db, reservation.user.id, "INFO", f"Tentando criar evento no Google Calendar para a reserva ID {reservation.id}.")
+            create_log(
+                db, reservation.user.id, "INFO", f"Tentando criar evento no Google Calendar para a reserva ID {reservation.id}.",
+                action="reservation.calendar_event_requested", entity_type="reservation", entity_id=reservation.id
+            )
             try:
                 # Tenta criar o evento no calendário do usuário
                 service = get_calendar_service(google_token.token_json)
                 create_calendar_event(service, reservation)
-                create_log(db, reservation.user.id, "INFO", f"Evento criado com sucesso no Google Calendar para a reserva ID {reservation.id}.")
+                create_log(
+                    db, reservation.user.id, "INFO", f"Evento criado com sucesso no Google Calendar para a reserva ID {reservation.id}.",
+                    action="reservation.calendar_event_created", entity_type="reservation", entity_id=reservation.id
+                )
             except Exception as e:
-                create_log(db, reservation.user.id, "ERROR", f"Falha ao criar evento no Google Calendar para a reserva ID {reservation.id}: {e}")
+                create_log(
+                    db, reservation.user.id, "ERROR", f"Falha ao criar evento no Google Calendar para a reserva ID {reservation.id}: {e}",
+                    action="reservation.calendar_event_failed", entity_type="reservation", entity_id=reservation.id, payload={"error": str(e)}
+                )
         else:
-            create_log(db, reservation.user.id, "INFO", f"Usuário '{reservation.user.username}' não possui conta Google conectada. Evento para reserva ID {reservation.id} não foi criado.")
+            create_log(
+                db, reservation.user.id, "INFO", f"Usuário '{reservation.user.username}' não possui conta Google conectada. Evento para reserva ID {reservation.id} não foi criado.",
+                action="reservation.calendar_event_skipped", entity_type="reservation", entity_id=reservation.id
+            )
     finally:
         db.close() # Garante que a sessão seja fechada
 
@@ -115,14 +155,29 @@ def list_all_reservations(
     sort_by: Optional[str] = Query(None),
     sort_dir: Optional[str] = Query('asc'),
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=1000)
+    size: int = Query(10, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex: id,status,user.username).")
 ):
-    """(Gerente) Lista todas as reservas do sistema, com filtros avançados e paginação."""
-    # Constrói a consulta base com joins para otimizar o carregamento de dados
-    query = db.query(Reservation).join(Reservation.user).join(Reservation.equipment_unit).join(EquipmentUnit.equipment_type).options(
-        joinedload(Reservation.user).joinedload(User.sector),
-        joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
-    )
+    """
+    (Gerente) Lista todas as reservas do sistema, com filtros avançados e paginação.
+    Com o parâmetro `fields`, apenas os campos e objetos aninhados pedidos são
+    consultados no banco e retornados.
+    """
+    field_tree = parse_fields(fields, ReservationOut)
+    if field_tree is None:
+        load_options = [
+            joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token)),
+            joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
+        ]
+    else:
+        load_options = loader_options(Reservation, field_tree)
+    query = db.query(Reservation).options(*load_options)
+
+    # Junta as tabelas relacionadas apenas quando a busca ou a ordenação as utilizam
+    if search or sort_by == 'user':
+        query = query.join(Reservation.user)
+    if search or sort_by == 'equipment':
+        query = query.join(Reservation.equipment_unit).join(EquipmentUnit.equipment_type)
 
     # Aplica filtros de busca por texto em múltiplos campos
     if search:
@@ -177,7 +232,7 @@ def list_all_reservations(
     total = query.count()
     reservations = query.offset((page - 1) * size).limit(size).all()
     
-    return {"items": reservations, "total": total, "page": page, "size": size, "pages": math.ceil(total / size)}
+    return page_response(projected_schema(ReservationOut, field_tree), reservations, total, page, size)
 
 @router.patch("/reservations/{reservation_id}", response_model=ReservationOut)
 def update_reservation_status(
@@ -186,17 +241,26 @@ def update_reservation_status(
 ):
     """(Gerente) Atualiza o status de uma reserva (aprovar, rejeitar, devolver)."""
     db_reservation = db.query(Reservation).options(
-        joinedload(Reservation.user), 
+        joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token)),
         joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
     ).filter(Reservation.id == reservation_id).first()
     if not db_reservation: raise HTTPException(status_code=404, detail="Reserva não encontrada.")
 
     unit = db_reservation.equipment_unit
+    # Uma reserva expirada já liberou o seu horário, que pode ter sido reservado de novo
+    if db_reservation.status == 'expired':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Reservas expiradas não podem ser alteradas. Crie uma nova solicitação.")
+    if update_data.status.value == 'approved' and db_reservation.status != 'approved':
+        # Bloqueia a unidade (como na criação) e confirma que o horário continua livre
+        db.query(EquipmentUnit.id).filter(EquipmentUnit.id == unit.id).with_for_update().first()
+        if find_conflicting_reservation(db, unit.id, db_reservation.start_time, db_reservation.end_time, exclude_id=db_reservation.id):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Já existe outra reserva para esta unidade no período desta reserva.")
+
     log_message = f"Gerente '{manager_user.username}' {update_data.status.value} a reserva ID {db_reservation.id} do usuário '{db_reservation.user.username}'."
     
-    # Lógica para aprovação ou rejeição
+    # Lógica para aprovação ou rejeição. O status da unidade não é alterado: a
+    # disponibilidade é derivada das reservas (ver app/availability.py).
     if update_data.status.value in ['approved', 'rejected']:
-        unit.status = 'reserved' if update_data.status.value == 'approved' else 'available'
         if update_data.status.value == 'approved':
             # Adiciona a tarefa de criar evento no calendário
             background_tasks.add_task(approve_and_create_calendar_event, db_reservation.id)
@@ -206,24 +270,66 @@ def update_reservation_status(
     # Lógica para devolução
     elif update_data.status.value == 'returned':
         db_reservation.return_notes = update_data.return_notes
+        # A devolução implica a retirada, mesmo que ela não tenha sido registrada
+        db_reservation.picked_up_at = db_reservation.picked_up_at or datetime.now(timezone.utc)
         if update_data.return_status == 'maintenance':
-            unit.status = 'maintenance'
+            # Abre o chamado de manutenção da unidade (que passa a 'maintenance'), se ainda não houver um
+            if not find_open_ticket(db, unit.id):
+                open_ticket(db, unit, opened_by_id=manager_user.id, description=update_data.return_notes, reservation_id=db_reservation.id)
             history_event = UnitHistory(unit_id=unit.id, event_type='sent_to_maintenance', notes=f"Devolvido com defeito por '{db_reservation.user.username}'. Obs: {update_data.return_notes}", user_id=manager_user.id, reservation_id=db_reservation.id)
             log_message += " e enviou a unidade para manutenção."
         else: # 'ok'
-            unit.status = 'available'
+            # Com um chamado de manutenção em aberto, a unidade só é liberada quando o chamado for fechado
+            if find_open_ticket(db, unit.id):
+                log_message += " A unidade continua em manutenção (chamado em aberto)."
+            else:
+                unit.status = 'available'
             history_event = UnitHistory(unit_id=unit.id, event_type='returned_ok', notes=f"Devolvido por '{db_reservation.user.username}'. Obs: {update_data.return_notes}", user_id=manager_user.id, reservation_id=db_reservation.id)
         db.add(history_event)
         # Adiciona a tarefa de enviar e-mail de confirmação de devolução
         background_tasks.add_task(task_send_reservation_email, db_reservation.id, 'returned')
 
+    old_status = db_reservation.status
     db_reservation.status = update_data.status.value
+    record_reservation_status(db, db_reservation, old_status, unit.type_id, db_reservation.user.sector_id)
     db.commit()
     db.refresh(db_reservation)
-    create_log(db, manager_user.id, "INFO", log_message)
+    invalidate_availability_cache()
+    invalidate_type_detail_cache(unit.type_id)
+    create_log(
+        db, manager_user.id, "INFO", log_message,
+        action="reservation.status_changed", entity_type="reservation", entity_id=db_reservation.id,
+        payload={"old_status": old_status, "new_status": db_reservation.status, "unit_id": unit.id}
+    )
     return db_reservation
 
-@router.post("/reservations/{reservation_id}/notify-overdue", status_code=status.HTTP_200_OK)
+@router.post("/reservations/{reservation_id}/pickup", response_model=ReservationOut)
+def register_reservation_pickup(
+    reservation_id: int, db: Session = Depends(get_db), manager_user: User = Depends(get_current_manager_user)
+):
+    """
+    (Gerente) Registra a retirada da unidade de uma reserva aprovada. Reservas
+    aprovadas sem retirada expiram NO_SHOW_GRACE_MINUTES após o início.
+    """
+    db_reservation = db.query(Reservation).filter(Reservation.id == reservation_id).with_for_update().first()
+    if not db_reservation: raise HTTPException(status_code=404, detail="Reserva não encontrada.")
+    if db_reservation.status != 'approved':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Apenas reservas aprovadas podem ter a retirada registrada.")
+    if db_reservation.picked_up_at is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A retirada desta reserva já foi registrada.")
+
+    db_reservation.picked_up_at = datetime.now(timezone.utc)
+    db.add(UnitHistory(unit_id=db_reservation.unit_id, event_type='picked_up', notes="Unidade retirada.", user_id=manager_user.id, reservation_id=db_reservation.id))
+    db.commit()
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' registrou a retirada da reserva ID {db_reservation.id}.",
+        action="reservation.picked_up", entity_type="reservation", entity_id=db_reservation.id, payload={"unit_id": db_reservation.unit_id}
+    )
+    return db.query(Reservation).options(
+        joinedload(Reservation.user), joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
+    ).filter(Reservation.id == reservation_id).first()
+
+@router.post("/reservations/{reservation_id}/notify-overdue", response_model=MessageOut, status_code=status.HTTP_200_OK)
 def notify_overdue_reservation(
     reservation_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db),
     manager_user: User = Depends(get_current_manager_user)
@@ -237,7 +343,18 @@ def notify_overdue_reservation(
         raise HTTPException(status_code=400, detail="Esta reserva não está atrasada.")
 
     background_tasks.add_task(task_send_reservation_email, db_reservation.id, 'overdue')
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' enviou notificação de atraso para la reserva ID {db_reservation.id}.")
+
+    # Registra o envio manual para que o lembrete automático não seja disparado de novo
+    already_notified = db.query(ReservationNotification).filter(
+        ReservationNotification.reservation_id == db_reservation.id,
+        ReservationNotification.kind == OVERDUE_NOTIFICATION
+    ).first()
+    if not already_notified:
+        db.add(ReservationNotification(reservation_id=db_reservation.id, kind=OVERDUE_NOTIFICATION))
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' enviou notificação de atraso para la reserva ID {db_reservation.id}.",
+        action="reservation.overdue_notified", entity_type="reservation", entity_id=db_reservation.id
+    )
     return {"message": "Notificação de atraso enviada com sucesso."}
 
 # --- ROTAS DE GERENCIAMENTO DE USUÁRIOS ---
@@ -304,7 +421,10 @@ def get_user_history(user_id: int, db: Session = Depends(get_db), manager_user:
     """(Gerente) Retorna o histórico de reservas de um usuário específico."""
     if not db.query(User).filter(User.id == user_id).first():
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
-    return db.query(Reservation).filter(Reservation.user_id == user_id).options(joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)).order_by(Reservation.start_time.desc()).all()
+    return db.query(Reservation).filter(Reservation.user_id == user_id).options(
+        joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token)),
+        joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
+    ).order_by(Reservation.start_time.desc()).all()
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user_by_admin(user_id: int, db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin_user)):
@@ -329,12 +449,17 @@ def delete_user_by_admin(user_id: int, db: Session = Depends(get_db), admin_user
     
     # --- INÍCIO DA ALTERAÇÃO ---
     # 1. Cria o log da exclusão ANTES de deletar o usuário.
-    create_log(db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' deletou o usuário '{user_email_log}' (ID: {user_id}).")
+    create_log(
+        db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' deletou o usuário '{user_email_log}' (ID: {user_id}).",
+        action="user.deleted", entity_type="user", entity_id=user_id, payload={"email": user_email_log}
+    )
 
     # 2. Re-busca o usuário para garantir que a instância está "attached" (anexada)
     # à sessão antes de deletar, pois o create_log realiza um commit.
     user_to_delete = db.query(User).filter(User.id == user_id).first()
     if user_to_delete:
+        # As reservas do usuário são removidas em cascata: desconta-as dos agregados
+        record_reservations_deleted(db, Reservation.user_id == user_id)
         db.delete(user_to_delete)
         db.commit()
     # --- FIM DA ALTERAÇÃO ---
@@ -352,7 +477,10 @@ def set_user_role(user_id: int, role_update: UserRoleUpdate, db: Session = Depen
     db_user.role = role_update.role.value
     db.commit()
     db.refresh(db_user)
-    create_log(db, admin_user.id, "INFO", f"Admin '{admin_user.username}' alterou a permissão do usuário '{db_user.username}' de '{old_role}' para '{db_user.role}'.")
+    create_log(
+        db, admin_user.id, "INFO", f"Admin '{admin_user.username}' alterou a permissão do usuário '{db_user.username}' de '{old_role}' para '{db_user.role}'.",
+        action="user.role_changed", entity_type="user", entity_id=db_user.id, payload={"old_role": old_role, "new_role": db_user.role}
+    )
     return db_user
     
 @router.patch("/users/{user_id}/status", response_model=UserOut)
@@ -366,7 +494,10 @@ def set_user_status(user_id: int, status_update: UserStatusUpdate, db: Session =
     db.commit()
     db.refresh(db_user)
     action_log = "ativou" if db_user.is_active else "desativou"
-    create_log(db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' {action_log} o usuário '{db_user.username}' (ID: {db_user.id}).")
+    create_log(
+        db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' {action_log} o usuário '{db_user.username}' (ID: {db_user.id}).",
+        action="user.status_changed", entity_type="user", entity_id=db_user.id, payload={"is_active": db_user.is_active}
+    )
     return db_user
 
 @router.patch("/users/{user_id}/sector", response_model=UserOut)
@@ -382,23 +513,120 @@ def set_user_sector(user_id: int, sector_update: UserSectorUpdate, db: Session =
         if not sector: raise HTTPException(status_code=404, detail="Setor não encontrado.")
         new_sector_name = sector.name
 
+    record_sector_change(db, [db_user.id], sector_update.sector_id)
     db_user.sector_id = sector_update.sector_id
     db.commit()
     db.refresh(db_user)
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' alterou o setor do usuário '{db_user.username}' de '{old_sector_name}' para '{new_sector_name}'.")
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' alterou o setor do usuário '{db_user.username}' de '{old_sector_name}' para '{new_sector_name}'.",
+        action="user.sector_changed", entity_type="user", entity_id=db_user.id, payload={"sector_id": db_user.sector_id}
+    )
     return db_user
 
+@router.post("/users/bulk-update", response_model=UserBulkUpdateResult)
+def bulk_update_users(bulk_update: UserBulkUpdate, db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin_user)):
+    """
+    (Admin) Aplica alterações de permissão, setor e status a vários usuários de uma vez.
+
+    As alterações são validadas em conjunto, agrupadas por valor e aplicadas com
+    um UPDATE por grupo. Os logs de auditoria são gravados em lote, na mesma
+    transação. Alterações inválidas são devolvidas no relatório de erros.
+    """
+    user_ids = list({change.user_id for change in bulk_update.changes})
+    requested_sectors = list({c.sector_id for c in bulk_update.changes if c.sector_id is not None})
+
+    # 1. Carrega o estado atual dos usuários e os setores envolvidos com poucas consultas
+    users = {}
+    for chunk in _chunks(user_ids):
+        rows = db.query(
+            User.id, User.username, User.role, User.is_active, User.sector_id, Sector.name.label("sector_name")
+        ).outerjoin(User.sector).filter(User.id.in_(chunk))
+        users.update({row.id: row for row in rows})
+    sectors = {}
+    for chunk in _chunks(requested_sectors):
+        sectors.update(db.query(Sector.id, Sector.name).filter(Sector.id.in_(chunk)).all())
+
+    # 2. Valida cada alteração e agrupa os usuários pelo novo valor de cada campo
+    role_groups, status_groups, sector_groups = {}, {}, {}
+    errors, log_entries, updated_ids, seen_ids = [], [], set(), set()
+    for change in bulk_update.changes:
+        user = users.get(change.user_id)
+        sector_given = "sector_id" in change.model_fields_set
+        if change.user_id in seen_ids:
+            errors.append(UserBulkError(user_id=change.user_id, detail="Usuário repetido na requisição."))
+            continue
+        seen_ids.add(change.user_id)
+        if not user:
+            errors.append(UserBulkError(user_id=change.user_id, detail="Usuário não encontrado."))
+            continue
+        if user.id == admin_user.id and change.role is not None and change.role.value != "admin":
+            errors.append(UserBulkError(user_id=change.user_id, detail="Um administrador não pode remover a própria permissão."))
+            continue
+        # Como em set_user_status, nenhuma alteração do próprio status é aceita
+        if user.id == admin_user.id and change.is_active is not None:
+            errors.append(UserBulkError(user_id=change.user_id, detail="Um administrador não pode inativar a própria conta."))
+            continue
+        if sector_given and change.sector_id is not None and change.sector_id not in sectors:
+            errors.append(UserBulkError(user_id=change.user_id, detail="Setor não encontrado."))
+            continue
+
+        if change.role is not None and change.role.value != user.role:
+            role_groups.setdefault(change.role.value, []).append(user.id)
+            log_entries.append(LogEntry(
+                admin_user.id, "INFO", f"Admin '{admin_user.username}' alterou a permissão do usuário '{user.username}' de '{user.role}' para '{change.role.value}' (em lote).",
+                action="user.role_changed", entity_type="user", entity_id=user.id, payload={"old_role": user.role, "new_role": change.role.value, "bulk": True}
+            ))
+            updated_ids.add(user.id)
+        if change.is_active is not None and change.is_active != user.is_active:
+            status_groups.setdefault(change.is_active, []).append(user.id)
+            action_log = "ativou" if change.is_active else "desativou"
+            log_entries.append(LogEntry(
+                admin_user.id, "WARNING", f"Admin '{admin_user.username}' {action_log} o usuário '{user.username}' (ID: {user.id}) (em lote).",
+                action="user.status_changed", entity_type="user", entity_id=user.id, payload={"is_active": change.is_active, "bulk": True}
+            ))
+            updated_ids.add(user.id)
+        if sector_given and change.sector_id != user.sector_id:
+            sector_groups.setdefault(change.sector_id, []).append(user.id)
+            new_sector_name = sectors.get(change.sector_id, "Nenhum")
+            log_entries.append(LogEntry(
+                admin_user.id, "INFO", f"Admin '{admin_user.username}' alterou o setor do usuário '{user.username}' de '{user.sector_name or 'Nenhum'}' para '{new_sector_name}' (em lote).",
+                action="user.sector_changed", entity_type="user", entity_id=user.id, payload={"sector_id": change.sector_id, "bulk": True}
+            ))
+            updated_ids.add(user.id)
+
+    # 3. Aplica as alterações com um UPDATE por valor e grava os logs na mesma transação
+    # (as reservas dos usuários que mudam de setor são movidas nos agregados antes)
+    for value, ids in sector_groups.items():
+        for chunk in _chunks(ids):
+            record_sector_change(db, chunk, value)
+    for column, groups in ((User.role, role_groups), (User.is_active, status_groups), (User.sector_id, sector_groups)):
+        for value, ids in groups.items():
+            for chunk in _chunks(ids):
+                db.query(User).filter(User.id.in_(chunk)).update({column: value}, synchronize_session=False)
+    create_logs(db, log_entries)
+
+    return UserBulkUpdateResult(updated=len(updated_ids), errors=errors)
+
 # --- ROTA DE LOGS DO SISTEMA ---
 
+def _require_activity_log_table():
+    if not settings.ACTIVITY_LOG_DB_ENABLED:
+        raise HTTPException(
+            status_code=404,
+            detail="Os logs de atividade não são gravados no banco de dados. Consulte o diário de auditoria em /admin/audit-journal/export."
+        )
+
 @router.get("/logs", response_model=Page[ActivityLogOut])
 def get_activity_logs(
     db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin_user),
     search: Optional[str] = Query(None), level: Optional[str] = Query(None),
     user_id: Optional[int] = Query(None), start_date: Optional[datetime] = Query(None),
-    end_date: Optional[datetime] = Query(None), page: int = Query(1, ge=1),
-    size: int = Query(50, ge=1, le=1000)
+    end_date: Optional[datetime] = Query(None), action: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None), entity_id: Optional[int] = Query(None),
+    page: int = Query(1, ge=1), size: int = Query(50, ge=1, le=1000)
 ):
     """(Admin) Lista os logs de atividade da aplicação, com filtros avançados e paginação."""
+    _require_activity_log_table()
     query = db.query(ActivityLog)
 
     if search:
@@ -411,11 +639,18 @@ def get_activity_logs(
         query = query.filter(ActivityLog.created_at >= start_date)
     if end_date:
         query = query.filter(ActivityLog.created_at <= end_date)
+    # Filtros pelos campos estruturados (consultas por índice)
+    if action:
+        query = query.filter(ActivityLog.action == action)
+    if entity_type:
+        query = query.filter(ActivityLog.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.filter(ActivityLog.entity_id == entity_id)
         
     total = query.count()
     logs = query.order_by(ActivityLog.created_at.desc()).offset((page - 1) * size).limit(size).all()
     
-    return {"items": logs, "total": total, "page": page, "size": size, "pages": math.ceil(total / size)}
+    return page_response(ActivityLogOut, logs, total, page, size)
 
 
 @router.get("/logs/export", response_class=Response)
@@ -426,9 +661,13 @@ def export_activity_logs(
     level: Optional[str] = Query(None),
     user_id: Optional[int] = Query(None),
     start_date: Optional[datetime] = Query(None),
-    end_date: Optional[datetime] = Query(None)
+    end_date: Optional[datetime] = Query(None),
+    action: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    entity_id: Optional[int] = Query(None)
 ):
     """(Admin) Exporta os logs de atividade para um arquivo .txt com base nos filtros aplicados."""
+    _require_activity_log_table()
     # 1. Obter os logs filtrados (sem paginação)
     query = db.query(ActivityLog).options(joinedload(ActivityLog.user)) # Eager load user
 
@@ -442,8 +681,15 @@ def export_activity_logs(
         query = query.filter(ActivityLog.created_at >= start_date)
     if end_date:
         query = query.filter(ActivityLog.created_at <= end_date)
+    # Filtros pelos campos estruturados (consultas por índice)
+    if action:
+        query = query.filter(ActivityLog.action == action)
+    if entity_type:
+        query = query.filter(ActivityLog.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.filter(ActivityLog.entity_id == entity_id)
 
-    logs = query.order_by(ActivityLog.created_at.asc()).all()
+    query = query.order_by(ActivityLog.created_at.asc())
 
     # 2. Obter estatísticas adicionais do sistema
     total_users = db.query(User).count()
@@ -452,7 +698,7 @@ def export_activity_logs(
     total_reservations = db.query(Reservation).count()
     total_sectors = db.query(Sector).count()
 
-    # 3. Formatar o conteúdo do arquivo de texto
+    # 3. Formatar o cabeçalho do arquivo de texto
     report_content = []
     report_content.append("=========================================")
     report_content.append("   RELATÓRIO DE AUDITORIA - EQUIPCONTROL   ")
@@ -470,36 +716,116 @@ def export_activity_logs(
     report_content.append(f"- Termo de busca: {search or 'Nenhum'}")
     report_content.append(f"- Nível de Log: {level or 'Todos'}")
     report_content.append(f"- ID do Usuário: {user_id or 'Todos'}")
+    report_content.append(f"- Ação: {action or 'Todas'}")
+    report_content.append(f"- Entidade: {entity_type or 'Todas'}{f' (ID: {entity_id})' if entity_id is not None else ''}")
     report_content.append(f"- Data de Início: {start_date.strftime('%d/%m/%Y %H:%M') if start_date else 'Nenhuma'}")
     report_content.append(f"- Data de Fim: {end_date.strftime('%d/%m/%Y %H:%M') if end_date else 'Nenhuma'}")
 
     report_content.append("\n=========================================")
     report_content.append("          REGISTROS DE ATIVIDADE         ")
     report_content.append("=========================================\n")
-
-    if not logs:
-        report_content.append("Nenhum registro de log encontrado com os filtros aplicados.")
-    else:
-        for log in logs:
+    header = "\n".join(report_content)
+
+    def generate_report():
+        """
+        Gera o relatório em blocos: o cabeçalho e, em seguida, os logs lidos do
+        banco em lotes, sem carregar o período inteiro em memória.
+        """
+        yield header
+        lines, exported = [], 0
+        for log in query.yield_per(LOG_EXPORT_BATCH_SIZE):
             username = log.user.username if log.user else 'Sistema'
-            log_line = (
+            lines.append(
                 f"[{log.created_at.strftime('%Y-%m-%d %H:%M:%S')}] "
                 f"[{log.level:<7}] "
                 f"[Usuário: {username} (ID: {log.user_id or 'N/A'})] - "
                 f"{log.message}"
             )
-            report_content.append(log_line)
-
-    final_report = "\n".join(report_content)
-
-    # 4. Criar a resposta de download
+            if len(lines) >= LOG_EXPORT_BATCH_SIZE:
+                yield "\n" + "\n".join(lines)
+                exported += len(lines)
+                lines.clear()
+        if lines:
+            yield "\n" + "\n".join(lines)
+        elif not exported:
+            yield "\nNenhum registro de log encontrado com os filtros aplicados."
+
+    # 4. Criar a resposta de download, transmitida à medida que o relatório é gerado
     filename_date = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     filename = f"equipcontrol_audit_log_{filename_date}.txt"
     
-    return Response(
-        content=final_report,
+    return StreamingResponse(
+        generate_report(),
         media_type="text/plain",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
-    )
\ No newline at end of file
+    )
+
+
+# --- ROTAS DO DIÁRIO DE AUDITORIA ---
+
+def _require_audit_journal():
+    if not settings.AUDIT_JOURNAL_ENABLED:
+        raise HTTPException(status_code=404, detail="O diário de auditoria não está habilitado.")
+
+@router.get("/audit-journal/export", response_class=Response)
+def export_audit_journal(
+    admin_user: User = Depends(get_current_admin_user),
+    level: Optional[str] = Query(None),
+    user_id: Optional[int] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    action: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    entity_id: Optional[int] = Query(None)
+):
+    """
+    (Admin) Exporta as entradas do diário de auditoria em JSON Lines, com os
+    mesmos filtros da listagem de logs. Cada linha traz o hash encadeado do registro.
+    """
+    _require_audit_journal()
+    records = scan_journal(
+        start=start_date, end=end_date, level=level if level != "all" else None, user_id=user_id,
+        action=action, entity_type=entity_type, entity_id=entity_id
+    )
+
+    def generate_export():
+        """Transmite as entradas em blocos, à medida que o diário é lido."""
+        lines = []
+        for record in records:
+            lines.append(json.dumps({**record.entry, "hash": record.hash}, ensure_ascii=False) + "\n")
+            if len(lines) >= LOG_EXPORT_BATCH_SIZE:
+                yield "".join(lines)
+                lines.clear()
+        if lines:
+            yield "".join(lines)
+
+    filename = f"equipcontrol_audit_journal_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jsonl"
+    return StreamingResponse(
+        generate_export(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/audit-journal/verify", response_model=JournalVerificationOut)
+def verify_audit_journal_chain(admin_user: User = Depends(get_current_admin_user)):
+    """(Admin) Verifica a cadeia de hashes de todo o diário de auditoria."""
+    _require_audit_journal()
+    return verify_journal()
+
+# --- ROTA DE CONSULTAS LENTAS ---
+
+@router.get("/slow-queries", response_model=List[SlowQueryStatsOut])
+def list_slow_queries(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+    limit: int = Query(20, ge=1, le=100),
+    since: Optional[datetime] = Query(None)
+):
+    """
+    (Admin) Lista as consultas SQL mais lentas, agrupadas e ordenadas pelo tempo total.
+    Requer SLOW_QUERY_LOG_ENABLED; os registros ainda em memória neste processo são gravados antes.
+    """
+    flush_slow_queries(db)
+    return top_slow_queries(db, limit=limit, since=since)
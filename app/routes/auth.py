@@ -31,6 +31,7 @@ from app.schemas.user import (
     TwoFactorSetupResponse, TwoFactorEnableRequest, TwoFactorDisableRequest,
     RefreshTokenRequest
 )
+from app.schemas.common import MessageOut
 from app.security import (
     get_password_hash, verify_password, create_access_token,
     create_password_reset_token, verify_password_reset_token,
@@ -81,7 +82,10 @@ async def register_user(
             # Se o usuário existe mas não verificou o e-mail, reenvia o e-mail de verificação
             verification_token = create_verification_token(email=db_user_by_email.email)
             background_tasks.add_task(send_verification_email, db_user_by_email.email, db_user_by_email.username, verification_token)
-            create_log(db, None, "INFO", f"Tentativa de registro com e-mail não verificado existente: {user.email}. Reenviando e-mail de verificação.")
+            create_log(
+                db, None, "INFO", f"Tentativa de registro com e-mail não verificado existente: {user.email}. Reenviando e-mail de verificação.",
+                action="auth.verification_resent", entity_type="user", entity_id=db_user_by_email.id
+            )
             return db_user_by_email
 
     # Valida se o setor fornecido existe
@@ -106,7 +110,10 @@ async def register_user(
     db.commit()
     db.refresh(new_user)
     
-    create_log(db, new_user.id, "INFO", f"Novo usuário registrado: '{new_user.username}' ({new_user.email}). Aguardando verificação de e-mail.")
+    create_log(
+        db, new_user.id, "INFO", f"Novo usuário registrado: '{new_user.username}' ({new_user.email}). Aguardando verificação de e-mail.",
+        action="auth.registered", entity_type="user", entity_id=new_user.id
+    )
 
     # Envia o e-mail de verificação em segundo plano
     verification_token = create_verification_token(email=new_user.email)
@@ -114,7 +121,7 @@ async def register_user(
 
     return new_user
 
-@router.get("/verify-email")
+@router.get("/verify-email", response_model=MessageOut)
 def verify_user_email(token: str, db: Session = Depends(get_db)):
     """Verifica o token enviado por e-mail e ativa a conta do usuário."""
     email = verify_verification_token(token)
@@ -132,7 +139,10 @@ def verify_user_email(token: str, db: Session = Depends(get_db)):
     user.is_active = True
     db.commit()
 
-    create_log(db, user.id, "INFO", f"Usuário '{user.username}' verificou o e-mail e ativou a conta.")
+    create_log(
+        db, user.id, "INFO", f"Usuário '{user.username}' verificou o e-mail e ativou a conta.",
+        action="auth.email_verified", entity_type="user", entity_id=user.id
+    )
     return {"message": "Sua conta foi verificada com sucesso!"}
 
 @router.post("/login", response_model=LoginResponse)
@@ -150,7 +160,10 @@ async def login_for_access_token(user_credentials: UserLogin, background_tasks:
     )
 
     if not user:
-        create_log(db, None, "WARNING", f"Tentativa de login para um e-mail não existente: {user_credentials.email}")
+        create_log(
+            db, None, "WARNING", f"Tentativa de login para um e-mail não existente: {user_credentials.email}",
+            action="auth.login_unknown_email", payload={"email": user_credentials.email}
+        )
         raise credentials_exception
 
     if not user.is_active:
@@ -162,11 +175,17 @@ async def login_for_access_token(user_credentials: UserLogin, background_tasks:
         if user.login_attempts >= LOGIN_ATTEMPT_LIMIT:
             user.is_active = False
             db.commit()
-            create_log(db, user.id, "ERROR", f"Usuário '{user.username}' desativado por exceder o limite de tentativas de login.")
+            create_log(
+                db, user.id, "ERROR", f"Usuário '{user.username}' desativado por exceder o limite de tentativas de login.",
+                action="auth.account_locked", entity_type="user", entity_id=user.id, payload={"attempts": user.login_attempts}
+            )
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Sua conta foi desativada por exceder as {LOGIN_ATTEMPT_LIMIT} tentativas de login. Contate o suporte.")
         db.commit()
         remaining_attempts = LOGIN_ATTEMPT_LIMIT - user.login_attempts
-        create_log(db, user.id, "WARNING", f"Tentativa de login falhou para o usuário '{user.username}'. Tentativas restantes: {remaining_attempts}")
+        create_log(
+            db, user.id, "WARNING", f"Tentativa de login falhou para o usuário '{user.username}'. Tentativas restantes: {remaining_attempts}",
+            action="auth.login_failed", entity_type="user", entity_id=user.id, payload={"remaining_attempts": remaining_attempts}
+        )
         raise credentials_exception
 
     # Se o login for bem-sucedido, zera o contador de tentativas
@@ -191,7 +210,10 @@ async def login_for_access_token(user_credentials: UserLogin, background_tasks:
     # Se tudo estiver correto, gera os tokens de acesso e de atualização
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
-    create_log(db, user.id, "INFO", f"Usuário '{user.username}' logado com sucesso.")
+    create_log(
+        db, user.id, "INFO", f"Usuário '{user.username}' logado com sucesso.",
+        action="auth.login", entity_type="user", entity_id=user.id, payload={"method": "password"}
+    )
     return LoginResponse(login_step="completed", access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
 @router.post("/login/2fa", response_model=Token)
@@ -210,13 +232,19 @@ def login_2fa_verification(request: TwoFactorRequest, db: Session = Depends(get_
         raise HTTPException(status_code=401, detail="Usuário não encontrado ou 2FA não está ativo.")
 
     if not verify_otp(user.otp_secret, request.otp_code):
-        create_log(db, user.id, "WARNING", "Tentativa de login com código 2FA inválido.")
+        create_log(
+            db, user.id, "WARNING", "Tentativa de login com código 2FA inválido.",
+            action="auth.2fa_failed", entity_type="user", entity_id=user.id
+        )
         raise HTTPException(status_code=401, detail="Código 2FA inválido.")
 
     # Se o código 2FA for válido, gera os tokens finais
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
-    create_log(db, user.id, "INFO", f"Usuário '{user.username}' logado com sucesso via 2FA.")
+    create_log(
+        db, user.id, "INFO", f"Usuário '{user.username}' logado com sucesso via 2FA.",
+        action="auth.login", entity_type="user", entity_id=user.id, payload={"method": "2fa"}
+    )
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/refresh", response_model=Token)
@@ -238,7 +266,7 @@ def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get
     new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
     return {"access_token": new_access_token, "refresh_token": new_refresh_token, "token_type": "bearer"}
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", response_model=MessageOut)
 async def forgot_password(request: ForgotPasswordRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Inicia o fluxo de redefinição de senha."""
     user = db.query(User).filter(User.email == request.email).first()
@@ -246,15 +274,21 @@ async def forgot_password(request: ForgotPasswordRequest, background_tasks: Back
         # Se o usuário existir, envia o e-mail de redefinição
         reset_token = create_password_reset_token(email=user.email)
         background_tasks.add_task(send_reset_password_email, user.email, user.username, reset_token)
-        create_log(db, user.id, "INFO", f"Usuário '{user.username}' solicitou a redefinição de senha.")
+        create_log(
+            db, user.id, "INFO", f"Usuário '{user.username}' solicitou a redefinição de senha.",
+            action="auth.password_reset_requested", entity_type="user", entity_id=user.id
+        )
     else:
         # Se não existir, registra o evento, mas não informa o erro ao cliente por segurança
-        create_log(db, None, "INFO", f"Tentativa de recuperação de senha para e-mail não existente: {request.email}.")
+        create_log(
+            db, None, "INFO", f"Tentativa de recuperação de senha para e-mail não existente: {request.email}.",
+            action="auth.password_reset_unknown_email", payload={"email": request.email}
+        )
     
     # Por segurança, sempre retorna a mesma mensagem para não confirmar se um e-mail existe ou não.
     return {"message": "Se um usuário com este email existir, um link de redefinição será enviado."}
 
-@router.post("/reset-password")
+@router.post("/reset-password", response_model=MessageOut)
 def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Finaliza o fluxo de redefinição de senha."""
     email = verify_password_reset_token(request.token)
@@ -275,10 +309,13 @@ def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db))
     user.password_hash = get_password_hash(request.new_password)
     db.commit()
 
-    create_log(db, user.id, "INFO", f"Usuário '{user.username}' redefiniu sua senha com sucesso.")
+    create_log(
+        db, user.id, "INFO", f"Usuário '{user.username}' redefiniu sua senha com sucesso.",
+        action="auth.password_reset", entity_type="user", entity_id=user.id
+    )
     return {"message": "Sua senha foi redefinida com sucesso."}
 
-@router.post("/logout")
+@router.post("/logout", response_model=MessageOut)
 def logout(db: Session = Depends(get_db), token: str = Depends(get_token)):
     """Invalida o token JWT atual adicionando-o à blacklist."""
     try:
@@ -302,7 +339,10 @@ def logout(db: Session = Depends(get_db), token: str = Depends(get_token)):
         db.add(db_token)
         db.commit()
 
-        create_log(db, user_id, "INFO", f"Usuário ID {user_id} fez logout.")
+        create_log(
+            db, user_id, "INFO", f"Usuário ID {user_id} fez logout.",
+            action="auth.logout", entity_type="user", entity_id=user_id
+        )
     except JWTError:
         raise HTTPException(status_code=400, detail="Token inválido.")
     
@@ -6,18 +6,28 @@ Módulo de Rotas para o Painel de Análise (Dashboard)
 Este arquivo define o endpoint que fornece estatísticas agregadas para o
 painel de análise do administrador, permitindo uma visão geral do uso do sistema.
 
+As estatísticas de reservas são lidas dos agregados pré-calculados por dia,
+hora, tipo de equipamento, setor e status, e o ranking de usuários dos
+agregados por usuário (ver app/rollups.py), e não da tabela de reservas. O
+período é aplicado em dias inteiros, no fuso ANALYTICS_TIMEZONE. Apenas o
+filtro por usuário agrega diretamente as reservas daquele usuário.
+
 Dependências:
 - FastAPI: Para a criação do roteador e gerenciamento de dependências.
 - SQLAlchemy: Para realizar consultas complexas e agregações no banco de dados.
 - Módulos de modelos e schemas: Para a estrutura de dados e formatação da resposta.
 - app.security: Para proteger o endpoint e garantir o acesso apenas de administradores.
+- app.rollups: Para a leitura dos agregados de reservas.
+- app.utilization: Para a análise de utilização das unidades.
+- DemandForecast: Para a leitura das previsões de demanda pré-calculadas.
 """
 
-from fastapi import APIRouter, Depends, Query, Response
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, case
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import math
 
 from app.database import get_db
 from app.models.reservation import Reservation
@@ -25,8 +35,15 @@ from app.models.equipment_type import EquipmentType
 from app.models.equipment_unit import EquipmentUnit
 from app.models.user import User
 from app.models.sector import Sector
-from app.schemas.dashboard import DashboardStats, StatsItem
+from app.models.demand_forecast import DemandForecast
+from app.schemas.dashboard import (
+    DashboardStats, StatsItem, HourlyStatsItem, UtilizationReport, UnitUtilizationOut, ForecastReport, TypeForecastOut
+)
+from app.schemas.pagination import Page
+from app.serialization import page_response
 from app.security import get_current_admin_user
+from app import rollups
+from app.utilization import default_window, get_utilization
 
 # Cria um roteador FastAPI para agrupar os endpoints do dashboard
 router = APIRouter(
@@ -34,7 +51,15 @@ router = APIRouter(
     tags=["Dashboard"]
 )
 
-@router.get("/stats")
+STATUS_TRANSLATION = {'approved': 'Aprovadas', 'pending': 'Pendentes', 'rejected': 'Rejeitadas', 'returned': 'Devolvidas', 'expired': 'Expiradas'}
+DAYS_OF_WEEK = {1: "Segunda", 2: "Terça", 3: "Quarta", 4: "Quinta", 5: "Sexta", 6: "Sábado", 7: "Domingo"}
+
+def _top_items(counts: dict, names: dict, limit: int = 5) -> list[StatsItem]:
+    """Monta o ranking (Top N) a partir das contagens por ID, ignorando IDs sem nome (ex: removidos)."""
+    ranked = sorted(((names[key], count) for key, count in counts.items() if key in names), key=lambda item: (-item[1], item[0]))
+    return [StatsItem(name=name, count=count) for name, count in ranked[:limit]]
+
+@router.get("/stats", response_model=DashboardStats)
 def get_dashboard_stats(
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_current_admin_user),
@@ -47,102 +72,183 @@ def get_dashboard_stats(
     """
     (Admin) Retorna estatísticas agregadas para o painel de análise com filtros avançados.
 
-    Esta função constrói consultas SQL complexas para agregar dados de reservas
-    e retornar um resumo completo para a visualização no frontend.
+    As contagens de reservas vêm dos agregados (app/rollups.py), com algumas
+    consultas agrupadas sobre uma tabela pequena, em vez de varrer as reservas.
     """
-    # Query base para todas as estatísticas de reserva, que será filtrada
-    query = db.query(Reservation)
-
-    # Aplica filtros de data, se fornecidos
-    if start_date:
-        query = query.filter(Reservation.created_at >= start_date)
-    if end_date:
-        query = query.filter(Reservation.created_at <= end_date)
-
-    # Aplica filtros adicionais de setor, usuário e tipo de equipamento
-    if sector_id:
-        query = query.join(Reservation.user).filter(User.sector_id == sector_id)
+    start_day = rollups.local_day(start_date) if start_date else None
+    end_day = rollups.local_day(end_date) if end_date else None
+
     if user_id:
-        # Reutiliza o join se sector_id já o fez
-        if not sector_id:
-            query = query.join(Reservation.user)
-        query = query.filter(User.id == user_id)
-    if equipment_type_id:
-        query = query.join(Reservation.equipment_unit).filter(EquipmentUnit.type_id == equipment_type_id)
+        # Os agregados do painel não têm a dimensão de usuário: agrega as reservas do usuário em memória
+        query = rollups.source_query(db).filter(Reservation.user_id == user_id)
+        if start_day:
+            query = query.filter(Reservation.created_at >= rollups.day_start(start_day))
+        if end_day:
+            query = query.filter(Reservation.created_at < rollups.day_start(end_day + timedelta(days=1)))
+        if sector_id:
+            query = query.filter(User.sector_id == sector_id)
+        if equipment_type_id:
+            query = query.filter(EquipmentUnit.type_id == equipment_type_id)
+        summary = rollups.summarize_buckets(rollups.aggregate(query.yield_per(rollups.ROLLUP_BATCH_SIZE)))
+    else:
+        summary = rollups.summarize_rollups(db, start_day, end_day, sector_id, equipment_type_id)
 
     # --- 1. KPIs Gerais ---
     # Contagens totais (não são afetadas pelos filtros de data/reserva)
     total_users = db.query(User).count()
     total_equipments = db.query(EquipmentUnit).count()
-    # Contagem total de reservas com base nos filtros aplicados
-    total_reservations = query.count()
-
-    # --- 2. Equipamentos mais reservados ---
-    top_equipments_query = (
-        query.join(Reservation.equipment_unit).join(EquipmentUnit.equipment_type)
-        .group_by(EquipmentType.name)
-        .with_entities(EquipmentType.name, func.count(Reservation.id).label('count'))
-        .order_by(desc('count'))
-        .limit(5)
-        .all()
-    )
-    top_equipments = [StatsItem(name=name, count=count) for name, count in top_equipments_query]
-
-    # --- 3. Setores que mais reservam ---
-    top_sectors_query = (
-        query.join(Reservation.user).join(User.sector)
-        .group_by(Sector.name)
-        .with_entities(Sector.name, func.count(Reservation.id).label('count'))
-        .order_by(desc('count'))
-        .limit(5)
-        .all()
-    )
-    top_sectors = [StatsItem(name=name, count=count) for name, count in top_sectors_query]
+
+    # --- 2. Equipamentos mais reservados e 3. Setores que mais reservam ---
+    type_names = dict(db.query(EquipmentType.id, EquipmentType.name).filter(EquipmentType.id.in_(summary.by_type)).all()) if summary.by_type else {}
+    sector_names = dict(db.query(Sector.id, Sector.name).filter(Sector.id.in_(summary.by_sector)).all()) if summary.by_sector else {}
+    top_equipments = _top_items(summary.by_type, type_names)
+    top_sectors = _top_items(summary.by_sector, sector_names)
 
     # --- 4. Usuários que mais reservam ---
-    top_users_query = (
-        query.join(Reservation.user) # Join já pode ter sido feito
-        .group_by(User.username)
-        .with_entities(User.username, func.count(Reservation.id).label('count'))
-        .order_by(desc('count'))
-        .limit(5)
-        .all()
-    )
-    top_users = [StatsItem(name=name, count=count) for name, count in top_users_query]
+    if user_id:
+        username = db.query(User.username).filter(User.id == user_id).scalar()
+        top_users = [StatsItem(name=username, count=summary.total)] if username and summary.total else []
+    else:
+        top_users = [
+            StatsItem(name=name, count=count)
+            for name, count in rollups.top_users(db, start_day, end_day, sector_id, equipment_type_id)
+        ]
 
     # --- 5. Contagem de status de reserva ---
-    status_counts_query = (
-        query.group_by(Reservation.status)
-        .with_entities(Reservation.status, func.count(Reservation.id).label('count'))
-        .all()
-    )
-    status_translation = {'approved': 'Aprovadas', 'pending': 'Pendentes', 'rejected': 'Rejeitadas', 'returned': 'Devolvidas'}
-    reservation_status_counts = [StatsItem(name=status_translation.get(status, status), count=count) for status, count in status_counts_query]
-
-    # --- 6. Reservas por dia da semana ---
-    reservations_by_day_query = (
-        query.group_by(func.extract('isodow', Reservation.created_at)) # isodow: 1=Segunda, 7=Domingo
-        .with_entities(func.extract('isodow', Reservation.created_at).label('day_of_week'), func.count(Reservation.id).label('count'))
-        .order_by('day_of_week')
-        .all()
-    )
-    days_of_week = {1: "Segunda", 2: "Terça", 3: "Quarta", 4: "Quinta", 5: "Sexta", 6: "Sábado", 7: "Domingo"}
-    reservations_by_day_dict = {day: count for day, count in reservations_by_day_query}
-    reservations_by_day = [StatsItem(name=days_of_week[i], count=reservations_by_day_dict.get(i, 0)) for i in range(1, 8)]
+    reservation_status_counts = [
+        StatsItem(name=STATUS_TRANSLATION.get(status, status), count=count) for status, count in sorted(summary.by_status.items())
+    ]
+
+    # --- 6. Reservas por dia da semana e por semana ---
+    by_weekday, by_week = {}, {}
+    for day, count in summary.by_day.items():
+        by_weekday[day.isoweekday()] = by_weekday.get(day.isoweekday(), 0) + count
+        week_start = day - timedelta(days=day.weekday())
+        by_week[week_start] = by_week.get(week_start, 0) + count
+    reservations_by_day = [StatsItem(name=DAYS_OF_WEEK[i], count=by_weekday.get(i, 0)) for i in range(1, 8)]
+    reservations_by_week = [StatsItem(name=week_start.strftime("%d/%m/%Y"), count=count) for week_start, count in sorted(by_week.items())]
+
+    # --- 7. Utilização por hora de início ---
+    reservations_by_hour = [
+        HourlyStatsItem(
+            name=f"{hour:02d}h",
+            count=summary.by_hour.get(hour, 0),
+            reserved_hours=round(summary.reserved_hours_by_hour.get(hour, 0.0), 1)
+        ) for hour in range(24)
+    ]
 
     # --- Montagem do Objeto de Resposta ---
     stats_object = DashboardStats(
         total_users=total_users,
         total_equipments=total_equipments,
-        total_reservations=total_reservations,
+        total_reservations=summary.total,
         top_equipments=top_equipments,
         top_sectors=top_sectors,
         top_users=top_users,
         reservation_status_counts=reservation_status_counts,
-        reservations_by_day=reservations_by_day
+        reservations_by_day=reservations_by_day,
+        reservations_by_week=reservations_by_week,
+        reservations_by_hour=reservations_by_hour
     )
 
-    # Converte o objeto Pydantic para JSON e cria uma Resposta manual
-    # para garantir o cabeçalho de codificação correto (charset=utf-8).
-    json_content = stats_object.model_dump_json()
-    return Response(content=json_content, media_type="application/json; charset=utf-8")
\ No newline at end of file
+    # O objeto já validado é serializado diretamente em bytes JSON (UTF-8) pelo
+    # FastAPI, sem nova validação, por ser uma instância do próprio response_model.
+    return stats_object
+
+
+def _utilization_window(start_date: Optional[datetime], end_date: Optional[datetime]) -> tuple[datetime, datetime]:
+    """Valida a janela informada, completando-a com a janela padrão."""
+    default_start, default_end = default_window()
+    end = end_date or default_end
+    start = start_date or (end - (default_end - default_start))
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data inicial deve ser anterior à data final.")
+    return start, end
+
+@router.get("/utilization", response_model=UtilizationReport)
+def get_utilization_report(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None)
+):
+    """
+    (Admin) Retorna a utilização por tipo de equipamento na janela informada
+    (padrão: últimos 30 dias): horas reservadas, unidades ociosas e saturadas e
+    o pico de reservas simultâneas.
+    """
+    start, end = _utilization_window(start_date, end_date)
+    result = get_utilization(db, start, end)
+    return UtilizationReport(start=result.start, end=result.end, window_hours=result.window_hours, types=result.types)
+
+@router.get("/utilization/units", response_model=Page[UnitUtilizationOut])
+def get_unit_utilization(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    equipment_type_id: Optional[int] = Query(None),
+    sort_dir: Optional[str] = Query('asc'),
+    page: int = Query(1, ge=1),
+    size: int = Query(50, ge=1, le=1000)
+):
+    """
+    (Admin) Lista a utilização de cada unidade na janela informada, ordenada pelo
+    percentual de utilização (padrão: das mais ociosas para as mais utilizadas).
+    """
+    if sort_dir not in ("asc", "desc"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ordenação inválida. Use: asc, desc.")
+    start, end = _utilization_window(start_date, end_date)
+    units = get_utilization(db, start, end).units
+    if equipment_type_id:
+        units = [unit for unit in units if unit["type_id"] == equipment_type_id]
+    units = sorted(units, key=lambda unit: (unit["utilization_pct"], unit["unit_id"]), reverse=(sort_dir == "desc"))
+    return page_response(UnitUtilizationOut, units[(page - 1) * size: page * size], len(units), page, size)
+
+
+@router.get("/forecast", response_model=ForecastReport)
+def get_demand_forecast(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+    equipment_type_id: Optional[int] = Query(None)
+):
+    """
+    (Admin) Retorna a previsão de demanda das próximas semanas por tipo de equipamento,
+    comparando o pico previsto de reservas simultâneas com as unidades existentes.
+    A previsão é pré-calculada pela tarefa agendada de treinamento.
+    """
+    query = db.query(DemandForecast)
+    if equipment_type_id:
+        query = query.filter(DemandForecast.equipment_type_id == equipment_type_id)
+    forecasts = query.order_by(DemandForecast.equipment_type_id, DemandForecast.week_start).all()
+
+    weeks_by_type: dict[int, list[DemandForecast]] = {}
+    for forecast in forecasts:
+        weeks_by_type.setdefault(forecast.equipment_type_id, []).append(forecast)
+
+    type_names = dict(db.query(EquipmentType.id, EquipmentType.name).filter(EquipmentType.id.in_(weeks_by_type)).all()) if weeks_by_type else {}
+    unit_counts = dict(
+        db.query(EquipmentUnit.type_id, func.count(EquipmentUnit.id))
+        .filter(EquipmentUnit.type_id.in_(weeks_by_type))
+        .group_by(EquipmentUnit.type_id)
+        .all()
+    ) if weeks_by_type else {}
+
+    types = []
+    for type_id, weeks in weeks_by_type.items():
+        peak_demand = max(week.predicted_peak for week in weeks)
+        total_units = unit_counts.get(type_id, 0)
+        types.append(TypeForecastOut(
+            type_id=type_id,
+            type_name=type_names.get(type_id, ""),
+            total_units=total_units,
+            model=weeks[0].model,
+            peak_demand=peak_demand,
+            shortfall_units=max(0, math.ceil(peak_demand) - total_units),
+            weeks=weeks
+        ))
+    # Tipos com maior falta de unidades (e, depois, maior pressão sobre as unidades) primeiro
+    types.sort(key=lambda item: (-item.shortfall_units, -item.peak_demand / max(item.total_units, 1), item.type_name))
+
+    generated_at = forecasts[0].generated_at if forecasts else None
+    return ForecastReport(generated_at=generated_at, types=types)
@@ -14,11 +14,14 @@ Dependências:
 - Módulos de utilitários: security (para proteger rotas) e logging_utils.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, subqueryload, joinedload
-from sqlalchemy import func, case, or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, or_, insert
 from typing import List, Optional
-import math
+from datetime import datetime, timezone
+import codecs
+import csv
+import json
 
 from app.database import get_db
 from app.models.equipment_type import EquipmentType
@@ -29,18 +32,71 @@ from app.models.unit_history import UnitHistory
 from app.schemas.equipment import (
     EquipmentTypeCreate, EquipmentTypeOut, EquipmentTypeUpdate,
     EquipmentUnitCreate, EquipmentUnitOut, EquipmentUnitUpdate,
-    EquipmentTypeWithUnitsOut, EquipmentTypeStatsOut
+    EquipmentTypeWithUnitsOut, EquipmentTypeStatsOut,
+    UnitImportResult, UnitImportRowError
 )
 from app.schemas.pagination import Page
-from app.schemas.unit_history import UnitHistoryOut
+from app.schemas.unit_history import UnitHistoryPage
+from app.serialization import page_response
 from app.security import get_current_user, get_current_manager_user
 from app.logging_utils import create_log
+from app.availability import UNIT_OPERATIONAL_STATUSES, occupied_units_subquery
+from app.type_details import type_detail_json, invalidate_type_detail_cache
+from app.popularity import POPULARITY_WINDOWS, POPULAR_TYPES_LIMIT, popularity_index
+from app.unit_history import history_page
+from app.maintenance import find_open_ticket, open_ticket, close_ticket
+from app.rollups import record_reservations_deleted, record_unit_type_change
 
 router = APIRouter(
     prefix="/equipments",
     tags=["Equipments Management"]
 )
 
+# Status aceitos para unidades criadas via importação em lote.
+IMPORT_ALLOWED_STATUSES = UNIT_OPERATIONAL_STATUSES
+
+# Quantidade máxima de valores enviados em cada cláusula IN durante a validação
+# da importação, evitando estourar o limite de parâmetros do banco de dados.
+IMPORT_QUERY_CHUNK_SIZE = 500
+
+def _validate_unit_status(unit_status: Optional[str]):
+    """
+    Garante que apenas estados operacionais sejam gravados na unidade. Os status
+    'pending' e 'reserved' são derivados das reservas e não podem ser definidos manualmente.
+    """
+    if unit_status not in UNIT_OPERATIONAL_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status '{unit_status}' inválido. Use: {', '.join(UNIT_OPERATIONAL_STATUSES)}.")
+
+# --- Funções Auxiliares da Importação em Lote ---
+
+def _read_import_rows(file: UploadFile):
+    """
+    Lê o arquivo enviado (CSV ou array JSON) e gera os registros um a um.
+
+    O CSV é decodificado de forma incremental, sem carregar o arquivo inteiro
+    em memória. O formato é identificado pela extensão ou pelo content-type.
+    """
+    filename = (file.filename or "").lower()
+    try:
+        if filename.endswith(".json") or file.content_type == "application/json":
+            data = json.load(codecs.getreader("utf-8-sig")(file.file))
+            if not isinstance(data, list):
+                raise HTTPException(status_code=400, detail="O arquivo JSON deve conter uma lista de unidades.")
+            yield from data
+        else:
+            yield from csv.DictReader(codecs.iterdecode(file.file, "utf-8-sig"))
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="Não foi possível ler o arquivo. Envie um CSV ou JSON válido em UTF-8.")
+
+def _find_existing_values(db: Session, column, values) -> set:
+    """Retorna quais dos valores informados já existem na coluna, consultando o banco em blocos."""
+    values = list(values)
+    found = set()
+    for i in range(0, len(values), IMPORT_QUERY_CHUNK_SIZE):
+        chunk = values[i:i + IMPORT_QUERY_CHUNK_SIZE]
+        found.update(value for (value,) in db.query(column).filter(column.in_(chunk)))
+    return found
+
 # --- Rotas para TIPOS de Equipamento ---
 
 @router.post("/types", response_model=EquipmentTypeOut, status_code=status.HTTP_201_CREATED)
@@ -59,7 +115,10 @@ def create_equipment_type(
     db.commit()
     db.refresh(new_type)
 
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' criou o tipo de equipamento '{new_type.name}' (ID: {new_type.id}).")
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' criou o tipo de equipamento '{new_type.name}' (ID: {new_type.id}).",
+        action="equipment_type.created", entity_type="equipment_type", entity_id=new_type.id
+    )
     return new_type
 
 @router.get("/types/categories", response_model=List[str])
@@ -85,22 +144,35 @@ def list_equipment_types(
     """
     (Usuários Autenticados) Lista todos os tipos de equipamentos com estatísticas de unidades.
     Esta consulta complexa calcula a contagem de unidades por status para cada tipo.
+    Uma unidade é contada como reservada quando há uma reserva ativa ocupando-a
+    neste momento, e como disponível quando não está em manutenção nem ocupada.
     """
+    # Unidades ocupadas agora, derivadas das reservas ativas
+    occupied = occupied_units_subquery(datetime.now(timezone.utc))
+    in_maintenance = EquipmentUnit.status == 'maintenance'
+    is_occupied = occupied.c.unit_id.is_not(None)
+
     # Subconsultas para calcular as estatísticas de unidades de forma eficiente
     total_sub = func.count(EquipmentUnit.id).label("total_units")
-    available_sub = func.sum(case((EquipmentUnit.status == 'available', 1), else_=0)).label("available_units")
-    reserved_sub = func.sum(case((EquipmentUnit.status.in_(['reserved', 'pending']), 1), else_=0)).label("reserved_units")
-    maintenance_sub = func.sum(case((EquipmentUnit.status == 'maintenance', 1), else_=0)).label("maintenance_units")
+    available_sub = func.coalesce(func.sum(case((in_maintenance, 0), (is_occupied, 0), (EquipmentUnit.id.is_not(None), 1), else_=0)), 0).label("available_units")
+    reserved_sub = func.coalesce(func.sum(case((in_maintenance, 0), (is_occupied, 1), else_=0)), 0).label("reserved_units")
+    maintenance_sub = func.coalesce(func.sum(case((in_maintenance, 1), else_=0)), 0).label("maintenance_units")
 
+    # Seleciona apenas as colunas do schema de saída: as linhas resultantes são
+    # serializadas diretamente, sem instanciar objetos ORM.
     query = (
         db.query(
-            EquipmentType,
+            EquipmentType.id,
+            EquipmentType.name,
+            EquipmentType.category,
+            EquipmentType.description,
             total_sub,
             available_sub,
             reserved_sub,
             maintenance_sub
         )
         .outerjoin(EquipmentUnit, EquipmentType.id == EquipmentUnit.type_id)
+        .outerjoin(occupied, occupied.c.unit_id == EquipmentUnit.id)
     )
 
     # Aplica filtros de busca
@@ -140,41 +212,19 @@ def list_equipment_types(
 
     total = query.count()
     results = query.order_by(EquipmentType.name).offset((page - 1) * size).limit(size).all()
-    
-    # Monta a lista de resposta no formato do schema EquipmentTypeStatsOut
-    stats_out = [
-        EquipmentTypeStatsOut.model_validate({
-            **type_obj.__dict__,
-            "total_units": total_units or 0,
-            "available_units": available or 0,
-            "reserved_units": reserved or 0,
-            "maintenance_units": maintenance or 0
-        }) for type_obj, total_units, available, reserved, maintenance in results
-    ]
-    
-    return {
-        "items": stats_out,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": math.ceil(total / size) if size > 0 else 0
-    }
+
+    # As linhas já têm os nomes dos campos de EquipmentTypeStatsOut
+    return page_response(EquipmentTypeStatsOut, results, total, page, size)
 
 @router.get("/types/{type_id}", response_model=EquipmentTypeWithUnitsOut)
 def get_equipment_type_with_units(type_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """(Usuários Autenticados) Busca um tipo de equipamento e todas as suas unidades."""
-    db_type = db.query(EquipmentType).options(
-        joinedload(EquipmentType.units).subqueryload(EquipmentUnit.reservations).joinedload(Reservation.user)
-    ).filter(EquipmentType.id == type_id).first()
-
-    if not db_type:
+    # O JSON já serializado vem do cache por tipo (ver app/type_details.py), que
+    # inclui a reserva ativa e o status atual de cada unidade
+    content = type_detail_json(db, type_id)
+    if content is None:
         raise HTTPException(status_code=404, detail="Tipo de equipamento não encontrado.")
-
-    # Adiciona a informação da reserva ativa a cada unidade para exibição no frontend
-    for unit in db_type.units:
-        unit.active_reservation = next((r for r in unit.reservations if r.status in ['approved', 'pending']), None)
-
-    return db_type
+    return Response(content=content, media_type="application/json")
 
 @router.put("/types/{type_id}", response_model=EquipmentTypeOut)
 def update_equipment_type(
@@ -192,7 +242,11 @@ def update_equipment_type(
     
     db.commit()
     db.refresh(db_type)
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' atualizou o tipo de equipamento '{db_type.name}' (ID: {db_type.id}).")
+    invalidate_type_detail_cache(db_type.id)
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' atualizou o tipo de equipamento '{db_type.name}' (ID: {db_type.id}).",
+        action="equipment_type.updated", entity_type="equipment_type", entity_id=db_type.id, payload={"fields": sorted(update_data)}
+    )
     return db_type
 
 @router.delete("/types/{type_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -220,9 +274,15 @@ def delete_equipment_type(type_id: int, db: Session = Depends(get_db), manager_u
         )
 
     type_name = db_type.name
+    # As reservas das unidades do tipo são removidas em cascata: desconta-as dos agregados
+    record_reservations_deleted(db, EquipmentUnit.type_id == type_id)
     db.delete(db_type)
     db.commit()
-    create_log(db, manager_user.id, "WARNING", f"Gerente '{manager_user.username}' deletou o tipo de equipamento '{type_name}' (ID: {type_id}).")
+    invalidate_type_detail_cache(type_id)
+    create_log(
+        db, manager_user.id, "WARNING", f"Gerente '{manager_user.username}' deletou o tipo de equipamento '{type_name}' (ID: {type_id}).",
+        action="equipment_type.deleted", entity_type="equipment_type", entity_id=type_id, payload={"name": type_name}
+    )
     return
 
 # --- Rotas para UNIDADES de Equipamento ---
@@ -245,6 +305,7 @@ def create_equipment_unit(
 
     if unit_data.quantity > 1:
          raise HTTPException(status_code=400, detail="Não é possível criar múltiplas unidades com número de série. Adicione uma de cada vez.")
+    _validate_unit_status(unit_data.status)
 
     created_units = []
     for _ in range(unit_data.quantity):
@@ -258,20 +319,127 @@ def create_equipment_unit(
         created_units.append(new_unit)
 
     db.commit()
+    invalidate_type_detail_cache(db_type.id)
     log_message = f"Gerente '{manager_user.email}' criou {unit_data.quantity} unidade(s) para o tipo '{db_type.name}'."
-    create_log(db, manager_user.id, "INFO", log_message)
+    create_log(
+        db, manager_user.id, "INFO", log_message,
+        action="unit.created", entity_type="equipment_type", entity_id=db_type.id, payload={"unit_ids": [unit.id for unit in created_units]}
+    )
     
     for unit in created_units: db.refresh(unit)
     return created_units
 
-@router.get("/units/{unit_id}/history", response_model=List[UnitHistoryOut])
-def get_unit_history(unit_id: int, db: Session = Depends(get_db), manager_user: User = Depends(get_current_manager_user)):
-    """(Gerente) Retorna o histórico de eventos de uma unidade específica."""
+@router.post("/units/import", response_model=UnitImportResult)
+def import_equipment_units(
+    file: UploadFile = File(...),
+    type_id: Optional[int] = Query(None, description="Tipo aplicado às linhas que não informam 'type_id'."),
+    db: Session = Depends(get_db),
+    manager_user: User = Depends(get_current_manager_user)
+):
+    """
+    (Gerente) Importa unidades em lote a partir de um arquivo CSV ou JSON.
+
+    Cada registro deve conter 'identifier_code' e 'serial_number', e opcionalmente
+    'type_id' e 'status'. A unicidade é validada em uma única passada, tanto dentro
+    do arquivo quanto contra o banco. As linhas válidas são inseridas em lote junto
+    com seus eventos de histórico, e as inválidas são devolvidas no relatório de erros.
+    """
+    rows, errors = [], []
+    seen_codes, seen_serials = {}, {}
+
+    # 1. Normaliza as linhas e detecta duplicidades dentro do próprio arquivo
+    for row_number, raw in enumerate(_read_import_rows(file), start=1):
+        if not isinstance(raw, dict):
+            errors.append(UnitImportRowError(row=row_number, detail="Registro em formato inválido."))
+            continue
+
+        code = str(raw.get("identifier_code") or "").strip()
+        serial = str(raw.get("serial_number") or "").strip()
+        unit_status = str(raw.get("status") or "available").strip().lower()
+        row_type_id = raw.get("type_id") or type_id
+
+        error = None
+        if not code or not serial:
+            error = "Os campos 'identifier_code' e 'serial_number' são obrigatórios."
+        elif unit_status not in IMPORT_ALLOWED_STATUSES:
+            error = f"Status '{unit_status}' inválido. Use: {', '.join(IMPORT_ALLOWED_STATUSES)}."
+        elif not str(row_type_id or "").strip().isdigit():
+            error = "O tipo de equipamento ('type_id') não foi informado ou é inválido."
+        elif code in seen_codes:
+            error = f"Código de identificação duplicado no arquivo (linha {seen_codes[code]})."
+        elif serial in seen_serials:
+            error = f"Número de série duplicado no arquivo (linha {seen_serials[serial]})."
+
+        if error:
+            errors.append(UnitImportRowError(row=row_number, identifier_code=code or None, detail=error))
+            continue
+
+        seen_codes[code] = row_number
+        seen_serials[serial] = row_number
+        rows.append({"row": row_number, "type_id": int(row_type_id), "identifier_code": code, "serial_number": serial, "status": unit_status})
+
+    total_rows = len(rows) + len(errors)
+
+    # 2. Valida tipos e unicidade contra o banco de dados de uma só vez
+    existing_types = _find_existing_values(db, EquipmentType.id, {r["type_id"] for r in rows})
+    existing_codes = _find_existing_values(db, EquipmentUnit.identifier_code, seen_codes.keys())
+    existing_serials = _find_existing_values(db, EquipmentUnit.serial_number, seen_serials.keys())
+
+    valid_rows = []
+    for r in rows:
+        if r["type_id"] not in existing_types:
+            error = f"O tipo de equipamento ID {r['type_id']} não existe."
+        elif r["identifier_code"] in existing_codes:
+            error = f"O código de identificação '{r['identifier_code']}' já está em uso."
+        elif r["serial_number"] in existing_serials:
+            error = f"O número de série '{r['serial_number']}' já está em uso."
+        else:
+            valid_rows.append(r)
+            continue
+        errors.append(UnitImportRowError(row=r["row"], identifier_code=r["identifier_code"], detail=error))
+
+    # 3. Insere as unidades e os eventos de histórico em lote
+    if valid_rows:
+        created_units = db.execute(
+            insert(EquipmentUnit).returning(EquipmentUnit.id, EquipmentUnit.status, sort_by_parameter_order=True),
+            [{k: r[k] for k in ("type_id", "identifier_code", "serial_number", "status")} for r in valid_rows]
+        ).all()
+        db.execute(
+            insert(UnitHistory),
+            [
+                {"unit_id": unit_id, "event_type": "created", "notes": f"Unidade criada com status '{unit_status}' (importação em lote).", "user_id": manager_user.id}
+                for unit_id, unit_status in created_units
+            ]
+        )
+        db.commit()
+        invalidate_type_detail_cache(*{row["type_id"] for row in valid_rows})
+        create_log(
+            db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' importou {len(valid_rows)} unidade(s) em lote ({len(errors)} linha(s) rejeitada(s)).",
+            action="unit.imported", entity_type="equipment_type", payload={"created": len(valid_rows), "rejected": len(errors)}
+        )
+
+    errors.sort(key=lambda e: e.row)
+    return UnitImportResult(total_rows=total_rows, created=len(valid_rows), errors=errors)
+
+@router.get("/units/{unit_id}/history", response_model=UnitHistoryPage)
+def get_unit_history(
+    unit_id: int,
+    cursor: Optional[str] = Query(None, description="Cursor da página seguinte (`next_cursor` da página anterior)."),
+    size: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    manager_user: User = Depends(get_current_manager_user)
+):
+    """
+    (Gerente) Retorna o histórico de eventos de uma unidade específica, do mais
+    recente para o mais antigo, paginado por cursor.
+    """
     if not db.query(EquipmentUnit).filter(EquipmentUnit.id == unit_id).first():
         raise HTTPException(status_code=404, detail="Unidade de equipamento não encontrada.")
 
-    history = db.query(UnitHistory).options(joinedload(UnitHistory.user)).filter(UnitHistory.unit_id == unit_id).order_by(UnitHistory.created_at.desc()).all()
-    return history
+    try:
+        return history_page(db, unit_id, size, cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginação inválido.")
 
 @router.put("/units/{unit_id}", response_model=EquipmentUnitOut)
 def update_equipment_unit(
@@ -284,6 +452,8 @@ def update_equipment_unit(
         raise HTTPException(status_code=404, detail="Unidade de equipamento não encontrada.")
 
     update_data = unit_update.dict(exclude_unset=True)
+    if 'status' in update_data:
+        _validate_unit_status(update_data['status'])
 
     # Validações de unicidade para os campos que estão sendo alterados
     if 'identifier_code' in update_data and update_data['identifier_code'] != db_unit.identifier_code:
@@ -293,12 +463,30 @@ def update_equipment_unit(
         if db.query(EquipmentUnit).filter(EquipmentUnit.serial_number == update_data['serial_number']).first():
             raise HTTPException(status_code=409, detail=f"O número de série '{update_data['serial_number']}' já está em uso.")
 
+    old_type_id = db_unit.type_id
+    old_status = db_unit.status
+    if update_data.get('type_id') is not None and update_data['type_id'] != old_type_id:
+        # Move as reservas da unidade para os agregados do novo tipo
+        record_unit_type_change(db, db_unit.id, update_data['type_id'])
     for key, value in update_data.items():
         setattr(db_unit, key, value)
-    
+
+    # A troca manual do status abre ou fecha o chamado de manutenção da unidade
+    if db_unit.status != old_status:
+        open_maintenance = find_open_ticket(db, db_unit.id, for_update=True)
+        if db_unit.status == 'maintenance' and not open_maintenance:
+            open_ticket(db, db_unit, opened_by_id=manager_user.id, description="Unidade enviada para manutenção manualmente.")
+            db.add(UnitHistory(unit_id=db_unit.id, event_type='sent_to_maintenance', notes="Unidade enviada para manutenção manualmente.", user_id=manager_user.id))
+        elif db_unit.status == 'available' and open_maintenance:
+            close_ticket(db, open_maintenance, closed_by_id=manager_user.id, resolution_notes="Unidade liberada manualmente.")
+
     db.commit()
     db.refresh(db_unit)
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' atualizou a unidade ID {db_unit.id}.")
+    invalidate_type_detail_cache(old_type_id, db_unit.type_id)
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' atualizou a unidade ID {db_unit.id}.",
+        action="unit.updated", entity_type="unit", entity_id=db_unit.id, payload={"fields": sorted(update_data)}
+    )
     return db_unit
 
 @router.delete("/units/{unit_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -313,22 +501,37 @@ def delete_equipment_unit(unit_id: int, db: Session = Depends(get_db), manager_u
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Não é possível deletar a unidade. Ela está associada a uma reserva ativa.")
     
     unit_identifier = db_unit.identifier_code or db_unit.id
+    unit_type_id = db_unit.type_id
+    # As reservas da unidade são removidas em cascata: desconta-as dos agregados
+    record_reservations_deleted(db, Reservation.unit_id == unit_id)
     db.delete(db_unit)
     db.commit()
-    create_log(db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' deletou a unidade '{unit_identifier}' (ID: {unit_id}).")
+    invalidate_type_detail_cache(unit_type_id)
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.email}' deletou a unidade '{unit_identifier}' (ID: {unit_id}).",
+        action="unit.deleted", entity_type="unit", entity_id=unit_id, payload={"identifier_code": unit_identifier}
+    )
     return
 
 # --- Rota de Estatísticas ---
 @router.get("/stats/popular", response_model=List[EquipmentTypeOut])
-def get_popular_equipment_types(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """(Usuários Autenticados) Retorna os 5 tipos de equipamentos mais reservados."""
-    popular_types = (
-        db.query(EquipmentType)
-        .join(EquipmentUnit)
-        .join(Reservation)
-        .group_by(EquipmentType.id)
-        .order_by(func.count(Reservation.id).desc())
-        .limit(5)
-        .all()
-    )
-    return popular_types
\ No newline at end of file
+def get_popular_equipment_types(
+    window: str = Query("all", description="Janela de popularidade: 7d, 30d, 90d ou all (todo o histórico)."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    (Usuários Autenticados) Retorna os 5 tipos de equipamentos mais reservados na
+    janela informada, lidos do ranking mantido em memória (ver app/popularity.py).
+    """
+    if window not in POPULARITY_WINDOWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Janela inválida. Use uma de: {', '.join(POPULARITY_WINDOWS)}."
+        )
+    ranked_ids = [type_id for type_id, _ in popularity_index.top(db, window)]
+    if not ranked_ids:
+        return []
+    # Tipos removidos desde a última carga do índice ficam de fora
+    types_by_id = {t.id: t for t in db.query(EquipmentType).filter(EquipmentType.id.in_(ranked_ids))}
+    return [types_by_id[type_id] for type_id in ranked_ids if type_id in types_by_id][:POPULAR_TYPES_LIMIT]
\ No newline at end of file
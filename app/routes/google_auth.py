@@ -26,6 +26,7 @@ from app.database import get_db
 from app.security import get_token, get_current_user
 from app.models.user import User
 from app.models.google_token import GoogleOAuthToken
+from app.schemas.common import MessageOut
 from app.config import settings
 from app.logging_utils import create_log
 
@@ -119,13 +120,16 @@ def google_callback(
     
     db.commit()
     
-    create_log(db, current_user.id, "INFO", f"Usuário '{current_user.username}' conectou sua conta Google com sucesso.")
+    create_log(
+        db, current_user.id, "INFO", f"Usuário '{current_user.username}' conectou sua conta Google com sucesso.",
+        action="user.google_connected", entity_type="user", entity_id=current_user.id
+    )
 
     # Renderiza uma página de sucesso para o usuário
     message = "A sua conta Google foi conectada com sucesso! Pode fechar esta aba."
     return templates.TemplateResponse("google_callback_success.html", {"request": request, "message": message})
 
-@router.delete("/disconnect", status_code=status.HTTP_200_OK)
+@router.delete("/disconnect", response_model=MessageOut, status_code=status.HTTP_200_OK)
 def google_disconnect(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -141,6 +145,9 @@ def google_disconnect(
     db.delete(db_token)
     db.commit()
     
-    create_log(db, current_user.id, "WARNING", f"Usuário '{current_user.username}' desconectou sua conta Google.")
+    create_log(
+        db, current_user.id, "WARNING", f"Usuário '{current_user.username}' desconectou sua conta Google.",
+        action="user.google_disconnected", entity_type="user", entity_id=current_user.id
+    )
     
     return {"message": "Sua conta Google foi desconectada com sucesso."}
\ No newline at end of file
@@ -0,0 +1,197 @@
+# app/routes/maintenance.py
+
+"""
+Módulo de Rotas para os Chamados de Manutenção
+
+Este arquivo define os endpoints da manutenção das unidades: a fila de
+chamados em aberto (por prioridade ou por idade), a abertura, a atualização e
+o fechamento de chamados, e as métricas de vazão e de tempo de reparo.
+
+Dependências:
+- FastAPI: Para a criação do roteador e gerenciamento das requisições.
+- SQLAlchemy: Para a interação com o banco de dados.
+- Módulos de modelos e schemas: Para a estrutura de dados e validação.
+- Módulos de utilitários: security (para proteger as rotas), logging_utils e maintenance.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+
+from app.database import get_db
+from app.models.user import User
+from app.models.equipment_unit import EquipmentUnit
+from app.models.unit_history import UnitHistory
+from app.models.maintenance_ticket import MaintenanceTicket, PRIORITY_LEVELS
+from app.schemas.maintenance import (
+    MaintenanceTicketCreate, MaintenanceTicketUpdate, MaintenanceTicketClose,
+    MaintenanceTicketOut, MaintenanceStatsOut
+)
+from app.schemas.pagination import Page
+from app.serialization import page_response
+from app.security import get_current_manager_user
+from app.logging_utils import create_log
+from app.rollups import local_day
+from app.type_details import invalidate_type_detail_cache
+from app.maintenance import (
+    QUEUE_ORDERS, find_open_ticket, open_ticket, close_ticket, tickets_query, open_queue, maintenance_stats
+)
+
+# Cria um roteador FastAPI para agrupar os endpoints de manutenção
+router = APIRouter(
+    prefix="/maintenance",
+    tags=["Maintenance"]
+)
+
+def _get_ticket(db: Session, ticket_id: int) -> MaintenanceTicket:
+    """Busca um chamado com a unidade e o técnico responsável, ou retorna 404."""
+    ticket = tickets_query(db).filter(MaintenanceTicket.id == ticket_id).first()
+    if not ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chamado de manutenção não encontrado.")
+    return ticket
+
+def _lock_open_ticket(db: Session, ticket_id: int) -> MaintenanceTicket:
+    """
+    Bloqueia (SELECT ... FOR UPDATE) um chamado em aberto até o fim da transação,
+    para que duas requisições simultâneas não o alterem ou fechem duas vezes.
+    Retorna 404 se o chamado não existir e 409 se já tiver sido fechado.
+    """
+    ticket = db.query(MaintenanceTicket).filter(MaintenanceTicket.id == ticket_id).with_for_update().first()
+    if not ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chamado de manutenção não encontrado.")
+    if ticket.closed_at is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Este chamado já foi fechado.")
+    return ticket
+
+def _validate_assignee(db: Session, assignee_id: Optional[int]):
+    """Garante que o técnico responsável informado exista."""
+    if assignee_id is not None and not db.query(User.id).filter(User.id == assignee_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário responsável não encontrado.")
+
+@router.get("/tickets", response_model=Page[MaintenanceTicketOut])
+def list_maintenance_tickets(
+    db: Session = Depends(get_db), manager_user: User = Depends(get_current_manager_user),
+    ticket_status: str = Query("open", alias="status", description="'open' (em aberto, incluindo em reparo), 'closed' ou 'all'."),
+    order: str = Query("priority", description="Ordem dos chamados em aberto: 'priority' (fila de atendimento) ou 'age'."),
+    unit_id: Optional[int] = Query(None), assignee_id: Optional[int] = Query(None),
+    page: int = Query(1, ge=1), size: int = Query(20, ge=1, le=100)
+):
+    """
+    (Gerente) Lista os chamados de manutenção. Os chamados em aberto formam a fila
+    de atendimento: por prioridade e, dentro dela, dos mais antigos para os mais
+    recentes (ou apenas por idade, com `order=age`). Os fechados vêm dos mais
+    recentemente fechados para os mais antigos.
+    """
+    if ticket_status not in ("open", "closed", "all"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Status inválido. Use: open, closed ou all.")
+    if order not in QUEUE_ORDERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Ordenação inválida. Use: {', '.join(QUEUE_ORDERS)}.")
+
+    if ticket_status == "open":
+        query = open_queue(db, order)
+    elif ticket_status == "closed":
+        query = tickets_query(db).filter(MaintenanceTicket.closed_at.is_not(None)).order_by(MaintenanceTicket.closed_at.desc(), MaintenanceTicket.id.desc())
+    else:
+        query = tickets_query(db).order_by(MaintenanceTicket.opened_at.desc(), MaintenanceTicket.id.desc())
+
+    if unit_id:
+        query = query.filter(MaintenanceTicket.unit_id == unit_id)
+    if assignee_id:
+        query = query.filter(MaintenanceTicket.assignee_id == assignee_id)
+
+    total = query.count()
+    tickets = query.offset((page - 1) * size).limit(size).all()
+    return page_response(MaintenanceTicketOut, tickets, total, page, size)
+
+@router.post("/tickets", response_model=MaintenanceTicketOut, status_code=status.HTTP_201_CREATED)
+def create_maintenance_ticket(
+    ticket_in: MaintenanceTicketCreate, db: Session = Depends(get_db),
+    manager_user: User = Depends(get_current_manager_user)
+):
+    """(Gerente) Abre um chamado de manutenção, enviando a unidade para manutenção."""
+    unit = db.query(EquipmentUnit).filter(EquipmentUnit.id == ticket_in.unit_id).with_for_update().first()
+    if not unit:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unidade de equipamento não encontrada.")
+    if find_open_ticket(db, unit.id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Esta unidade já possui um chamado de manutenção em aberto.")
+    _validate_assignee(db, ticket_in.assignee_id)
+
+    ticket = open_ticket(
+        db, unit, opened_by_id=manager_user.id, priority=PRIORITY_LEVELS.index(ticket_in.priority.value),
+        description=ticket_in.description, assignee_id=ticket_in.assignee_id
+    )
+    db.add(UnitHistory(unit_id=unit.id, event_type='sent_to_maintenance', notes=ticket_in.description or "Chamado de manutenção aberto.", user_id=manager_user.id))
+    db.commit()
+    invalidate_type_detail_cache(unit.type_id)
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' abriu o chamado de manutenção ID {ticket.id} para a unidade '{unit.identifier_code}'.",
+        action="maintenance.opened", entity_type="maintenance_ticket", entity_id=ticket.id,
+        payload={"unit_id": unit.id, "priority": ticket_in.priority.value}
+    )
+    return _get_ticket(db, ticket.id)
+
+@router.get("/tickets/{ticket_id}", response_model=MaintenanceTicketOut)
+def get_maintenance_ticket(ticket_id: int, db: Session = Depends(get_db), manager_user: User = Depends(get_current_manager_user)):
+    """(Gerente) Retorna um chamado de manutenção."""
+    return _get_ticket(db, ticket_id)
+
+@router.patch("/tickets/{ticket_id}", response_model=MaintenanceTicketOut)
+def update_maintenance_ticket(
+    ticket_id: int, ticket_update: MaintenanceTicketUpdate, db: Session = Depends(get_db),
+    manager_user: User = Depends(get_current_manager_user)
+):
+    """(Gerente) Atualiza a prioridade, a descrição, o responsável ou o andamento de um chamado em aberto."""
+    ticket = _lock_open_ticket(db, ticket_id)
+
+    update_data = ticket_update.dict(exclude_unset=True)
+    if 'assignee_id' in update_data:
+        _validate_assignee(db, update_data['assignee_id'])
+        ticket.assignee_id = update_data['assignee_id']
+    if update_data.get('priority') is not None:
+        ticket.priority = PRIORITY_LEVELS.index(update_data['priority'].value)
+    if 'description' in update_data:
+        ticket.description = update_data['description']
+    if update_data.get('in_progress') is not None:
+        ticket.status = 'in_progress' if update_data['in_progress'] else 'open'
+
+    db.commit()
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' atualizou o chamado de manutenção ID {ticket.id}.",
+        action="maintenance.updated", entity_type="maintenance_ticket", entity_id=ticket.id,
+        payload={key: (value.value if hasattr(value, "value") else value) for key, value in update_data.items()}
+    )
+    return _get_ticket(db, ticket.id)
+
+@router.post("/tickets/{ticket_id}/close", response_model=MaintenanceTicketOut)
+def close_maintenance_ticket(
+    ticket_id: int, ticket_close: MaintenanceTicketClose, db: Session = Depends(get_db),
+    manager_user: User = Depends(get_current_manager_user)
+):
+    """(Gerente) Fecha um chamado de manutenção, devolvendo a unidade para 'available'."""
+    ticket = _lock_open_ticket(db, ticket_id)
+
+    close_ticket(db, ticket, closed_by_id=manager_user.id, resolution_notes=ticket_close.resolution_notes)
+    db.commit()
+    invalidate_type_detail_cache(ticket.unit.type_id)
+    create_log(
+        db, manager_user.id, "INFO", f"Gerente '{manager_user.username}' fechou o chamado de manutenção ID {ticket.id} e liberou a unidade '{ticket.unit.identifier_code}'.",
+        action="maintenance.closed", entity_type="maintenance_ticket", entity_id=ticket.id, payload={"unit_id": ticket.unit_id}
+    )
+    return _get_ticket(db, ticket.id)
+
+@router.get("/stats", response_model=MaintenanceStatsOut)
+def get_maintenance_stats(
+    db: Session = Depends(get_db), manager_user: User = Depends(get_current_manager_user),
+    start_date: Optional[date] = Query(None, description="Primeiro dia de fechamento considerado (padrão: 30 dias atrás)."),
+    end_date: Optional[date] = Query(None, description="Último dia de fechamento considerado (padrão: hoje).")
+):
+    """
+    (Gerente) Retorna a fila atual de manutenção e, no período, a quantidade de
+    chamados fechados e o tempo médio de reparo, no total e por tipo de equipamento.
+    """
+    end_date = end_date or local_day(datetime.now(timezone.utc))
+    start_date = start_date or end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data inicial deve ser anterior à data final.")
+    return maintenance_stats(db, start_date, end_date)
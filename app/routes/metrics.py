@@ -0,0 +1,31 @@
+# app/routes/metrics.py
+
+"""
+Módulo de Rotas de Métricas
+
+Este arquivo define o endpoint que expõe as métricas de desempenho da API
+no formato texto do Prometheus, para coleta periódica (scrape).
+
+Dependências:
+- FastAPI: Para a criação do roteador e a resposta em texto puro.
+- app.metrics: Registro das métricas coletadas pelo middleware.
+"""
+
+from fastapi import APIRouter, Response
+
+from app.metrics import registry
+
+router = APIRouter(
+    tags=["Metrics"]
+)
+
+# Tipo de conteúdo do formato de exposição em texto do Prometheus.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Retorna as métricas do processo atual: latência e tamanho das respostas por
+    rota, requisições em andamento e comandos SQL executados por requisição.
+    """
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,136 @@
+# app/routes/reports.py
+
+"""
+Módulo de Rotas para os Relatórios de Reservas (CSV e PDF)
+
+Este arquivo define os endpoints que permitem ao administrador solicitar um
+relatório consolidado de reservas, acompanhar o seu andamento e baixar o
+arquivo gerado.
+
+A geração não acontece na requisição: a solicitação é gravada na fila
+(tabela 'report_jobs') e processada pelo worker de relatórios
+(app/jobs/report_worker.py), em um processo separado da API. O cliente
+consulta `GET /reports/{id}` até que o status seja 'completed' e então baixa
+o arquivo em `GET /reports/{id}/download`.
+
+Dependências:
+- FastAPI: Para a criação do roteador e o envio dos arquivos.
+- SQLAlchemy: Para a interação com o banco de dados.
+- Módulos de modelos e schemas: Para a estrutura de dados e validação.
+- Módulos de utilitários: security (para proteger as rotas), logging_utils e reports.
+"""
+
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.report_job import ReportJob
+from app.models.sector import Sector
+from app.models.equipment_type import EquipmentType
+from app.models.user import User
+from app.schemas.report import ReportJobCreate, ReportJobOut
+from app.schemas.pagination import Page
+from app.serialization import page_response
+from app.security import get_current_admin_user
+from app.logging_utils import create_log
+from app.reports import report_file_path
+
+# Cria um roteador FastAPI para agrupar os endpoints de relatórios
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"]
+)
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "pdf": "application/pdf"}
+
+def _as_utc(moment: datetime) -> datetime:
+    # Datas sem fuso são UTC (permite comparar datas com e sem fuso na mesma requisição)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+def _get_own_job(db: Session, report_id: int, admin_user: User) -> ReportJob:
+    """Busca uma solicitação de relatório do próprio administrador, ou retorna 404."""
+    job = db.query(ReportJob).filter(ReportJob.id == report_id, ReportJob.requested_by == admin_user.id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relatório não encontrado.")
+    return job
+
+@router.post("/", response_model=ReportJobOut, status_code=status.HTTP_202_ACCEPTED)
+def request_report(
+    report: ReportJobCreate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """
+    (Admin) Solicita a geração de um relatório de reservas.
+    O relatório entra na fila e é gerado em segundo plano pelo worker de relatórios.
+    """
+    if _as_utc(report.start_date) > _as_utc(report.end_date):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data inicial do relatório deve ser anterior à data final.")
+    if report.sector_id and not db.query(Sector.id).filter(Sector.id == report.sector_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Setor não encontrado.")
+    if report.type_id and not db.query(EquipmentType.id).filter(EquipmentType.id == report.type_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tipo de equipamento não encontrado.")
+
+    job = ReportJob(
+        requested_by=admin_user.id,
+        status='queued',
+        format=report.format.value,
+        start_date=report.start_date,
+        end_date=report.end_date,
+        sector_id=report.sector_id,
+        type_id=report.type_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    create_log(
+        db, admin_user.id, "INFO", f"Admin '{admin_user.username}' solicitou o relatório ID {job.id} ({job.format.upper()}).",
+        action="report.requested", entity_type="report", entity_id=job.id, payload={"format": job.format}
+    )
+    return job
+
+@router.get("/", response_model=Page[ReportJobOut])
+def list_my_reports(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100)
+):
+    """(Admin) Lista as solicitações de relatório do administrador, das mais recentes para as mais antigas."""
+    query = db.query(ReportJob).filter(ReportJob.requested_by == admin_user.id)
+    total = query.count()
+    jobs = query.order_by(ReportJob.created_at.desc(), ReportJob.id.desc()).offset((page - 1) * size).limit(size).all()
+    return page_response(ReportJobOut, jobs, total, page, size)
+
+@router.get("/{report_id}", response_model=ReportJobOut)
+def get_report(
+    report_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """(Admin) Retorna o andamento de uma solicitação de relatório."""
+    return _get_own_job(db, report_id, admin_user)
+
+@router.get("/{report_id}/download", response_class=FileResponse)
+def download_report(
+    report_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """(Admin) Baixa o arquivo de um relatório já gerado."""
+    job = _get_own_job(db, report_id, admin_user)
+    if job.status == 'expired':
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="O arquivo deste relatório expirou. Solicite um novo relatório.")
+    if job.status != 'completed':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="O relatório ainda não foi gerado.")
+
+    path = report_file_path(job)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="O arquivo deste relatório não está mais disponível.")
+
+    filename = f"relatorio_reservas_{job.start_date:%Y%m%d}_{job.end_date:%Y%m%d}_{job.id}.{job.format}"
+    return FileResponse(path, media_type=MEDIA_TYPES[job.format], filename=filename)
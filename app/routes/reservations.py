@@ -19,7 +19,6 @@ from sqlalchemy import or_, func, desc, asc, case
 from typing import List, Optional
 from datetime import datetime, timezone
 import asyncio
-import math
 
 from app.database import get_db, SessionLocal
 from app.models.reservation import Reservation
@@ -28,9 +27,15 @@ from app.models.equipment_type import EquipmentType
 from app.models.user import User
 from app.schemas.reservation import ReservationCreate, ReservationOut
 from app.schemas.pagination import Page
+from app.serialization import page_response
+from app.projection import parse_fields, projected_schema, loader_options
 from app.security import get_current_user, get_current_requester_user
 from app.email_utils import send_reservation_pending_email, send_new_reservation_to_managers_email
 from app.logging_utils import create_log
+from app.availability import find_conflicting_reservation, invalidate_availability_cache
+from app.type_details import invalidate_type_detail_cache
+from app.rollups import record_reservation_status
+from app.popularity import record_new_reservation
 
 # Cria um roteador FastAPI para agrupar os endpoints de reservas
 router = APIRouter(
@@ -72,6 +77,10 @@ async def task_send_creation_emails(reservation_id: int):
         db.close()  # Garante que a sessão do banco de dados seja fechada
 
 
+def _as_utc(moment: datetime) -> datetime:
+    # Datas sem fuso são UTC (permite comparar datas com e sem fuso na mesma requisição)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
 # --- ROTAS ---
 
 @router.post("/", response_model=ReservationOut, status_code=status.HTTP_201_CREATED)
@@ -84,24 +93,27 @@ def create_reservation(
     """
     (Requerente) Cria uma nova solicitação de reserva para uma unidade de equipamento.
     """
-    # Valida se a unidade de equipamento solicitada existe
-    unit = db.query(EquipmentUnit).options(joinedload(EquipmentUnit.equipment_type)).filter(EquipmentUnit.id == reservation.unit_id).first()
+    if _as_utc(reservation.end_time) <= _as_utc(reservation.start_time):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O horário de término deve ser posterior ao de início.")
+
+    # Valida se a unidade de equipamento solicitada existe. A linha da unidade é
+    # bloqueada (FOR UPDATE) para serializar reservas concorrentes da mesma unidade.
+    unit = (
+        db.query(EquipmentUnit)
+        .options(joinedload(EquipmentUnit.equipment_type))
+        .filter(EquipmentUnit.id == reservation.unit_id)
+        .with_for_update(of=EquipmentUnit)
+        .first()
+    )
     if not unit:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unidade de equipamento não encontrada.")
 
-    # Valida se a unidade está disponível para reserva
-    if unit.status != 'available':
+    # Unidades em manutenção não podem ser reservadas
+    if unit.status == 'maintenance':
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Esta unidade não está disponível para reserva.")
 
     # Verifica se há conflito de horário com outras reservas pendentes ou aprovadas para a mesma unidade
-    existing_reservation = db.query(Reservation).filter(
-        Reservation.unit_id == reservation.unit_id,
-        Reservation.end_time > reservation.start_time,
-        Reservation.start_time < reservation.end_time,
-        Reservation.status.in_(['pending', 'approved'])
-    ).first()
-
-    if existing_reservation:
+    if find_conflicting_reservation(db, unit.id, reservation.start_time, reservation.end_time):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Já existe uma reserva para esta unidade no período solicitado."
@@ -114,14 +126,19 @@ def create_reservation(
         status='pending'
     )
     
-    # Altera o status da unidade para 'pending' para evitar que seja reservada por outra pessoa
-    unit.status = 'pending'
-    
     db.add(new_reservation)
+    db.flush()
+    record_reservation_status(db, new_reservation, None, unit.type_id, current_user.sector_id)
     db.commit()
     db.refresh(new_reservation)
+    invalidate_availability_cache()
+    invalidate_type_detail_cache(unit.type_id)
+    record_new_reservation(unit.type_id, new_reservation.created_at)
 
-    create_log(db, current_user.id, "INFO", f"Usuário '{current_user.username}' solicitou a reserva da unidade '{unit.identifier_code}' (ID: {unit.id}).")
+    create_log(
+        db, current_user.id, "INFO", f"Usuário '{current_user.username}' solicitou a reserva da unidade '{unit.identifier_code}' (ID: {unit.id}).",
+        action="reservation.created", entity_type="reservation", entity_id=new_reservation.id, payload={"unit_id": unit.id}
+    )
 
     # Adiciona a tarefa de envio de e-mails para ser executada em segundo plano
     background_tasks.add_task(task_send_creation_emails, new_reservation.id)
@@ -139,21 +156,28 @@ def get_my_reservations(
     sort_by: Optional[str] = Query(None), # Alterado o padrão
     sort_dir: Optional[str] = Query('asc'), # Alterado o padrão
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100)
+    size: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex: id,status,equipment_unit.identifier_code).")
 ):
     """
     (Requerente) Retorna uma lista paginada de todas as reservas feitas pelo usuário autenticado, com filtros.
+    Com o parâmetro `fields`, apenas os campos e objetos aninhados pedidos são
+    consultados no banco e retornados.
     """
-    query = (
-        db.query(Reservation)
-        .join(Reservation.equipment_unit)
-        .join(EquipmentUnit.equipment_type)
-        .filter(Reservation.user_id == current_user.id)
-        .options(  # Otimiza a consulta carregando os dados relacionados de uma só vez
-            joinedload(Reservation.user),
+    field_tree = parse_fields(fields, ReservationOut)
+    if field_tree is None:
+        # Otimiza a consulta carregando os dados relacionados de uma só vez
+        load_options = [
+            joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token)),
             joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
-        )
-    )
+        ]
+    else:
+        load_options = loader_options(Reservation, field_tree)
+    query = db.query(Reservation).filter(Reservation.user_id == current_user.id).options(*load_options)
+
+    # Junta as tabelas da unidade e do tipo apenas quando a busca ou a ordenação as utilizam
+    if search or sort_by in ('equipment', 'code'):
+        query = query.join(Reservation.equipment_unit).join(EquipmentUnit.equipment_type)
 
     # Aplica filtros de busca e de status, se fornecidos
     if search:
@@ -209,13 +233,7 @@ def get_my_reservations(
     # Executa a consulta com ordenação, paginação e retorna os resultados
     reservations = query.offset((page - 1) * size).limit(size).all()
     
-    return {
-        "items": reservations,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": math.ceil(total / size)
-    }
+    return page_response(projected_schema(ReservationOut, field_tree), reservations, total, page, size)
 
 
 @router.get("/upcoming", response_model=List[ReservationOut])
@@ -236,7 +254,7 @@ def get_my_upcoming_reservations(
             Reservation.start_time > now  # Filtra apenas reservas que ainda não começaram
         )
         .options(
-            joinedload(Reservation.user),
+            joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token)),
             joinedload(Reservation.equipment_unit).joinedload(EquipmentUnit.equipment_type)
         )
         .order_by(Reservation.start_time.asc()) # Ordena pela mais próxima
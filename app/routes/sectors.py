@@ -10,7 +10,8 @@ Dependências:
 - FastAPI: Para a criação do roteador e gerenciamento das requisições.
 - SQLAlchemy: Para a interação com o banco de dados.
 - Módulos de modelos e schemas: Para a estrutura de dados e validação.
-- Módulos de utilitários: security (para proteger as rotas) e logging_utils.
+- Módulos de utilitários: security (para proteger as rotas), logging_utils e rollups
+  (agregados das reservas dos usuários que ficam sem setor).
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
@@ -25,6 +26,7 @@ from app.schemas.pagination import Page
 from app.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.logging_utils import create_log
+from app.rollups import record_sector_change
 
 # Cria um roteador FastAPI para agrupar os endpoints de setores
 router = APIRouter(
@@ -53,7 +55,10 @@ def create_sector(
     db.commit()
     db.refresh(new_sector)
     
-    create_log(db, admin_user.id, "INFO", f"Admin '{admin_user.username}' criou o setor '{new_sector.name}' (ID: {new_sector.id}).")
+    create_log(
+        db, admin_user.id, "INFO", f"Admin '{admin_user.username}' criou o setor '{new_sector.name}' (ID: {new_sector.id}).",
+        action="sector.created", entity_type="sector", entity_id=new_sector.id
+    )
 
     return new_sector
 
@@ -113,7 +118,10 @@ def update_sector(
     db.commit()
     db.refresh(db_sector)
     
-    create_log(db, admin_user.id, "INFO", f"Admin '{admin_user.username}' atualizou o setor ID {sector_id} de '{old_name}' para '{db_sector.name}'.")
+    create_log(
+        db, admin_user.id, "INFO", f"Admin '{admin_user.username}' atualizou o setor ID {sector_id} de '{old_name}' para '{db_sector.name}'.",
+        action="sector.updated", entity_type="sector", entity_id=sector_id, payload={"old_name": old_name, "new_name": db_sector.name}
+    )
 
     return db_sector
 
@@ -131,10 +139,15 @@ def delete_sector(
         raise HTTPException(status_code=404, detail="Sector not found.")
     
     sector_name_log = db_sector.name # Guarda o nome para o log
-    
+
+    # Os usuários do setor ficam sem setor: suas reservas são movidas nos agregados
+    record_sector_change(db, [user_id for (user_id,) in db.query(User.id).filter(User.sector_id == sector_id)], None)
     db.delete(db_sector)
     db.commit()
     
-    create_log(db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' deletou o setor '{sector_name_log}' (ID: {sector_id}).")
+    create_log(
+        db, admin_user.id, "WARNING", f"Admin '{admin_user.username}' deletou o setor '{sector_name_log}' (ID: {sector_id}).",
+        action="sector.deleted", entity_type="sector", entity_id=sector_id, payload={"name": sector_name_log}
+    )
 
     return
\ No newline at end of file
@@ -24,6 +24,7 @@ from app.models.user import User
 from app.schemas.user import (
     TwoFactorSetupResponse, TwoFactorEnableRequest, TwoFactorDisableRequest
 )
+from app.schemas.common import MessageOut
 from app.security import get_current_user, verify_password, verify_otp
 from app.logging_utils import create_log
 
@@ -52,7 +53,7 @@ def setup_2fa(current_user: User = Depends(get_current_user)):
     
     return {"otp_secret": otp_secret, "provisioning_uri": provisioning_uri}
 
-@router.get("/qr-code")
+@router.get("/qr-code", response_class=Response)
 def get_2fa_qr_code(provisioning_uri: str):
     """
     Gera uma imagem QR Code a partir da URI de provisionamento.
@@ -65,7 +66,7 @@ def get_2fa_qr_code(provisioning_uri: str):
     # Retorna os bytes da imagem PNG diretamente na resposta HTTP
     return Response(content=buf.getvalue(), media_type="image/png")
 
-@router.post("/enable")
+@router.post("/enable", response_model=MessageOut)
 def enable_2fa(
     request: TwoFactorEnableRequest,
     db: Session = Depends(get_db),
@@ -86,12 +87,15 @@ def enable_2fa(
     current_user.otp_enabled = True
     db.commit()
 
-    create_log(db, current_user.id, "INFO", f"Usuário '{current_user.username}' ativou a autenticação de dois fatores (2FA).")
+    create_log(
+        db, current_user.id, "INFO", f"Usuário '{current_user.username}' ativou a autenticação de dois fatores (2FA).",
+        action="user.2fa_enabled", entity_type="user", entity_id=current_user.id
+    )
 
     return {"message": "2FA ativado com sucesso."}
 
 
-@router.post("/disable")
+@router.post("/disable", response_model=MessageOut)
 def disable_2fa(
     request: TwoFactorDisableRequest,
     db: Session = Depends(get_db),
@@ -116,6 +120,9 @@ def disable_2fa(
     current_user.otp_enabled = False
     db.commit()
 
-    create_log(db, current_user.id, "WARNING", f"Usuário '{current_user.username}' desativou a autenticação de dois fatores (2FA).")
+    create_log(
+        db, current_user.id, "WARNING", f"Usuário '{current_user.username}' desativou a autenticação de dois fatores (2FA).",
+        action="user.2fa_disabled", entity_type="user", entity_id=current_user.id
+    )
 
     return {"message": "2FA desativado com sucesso."}
\ No newline at end of file
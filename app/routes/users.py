@@ -11,7 +11,7 @@ Dependências:
 - FastAPI: Para a criação do roteador e gerenciamento de dependências.
 - SQLAlchemy: Para a interação com o banco de dados.
 - Módulos de modelos e schemas: Para a estrutura de dados e validação.
-- Módulos de utilitários: security (para obter o usuário atual) e logging_utils.
+- Módulos de utilitários: security (para obter o usuário atual), logging_utils e rollups (agregados das reservas removidas com a conta ou que mudam de setor).
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -24,6 +24,7 @@ from app.models.reservation import Reservation
 from app.schemas.user import UserOut, UserUpdate
 from app.security import get_current_user
 from app.logging_utils import create_log
+from app.rollups import record_reservations_deleted, record_sector_change
 
 # Cria um roteador FastAPI para agrupar os endpoints de usuário
 router = APIRouter(
@@ -54,21 +55,24 @@ def update_user_me(
     if user_update.username:
         current_user.username = user_update.username
     
-    # Atualiza o setor do usuário
+    # Atualiza o setor do usuário (sem setor, o usuário remove sua associação a um setor)
     if user_update.sector_id is not None:
         # Verifica se o setor para o qual o usuário quer mudar existe
         sector = db.query(Sector).filter(Sector.id == user_update.sector_id).first()
         if not sector:
             raise HTTPException(status_code=404, detail="Setor não encontrado.")
-        current_user.sector_id = user_update.sector_id
-    else: # Permite que o usuário remova sua associação a um setor
-        current_user.sector_id = None
+    # Move as reservas do usuário para os agregados do novo setor
+    record_sector_change(db, [current_user.id], user_update.sector_id)
+    current_user.sector_id = user_update.sector_id
 
     # Salva as alterações no banco de dados
     db.commit()
     db.refresh(current_user)
     
-    create_log(db, current_user.id, "INFO", f"Usuário '{current_user.username}' atualizou seu próprio perfil.")
+    create_log(
+        db, current_user.id, "INFO", f"Usuário '{current_user.username}' atualizou seu próprio perfil.",
+        action="user.profile_updated", entity_type="user", entity_id=current_user.id
+    )
 
     return current_user
 
@@ -101,7 +105,10 @@ def delete_user_me(
     # --- INÍCIO DA ALTERAÇÃO ---
     # 1. Cria o log da exclusão ANTES de deletar o usuário.
     # A função create_log realiza um "commit", finalizando esta transação.
-    create_log(db, user_id_log, "WARNING", f"Usuário '{username_log}' (ID: {user_id_log}) deletou a própria conta.")
+    create_log(
+        db, user_id_log, "WARNING", f"Usuário '{username_log}' (ID: {user_id_log}) deletou a própria conta.",
+        action="user.self_deleted", entity_type="user", entity_id=user_id_log
+    )
     
     # 2. Após o commit anterior, o objeto 'current_user' fica "detached" (desanexado) da sessão.
     # É necessário buscar o usuário novamente no banco para poder deletá-lo em uma nova transação.
@@ -109,6 +116,8 @@ def delete_user_me(
 
     # 3. Deleta o usuário e confirma (commit) a operação.
     if user_to_delete:
+        # As reservas do usuário são removidas em cascata: desconta-as dos agregados
+        record_reservations_deleted(db, Reservation.user_id == user_id_log)
         db.delete(user_to_delete)
         db.commit()
     # --- FIM DA ALTERAÇÃO ---
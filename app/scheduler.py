@@ -0,0 +1,169 @@
+# app/scheduler.py
+
+"""
+Módulo do Agendador de Tarefas Periódicas
+
+Este módulo implementa um agendador simples, baseado em asyncio, que executa
+tarefas de manutenção em intervalos fixos dentro do próprio processo da API
+(ex: envio automático de lembretes de atraso).
+
+Quando a aplicação roda com vários processos ou instâncias, cada execução
+de tarefa é protegida por um advisory lock do PostgreSQL: apenas o processo
+que obtiver o lock (o "líder" naquele momento) executa a tarefa, e os demais
+simplesmente pulam aquela rodada. Em bancos sem suporte a advisory locks
+(ex: SQLite nos testes), o processo atual é sempre considerado líder.
+
+Dependências:
+- asyncio: Para o laço de execução periódica.
+- sqlalchemy: Para os advisory locks e as sessões de banco de dados.
+- app.config: Para habilitar o agendador e definir os intervalos.
+- app.jobs: Módulos com as tarefas propriamente ditas.
+"""
+
+import asyncio
+import inspect
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.database import engine, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PeriodicJob:
+    """
+    Descreve uma tarefa periódica.
+
+    Attributes:
+        name (str): Nome único da tarefa, usado nos logs e para derivar o ID do lock.
+        interval_seconds (float): Intervalo entre o fim de uma execução e o início da próxima.
+        func (Callable): Função que recebe uma sessão de banco (`db`). Pode ser síncrona
+                         ou assíncrona (executada em um event loop próprio); em
+                         ambos os casos, roda fora do event loop da API.
+        per_process (bool): Se True, a tarefa roda em todos os processos, sem disputar
+                            a liderança (ex: gravação de dados mantidos em memória).
+    """
+    name: str
+    interval_seconds: float
+    func: Callable
+    per_process: bool = False
+
+    @property
+    def lock_id(self) -> int:
+        """ID estável do advisory lock, derivado do nome da tarefa."""
+        return zlib.crc32(f"equipcontrol:{self.name}".encode())
+
+# Tarefas em execução neste processo (preenchida por `start_scheduler`).
+_running_tasks: list[asyncio.Task] = []
+
+def get_default_jobs() -> list[PeriodicJob]:
+    """Retorna a lista de tarefas periódicas registradas na aplicação."""
+    from app.jobs import overdue_reminders, reservation_sweeper, rollup_backfill, demand_forecast
+    from app import slow_query_log, reports, log_partitions, audit_journal, popularity, unit_history
+
+    jobs = [
+        PeriodicJob("overdue_reminders", settings.OVERDUE_REMINDER_INTERVAL_SECONDS, overdue_reminders.send_overdue_reminders),
+        PeriodicJob("reservation_sweeper", settings.RESERVATION_SWEEP_INTERVAL_SECONDS, reservation_sweeper.sweep_reservations),
+        PeriodicJob("rollup_refresh", settings.ROLLUP_REFRESH_INTERVAL_SECONDS, rollup_backfill.refresh_recent_rollups),
+        PeriodicJob("demand_forecast", settings.FORECAST_TRAINING_INTERVAL_SECONDS, demand_forecast.train_demand_forecasts),
+        PeriodicJob("report_retention", settings.REPORT_RETENTION_INTERVAL_SECONDS, reports.purge_expired_reports),
+        PeriodicJob("activity_log_maintenance", settings.ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS, log_partitions.maintain_activity_logs),
+        PeriodicJob("unit_history_compaction", settings.UNIT_HISTORY_COMPACTION_INTERVAL_SECONDS, unit_history.compact_unit_history),
+        # Sem lock de liderança: cada processo mantém o seu próprio ranking em memória.
+        PeriodicJob("popularity_refresh", settings.POPULARITY_REFRESH_INTERVAL_SECONDS, popularity.refresh_popularity_index, per_process=True),
+    ]
+    if settings.AUDIT_JOURNAL_ENABLED:
+        # Sem lock de liderança: o diário fica no disco local de cada servidor.
+        jobs.append(PeriodicJob("audit_journal_verify", settings.AUDIT_JOURNAL_VERIFY_INTERVAL_SECONDS, audit_journal.verify_audit_journal, per_process=True))
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        # Sem lock de liderança: cada processo grava o seu próprio buffer em memória.
+        jobs.append(PeriodicJob("slow_query_flush", settings.SLOW_QUERY_FLUSH_INTERVAL_SECONDS, slow_query_log.flush_slow_queries, per_process=True))
+    # A retenção roda mesmo com o registro desligado, para limpar os registros de quando estava ligado.
+    jobs.append(PeriodicJob("slow_query_retention", settings.SLOW_QUERY_RETENTION_INTERVAL_SECONDS, slow_query_log.purge_old_slow_queries))
+    return jobs
+
+def _try_acquire_lock(conn: Connection, lock_id: int) -> bool:
+    """Tenta obter o advisory lock da tarefa. Retorna True se este processo for o líder."""
+    if conn.dialect.name != "postgresql":
+        return True
+    return bool(conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}).scalar())
+
+def _release_lock(conn: Connection, lock_id: int):
+    """Libera o advisory lock obtido por `_try_acquire_lock`."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+
+async def run_job_once(job: PeriodicJob):
+    """
+    Executa uma rodada da tarefa, se este processo conseguir o lock de liderança
+    (ou sempre, para tarefas marcadas como `per_process`).
+
+    Toda a sequência (conexão do lock, tarefa, liberação do lock e fechamento
+    da sessão) roda em uma única thread, sem bloquear o event loop da API.
+    """
+    await asyncio.to_thread(_run_job_sync, job)
+
+def _run_job_sync(job: PeriodicJob):
+    """
+    Sequência bloqueante de uma rodada da tarefa.
+
+    O lock é mantido em uma conexão dedicada durante toda a execução, enquanto
+    a tarefa usa sua própria sessão (que pode fazer vários commits).
+    """
+    if job.per_process:
+        _run_job_func(job)
+        return
+
+    with engine.connect() as lock_conn:
+        if not _try_acquire_lock(lock_conn, job.lock_id):
+            logger.debug("Tarefa '%s' ignorada: outro processo é o líder.", job.name)
+            return
+        try:
+            _run_job_func(job)
+        finally:
+            _release_lock(lock_conn, job.lock_id)
+
+def _run_job_func(job: PeriodicJob):
+    """
+    Executa a função da tarefa com uma sessão de banco própria.
+
+    Tarefas assíncronas rodam em um event loop próprio, dentro da thread da tarefa.
+    """
+    db = SessionLocal()
+    try:
+        if inspect.iscoroutinefunction(job.func):
+            asyncio.run(job.func(db))
+        else:
+            job.func(db)
+    finally:
+        db.close()
+
+async def _run_forever(job: PeriodicJob):
+    """Laço de execução de uma tarefa. Erros são registrados e não interrompem o laço."""
+    while True:
+        await asyncio.sleep(job.interval_seconds)
+        try:
+            await run_job_once(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Falha ao executar a tarefa agendada '%s'.", job.name)
+
+def start_scheduler(jobs: list[PeriodicJob] | None = None):
+    """Inicia os laços de todas as tarefas periódicas no event loop atual."""
+    for job in jobs if jobs is not None else get_default_jobs():
+        _running_tasks.append(asyncio.create_task(_run_forever(job), name=f"job:{job.name}"))
+        logger.info("Tarefa agendada '%s' iniciada (intervalo: %ss).", job.name, job.interval_seconds)
+
+async def stop_scheduler():
+    """Cancela as tarefas em execução e aguarda o seu encerramento."""
+    for task in _running_tasks:
+        task.cancel()
+    await asyncio.gather(*_running_tasks, return_exceptions=True)
+    _running_tasks.clear()
@@ -12,9 +12,9 @@ Dependências:
 - enum: Para definir conjuntos de valores permitidos para campos específicos.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional
+from typing import Optional, List
 
 # --- Schemas para Gerenciamento de Reservas ---
 
@@ -62,4 +62,31 @@ class UserSectorUpdate(BaseModel):
 
 class UserStatusUpdate(BaseModel):
     """Schema para o corpo da requisição de ativação ou desativação de um usuário."""
-    is_active: bool
\ No newline at end of file
+    is_active: bool
+
+# --- Schemas para Atualização de Usuários em Lote ---
+
+class UserBulkChange(BaseModel):
+    """
+    Alterações a aplicar em um único usuário dentro de uma atualização em lote.
+    Apenas os campos enviados são alterados; enviar 'sector_id' como null
+    remove o usuário de seu setor.
+    """
+    user_id: int
+    role: Optional[UserRoleEnum] = None
+    sector_id: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class UserBulkUpdate(BaseModel):
+    """Schema para o corpo da requisição de atualização de usuários em lote."""
+    changes: List[UserBulkChange] = Field(min_length=1, max_length=10000)
+
+class UserBulkError(BaseModel):
+    """Descreve uma alteração rejeitada durante a atualização em lote."""
+    user_id: int
+    detail: str
+
+class UserBulkUpdateResult(BaseModel):
+    """Resumo da atualização em lote: usuários alterados e alterações rejeitadas."""
+    updated: int
+    errors: List[UserBulkError] = []
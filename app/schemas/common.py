@@ -0,0 +1,21 @@
+# app/schemas/common.py
+
+"""
+Define schemas Pydantic genéricos, compartilhados por diversos módulos de rotas.
+
+Declarar um schema de resposta em todas as rotas JSON permite que o FastAPI
+serialize o retorno diretamente em bytes JSON pelo pydantic-core, em vez de
+convertê-lo com `jsonable_encoder` e `json.dumps`.
+
+Dependências:
+- pydantic: Para a criação dos modelos de dados (schemas).
+"""
+
+from pydantic import BaseModel
+
+class MessageOut(BaseModel):
+    """
+    Schema de resposta para operações que retornam apenas uma mensagem
+    informativa (ex: logout, redefinição de senha, ativação do 2FA).
+    """
+    message: str
@@ -8,11 +8,12 @@ garantindo um formato consistente e validado para ser consumido pelo frontend.
 
 Dependências:
 - pydantic: Para a criação dos modelos de dados (schemas).
-- typing: Para a definição de listas de tipos específicos.
+- typing, datetime: Para a correta tipagem dos campos.
 """
 
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from datetime import datetime, date
 
 class StatsItem(BaseModel):
     """
@@ -22,6 +23,13 @@ class StatsItem(BaseModel):
     name: str
     count: int
 
+class HourlyStatsItem(StatsItem):
+    """
+    Schema para a utilização em uma hora do dia: a quantidade de reservas que
+    começam naquela hora e a soma das suas durações, em horas.
+    """
+    reserved_hours: float
+
 class DashboardStats(BaseModel):
     """
     Schema principal que define a estrutura completa da resposta do endpoint
@@ -39,4 +47,82 @@ class DashboardStats(BaseModel):
     
     # --- Distribuições ---
     reservation_status_counts: List[StatsItem]
-    reservations_by_day: List[StatsItem]
\ No newline at end of file
+    reservations_by_day: List[StatsItem]     # Por dia da semana (Segunda a Domingo)
+    reservations_by_week: List[StatsItem]    # Tendência por semana (nome = data da segunda-feira)
+    reservations_by_hour: List[HourlyStatsItem]  # Utilização por hora de início (00h a 23h)
+
+# --- Análise de Utilização ---
+
+class UnitUtilizationOut(BaseModel):
+    """
+    Schema de saída para a utilização de uma unidade de equipamento em uma janela.
+    """
+    unit_id: int
+    identifier_code: str
+    status: str                   # Estado operacional ('available' ou 'maintenance')
+    type_id: int
+    type_name: str
+    booked_hours: float           # Horas reservadas (união das reservas aprovadas e devolvidas)
+    utilization_pct: float        # Horas reservadas / duração da janela
+    longest_idle_hours: float     # Maior período contínuo sem reserva
+    idle_hours_at_end: float      # Tempo sem reserva desde a última reserva até o fim da janela
+
+class TypeUtilizationOut(BaseModel):
+    """
+    Schema de saída para a utilização de um tipo de equipamento em uma janela.
+    """
+    type_id: int
+    type_name: str
+    total_units: int
+    booked_hours: float
+    utilization_pct: float        # Horas reservadas / (unidades × duração da janela)
+    idle_units: int               # Unidades sem nenhuma reserva na janela
+    saturated_units: int          # Unidades com utilização acima do limite de saturação
+    peak_concurrency: int         # Maior quantidade de reservas simultâneas
+    peak_at: Optional[datetime]   # Primeiro instante em que o pico ocorreu
+
+class UtilizationReport(BaseModel):
+    """
+    Schema principal da análise de utilização por tipo de equipamento.
+    """
+    start: datetime
+    end: datetime
+    window_hours: float
+    types: List[TypeUtilizationOut]
+
+
+# --- Previsão de Demanda ---
+
+class WeeklyForecastOut(BaseModel):
+    """
+    Schema de saída para a demanda prevista de um tipo de equipamento em uma semana.
+    """
+    week_start: date                # Segunda-feira da semana
+    predicted_peak: float           # Pico previsto de reservas simultâneas
+    predicted_reservations: float   # Reservas previstas que começam na semana
+
+    class Config:
+        """
+        Configuração do Pydantic que permite mapear automaticamente os atributos
+        de um objeto ORM (SQLAlchemy) para os campos deste schema.
+        """
+        from_attributes = True
+
+class TypeForecastOut(BaseModel):
+    """
+    Schema de saída para a previsão de demanda de um tipo de equipamento.
+    """
+    type_id: int
+    type_name: str
+    total_units: int                # Unidades do tipo existentes hoje
+    model: str                      # Modelo usado ('holt_winters', 'holt' ou 'naive')
+    peak_demand: float              # Maior pico previsto no horizonte
+    shortfall_units: int            # Unidades que faltariam para atender ao pico previsto
+    weeks: List[WeeklyForecastOut]
+
+class ForecastReport(BaseModel):
+    """
+    Schema principal da previsão de demanda, gerada pela tarefa agendada de treinamento.
+    """
+    generated_at: Optional[datetime]  # None se a previsão ainda não foi gerada
+    types: List[TypeForecastOut]
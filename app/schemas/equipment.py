@@ -12,7 +12,7 @@ Dependências:
 - app.schemas.user: Para aninhar informações do usuário em respostas relacionadas.
 """
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, AliasChoices
 from typing import Optional, List
 from .user import UserOut
 from datetime import datetime
@@ -91,6 +91,9 @@ class EquipmentUnitOut(EquipmentUnitBase):
     """
     id: int
     type_id: int
+    # Status exibido: usa o status atual calculado pelas reservas ('current_status'),
+    # quando a rota o preenche, ou o estado operacional gravado na unidade.
+    status: str = Field('available', validation_alias=AliasChoices('current_status', 'status'))
     equipment_type: EquipmentTypeOut  # Aninha os dados do tipo de equipamento.
     active_reservation: Optional[ReservationBasicOut] = None # Campo para a reserva ativa.
     
@@ -103,4 +106,21 @@ class EquipmentTypeWithUnitsOut(EquipmentTypeOut):
     Schema de saída que retorna um tipo de equipamento junto com uma lista
     completa de todas as suas unidades associadas.
     """
-    units: List[EquipmentUnitOut] = []
\ No newline at end of file
+    units: List[EquipmentUnitOut] = []
+
+# --- Schemas para a Importação em Lote de Unidades ---
+
+class UnitImportRowError(BaseModel):
+    """Descreve o erro encontrado em uma linha específica do arquivo de importação."""
+    row: int                                # Número da linha no arquivo (1 = primeiro registro de dados)
+    identifier_code: Optional[str] = None   # Código informado na linha, para facilitar a correção
+    detail: str                             # Motivo pelo qual a linha foi rejeitada
+
+class UnitImportResult(BaseModel):
+    """
+    Schema de saída do endpoint de importação em lote. Resume quantas
+    linhas foram lidas, quantas unidades foram criadas e o relatório de erros.
+    """
+    total_rows: int
+    created: int
+    errors: List[UnitImportRowError] = []
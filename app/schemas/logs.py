@@ -4,7 +4,9 @@
 Define o schema Pydantic para a serialização dos dados de Log de Atividade.
 
 Este módulo contém o schema de saída (output) para os registros de log
-da aplicação, garantindo uma estrutura consistente para as respostas da API.
+da aplicação, garantindo uma estrutura consistente para as respostas da API,
+o schema do resumo de consultas lentas (slow query log) e o do resultado da
+verificação do diário de auditoria.
 
 Dependências:
 - pydantic: Para a criação do modelo de dados (schema).
@@ -13,7 +15,7 @@ Dependências:
 
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 class ActivityLogOut(BaseModel):
     """
@@ -24,10 +26,41 @@ class ActivityLogOut(BaseModel):
     level: str              # Nível do log (ex: INFO, WARNING, ERROR)
     message: str            # Mensagem descritiva do log
     created_at: datetime    # Data e hora em que o log foi criado
+    action: Optional[str] = None                # Código da ação (ex: 'reservation.status_changed')
+    entity_type: Optional[str] = None           # Tipo da entidade afetada (ex: 'reservation')
+    entity_id: Optional[int] = None             # ID da entidade afetada
+    payload: Optional[dict[str, Any]] = None    # Detalhes estruturados do evento
 
     class Config:
         """
         Configuração do Pydantic que permite mapear automaticamente os atributos
         de um objeto ORM (SQLAlchemy) para os campos deste schema.
         """
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SlowQueryStatsOut(BaseModel):
+    """
+    Schema de saída para uma consulta lenta, agrupada pela sua impressão digital.
+    """
+    fingerprint: str        # Hash do comando SQL normalizado
+    statement: str          # Exemplo do comando SQL
+    route: Optional[str]    # Rota da API que executou o comando (ex: 'GET /admin/logs')
+    executions: int         # Quantidade de execuções lentas registradas
+    total_ms: float         # Tempo total somado das execuções, em milissegundos
+    avg_ms: float           # Tempo médio por execução
+    max_ms: float           # Maior tempo registrado
+    last_seen: datetime     # Data e hora da execução lenta mais recente
+
+class JournalVerificationOut(BaseModel):
+    """
+    Schema de saída da verificação da cadeia de hashes do diário de auditoria.
+    """
+    ok: bool                        # Se a cadeia está íntegra
+    segments: int                   # Quantidade de segmentos verificados
+    records: int                    # Quantidade de registros válidos antes da falha (ou no total)
+    error: Optional[str] = None     # Descrição da falha encontrada
+    segment: Optional[str] = None   # Segmento em que a falha foi encontrada
+    offset: Optional[int] = None    # Posição (em bytes) da falha no segmento
+
+    class Config:
+        from_attributes = True
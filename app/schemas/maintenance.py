@@ -0,0 +1,102 @@
+# app/schemas/maintenance.py
+
+"""
+Define os schemas Pydantic para os chamados de manutenção das unidades e as
+métricas da manutenção.
+
+Dependências:
+- pydantic: Para a criação dos modelos de dados (schemas).
+- app.schemas.user.UserOut: Para aninhar os dados do técnico responsável.
+"""
+
+from pydantic import BaseModel, ConfigDict
+from enum import Enum
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .user import UserOut
+
+class MaintenancePriorityEnum(str, Enum):
+    """
+    Enumeração para as prioridades dos chamados, da mais urgente para a menos urgente.
+    """
+    urgent = "urgent"
+    high = "high"
+    normal = "normal"
+    low = "low"
+
+class MaintenanceTicketCreate(BaseModel):
+    """
+    Schema para a abertura de um chamado, que envia a unidade para manutenção.
+    """
+    unit_id: int
+    priority: MaintenancePriorityEnum = MaintenancePriorityEnum.normal
+    description: Optional[str] = None
+    assignee_id: Optional[int] = None   # Técnico responsável (opcional)
+
+class MaintenanceTicketUpdate(BaseModel):
+    """
+    Schema para atualizar um chamado em aberto. Todos os campos são opcionais.
+    """
+    priority: Optional[MaintenancePriorityEnum] = None
+    description: Optional[str] = None
+    assignee_id: Optional[int] = None
+    in_progress: Optional[bool] = None  # Marca (ou desmarca) o reparo como iniciado
+
+class MaintenanceTicketClose(BaseModel):
+    """
+    Schema para o fechamento de um chamado, que devolve a unidade para 'available'.
+    """
+    resolution_notes: Optional[str] = None
+
+class MaintenanceUnitOut(BaseModel):
+    """Dados resumidos da unidade de um chamado."""
+    id: int
+    identifier_code: str
+    type_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class MaintenanceTicketOut(BaseModel):
+    """
+    Schema de saída para um chamado de manutenção.
+    """
+    id: int
+    unit_id: int
+    reservation_id: Optional[int] = None
+    status: str                         # 'open', 'in_progress' ou 'closed'
+    priority: int                       # 0 (urgente) a 3 (baixa)
+    priority_label: str                 # 'urgent', 'high', 'normal' ou 'low'
+    description: Optional[str] = None
+    resolution_notes: Optional[str] = None
+    opened_by_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+    closed_by_id: Optional[int] = None
+    opened_at: datetime
+    closed_at: Optional[datetime] = None
+
+    unit: MaintenanceUnitOut
+    assignee: Optional[UserOut] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class MaintenanceTypeStatsOut(BaseModel):
+    """Chamados fechados e tempo médio de reparo de um tipo de equipamento no período."""
+    type_id: int
+    type_name: Optional[str] = None
+    tickets_closed: int
+    avg_repair_hours: float
+
+class MaintenanceStatsOut(BaseModel):
+    """
+    Schema de saída das métricas da manutenção: a fila atual e a vazão do período.
+    """
+    # --- Fila atual ---
+    open_tickets: int
+    open_by_priority: Dict[str, int]        # Chamados em aberto por prioridade
+    oldest_open_at: Optional[datetime] = None
+
+    # --- Vazão do período (chamados fechados) ---
+    tickets_closed: int
+    avg_repair_hours: float
+    by_type: List[MaintenanceTypeStatsOut]
@@ -0,0 +1,60 @@
+# app/schemas/report.py
+
+"""
+Define os schemas Pydantic para as solicitações de relatórios (CSV e PDF).
+
+Este módulo contém o schema de entrada (input) para a solicitação de um
+relatório e o schema de saída (output) usado para acompanhar o seu andamento.
+
+Dependências:
+- pydantic: Para a criação dos modelos de dados (schemas).
+- enum: Para definir os formatos permitidos.
+- datetime, typing: Para a correta tipagem dos campos.
+"""
+
+from pydantic import BaseModel
+from enum import Enum
+from datetime import datetime
+from typing import Optional
+
+class ReportFormatEnum(str, Enum):
+    """
+    Enumeração para os formatos de relatório permitidos.
+    """
+    csv = "csv"
+    pdf = "pdf"
+
+class ReportJobCreate(BaseModel):
+    """
+    Schema para o corpo da requisição de um novo relatório de reservas.
+    """
+    format: ReportFormatEnum            # Formato do arquivo a ser gerado
+    start_date: datetime                # Início do período (data de criação das reservas)
+    end_date: datetime                  # Fim do período
+    sector_id: Optional[int] = None     # Filtro opcional por setor do solicitante
+    type_id: Optional[int] = None       # Filtro opcional por tipo de equipamento
+
+class ReportJobOut(BaseModel):
+    """
+    Schema de saída para uma solicitação de relatório e o seu andamento.
+    """
+    id: int
+    status: str                         # 'queued', 'running', 'completed', 'failed' ou 'expired'
+    format: str
+    start_date: datetime
+    end_date: datetime
+    sector_id: Optional[int]
+    type_id: Optional[int]
+    file_size: Optional[int]            # Tamanho do arquivo gerado, em bytes
+    error: Optional[str]                # Mensagem de erro, em caso de falha
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    expires_at: Optional[datetime]      # Data a partir da qual o arquivo deixa de estar disponível
+
+    class Config:
+        """
+        Configuração do Pydantic que permite mapear automaticamente os atributos
+        de um objeto ORM (SQLAlchemy) para os campos deste schema.
+        """
+        from_attributes = True
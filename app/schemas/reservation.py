@@ -15,6 +15,7 @@ Dependências:
 
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 # Importamos os schemas de output para que possamos mostrar os detalhes do usuário
 # e do equipamento quando uma reserva for retornada pela API.
@@ -47,6 +48,7 @@ class ReservationOut(ReservationBase):
     user_id: int
     status: str
     created_at: datetime
+    picked_up_at: Optional[datetime] = None # Retirada da unidade (None enquanto não retirada)
     
     # --- Campos de Relacionamento Aninhados ---
     # Estes campos serão preenchidos automaticamente pelo SQLAlchemy
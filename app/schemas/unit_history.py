@@ -14,7 +14,7 @@ Dependências:
 
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 # Importar UserOut para exibir detalhes do usuário no histórico
 from .user import UserOut
@@ -30,6 +30,7 @@ class UnitHistoryOut(BaseModel):
     created_at: datetime             # Data e hora do evento
     user_id: Optional[int] = None    # ID do usuário que registrou o evento
     reservation_id: Optional[int] = None # ID da reserva associada (se houver)
+    event_counts: Optional[Dict[str, int]] = None # Nos resumos: eventos resumidos por tipo
     
     # Aninha os dados do usuário que registrou o evento para uma resposta mais completa.
     user: Optional[UserOut] = None
@@ -39,4 +40,13 @@ class UnitHistoryOut(BaseModel):
         Configuração do Pydantic que permite mapear automaticamente os atributos
         de um objeto ORM (SQLAlchemy) para os campos deste schema.
         """
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UnitHistoryPage(BaseModel):
+    """
+    Schema de uma página do histórico de uma unidade, paginado por cursor
+    (do evento mais recente para o mais antigo).
+    """
+    items: List[UnitHistoryOut]
+    # Cursor da próxima página (parâmetro `cursor`), ou None se esta for a última.
+    next_cursor: Optional[str] = None
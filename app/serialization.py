@@ -0,0 +1,55 @@
+# app/serialization.py
+
+"""
+Módulo de Serialização Rápida das Respostas Paginadas
+
+Nas maiores listagens da API (reservas, logs e tipos de equipamento), o caminho
+padrão do FastAPI valida o retorno da rota contra o `response_model`, converte o
+resultado em objetos Python compatíveis com JSON e só então gera o JSON com o
+módulo `json` da biblioteca padrão.
+
+`page_response` substitui esse caminho: o `TypeAdapter` do schema da página
+(construído uma única vez por schema) valida os objetos ORM ou as linhas da
+consulta (via `from_attributes`) e gera os bytes do JSON diretamente no
+pydantic-core, sem etapas intermediárias em Python. O conteúdo gerado é o mesmo
+do caminho padrão, e o `response_model` declarado na rota continua sendo usado
+na documentação OpenAPI.
+
+Dependências:
+- pydantic: Para o TypeAdapter dos schemas de saída.
+- fastapi: Para a resposta HTTP com o JSON já serializado.
+- app.schemas.pagination: Schema genérico das páginas.
+"""
+
+import math
+from functools import lru_cache
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.schemas.pagination import Page
+
+@lru_cache(maxsize=None)
+def page_adapter(schema: type) -> TypeAdapter:
+    """Retorna o TypeAdapter (em cache) de `Page[schema]`."""
+    return TypeAdapter(Page[schema])
+
+def page_json(schema: type, items, total: int, page: int, size: int) -> bytes:
+    """
+    Serializa uma página de resultados diretamente para JSON.
+
+    Args:
+        schema: Schema de saída dos itens (ex: ReservationOut).
+        items: Objetos ORM, linhas de consulta (Row) ou dicionários com os campos do schema.
+        total, page, size: Metadados da paginação.
+    """
+    adapter = page_adapter(schema)
+    data = adapter.validate_python(
+        {"items": items, "total": total, "page": page, "size": size, "pages": math.ceil(total / size) if size > 0 else 0},
+        from_attributes=True
+    )
+    return adapter.dump_json(data)
+
+def page_response(schema: type, items, total: int, page: int, size: int) -> Response:
+    """Monta a resposta HTTP de uma página serializada por `page_json`."""
+    return Response(content=page_json(schema, items, total, page, size), media_type="application/json")
@@ -0,0 +1,352 @@
+# app/server.py
+
+"""
+Servidor de Produção (vários processos)
+
+Executa a API em N processos de trabalho do uvicorn sob um processo
+supervisor, no modelo pre-fork:
+
+1. O supervisor importa a aplicação e faz o aquecimento (warmup): importa
+   todos os módulos de rotas e modelos, configura os mapeamentos do ORM, gera
+   o schema OpenAPI e compila os TypeAdapters das páginas serializadas por
+   app/serialization.py, e testa a conexão com o banco de dados. O pool de
+   conexões é então descartado, pois conexões não podem ser compartilhadas
+   entre processos.
+2. O supervisor abre o socket de escuta (com a fila SERVER_BACKLOG) e cria os
+   processos com `fork`, que herdam a aplicação já aquecida e o socket.
+3. Cada processo abre as conexões do seu pool (DB_POOL_SIZE), ajusta o pool
+   de threads das rotas síncronas (SERVER_THREADPOOL_SIZE) e só então passa
+   a aceitar conexões. Enquanto isso, o kernel mantém as novas conexões na
+   fila do socket.
+
+Os processos que terminam inesperadamente são recriados. Ao receber SIGTERM
+ou SIGINT, o supervisor repassa o sinal aos processos, que deixam de aceitar
+conexões, concluem as requisições em andamento (até
+SERVER_GRACEFUL_TIMEOUT_SECONDS) e executam o desligamento da aplicação
+(tarefas agendadas e diário de auditoria); os que não terminarem a tempo são
+finalizados com SIGKILL.
+
+O máximo de conexões que os processos podem abrir (processos × (DB_POOL_SIZE +
+DB_MAX_OVERFLOW)) deve caber em DB_MAX_CONNECTIONS: a quantidade automática de
+processos (SERVER_WORKERS=0) é limitada a esse orçamento, e uma quantidade
+configurada explicitamente que o exceda impede o supervisor de iniciar.
+
+As tarefas agendadas rodam em todos os processos, com a eleição de líder do
+app/scheduler.py; as métricas e os caches em memória são de cada processo.
+
+Uso (a partir da raiz do projeto):
+    python -m app.server                        # configuração do .env (SERVER_*)
+    python -m app.server --workers 4 --port 8080
+
+Em sistemas sem `fork` (Windows), a API roda em um único processo.
+
+Dependências:
+- uvicorn: Para o servidor HTTP de cada processo.
+- anyio: Para o tamanho do pool de threads das rotas síncronas.
+- sqlalchemy: Para o teste e a abertura das conexões do pool.
+- app.serialization: Para compilar os TypeAdapters das páginas.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+
+import anyio.to_thread
+import uvicorn
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.schemas.pagination import Page
+from app.serialization import page_adapter
+
+logger = logging.getLogger(__name__)
+
+# Tempo mínimo de vida de um processo; os que terminam antes disso são recriados
+# com um atraso, para não entrar em um ciclo de falhas consumindo CPU.
+MIN_WORKER_LIFETIME_SECONDS = 1.0
+
+# Margem, além de SERVER_GRACEFUL_TIMEOUT_SECONDS, para o desligamento da aplicação.
+SHUTDOWN_MARGIN_SECONDS = 5.0
+
+def resolve_worker_count(workers: int) -> int:
+    """
+    Quantidade de processos: o valor configurado ou, se 0, um por CPU disponível,
+    limitado à quantidade de processos cujas conexões cabem em DB_MAX_CONNECTIONS.
+    """
+    if workers > 0:
+        return workers
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    if settings.DB_MAX_CONNECTIONS <= 0:
+        return cpus
+    allowed = max(1, settings.DB_MAX_CONNECTIONS // (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW))
+    if cpus > allowed:
+        logger.warning(
+            "%d CPU(s) disponíveis, mas apenas %d processo(s) cabem em DB_MAX_CONNECTIONS=%d com %d conexões cada; "
+            "usando %d processo(s).", cpus, allowed, settings.DB_MAX_CONNECTIONS,
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW, allowed
+        )
+        return allowed
+    return cpus
+
+def resolve_threadpool_size(threadpool_size: int) -> int:
+    """
+    Threads das rotas síncronas de cada processo: o valor configurado ou, se 0,
+    o máximo de conexões do pool, já que quase toda rota síncrona usa uma
+    conexão (mais threads do que isso só esperariam por conexões livres).
+    """
+    return threadpool_size if threadpool_size > 0 else settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+def connection_budget(workers: int) -> int:
+    """Máximo de conexões que os processos podem abrir no banco: processos × (pool + extras)."""
+    return workers * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+def check_connection_budget(workers: int, max_connections: int):
+    """
+    Falha antes de criar os processos se eles puderem abrir mais conexões do que
+    o limite configurado (DB_MAX_CONNECTIONS; 0 desativa a verificação), em vez
+    de deixar o PostgreSQL recusar conexões nos picos de carga. Só é usada para
+    uma quantidade de processos configurada explicitamente; a automática já é
+    limitada por `resolve_worker_count`.
+
+    Raises:
+        ValueError: Se processos × (DB_POOL_SIZE + DB_MAX_OVERFLOW) exceder o limite.
+    """
+    budget = connection_budget(workers)
+    if max_connections > 0 and budget > max_connections:
+        raise ValueError(
+            f"{workers} processo(s) × ({settings.DB_POOL_SIZE} + {settings.DB_MAX_OVERFLOW}) conexões = {budget}, "
+            f"acima de DB_MAX_CONNECTIONS={max_connections}. Reduza SERVER_WORKERS, DB_POOL_SIZE ou "
+            f"DB_MAX_OVERFLOW, ou aumente DB_MAX_CONNECTIONS (respeitando o max_connections do PostgreSQL)."
+        )
+
+# --- Aquecimento ---
+
+def _api_routes(routes) -> list[APIRoute]:
+    """Rotas da API, incluindo as dos roteadores incluídos (mantidos sem cópia nas versões recentes do FastAPI)."""
+    api_routes = []
+    for route in routes:
+        if isinstance(route, APIRoute):
+            api_routes.append(route)
+        elif getattr(route, "original_router", None) is not None:
+            api_routes.extend(_api_routes(route.original_router.routes))
+    return api_routes
+
+def warmup(app: FastAPI, engine: Engine):
+    """
+    Aquece a aplicação no supervisor, antes da criação dos processos: configura
+    os mapeamentos do ORM, gera o schema OpenAPI (que percorre todos os schemas
+    de entrada e saída), compila os TypeAdapters das rotas paginadas e testa a
+    conexão com o banco, descartando o pool em seguida.
+    """
+    started = time.perf_counter()
+    configure_mappers()
+    app.openapi()
+    for route in _api_routes(app.routes):
+        if isinstance(route.response_model, type) and issubclass(route.response_model, Page):
+            (item_schema,) = route.response_model.__pydantic_generic_metadata__["args"]
+            page_adapter(item_schema)
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+    engine.dispose()
+    logger.info("Aplicação aquecida em %.0f ms.", (time.perf_counter() - started) * 1000)
+
+def prime_pool(engine: Engine) -> int:
+    """
+    Abre as conexões do pool do processo (todas ao mesmo tempo, para que o pool
+    as mantenha), para que as primeiras requisições não paguem a conexão.
+
+    Returns:
+        int: Quantidade de conexões abertas.
+    """
+    size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+# --- Processos de trabalho ---
+
+class WorkerServer(uvicorn.Server):
+    """Servidor uvicorn que ajusta o pool de threads das rotas síncronas antes de subir a aplicação."""
+
+    def __init__(self, config: uvicorn.Config, threadpool_size: int):
+        super().__init__(config)
+        self.threadpool_size = threadpool_size
+
+    async def startup(self, sockets: list[socket.socket] | None = None):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = self.threadpool_size
+        await super().startup(sockets=sockets)
+
+def build_worker_config(app: FastAPI) -> uvicorn.Config:
+    """Configuração do uvicorn de cada processo."""
+    return uvicorn.Config(
+        app,
+        lifespan="on",
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        backlog=settings.SERVER_BACKLOG,
+    )
+
+def run_worker(app: FastAPI, engine: Engine, listener: socket.socket, threadpool_size: int):
+    """Corpo de um processo de trabalho: abre o pool e atende o socket herdado até receber SIGTERM/SIGINT."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    prime_pool(engine)
+    WorkerServer(build_worker_config(app), threadpool_size).run(sockets=[listener])
+
+def create_listener(host: str, port: int, backlog: int) -> socket.socket:
+    """Abre o socket de escuta compartilhado pelos processos."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    listener.set_inheritable(True)
+    return listener
+
+# --- Supervisor ---
+
+class Supervisor:
+    """
+    Mantém `workers` processos atendendo o socket de escuta, recriando os que
+    terminarem, e os encerra de forma graciosa no desligamento.
+    """
+
+    def __init__(self, app: FastAPI, engine: Engine, listener: socket.socket, workers: int, threadpool_size: int):
+        self.app = app
+        self.engine = engine
+        self.listener = listener
+        self.workers = workers
+        self.threadpool_size = threadpool_size
+        self.children: dict[int, float] = {}   # PID -> momento da criação
+        self.stopping = False
+
+    def spawn_worker(self):
+        """Cria um processo de trabalho (fork)."""
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.app, self.engine, self.listener, self.threadpool_size)
+            except BaseException:
+                logger.exception("Falha no processo de trabalho [%d].", os.getpid())
+                status = 1
+            finally:
+                os._exit(status)
+        self.children[pid] = time.monotonic()
+        logger.info("Processo de trabalho [%d] criado.", pid)
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def reap_children(self) -> list[tuple[int, float]]:
+        """Recolhe os processos que terminaram, retornando o PID e o tempo de vida de cada um."""
+        finished = []
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                break
+            if pid == 0:
+                break
+            started = self.children.pop(pid, None)
+            if started is not None:
+                finished.append((pid, time.monotonic() - started))
+                if not self.stopping:
+                    logger.warning("Processo de trabalho [%d] terminou inesperadamente (status %s).", pid, os.waitstatus_to_exitcode(status))
+        return finished
+
+    def run(self):
+        """Laço do supervisor, até receber SIGTERM ou SIGINT."""
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        for _ in range(self.workers):
+            self.spawn_worker()
+
+        while not self.stopping:
+            time.sleep(0.5)
+            for _, lifetime in self.reap_children():
+                if self.stopping:
+                    break
+                if lifetime < MIN_WORKER_LIFETIME_SECONDS:
+                    time.sleep(MIN_WORKER_LIFETIME_SECONDS)
+                self.spawn_worker()
+
+        self.stop()
+
+    def stop(self):
+        """Encerra os processos: SIGTERM e, após o prazo de desligamento, SIGKILL."""
+        logger.info("Encerrando %d processo(s) de trabalho.", len(self.children))
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + SHUTDOWN_MARGIN_SECONDS
+        while self.children and time.monotonic() < deadline:
+            self.reap_children()
+            time.sleep(0.1)
+
+        for pid in list(self.children):
+            logger.warning("Processo de trabalho [%d] não terminou a tempo e será finalizado.", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+        self.listener.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de produção da API do EquipControl (vários processos).")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help="Endereço em que o servidor escuta.")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help="Porta em que o servidor escuta.")
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Quantidade de processos de trabalho (0 = um por CPU disponível).")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from app.database import engine
+    from main import app
+
+    workers = resolve_worker_count(args.workers)
+    if args.workers > 0:
+        try:
+            check_connection_budget(workers, settings.DB_MAX_CONNECTIONS)
+        except ValueError as exc:
+            parser.error(str(exc))
+    threadpool_size = resolve_threadpool_size(settings.SERVER_THREADPOOL_SIZE)
+    warmup(app, engine)
+    listener = create_listener(args.host, args.port, settings.SERVER_BACKLOG)
+    logger.info(
+        "Servindo em %s:%d com %d processo(s) de %d thread(s) cada (até %d conexões com o banco).",
+        args.host, args.port, workers, threadpool_size, connection_budget(workers)
+    )
+
+    if not hasattr(os, "fork"):
+        prime_pool(engine)
+        WorkerServer(build_worker_config(app), threadpool_size).run(sockets=[listener])
+        return
+    Supervisor(app, engine, listener, workers, threadpool_size).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# app/slow_query_log.py
+
+"""
+Módulo de Registro de Consultas Lentas (Slow Query Log)
+
+Subsistema opcional (SLOW_QUERY_LOG_ENABLED) que mede cada comando SQL
+executado pela engine. Quando um comando ultrapassa SLOW_QUERY_THRESHOLD_MS,
+uma amostra (SLOW_QUERY_SAMPLE_RATE) é registrada com:
+
+- O comando e a descrição dos parâmetros: por padrão, apenas os tipos dos
+  valores, já que eles podem conter hashes de senha, tokens e e-mails
+  (SLOW_QUERY_LOG_PARAMETERS grava os valores, truncados).
+- A rota da API que o executou (obtida do middleware de métricas).
+- Opcionalmente (SLOW_QUERY_EXPLAIN, apenas PostgreSQL), a saída de
+  `EXPLAIN (ANALYZE, BUFFERS)`. Atenção: o ANALYZE executa a consulta de novo.
+
+Para não adicionar escritas ao caminho das requisições, os registros ficam em
+um buffer em memória, de tamanho limitado, e são gravados em lote na tabela
+'slow_query_logs' por uma tarefa agendada (quando SCHEDULER_ENABLED), sob
+demanda pela rota de consulta e, com ou sem o agendador, sempre que o buffer
+atinge SLOW_QUERY_FLUSH_THRESHOLD registros (em uma thread à parte), para que
+os registros não sejam descartados quando o buffer enche. Os registros mais
+antigos que SLOW_QUERY_RETENTION_DAYS são removidos pela tarefa agendada
+`slow_query_retention`.
+
+Dependências:
+- sqlalchemy: Para os eventos de execução da engine e a gravação em lote.
+- app.config: Para as opções do subsistema.
+- app.metrics: Para identificar a rota da requisição em andamento.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import active_request_stats
+
+logger = logging.getLogger(__name__)
+
+# Quantidade máxima de registros mantidos em memória entre duas gravações.
+BUFFER_SIZE = 1000
+
+# Tamanho máximo gravado para o comando e para os parâmetros.
+MAX_STATEMENT_LENGTH = 10000
+MAX_PARAMETERS_LENGTH = 2000
+
+# Agrupa listas de placeholders (ex: 'IN (?, ?, ?)') para que consultas iguais
+# com quantidades diferentes de valores tenham a mesma impressão digital.
+_IN_LIST_RE = re.compile(r"IN \((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+_buffer: deque = deque(maxlen=BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_flush_in_progress = threading.Event()
+
+def normalize_statement(statement: str) -> str:
+    """Normaliza espaços e listas de placeholders de um comando SQL."""
+    return _IN_LIST_RE.sub("IN (...)", " ".join(statement.split()))
+
+def statement_fingerprint(statement: str) -> str:
+    """Retorna o hash (SHA-1) do comando normalizado."""
+    return hashlib.sha1(normalize_statement(statement).encode()).hexdigest()
+
+def describe_parameters(parameters) -> str | None:
+    """
+    Descreve os parâmetros de um comando para o registro. Sem
+    SLOW_QUERY_LOG_PARAMETERS, os valores são substituídos pelos seus tipos.
+    """
+    if not parameters:
+        return None
+    if settings.SLOW_QUERY_LOG_PARAMETERS:
+        return repr(parameters)[:MAX_PARAMETERS_LENGTH]
+
+    def redact(params):
+        if isinstance(params, dict):
+            return {key: type(value).__name__ for key, value in params.items()}
+        return [type(value).__name__ for value in params]
+
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        # executemany: descreve o primeiro conjunto e a quantidade
+        return f"{redact(parameters[0])!r} x {len(parameters)}"[:MAX_PARAMETERS_LENGTH]
+    return repr(redact(parameters))[:MAX_PARAMETERS_LENGTH]
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    """
+    Executa EXPLAIN (ANALYZE, BUFFERS) para o comando, no PostgreSQL.
+
+    Usa o cursor DBAPI da própria conexão (sem disparar os eventos da engine),
+    dentro de um SAVEPOINT, para que uma falha não invalide a transação da rota.
+    """
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.debug("Não foi possível obter o EXPLAIN da consulta lenta.", exc_info=True)
+            return None
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["slow_query_start_time"].pop()) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS or "slow_query_logs" in statement:
+        return
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    stats = active_request_stats()
+    entry = {
+        "fingerprint": statement_fingerprint(statement),
+        "statement": statement[:MAX_STATEMENT_LENGTH],
+        "parameters": describe_parameters(parameters),
+        "route": stats.route if stats is not None else None,
+        "duration_ms": round(duration_ms, 3),
+        "explain": _explain(conn, statement, parameters) if settings.SLOW_QUERY_EXPLAIN and not executemany else None,
+    }
+    with _buffer_lock:
+        _buffer.append(entry)
+        start_flush = 0 < settings.SLOW_QUERY_FLUSH_THRESHOLD <= len(_buffer) and not _flush_in_progress.is_set()
+        if start_flush:
+            _flush_in_progress.set()
+    if start_flush:
+        threading.Thread(target=_flush_in_background, name="slow-query-flush", daemon=True).start()
+
+def _flush_in_background():
+    """Grava o buffer com uma sessão própria, fora da transação da rota que o encheu."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        flush_slow_queries(db)
+    except Exception:
+        logger.exception("Falha ao gravar os registros de consultas lentas.")
+    finally:
+        db.close()
+        _flush_in_progress.clear()
+
+def install_slow_query_log(engine: Engine):
+    """Registra a medição de comandos lentos na engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def uninstall_slow_query_log(engine: Engine):
+    """Remove a medição de comandos lentos da engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+def flush_slow_queries(db: Session) -> int:
+    """
+    Grava em lote os registros acumulados no buffer.
+
+    Returns:
+        int: Quantidade de registros gravados.
+    """
+    from app.models.slow_query_log import SlowQueryLog
+
+    with _buffer_lock:
+        entries = list(_buffer)
+        _buffer.clear()
+    if entries:
+        db.execute(insert(SlowQueryLog), entries)
+        db.commit()
+    return len(entries)
+
+def purge_old_slow_queries(db: Session, now: datetime | None = None) -> int:
+    """
+    Remove os registros de consultas lentas mais antigos que SLOW_QUERY_RETENTION_DAYS.
+
+    Returns:
+        int: Quantidade de registros removidos.
+    """
+    from app.models.slow_query_log import SlowQueryLog
+
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.SLOW_QUERY_RETENTION_DAYS)
+    count = db.query(SlowQueryLog).filter(SlowQueryLog.created_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+def top_slow_queries(db: Session, limit: int = 20, since: datetime | None = None) -> list[dict]:
+    """Retorna as consultas lentas agrupadas pela impressão digital, ordenadas pelo tempo total."""
+    from app.models.slow_query_log import SlowQueryLog
+
+    total_ms = func.sum(SlowQueryLog.duration_ms)
+    query = db.query(
+        SlowQueryLog.fingerprint,
+        func.count(SlowQueryLog.id).label("executions"),
+        total_ms.label("total_ms"),
+        func.avg(SlowQueryLog.duration_ms).label("avg_ms"),
+        func.max(SlowQueryLog.duration_ms).label("max_ms"),
+        func.max(SlowQueryLog.statement).label("statement"),
+        func.max(SlowQueryLog.route).label("route"),
+        func.max(SlowQueryLog.created_at).label("last_seen"),
+    )
+    if since:
+        query = query.filter(SlowQueryLog.created_at >= since)
+    rows = query.group_by(SlowQueryLog.fingerprint).order_by(total_ms.desc()).limit(limit).all()
+    return [row._asdict() for row in rows]
@@ -0,0 +1,103 @@
+# app/type_details.py
+
+"""
+Módulo do Detalhe de um Tipo de Equipamento (GET /equipments/types/{type_id})
+
+Monta a resposta do detalhe de um tipo: o tipo, as suas unidades, o status
+atual de cada unidade e a reserva ativa ('pending' ou 'approved') de cada uma,
+com o usuário que a fez.
+
+Em vez de carregar todo o histórico de reservas de cada unidade, as reservas
+ativas são lidas com uma única consulta de janela (ROW_NUMBER por unidade),
+apoiada por um índice parcial apenas das reservas ativas. Assim, o custo por
+requisição não cresce com o histórico.
+
+O JSON da resposta de cada tipo é mantido em cache por
+EQUIPMENT_TYPE_CACHE_TTL_SECONDS e descartado pelas rotas e tarefas que alteram
+as reservas, as unidades ou o próprio tipo (`invalidate_type_detail_cache`).
+Mudanças que não passam por elas (como o status atual mudando com a passagem
+do tempo, ou o perfil de um usuário) aparecem após a expiração.
+
+Dependências:
+- sqlalchemy: Para a consulta de janela das reservas ativas.
+- pydantic: Para a serialização direta da resposta em JSON.
+- app.cache_utils: Para o cache por tipo.
+- app.availability: Para o status atual das unidades.
+"""
+
+from functools import lru_cache
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.cache_utils import TTLCache
+from app.availability import ACTIVE_RESERVATION_STATUSES, annotate_current_status
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation import Reservation
+from app.models.user import User
+from app.schemas.equipment import EquipmentTypeWithUnitsOut
+
+# Cache do JSON do detalhe de cada tipo, por ID do tipo.
+_type_detail_cache = TTLCache(ttl_seconds=settings.EQUIPMENT_TYPE_CACHE_TTL_SECONDS, maxsize=256)
+
+@lru_cache(maxsize=None)
+def _adapter() -> TypeAdapter:
+    return TypeAdapter(EquipmentTypeWithUnitsOut)
+
+def load_type_with_units(db: Session, type_id: int) -> EquipmentType | None:
+    """
+    Carrega o tipo com as suas unidades e preenche, em cada unidade, os atributos
+    transitórios `active_reservation` e `current_status`.
+    """
+    db_type = db.query(EquipmentType).options(joinedload(EquipmentType.units)).filter(EquipmentType.id == type_id).first()
+    if not db_type:
+        return None
+
+    # Primeira reserva ativa (menor ID) de cada unidade do tipo, com o usuário e o setor
+    ranked = (
+        select(Reservation.id, func.row_number().over(partition_by=Reservation.unit_id, order_by=Reservation.id).label("position"))
+        .join(EquipmentUnit, EquipmentUnit.id == Reservation.unit_id)
+        .where(EquipmentUnit.type_id == type_id, Reservation.status.in_(ACTIVE_RESERVATION_STATUSES))
+        .subquery()
+    )
+    active = db.query(Reservation).options(
+        joinedload(Reservation.user).options(joinedload(User.sector), joinedload(User.google_token))
+    ).join(ranked, ranked.c.id == Reservation.id).filter(ranked.c.position == 1).all()
+    active_by_unit = {reservation.unit_id: reservation for reservation in active}
+
+    for unit in db_type.units:
+        unit.active_reservation = active_by_unit.get(unit.id)
+    annotate_current_status(db, db_type.units)
+    return db_type
+
+def type_detail_json(db: Session, type_id: int) -> bytes | None:
+    """Retorna (em cache) o JSON do detalhe do tipo, ou None se o tipo não existir."""
+    def load():
+        db_type = load_type_with_units(db, type_id)
+        if db_type is None:
+            return None
+        adapter = _adapter()
+        return adapter.dump_json(adapter.validate_python(db_type, from_attributes=True))
+
+    cached = _type_detail_cache.get(type_id)
+    if cached is None:
+        cached = load()
+        # Tipos inexistentes não ficam em cache, para que apareçam assim que forem criados
+        if cached is not None and settings.EQUIPMENT_TYPE_CACHE_TTL_SECONDS > 0:
+            _type_detail_cache.set(type_id, cached)
+    return cached
+
+def invalidate_type_detail_cache(*type_ids: int | None):
+    """
+    Descarta o detalhe em cache dos tipos informados, ou de todos os tipos se
+    nenhum for informado. Deve ser chamada após alterações em reservas, unidades
+    ou tipos de equipamento.
+    """
+    if not type_ids:
+        _type_detail_cache.invalidate()
+    for type_id in type_ids:
+        if type_id is not None:
+            _type_detail_cache.invalidate(type_id)
@@ -0,0 +1,171 @@
+# app/unit_history.py
+
+"""
+Módulo da Linha do Tempo das Unidades (GET /equipments/units/{unit_id}/history)
+
+A linha do tempo de uma unidade é lida do evento mais recente para o mais
+antigo, em páginas paginadas por cursor (keyset): cada página continua a partir
+do último evento da anterior, na ordem (created_at, id) do índice
+'ix_unit_history_unit_id_created_at'. Assim, o custo de cada página não
+depende de quantos eventos a unidade já acumulou nem de quantas páginas já
+foram lidas.
+
+Para manter a tabela pequena, a tarefa agendada `unit_history_compaction`
+(UNIT_HISTORY_COMPACTION_INTERVAL_SECONDS) resume os eventos rotineiros mais
+antigos que UNIT_HISTORY_COMPACT_AFTER_DAYS: cada sequência de eventos
+rotineiros do mesmo mês, sem eventos relevantes ('created',
+'sent_to_maintenance', ...) entre eles, é substituída por um único registro
+'history_compacted', com a quantidade de eventos resumidos por tipo.
+
+Dependências:
+- sqlalchemy: Para as consultas da paginação e da compactação.
+- app.config: Para a idade mínima dos eventos compactados.
+"""
+
+import base64
+import binascii
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from app.config import settings
+from app.models.unit_history import UnitHistory
+from app.schemas.unit_history import UnitHistoryPage
+
+logger = logging.getLogger(__name__)
+
+# Eventos rotineiros, que podem ser resumidos após UNIT_HISTORY_COMPACT_AFTER_DAYS, e a sua descrição nos resumos.
+COMPACTABLE_EVENTS = {
+    "returned_ok": "devolução(ões) sem defeito",
+    "picked_up": "retirada(s)",
+    "reservation_expired": "reserva(s) expirada(s)",
+    "status_released": "liberação(ões) automática(s)",
+}
+COMPACTED_EVENT = "history_compacted"
+
+# Quantidade de unidades compactadas por transação.
+COMPACTION_BATCH_UNITS = 100
+
+# --- Paginação por cursor ---
+
+def encode_cursor(event: UnitHistory) -> str:
+    """Cursor opaco que aponta para um evento: o seu ID e a sua data."""
+    raw = f"{event.id}|{event.created_at.isoformat()}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[int, datetime]:
+    """Lê um cursor gerado por `encode_cursor`. Lança ValueError se ele for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        event_id, created_at = raw.split("|", 1)
+        return int(event_id), datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Cursor inválido.") from exc
+
+def history_page(db: Session, unit_id: int, size: int, cursor: str | None = None) -> UnitHistoryPage:
+    """
+    Retorna até `size` eventos da unidade, do mais recente para o mais antigo,
+    a partir do evento apontado por `cursor` (exclusive).
+    """
+    query = db.query(UnitHistory).options(joinedload(UnitHistory.user)).filter(UnitHistory.unit_id == unit_id)
+    if cursor:
+        event_id, created_at = decode_cursor(cursor)
+        # A data é relida do próprio evento, para comparar com o valor gravado no banco;
+        # a do cursor só é usada se o evento tiver sido resumido entre duas páginas.
+        anchor = aliased(UnitHistory)
+        anchor_time = func.coalesce(select(anchor.created_at).where(anchor.id == event_id).scalar_subquery(), created_at)
+        query = query.filter(tuple_(UnitHistory.created_at, UnitHistory.id) < tuple_(anchor_time, event_id))
+
+    events = query.order_by(UnitHistory.created_at.desc(), UnitHistory.id.desc()).limit(size + 1).all()
+    next_cursor = encode_cursor(events[size - 1]) if len(events) > size else None
+    return UnitHistoryPage(items=events[:size], next_cursor=next_cursor)
+
+# --- Compactação ---
+
+def _month(moment: datetime) -> tuple[int, int]:
+    """Mês (em UTC) de uma data; datas sem fuso (como as do SQLite) são UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return moment.year, moment.month
+
+def summary_notes(counts: dict[str, int], month: tuple[int, int]) -> str:
+    """Texto de um resumo (ex: 'Resumo de 3 evento(s) de 01/2025: 3 devolução(ões) sem defeito.')."""
+    parts = ", ".join(f"{count} {COMPACTABLE_EVENTS.get(event_type, event_type)}" for event_type, count in sorted(counts.items()))
+    return f"Resumo de {sum(counts.values())} evento(s) de {month[1]:02d}/{month[0]}: {parts}."
+
+def _compactable_runs(events: list[UnitHistory]) -> list[list[UnitHistory]]:
+    """Agrupa os eventos (em ordem cronológica) em sequências de eventos rotineiros do mesmo mês."""
+    runs, current = [], []
+    for event in events:
+        if event.event_type not in COMPACTABLE_EVENTS and event.event_type != COMPACTED_EVENT:
+            if current:
+                runs.append(current)
+            current = []
+            continue
+        if current and _month(current[-1].created_at) != _month(event.created_at):
+            runs.append(current)
+            current = []
+        current.append(event)
+    if current:
+        runs.append(current)
+    return runs
+
+def _compact_unit(db: Session, unit_id: int, cutoff: datetime) -> int:
+    """Resume os eventos rotineiros antigos de uma unidade (sem commit). Retorna a quantidade de eventos removidos."""
+    events = (
+        db.query(UnitHistory)
+        .filter(UnitHistory.unit_id == unit_id, UnitHistory.created_at < cutoff)
+        .order_by(UnitHistory.created_at, UnitHistory.id)
+        .all()
+    )
+    removed = 0
+    for run in _compactable_runs(events):
+        summaries = [event for event in run if event.event_type == COMPACTED_EVENT]
+        if len(run) < 2 or len(summaries) == len(run):
+            continue
+
+        counts = Counter()
+        for event in run:
+            counts.update(event.event_counts if event.event_type == COMPACTED_EVENT else {event.event_type: 1})
+
+        # Um resumo anterior do mesmo mês é reaproveitado; os demais registros da sequência são removidos
+        summary = summaries[0] if summaries else UnitHistory(unit_id=unit_id, event_type=COMPACTED_EVENT)
+        summary.event_counts = dict(counts)
+        summary.notes = summary_notes(counts, _month(run[-1].created_at))
+        summary.created_at = run[-1].created_at
+        db.add(summary)
+
+        stale_ids = [event.id for event in run if event is not summary]
+        db.query(UnitHistory).filter(UnitHistory.id.in_(stale_ids)).delete(synchronize_session=False)
+        removed += len(run) - len(summaries)
+    return removed
+
+def compact_unit_history(db: Session, now: datetime | None = None) -> int:
+    """
+    Tarefa agendada: resume os eventos rotineiros mais antigos que
+    UNIT_HISTORY_COMPACT_AFTER_DAYS de todas as unidades.
+
+    Returns:
+        int: Quantidade de eventos substituídos por resumos.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.UNIT_HISTORY_COMPACT_AFTER_DAYS)
+    unit_ids = [
+        unit_id for (unit_id,) in
+        db.query(UnitHistory.unit_id)
+        .filter(UnitHistory.event_type.in_(COMPACTABLE_EVENTS), UnitHistory.created_at < cutoff)
+        .distinct()
+        .order_by(UnitHistory.unit_id)
+    ]
+
+    removed = 0
+    for start in range(0, len(unit_ids), COMPACTION_BATCH_UNITS):
+        for unit_id in unit_ids[start:start + COMPACTION_BATCH_UNITS]:
+            removed += _compact_unit(db, unit_id, cutoff)
+        db.commit()
+    if removed:
+        logger.info("%s evento(s) do histórico das unidades resumido(s).", removed)
+    return removed
@@ -0,0 +1,240 @@
+# app/utilization.py
+
+"""
+Módulo de Análise de Utilização das Unidades de Equipamento
+
+Responde "quais unidades ficam ociosas e quais estão saturadas" em uma janela
+de tempo, a partir dos intervalos (start_time, end_time) das reservas que
+efetivamente ocuparam as unidades ('approved' e 'returned'):
+
+- por unidade: horas reservadas, percentual de utilização, maior período
+  ocioso e tempo ocioso desde a última reserva até o fim da janela;
+- por tipo de equipamento: horas reservadas, utilização média, quantidade de
+  unidades ociosas e saturadas, e o pico de reservas simultâneas (com o
+  instante em que ocorreu).
+
+Os intervalos são lidos com uma única consulta colunar e toda a aritmética
+de intervalos é vetorizada com NumPy: os intervalos de cada unidade são
+ordenados e "achatados" em uma única linha do tempo (com um deslocamento por
+grupo), de modo que uniões, lacunas e contagens de simultaneidade saem de
+somas e máximos acumulados, sem laços em Python por reserva.
+
+O resultado de cada janela fica em um cache em memória por alguns minutos
+(UTILIZATION_CACHE_TTL_SECONDS); as novas reservas aparecem após a expiração.
+
+Dependências:
+- numpy: Para a aritmética vetorizada dos intervalos.
+- sqlalchemy: Para a leitura das unidades e dos intervalos.
+- app.cache_utils: Para o cache por janela.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.cache_utils import TTLCache
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.equipment_type import EquipmentType
+
+# Status de reserva que ocupam efetivamente uma unidade no período reservado.
+BOOKED_STATUSES = ('approved', 'returned')
+
+# Cache dos resultados por janela (início, fim).
+_utilization_cache = TTLCache(ttl_seconds=settings.UTILIZATION_CACHE_TTL_SECONDS, maxsize=32)
+
+@dataclass
+class UtilizationResult:
+    """Resultado da análise de uma janela: listas de dicionários por unidade e por tipo."""
+    start: datetime
+    end: datetime
+    units: list[dict]
+    types: list[dict]
+
+    @property
+    def window_hours(self) -> float:
+        return (self.end - self.start).total_seconds() / 3600
+
+def default_window(now: datetime | None = None) -> tuple[datetime, datetime]:
+    """
+    Janela padrão: os últimos UTILIZATION_DEFAULT_WINDOW_DAYS dias, terminando na
+    próxima hora cheia, para que requisições próximas compartilhem o mesmo cache.
+    """
+    now = now or datetime.now(timezone.utc)
+    end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return end - timedelta(days=settings.UTILIZATION_DEFAULT_WINDOW_DAYS), end
+
+def _as_utc(moment: datetime) -> datetime:
+    # Datas sem fuso (como as do SQLite) são UTC
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+def _epoch_seconds(moments) -> np.ndarray:
+    return np.array([_as_utc(moment).timestamp() for moment in moments], dtype=np.float64)
+
+def _from_epoch(seconds: float) -> datetime:
+    return datetime.fromtimestamp(float(seconds), tz=timezone.utc)
+
+def get_utilization(db: Session, start: datetime, end: datetime) -> UtilizationResult:
+    """Retorna (em cache) a análise de utilização da janela [start, end)."""
+    start, end = _as_utc(start), _as_utc(end)
+    return _utilization_cache.get_or_set((start, end), lambda: compute_utilization(db, start, end))
+
+def invalidate_utilization_cache():
+    _utilization_cache.invalidate()
+
+def compute_utilization(db: Session, start: datetime, end: datetime) -> UtilizationResult:
+    """Calcula a análise de utilização de todas as unidades na janela [start, end)."""
+    start, end = _as_utc(start), _as_utc(end)
+    window = (end - start).total_seconds()
+
+    units = db.execute(
+        select(EquipmentUnit.id, EquipmentUnit.identifier_code, EquipmentUnit.status, EquipmentUnit.type_id)
+        .order_by(EquipmentUnit.id)
+    ).all()
+    type_names = dict(db.execute(select(EquipmentType.id, EquipmentType.name)).all())
+
+    # Consulta colunar dos intervalos que se sobrepõem à janela
+    intervals = db.execute(
+        select(Reservation.unit_id, Reservation.start_time, Reservation.end_time)
+        .where(Reservation.status.in_(BOOKED_STATUSES), Reservation.start_time < end, Reservation.end_time > start)
+    ).all()
+
+    unit_ids = np.array([unit.id for unit in units], dtype=np.int64)
+    unit_type_ids = np.array([unit.type_id for unit in units], dtype=np.int64)
+    n_units = len(units)
+
+    if intervals and n_units:
+        interval_units, starts, ends = zip(*intervals)
+        # Posição de cada unidade no vetor de unidades (ordenado por ID)
+        unit_index = np.searchsorted(unit_ids, np.array(interval_units, dtype=np.int64))
+        origin = start.timestamp()
+        # Tempos relativos ao início da janela, recortados à janela
+        s = np.clip(_epoch_seconds(starts) - origin, 0, window)
+        e = np.clip(_epoch_seconds(ends) - origin, 0, window)
+        valid = e > s
+        unit_index, s, e = unit_index[valid], s[valid], e[valid]
+    else:
+        unit_index = np.empty(0, dtype=np.int64)
+        s = e = np.empty(0, dtype=np.float64)
+
+    booked, longest_idle, trailing_idle = _unit_coverage(unit_index, s, e, n_units, window)
+    utilization = booked / window * 100 if window > 0 else np.zeros(n_units)
+
+    # --- Por unidade ---
+    unit_rows = [
+        {
+            "unit_id": unit.id,
+            "identifier_code": unit.identifier_code,
+            "status": unit.status,
+            "type_id": unit.type_id,
+            "type_name": type_names.get(unit.type_id, ""),
+            "booked_hours": round(float(booked[i]) / 3600, 2),
+            "utilization_pct": round(float(utilization[i]), 2),
+            "longest_idle_hours": round(float(longest_idle[i]) / 3600, 2),
+            "idle_hours_at_end": round(float(trailing_idle[i]) / 3600, 2),
+        }
+        for i, unit in enumerate(units)
+    ]
+
+    # --- Por tipo de equipamento ---
+    type_ids, type_of_unit = np.unique(unit_type_ids, return_inverse=True)
+    n_types = len(type_ids)
+    total_units = np.bincount(type_of_unit, minlength=n_types)
+    booked_by_type = np.bincount(type_of_unit, weights=booked, minlength=n_types)
+    idle_units = np.bincount(type_of_unit, weights=(booked == 0), minlength=n_types)
+    saturated_units = np.bincount(
+        type_of_unit, weights=(utilization >= settings.UTILIZATION_SATURATION_PERCENT), minlength=n_types
+    )
+    peak, peak_at = _peak_concurrency(type_of_unit[unit_index] if n_units else unit_index, s, e, n_types, window)
+
+    type_rows = [
+        {
+            "type_id": int(type_ids[t]),
+            "type_name": type_names.get(int(type_ids[t]), ""),
+            "total_units": int(total_units[t]),
+            "booked_hours": round(float(booked_by_type[t]) / 3600, 2),
+            "utilization_pct": round(float(booked_by_type[t]) / (total_units[t] * window) * 100, 2) if window > 0 else 0.0,
+            "idle_units": int(idle_units[t]),
+            "saturated_units": int(saturated_units[t]),
+            "peak_concurrency": int(peak[t]),
+            "peak_at": _from_epoch(start.timestamp() + peak_at[t]) if peak[t] > 0 else None,
+        }
+        for t in range(n_types)
+    ]
+    type_rows.sort(key=lambda row: (-row["utilization_pct"], row["type_name"]))
+    return UtilizationResult(start=start, end=end, units=unit_rows, types=type_rows)
+
+def _unit_coverage(unit_index: np.ndarray, s: np.ndarray, e: np.ndarray, n_units: int, window: float):
+    """
+    Calcula, por unidade, o tempo coberto pela união dos intervalos, a maior
+    lacuna ociosa e a lacuna final (da última reserva até o fim da janela).
+
+    Cada unidade ocupa uma faixa própria de uma linha do tempo única
+    (deslocamento = índice da unidade × (janela + 1)), o que permite usar um
+    único máximo acumulado para obter o fim coberto até cada intervalo.
+    """
+    booked = np.zeros(n_units)
+    longest_idle = np.full(n_units, float(window))
+    trailing_idle = np.full(n_units, float(window))
+    if len(s) == 0:
+        return booked, longest_idle, trailing_idle
+
+    order = np.lexsort((s, unit_index))
+    unit_index, s, e = unit_index[order], s[order], e[order]
+    offset = unit_index * (window + 1)
+    s_line, e_line = s + offset, e + offset
+
+    # Fim coberto pelos intervalos anteriores da mesma unidade (ou o início da faixa)
+    covered_until = np.maximum.accumulate(e_line)
+    previous_end = np.concatenate(([-np.inf], covered_until[:-1]))
+    previous_end = np.maximum(previous_end, offset)
+
+    booked = np.bincount(unit_index, weights=np.clip(e_line - np.maximum(s_line, previous_end), 0, None), minlength=n_units)
+
+    # Lacunas antes de cada intervalo e, para a última reserva de cada unidade, até o fim da janela
+    gaps = np.clip(s_line - previous_end, 0, None)
+    longest_idle = np.zeros(n_units)
+    np.maximum.at(longest_idle, unit_index, gaps)
+    last_of_unit = np.r_[unit_index[1:] != unit_index[:-1], True]
+    units_with_bookings = unit_index[last_of_unit]
+    trailing = offset[last_of_unit] + window - covered_until[last_of_unit]
+
+    trailing_idle = np.full(n_units, float(window))
+    trailing_idle[units_with_bookings] = trailing
+    np.maximum.at(longest_idle, units_with_bookings, trailing)
+    unbooked = np.ones(n_units, dtype=bool)
+    unbooked[units_with_bookings] = False
+    longest_idle[unbooked] = window
+    return booked, longest_idle, trailing_idle
+
+def _peak_concurrency(type_index: np.ndarray, s: np.ndarray, e: np.ndarray, n_types: int, window: float):
+    """
+    Calcula, por tipo de equipamento, o pico de reservas simultâneas e o instante
+    (em segundos desde o início da janela) em que ele ocorre pela primeira vez.
+
+    Cada reserva gera um evento +1 no início e -1 no fim; os eventos de cada tipo
+    são ordenados na sua faixa da linha do tempo (fins antes de inícios no mesmo
+    instante) e a simultaneidade é a soma acumulada dos eventos.
+    """
+    peak = np.zeros(n_types, dtype=np.int64)
+    peak_at = np.zeros(n_types)
+    if len(s) == 0:
+        return peak, peak_at
+
+    offset = type_index * (window + 1)
+    times = np.concatenate((s + offset, e + offset))
+    deltas = np.concatenate((np.ones(len(s), dtype=np.int64), -np.ones(len(e), dtype=np.int64)))
+    types = np.concatenate((type_index, type_index))
+    order = np.lexsort((deltas, times))
+    times, deltas, types = times[order], deltas[order], types[order]
+
+    concurrency = np.cumsum(deltas)
+    np.maximum.at(peak, types, concurrency)
+    at_peak = concurrency == peak[types]
+    peak_types, first = np.unique(types[at_peak], return_index=True)
+    peak_at[peak_types] = times[at_peak][first] - peak_types * (window + 1)
+    return peak, peak_at
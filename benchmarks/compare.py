@@ -0,0 +1,56 @@
+# benchmarks/compare.py
+
+"""
+Comparação de Resultados de Benchmark
+
+Compara dois arquivos de resultado gerados por `benchmarks/load_test.py`
+(ex: antes e depois de uma mudança) e exibe, por endpoint, a variação de
+latência (p50/p95/p99) e de vazão.
+
+Uso:
+    python -m benchmarks.compare benchmarks/results/ANTES.json benchmarks/results/DEPOIS.json
+
+Sem argumentos, compara os dois resultados mais recentes de `benchmarks/results/`.
+
+Dependências:
+- json, pathlib: Leitura dos arquivos de resultado.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from benchmarks.load_test import RESULTS_DIR
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "   n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+def compare(before: dict, after: dict):
+    print(f"Antes:  {before['commit']} {before.get('label', '')} ({before['timestamp']})")
+    print(f"Depois: {after['commit']} {after.get('label', '')} ({after['timestamp']})\n")
+    print(f"{'Endpoint':<45}" + "".join(f"{m:>24}" for m in METRICS))
+    for label in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        b, a = before["endpoints"].get(label), after["endpoints"].get(label)
+        if not b or not a:
+            print(f"{label:<45}{'(presente em apenas um dos resultados)':>24}")
+            continue
+        cells = "".join(f"{b[m]:>9} → {a[m]:<6}{_change(b[m], a[m])}" for m in METRICS)
+        print(f"{label:<45}{cells}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    parser.add_argument("files", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    files = args.files or sorted(RESULTS_DIR.glob("*.json"))[-2:]
+    if len(files) != 2:
+        raise SystemExit("Informe dois arquivos de resultado (ou tenha ao menos dois em benchmarks/results/).")
+    before, after = (json.loads(path.read_text()) for path in files)
+    compare(before, after)
+
+if __name__ == "__main__":
+    main()
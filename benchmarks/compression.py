@@ -0,0 +1,128 @@
+# benchmarks/compression.py
+
+"""
+Benchmark de Compressão das Respostas (gzip × Brotli)
+
+Mede, para respostas reais das maiores listagens da API (geradas pelos mesmos
+serializadores das rotas), o compromisso entre banda e latência de cada
+codificação e nível:
+
+- tamanho comprimido e taxa de compressão;
+- tempo de compressão (servidor) e de descompressão (cliente);
+- tempo total estimado de entrega (compressão + transferência + descompressão)
+  em diferentes larguras de banda.
+
+Uso:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --bandwidth-mbps 5 50 1000 --repeat 20 --output resultado.json
+
+Dependências:
+- zlib / brotli (opcional): Codificações medidas.
+- app.serialization / benchmarks.sample_objects: Para gerar as respostas de exemplo.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - o Brotli é opcional
+    brotli = None
+
+from app.schemas.equipment import EquipmentTypeStatsOut
+from app.schemas.logs import ActivityLogOut
+from app.schemas.reservation import ReservationOut
+from app.serialization import page_json
+from benchmarks.sample_objects import make_reservations, make_logs, make_type_stats_rows
+
+def sample_payloads() -> dict[str, bytes]:
+    """Respostas JSON de exemplo, nos tamanhos de página usados pelas telas e no limite das rotas."""
+    type_rows = [
+        {"id": t.id, "name": t.name, "category": t.category, "description": t.description,
+         "total_units": total, "available_units": available, "reserved_units": reserved, "maintenance_units": maintenance}
+        for t, total, available, reserved, maintenance in make_type_stats_rows(1000)
+    ]
+    return {
+        "ReservationOut x10": page_json(ReservationOut, make_reservations(10), 10, 1, 10),
+        "ReservationOut x100": page_json(ReservationOut, make_reservations(100), 100, 1, 100),
+        "ActivityLogOut x1000": page_json(ActivityLogOut, make_logs(1000), 1000, 1, 1000),
+        "EquipmentTypeStatsOut x1000": page_json(EquipmentTypeStatsOut, type_rows, 1000, 1, 1000),
+    }
+
+def codecs() -> dict[str, tuple]:
+    """Codificações medidas: nome -> (compressor, descompressor)."""
+    result = {"identity": (lambda data: data, lambda data: data)}
+    for level in (1, 6, 9):
+        result[f"gzip-{level}"] = (lambda data, level=level: _gzip(data, level), lambda data: zlib.decompress(data, 31))
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            result[f"br-{quality}"] = (lambda data, quality=quality: brotli.compress(data, quality=quality), brotli.decompress)
+    return result
+
+def _gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+def _median_seconds(func, data: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def measure(payloads: dict[str, bytes], bandwidths_mbps: list[float], repeat: int) -> list[dict]:
+    results = []
+    for payload_name, data in payloads.items():
+        for codec_name, (compress, decompress) in codecs().items():
+            compressed = compress(data)
+            compress_s = _median_seconds(compress, data, repeat)
+            decompress_s = _median_seconds(decompress, compressed, repeat)
+            results.append({
+                "payload": payload_name,
+                "codec": codec_name,
+                "original_bytes": len(data),
+                "compressed_bytes": len(compressed),
+                "ratio": round(len(data) / len(compressed), 2),
+                "compress_ms": round(compress_s * 1000, 3),
+                "decompress_ms": round(decompress_s * 1000, 3),
+                # Tempo total de entrega estimado: compressão + transferência + descompressão
+                "delivery_ms": {
+                    str(mbps): round((compress_s + len(compressed) * 8 / (mbps * 1_000_000) + decompress_s) * 1000, 2)
+                    for mbps in bandwidths_mbps
+                },
+            })
+    return results
+
+def print_report(results: list[dict], bandwidths_mbps: list[float]):
+    delivery_header = "".join(f"{f'{mbps:g}Mbps':>11}" for mbps in bandwidths_mbps)
+    current = None
+    for row in results:
+        if row["payload"] != current:
+            current = row["payload"]
+            print(f"\n{current} ({row['original_bytes']} bytes)")
+            print(f"{'codec':<10}{'bytes':>10}{'taxa':>7}{'comp ms':>10}{'desc ms':>10}  entrega (ms):{delivery_header}")
+        delivery = "".join(f"{row['delivery_ms'][str(mbps)]:>11}" for mbps in bandwidths_mbps)
+        print(f"{row['codec']:<10}{row['compressed_bytes']:>10}{row['ratio']:>7}{row['compress_ms']:>10}{row['decompress_ms']:>10}  {'':13}{delivery}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara gzip e Brotli nas respostas da API.")
+    parser.add_argument("--bandwidth-mbps", type=float, nargs="+", default=[5, 50, 1000], help="Larguras de banda simuladas.")
+    parser.add_argument("--repeat", type=int, default=15, help="Repetições por medição (é usada a mediana).")
+    parser.add_argument("--output", type=Path, help="Arquivo JSON onde gravar os resultados.")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("Pacote 'brotli' não instalado: apenas o gzip será medido.")
+    results = measure(sample_payloads(), args.bandwidth_mbps, args.repeat)
+    print_report(results, args.bandwidth_mbps)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"\nResultado gravado em {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# benchmarks/load_test.py
+
+"""
+Gerador de Carga HTTP para Benchmarks
+
+Executa cenários de uso roteirizados contra uma instância da API em execução
+(ex: `uvicorn main:app --workers 4`) populada por `benchmarks/seed_data.py`,
+e relata, por endpoint, a latência (p50/p95/p99) e a vazão obtidas.
+
+Cenários (sorteados por peso a cada iteração de cada usuário virtual):
+- catalog: navegação pelo catálogo (listagem paginada e detalhe de um tipo).
+- book: criação de reservas em horários futuros aleatórios (409 é esperado).
+- approve: um gerente lista as reservas pendentes e aprova uma delas.
+- dashboard: painel de análise do administrador.
+- log_export: exportação de logs de um período pelo administrador.
+
+Os resultados são gravados em JSON em `benchmarks/results/`, identificados pelo
+commit atual, para comparação entre versões com `benchmarks/compare.py`.
+
+Observação: novas reservas e aprovações disparam e-mails (e eventos de
+calendário) em segundo plano. Aponte MAIL_SERVER para um servidor SMTP local
+de testes no servidor avaliado, ou use `--scenarios` para excluir os cenários
+'book' e 'approve'. O painel de análise requer PostgreSQL.
+
+Uso:
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --duration 60 --concurrency 50
+
+Dependências:
+- httpx: Cliente HTTP assíncrono.
+- sqlalchemy / app.database: Para obter IDs e usuários de amostra do banco avaliado.
+- app.security: Para emitir os tokens de acesso dos usuários virtuais.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.security import create_access_token
+from benchmarks.seed_data import BENCHMARK_EMAIL_DOMAIN
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Peso de cada cenário no sorteio.
+SCENARIO_WEIGHTS = {"catalog": 60, "book": 20, "approve": 10, "dashboard": 5, "log_export": 5}
+
+class LoadContext:
+    """IDs de amostra e tokens de acesso usados pelos cenários."""
+
+    def __init__(self, sample_size: int = 200):
+        db = SessionLocal()
+        try:
+            bench_users = select(User.id).where(User.email.like(f"%@{BENCHMARK_EMAIL_DOMAIN}"))
+            self.type_ids = list(db.scalars(select(EquipmentType.id).limit(sample_size * 5)))
+            self.unit_ids = list(db.scalars(select(EquipmentUnit.id).where(EquipmentUnit.status == "available").limit(sample_size * 50)))
+            tokens = {}
+            for role in ("requester", "manager", "admin"):
+                ids = list(db.scalars(bench_users.where(User.role == role).limit(sample_size)))
+                if not ids:
+                    raise SystemExit(f"Nenhum usuário sintético com perfil '{role}'. Execute benchmarks.seed_data antes.")
+                tokens[role] = [create_access_token({"sub": str(user_id)}, expires_delta=timedelta(hours=6)) for user_id in ids]
+            self.tokens = tokens
+        finally:
+            db.close()
+
+    def headers(self, role: str) -> dict:
+        return {"Authorization": f"Bearer {random.choice(self.tokens[role])}"}
+
+class Recorder:
+    """Acumula as latências e os status das requisições, por endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        self.statuses[label][response.status_code] += 1
+        if response.status_code >= 500:
+            self.errors[label] += 1
+        return response
+
+# --- Cenários ---
+
+async def scenario_catalog(client, ctx: LoadContext, rec: Recorder):
+    headers = ctx.headers("requester")
+    await rec.request(client, "GET /equipments/types", "GET", "/equipments/types", params={"page": random.randint(1, 20), "size": 9}, headers=headers)
+    await rec.request(client, "GET /equipments/types/{type_id}", "GET", f"/equipments/types/{random.choice(ctx.type_ids)}", headers=headers)
+
+async def scenario_book(client, ctx: LoadContext, rec: Recorder):
+    start = datetime.now(timezone.utc) + timedelta(days=random.randint(30, 365), hours=random.randint(0, 23))
+    payload = {"unit_id": random.choice(ctx.unit_ids), "start_time": start.isoformat(), "end_time": (start + timedelta(hours=random.randint(1, 8))).isoformat()}
+    await rec.request(client, "POST /reservations/", "POST", "/reservations/", json=payload, headers=ctx.headers("requester"))
+
+async def scenario_approve(client, ctx: LoadContext, rec: Recorder):
+    headers = ctx.headers("manager")
+    response = await rec.request(client, "GET /admin/reservations", "GET", "/admin/reservations", params={"status": "pending", "size": 20, "page": random.randint(1, 5)}, headers=headers)
+    items = response.json().get("items", []) if response is not None and response.status_code == 200 else []
+    if items:
+        reservation_id = random.choice(items)["id"]
+        await rec.request(client, "PATCH /admin/reservations/{reservation_id}", "PATCH", f"/admin/reservations/{reservation_id}", json={"status": "approved"}, headers=headers)
+
+async def scenario_dashboard(client, ctx: LoadContext, rec: Recorder):
+    start = datetime.now(timezone.utc) - timedelta(days=random.choice([30, 90, 365]))
+    await rec.request(client, "GET /dashboard/stats", "GET", "/dashboard/stats", params={"start_date": start.isoformat()}, headers=ctx.headers("admin"))
+
+async def scenario_log_export(client, ctx: LoadContext, rec: Recorder):
+    end = datetime.now(timezone.utc) - timedelta(days=random.randint(0, 700))
+    params = {"start_date": (end - timedelta(days=1)).isoformat(), "end_date": end.isoformat()}
+    await rec.request(client, "GET /admin/logs/export", "GET", "/admin/logs/export", params=params, headers=ctx.headers("admin"))
+
+SCENARIOS = {
+    "catalog": scenario_catalog,
+    "book": scenario_book,
+    "approve": scenario_approve,
+    "dashboard": scenario_dashboard,
+    "log_export": scenario_log_export,
+}
+
+# --- Execução e relatório ---
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo, sobre uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+def summarize(rec: Recorder, elapsed: float) -> dict:
+    """Calcula as estatísticas por endpoint (latências em milissegundos)."""
+    summary = {}
+    for label, values in sorted(rec.latencies.items()):
+        values.sort()
+        summary[label] = {
+            "requests": len(values),
+            "errors": rec.errors[label],
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "statuses": {str(code): count for code, count in sorted(rec.statuses[label].items())},
+        }
+    return summary
+
+def print_report(summary: dict, elapsed: float):
+    print(f"\n{'Endpoint':<45}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for label, s in summary.items():
+        print(f"{label:<45}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>9}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}")
+    total = sum(s["requests"] for s in summary.values())
+    print(f"\nTotal: {total} requisições em {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def virtual_user(client, ctx: LoadContext, rec: Recorder, scenarios: list[str], weights: list[int], deadline: float):
+    while time.perf_counter() < deadline:
+        await SCENARIOS[random.choices(scenarios, weights)[0]](client, ctx, rec)
+
+async def run(args) -> dict:
+    ctx = LoadContext()
+    rec = Recorder()
+    scenarios = args.scenarios or list(SCENARIO_WEIGHTS)
+    weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        # Aquecimento: os resultados desta fase são descartados
+        if args.warmup > 0:
+            warmup_rec = Recorder()
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(virtual_user(client, ctx, warmup_rec, scenarios, weights, deadline) for _ in range(args.concurrency)))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(virtual_user(client, ctx, rec, scenarios, weights, deadline) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    summary = summarize(rec, elapsed)
+    print_report(summary, elapsed)
+    return {
+        "commit": current_commit(),
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "settings": {"base_url": args.base_url, "duration": args.duration, "concurrency": args.concurrency, "scenarios": scenarios},
+        "elapsed_seconds": round(elapsed, 2),
+        "endpoints": summary,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP da API EquipControl.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=60, help="Duração da medição, em segundos.")
+    parser.add_argument("--warmup", type=float, default=10, help="Duração do aquecimento, em segundos.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Quantidade de usuários virtuais simultâneos.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="Cenários a executar (padrão: todos).")
+    parser.add_argument("--label", default="", help="Rótulo livre gravado no resultado (ex: 'pg16-4workers').")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    args.output.mkdir(parents=True, exist_ok=True)
+    suffix = f"_{args.label}" if args.label else ""
+    path = args.output / f"{datetime.now():%Y%m%d_%H%M%S}_{result['commit']}{suffix}.json"
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"Resultado gravado em {path}")
+
+if __name__ == "__main__":
+    main()
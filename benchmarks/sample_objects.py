@@ -0,0 +1,66 @@
+# benchmarks/sample_objects.py
+
+"""
+Objetos de Exemplo para os Micro-benchmarks
+
+Gera objetos ORM transitórios (sem banco de dados), com os relacionamentos já
+preenchidos como ficam após os `joinedload` das rotas, para medir a
+serialização e a compressão das respostas das maiores listagens da API.
+
+Dependências:
+- app.models: Modelos ORM usados como entrada dos schemas de saída.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.models.sector import Sector
+from app.models.user import User
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation import Reservation
+from app.models.activity_log import ActivityLog
+# Registra todos os modelos, para que os relacionamentos possam ser resolvidos.
+import app.models  # noqa: F401
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+def make_users(count: int) -> list[User]:
+    sectors = [Sector(id=i, name=f"Setor {i}") for i in range(1, 11)]
+    return [
+        User(
+            id=i, username=f"usuario_{i}", email=f"usuario{i}@example.com", password_hash="x",
+            role="requester", is_active=True, is_verified=True, otp_enabled=False,
+            sector=sectors[i % len(sectors)]
+        )
+        for i in range(1, count + 1)
+    ]
+
+def make_reservations(count: int) -> list[Reservation]:
+    types = [EquipmentType(id=i, name=f"Notebook Modelo {i}", category="Informática", description="Notebook para uso em campo.") for i in range(1, 21)]
+    units = [
+        EquipmentUnit(id=i, type_id=types[i % 20].id, identifier_code=f"NB-{i:05d}", serial_number=f"SN-{i:08d}", status="available", equipment_type=types[i % 20])
+        for i in range(1, 201)
+    ]
+    users = make_users(50)
+    reservations = []
+    for i in range(1, count + 1):
+        start = NOW + timedelta(hours=i)
+        unit, user = units[i % len(units)], users[i % len(users)]
+        reservations.append(Reservation(
+            id=i, user_id=user.id, unit_id=unit.id, start_time=start, end_time=start + timedelta(hours=4),
+            status="approved", created_at=start - timedelta(days=2), user=user, equipment_unit=unit
+        ))
+    return reservations
+
+def make_logs(count: int) -> list[ActivityLog]:
+    return [
+        ActivityLog(id=i, user_id=i % 50 or None, level="INFO", message=f"Usuário 'usuario_{i}' solicitou a reserva da unidade ID {i}.", created_at=NOW - timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+
+def make_type_stats_rows(count: int) -> list[tuple]:
+    """Linhas no formato da consulta de `list_equipment_types`: (tipo, total, disponíveis, reservadas, manutenção)."""
+    return [
+        (EquipmentType(id=i, name=f"Tipo {i}", category="Audiovisual", description="Projetor multimídia."), 12, 8, 3, 1)
+        for i in range(1, count + 1)
+    ]
@@ -0,0 +1,225 @@
+# benchmarks/seed_data.py
+
+"""
+Gerador de Dados Sintéticos para Benchmarks
+
+Popula o banco de dados configurado em DATABASE_URL com um volume grande e
+realista de dados (dezenas de milhares de usuários e unidades, milhões de
+reservas e logs), para os testes de carga de `benchmarks/load_test.py`.
+
+Os registros gerados são identificados pelo domínio de e-mail e pelo prefixo
+dos códigos (BENCH), e todos os usuários usam a senha BENCHMARK_PASSWORD.
+As reservas de cada unidade são geradas em sequência, sem sobreposição de
+horários, distribuídas entre o passado e as próximas semanas. Como as
+inserções em lote não passam pelas rotas, os agregados do painel de análise
+são recalculados ao final (app/jobs/rollup_backfill.py).
+
+Uso (a partir da raiz do projeto, com o .env apontando para um banco de testes):
+    python -m benchmarks.seed_data --users 20000 --units 20000 --reservations 2000000 --logs 2000000
+
+Dependências:
+- sqlalchemy: Para as inserções em lote (Core), em transações por lote.
+- app.database / app.models: Engine e tabelas da aplicação.
+- app.security: Para gerar o hash da senha dos usuários sintéticos.
+- app.jobs.rollup_backfill: Para recalcular os agregados das reservas geradas.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.database import engine, Base, SessionLocal
+from app.models.sector import Sector
+from app.models.user import User
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation import Reservation
+from app.models.activity_log import ActivityLog
+from app.security import get_password_hash
+from app.jobs.rollup_backfill import backfill_rollups
+# Registra todos os modelos, para que os relacionamentos possam ser resolvidos.
+import app.models  # noqa: F401
+
+# Domínio de e-mail que identifica os usuários sintéticos.
+BENCHMARK_EMAIL_DOMAIN = "benchmark.equipcontrol.dev"
+
+# Senha de todos os usuários sintéticos.
+BENCHMARK_PASSWORD = "Benchmark@123"
+
+# Distribuição de perfis dos usuários sintéticos.
+ROLE_WEIGHTS = {"user": 35, "requester": 60, "manager": 4, "admin": 1}
+
+CATEGORIES = ["Notebook", "Informática", "Audiovisual", "Fotografia e Vídeo", "Laboratório", "Rede", "Mobiliário"]
+
+LOG_TEMPLATES = [
+    ("INFO", "Usuário '{user}' logado com sucesso."),
+    ("INFO", "Usuário '{user}' solicitou a reserva da unidade ID {unit}."),
+    ("INFO", "Gerente '{user}' approved a reserva ID {unit}."),
+    ("WARNING", "Tentativa de login falhou para o usuário '{user}'. Tentativas restantes: 3"),
+    ("ERROR", "Falha ao enviar e-mail de notificação para '{user}'."),
+]
+
+def _batched_insert(table, rows, batch_size: int, label: str) -> int:
+    """Insere as linhas geradas em lotes, uma transação por lote, exibindo o progresso."""
+    total, batch, started = 0, [], time.perf_counter()
+
+    def flush():
+        nonlocal total
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        total += len(batch)
+        batch.clear()
+        print(f"  {label}: {total} linhas ({total / (time.perf_counter() - started):.0f}/s)", end="\r")
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    print(f"  {label}: {total} linhas em {time.perf_counter() - started:.1f}s" + " " * 10)
+    return total
+
+def _select_ids(query) -> list[int]:
+    with engine.connect() as conn:
+        return list(conn.execute(query).scalars())
+
+def generate_users(count: int, sector_ids: list[int], rng: random.Random):
+    password_hash = get_password_hash(BENCHMARK_PASSWORD)
+    roles, weights = zip(*ROLE_WEIGHTS.items())
+    for i in range(count):
+        yield {
+            "username": f"bench_user_{i}",
+            "email": f"user{i}@{BENCHMARK_EMAIL_DOMAIN}",
+            "password_hash": password_hash,
+            "role": rng.choices(roles, weights)[0],
+            "sector_id": rng.choice(sector_ids),
+            "is_active": True,
+            "is_verified": True,
+            "otp_enabled": False,
+            "terms_accepted": True,
+            "login_attempts": 0,
+        }
+
+def generate_types(count: int, rng: random.Random):
+    for i in range(count):
+        yield {"name": f"BENCH Equipamento {i}", "category": rng.choice(CATEGORIES), "description": f"Tipo sintético {i} para benchmarks."}
+
+def generate_units(count: int, type_ids: list[int], rng: random.Random):
+    for i in range(count):
+        yield {
+            "type_id": rng.choice(type_ids),
+            "identifier_code": f"BENCH-{i:07d}",
+            "serial_number": f"BENCH-SN-{i:07d}",
+            "status": "maintenance" if rng.random() < 0.03 else "available",
+        }
+
+def generate_reservations(count: int, unit_ids: list[int], requester_ids: list[int], rng: random.Random):
+    """
+    Gera reservas sem sobreposição por unidade: cada unidade recebe uma sequência
+    de reservas que começa no passado e avança com intervalos aleatórios.
+    """
+    now = datetime.now(timezone.utc)
+    per_unit = max(1, count // len(unit_ids))
+    # Espalha as reservas de cada unidade por ~3 anos, terminando algumas semanas no futuro.
+    # Cada passo é um intervalo livre (0 a 1,5 passo médio) seguido da reserva (1 a 0,5
+    # passo médio), de modo que a unidade fica ocupada cerca de 1/4 do tempo.
+    target_step_hours = max(4, (3 * 365 * 24) // per_unit)
+    max_gap_hours = target_step_hours + target_step_hours // 2
+    max_duration_hours = max(1, target_step_hours // 2)
+    # Passo médio efetivo (médias dos dois sorteios), usado para que o fim da sequência caia ~30 dias no futuro.
+    mean_step_hours = max_gap_hours / 2 + (1 + max_duration_hours) / 2
+    generated = 0
+
+    for unit_id in unit_ids:
+        cursor = now - timedelta(hours=per_unit * mean_step_hours) + timedelta(days=30)
+        for _ in range(per_unit):
+            if generated >= count:
+                return
+            start = cursor + timedelta(hours=rng.randint(0, max_gap_hours))
+            end = start + timedelta(hours=rng.randint(1, max_duration_hours))
+            cursor = end
+            if end < now:
+                status = rng.choices(["returned", "rejected", "expired", "approved"], [80, 10, 9, 1])[0]
+            elif start < now:
+                status = rng.choices(["approved", "pending"], [90, 10])[0]
+            else:
+                status = rng.choices(["approved", "pending", "rejected"], [55, 40, 5])[0]
+            created_at = start - timedelta(days=rng.randint(1, 14))
+            # Reservas já em andamento ou devolvidas foram retiradas (senão, seriam expiradas como não comparecimento)
+            picked_up = status in ("approved", "returned") and start < now
+            yield {
+                "user_id": rng.choice(requester_ids),
+                "unit_id": unit_id,
+                "start_time": start,
+                "end_time": end,
+                "status": status,
+                "created_at": created_at,
+                "picked_up_at": start if picked_up else None,
+            }
+            generated += 1
+
+def generate_logs(count: int, user_ids: list[int], rng: random.Random):
+    now = datetime.now(timezone.utc)
+    for _ in range(count):
+        level, template = rng.choice(LOG_TEMPLATES)
+        user_id = rng.choice(user_ids)
+        yield {
+            "user_id": user_id,
+            "level": level,
+            "message": template.format(user=f"bench_user_{user_id}", unit=rng.randint(1, 100000)),
+            "created_at": now - timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600)),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Popula o banco com dados sintéticos para benchmarks.")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--types", type=int, default=500)
+    parser.add_argument("--units", type=int, default=20000)
+    parser.add_argument("--reservations", type=int, default=2000000)
+    parser.add_argument("--logs", type=int, default=2000000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador, para conjuntos de dados reprodutíveis.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    Base.metadata.create_all(bind=engine)
+
+    existing = _select_ids(select(User.id).where(User.email.like(f"%@{BENCHMARK_EMAIL_DOMAIN}")).limit(1))
+    if existing:
+        raise SystemExit("O banco já contém dados sintéticos de benchmark. Use um banco vazio.")
+
+    print("Gerando dados sintéticos...")
+    sector_ids = _select_ids(select(Sector.id))
+    if not sector_ids:
+        _batched_insert(Sector, ({"name": f"BENCH Setor {i}"} for i in range(30)), args.batch_size, "setores")
+        sector_ids = _select_ids(select(Sector.id))
+
+    _batched_insert(User, generate_users(args.users, sector_ids, rng), args.batch_size, "usuários")
+    bench_users = select(User.id).where(User.email.like(f"%@{BENCHMARK_EMAIL_DOMAIN}"))
+    user_ids = _select_ids(bench_users)
+    requester_ids = _select_ids(bench_users.where(User.role != "user"))
+
+    _batched_insert(EquipmentType, generate_types(args.types, rng), args.batch_size, "tipos")
+    type_ids = _select_ids(select(EquipmentType.id).where(EquipmentType.name.like("BENCH %")))
+
+    _batched_insert(EquipmentUnit, generate_units(args.units, type_ids, rng), args.batch_size, "unidades")
+    unit_ids = _select_ids(select(EquipmentUnit.id).where(EquipmentUnit.identifier_code.like("BENCH-%")))
+
+    _batched_insert(Reservation, generate_reservations(args.reservations, unit_ids, requester_ids, rng), args.batch_size, "reservas")
+    _batched_insert(ActivityLog, generate_logs(args.logs, user_ids, rng), args.batch_size, "logs")
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        written = backfill_rollups(db)
+    finally:
+        db.close()
+    print(f"  agregados do painel: {written} baldes em {time.perf_counter() - started:.1f}s")
+    print("Concluído.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/test_schema_serialization.py
+
+"""
+Micro-benchmarks da Serialização dos Schemas (app/schemas/)
+
+Mede, em páginas de tamanhos realistas, o custo de serializar os schemas de
+saída das maiores listagens da API, comparando:
+
+- default: o caminho padrão do FastAPI (validação do retorno contra o
+  `response_model`, conversão para objetos compatíveis com JSON e `json.dumps`);
+- fast: o caminho rápido de `app.serialization.page_json` (TypeAdapter em cache,
+  JSON gerado diretamente pelo pydantic-core).
+
+Os dados são objetos ORM transitórios (sem banco de dados), gerados por
+`benchmarks/sample_objects.py`.
+
+Uso (a partir da raiz do projeto):
+    pytest benchmarks/test_schema_serialization.py --benchmark-group-by=func,param:size
+    pytest benchmarks/test_schema_serialization.py --benchmark-autosave   # grava em .benchmarks/
+
+Dependências:
+- pytest-benchmark: Para a medição e o relatório (os testes são ignorados se não estiver instalado).
+- app.schemas / app.serialization: Schemas e serializadores medidos.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.schemas.equipment import EquipmentTypeStatsOut
+from app.schemas.logs import ActivityLogOut
+from app.schemas.pagination import Page
+from app.schemas.reservation import ReservationOut
+from app.schemas.user import UserOut
+from app.serialization import page_json
+from benchmarks.sample_objects import make_users, make_reservations, make_logs, make_type_stats_rows
+
+# Tamanhos de página medidos: padrão das telas, página grande e o limite das rotas.
+PAGE_SIZES = [10, 100, 1000]
+
+def _default_path(schema: type, items: list) -> bytes:
+    """Reproduz o caminho padrão do FastAPI para um retorno em dicionário com `response_model=Page[schema]`."""
+    payload = {"items": items, "total": len(items), "page": 1, "size": len(items), "pages": 1}
+    page = Page[schema].model_validate(payload, from_attributes=True)
+    content = page.model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def _fast_path(schema: type, items: list) -> bytes:
+    return page_json(schema, items, total=len(items), page=1, size=len(items))
+
+# --- Benchmarks ---
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+@pytest.mark.parametrize("path", ["default", "fast"])
+def test_reservation_page(benchmark, size, path):
+    items = make_reservations(size)
+    serialize = _default_path if path == "default" else _fast_path
+    benchmark.group = f"ReservationOut size={size}"
+    benchmark(serialize, ReservationOut, items)
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+@pytest.mark.parametrize("path", ["default", "fast"])
+def test_activity_log_page(benchmark, size, path):
+    items = make_logs(size)
+    serialize = _default_path if path == "default" else _fast_path
+    benchmark.group = f"ActivityLogOut size={size}"
+    benchmark(serialize, ActivityLogOut, items)
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+@pytest.mark.parametrize("path", ["default", "fast"])
+def test_user_page(benchmark, size, path):
+    items = make_users(size)
+    serialize = _default_path if path == "default" else _fast_path
+    benchmark.group = f"UserOut size={size}"
+    benchmark(serialize, UserOut, items)
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+def test_equipment_type_stats_legacy(benchmark, size):
+    """Montagem anterior da listagem de tipos: model_validate de `{**type_obj.__dict__, ...}` por linha."""
+    rows = make_type_stats_rows(size)
+
+    def serialize():
+        items = [
+            EquipmentTypeStatsOut.model_validate({
+                **type_obj.__dict__, "total_units": total, "available_units": available,
+                "reserved_units": reserved, "maintenance_units": maintenance
+            }) for type_obj, total, available, reserved, maintenance in rows
+        ]
+        return _default_path(EquipmentTypeStatsOut, items)
+
+    benchmark.group = f"EquipmentTypeStatsOut size={size}"
+    benchmark(serialize)
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+def test_equipment_type_stats_fast(benchmark, size):
+    """Caminho atual: linhas com as colunas do schema, serializadas diretamente."""
+    rows = [
+        {"id": t.id, "name": t.name, "category": t.category, "description": t.description,
+         "total_units": total, "available_units": available, "reserved_units": reserved, "maintenance_units": maintenance}
+        for t, total, available, reserved, maintenance in make_type_stats_rows(size)
+    ]
+    benchmark.group = f"EquipmentTypeStatsOut size={size}"
+    benchmark(_fast_path, EquipmentTypeStatsOut, rows)
+
+@pytest.mark.parametrize("schema,factory", [(ReservationOut, make_reservations), (ActivityLogOut, make_logs), (UserOut, make_users)])
+def test_fast_path_output_matches_default(schema, factory):
+    """Garante que os dois caminhos medidos produzem o mesmo JSON."""
+    items = factory(20)
+    assert json.loads(_fast_path(schema, items)) == json.loads(_default_path(schema, items))
@@ -0,0 +1,74 @@
+-- One-time conversion of an existing (non-partitioned) activity_logs table
+-- into the monthly range-partitioned layout of gestao_equipamentos_db.sql.
+--
+-- Run during a maintenance window (application stopped). Before the rows are
+-- copied, a monthly partition is created for every month present in the old
+-- table and for the current and the next two months (ACTIVITY_LOG_PARTITIONS_AHEAD),
+-- with the same names and UTC bounds used by app/log_partitions.py. The rows
+-- therefore land in their monthly partitions, not in activity_logs_default:
+-- Postgres refuses to create a partition for a range the default partition
+-- already holds rows for. The activity_log_maintenance job then creates the
+-- following months and archives the months older than the retention period
+-- by dropping their partitions.
+
+BEGIN;
+
+ALTER TABLE activity_logs RENAME TO activity_logs_old;
+ALTER TABLE activity_logs_old RENAME CONSTRAINT fk_user_log TO fk_user_log_old;
+ALTER SEQUENCE activity_logs_id_seq OWNED BY NONE;
+
+CREATE TABLE activity_logs (
+    id INTEGER NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+    user_id INTEGER,
+    level VARCHAR(10) NOT NULL,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    action VARCHAR(50), -- Ex: 'reservation.status_changed'
+    entity_type VARCHAR(30), -- Ex: 'reservation'
+    entity_id INTEGER,
+    payload JSONB,
+    PRIMARY KEY (id, created_at),
+    CONSTRAINT fk_user_log FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id;
+
+CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT;
+
+DO $$
+DECLARE
+    partition_month DATE;
+BEGIN
+    FOR partition_month IN
+        SELECT DISTINCT date_trunc('month', COALESCE(created_at, NOW()) AT TIME ZONE 'UTC')::date
+        FROM activity_logs_old
+        UNION
+        SELECT generate_series(
+            date_trunc('month', NOW() AT TIME ZONE 'UTC'),
+            date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '2 months',
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+            'activity_logs_p' || to_char(partition_month, 'YYYY_MM'),
+            partition_month::timestamp AT TIME ZONE 'UTC',
+            (partition_month + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END $$;
+
+CREATE INDEX ix_activity_logs_created_at ON activity_logs (created_at);
+CREATE INDEX ix_activity_logs_user_id_created_at ON activity_logs (user_id, created_at);
+CREATE INDEX ix_activity_logs_level_created_at ON activity_logs (level, created_at);
+CREATE INDEX ix_activity_logs_action_created_at ON activity_logs (action, created_at);
+CREATE INDEX ix_activity_logs_entity ON activity_logs (entity_type, entity_id, created_at);
+CREATE INDEX ix_activity_logs_payload ON activity_logs USING GIN (payload);
+
+INSERT INTO activity_logs (id, user_id, level, message, created_at)
+SELECT id, user_id, level, message, COALESCE(created_at, NOW())
+FROM activity_logs_old;
+
+DROP TABLE activity_logs_old;
+
+COMMIT;
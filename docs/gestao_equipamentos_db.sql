@@ -36,7 +36,9 @@ CREATE TABLE equipment_units (
     type_id INTEGER NOT NULL,
     identifier_code VARCHAR(50) UNIQUE NOT NULL,
     serial_number VARCHAR(100) UNIQUE NOT NULL,
-    status VARCHAR(20) NOT NULL DEFAULT 'available' CHECK (status IN ('available', 'pending', 'reserved', 'maintenance')),
+    -- Operational state only; 'pending'/'reserved' are derived from the reservations.
+    -- Existing databases: UPDATE equipment_units SET status = 'available' WHERE status IN ('pending', 'reserved');
+    status VARCHAR(20) NOT NULL DEFAULT 'available' CHECK (status IN ('available', 'maintenance')),
     CONSTRAINT fk_equipment_type FOREIGN KEY(type_id) REFERENCES equipment_types(id) ON DELETE CASCADE
 );
 
@@ -47,8 +49,9 @@ CREATE TABLE reservations (
     unit_id INTEGER NOT NULL,
     start_time TIMESTAMP WITH TIME ZONE NOT NULL,
     end_time TIMESTAMP WITH TIME ZONE NOT NULL,
-    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'rejected', 'returned')),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'rejected', 'returned', 'expired')),
     return_notes TEXT,
+    picked_up_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     CONSTRAINT fk_user FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
     CONSTRAINT fk_equipment_unit FOREIGN KEY(unit_id) REFERENCES equipment_units(id) ON DELETE CASCADE
@@ -69,26 +72,196 @@ CREATE TABLE token_blacklist (
     expires_at TIMESTAMP WITH TIME ZONE NOT NULL
 );
 
--- Table to store application activity logs
+-- Table to store application activity logs, range-partitioned by month on created_at.
+-- The partition key must be part of the primary key. Monthly partitions
+-- (activity_logs_pYYYY_MM) are created ahead of time and archived after the
+-- retention period by the activity_log_maintenance job (app/log_partitions.py).
+-- Existing installations: see docs/activity_logs_partitioning.sql.
 CREATE TABLE activity_logs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     user_id INTEGER,
     level VARCHAR(10) NOT NULL,
     message TEXT NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    action VARCHAR(50), -- Ex: 'reservation.status_changed'
+    entity_type VARCHAR(30), -- Ex: 'reservation'
+    entity_id INTEGER,
+    payload JSONB,
+    PRIMARY KEY (id, created_at),
     CONSTRAINT fk_user_log FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
-);
+) PARTITION BY RANGE (created_at);
+
+-- Catch-all partition for rows outside the monthly partitions
+CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT;
+
+-- Indexes on the partitioned table are created on every partition
+CREATE INDEX ix_activity_logs_created_at ON activity_logs (created_at);
+CREATE INDEX ix_activity_logs_user_id_created_at ON activity_logs (user_id, created_at);
+CREATE INDEX ix_activity_logs_level_created_at ON activity_logs (level, created_at);
+CREATE INDEX ix_activity_logs_action_created_at ON activity_logs (action, created_at);
+CREATE INDEX ix_activity_logs_entity ON activity_logs (entity_type, entity_id, created_at);
+CREATE INDEX ix_activity_logs_payload ON activity_logs USING GIN (payload);
 
 -- Table for unit history
 CREATE TABLE unit_history (
     id SERIAL PRIMARY KEY,
     unit_id INTEGER NOT NULL,
-    event_type VARCHAR(50) NOT NULL, -- Ex: 'returned_ok', 'sent_to_maintenance', 'created'
+    event_type VARCHAR(50) NOT NULL, -- Ex: 'returned_ok', 'sent_to_maintenance', 'created', 'history_compacted'
     notes TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     user_id INTEGER, -- Manager/Admin who registered the event
     reservation_id INTEGER, -- Optional, to link with the reservation
+    event_counts JSON, -- Only on 'history_compacted' rows: summarized events per type
     CONSTRAINT fk_history_unit FOREIGN KEY(unit_id) REFERENCES equipment_units(id) ON DELETE CASCADE,
     CONSTRAINT fk_history_user FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL,
     CONSTRAINT fk_history_reservation FOREIGN KEY(reservation_id) REFERENCES reservations(id) ON DELETE SET NULL
-);
\ No newline at end of file
+);
+
+-- Index for status/deadline lookups (e.g. overdue detection by the scheduled jobs)
+CREATE INDEX ix_reservations_status_end_time ON reservations (status, end_time);
+
+-- Index for the per-unit overlap checks used to derive availability
+CREATE INDEX ix_reservations_unit_time ON reservations (unit_id, start_time, end_time);
+
+-- Partial index of the active reservations only (active reservation of each unit)
+CREATE INDEX ix_reservations_active_unit ON reservations (unit_id, id) WHERE status IN ('pending', 'approved');
+
+-- Index for the paginated timeline of each unit (newest first)
+CREATE INDEX ix_unit_history_unit_id_created_at ON unit_history (unit_id, created_at DESC, id DESC);
+
+-- Table recording the automatic notifications already sent for each reservation
+CREATE TABLE reservation_notifications (
+    id SERIAL PRIMARY KEY,
+    reservation_id INTEGER NOT NULL,
+    kind VARCHAR(30) NOT NULL, -- Ex: 'overdue'
+    sent_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT uq_reservation_notification_kind UNIQUE (reservation_id, kind),
+    CONSTRAINT fk_notification_reservation FOREIGN KEY(reservation_id) REFERENCES reservations(id) ON DELETE CASCADE
+);
+
+-- Table storing sampled slow SQL statements (opt-in, see SLOW_QUERY_LOG_ENABLED)
+CREATE TABLE slow_query_logs (
+    id SERIAL PRIMARY KEY,
+    fingerprint VARCHAR(40) NOT NULL, -- Hash of the normalized statement
+    statement TEXT NOT NULL,
+    parameters TEXT,
+    route VARCHAR(255), -- Ex: 'GET /admin/logs'
+    duration_ms DOUBLE PRECISION NOT NULL,
+    explain TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX ix_slow_query_logs_fingerprint ON slow_query_logs (fingerprint);
+CREATE INDEX ix_slow_query_logs_created_at ON slow_query_logs (created_at); -- Retention purge
+
+-- Table with the report generation requests processed by the report worker
+CREATE TABLE report_jobs (
+    id SERIAL PRIMARY KEY,
+    requested_by INTEGER,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- 'queued', 'running', 'completed', 'failed', 'expired'
+    format VARCHAR(10) NOT NULL, -- 'csv' or 'pdf'
+    start_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    end_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    sector_id INTEGER,
+    type_id INTEGER,
+    file_path VARCHAR(500), -- Relative to REPORTS_STORAGE_DIR
+    file_size INTEGER,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    expires_at TIMESTAMP WITH TIME ZONE,
+    CONSTRAINT fk_report_job_user FOREIGN KEY(requested_by) REFERENCES users(id) ON DELETE SET NULL,
+    CONSTRAINT fk_report_job_sector FOREIGN KEY(sector_id) REFERENCES sectors(id) ON DELETE SET NULL,
+    CONSTRAINT fk_report_job_type FOREIGN KEY(type_id) REFERENCES equipment_types(id) ON DELETE SET NULL
+);
+CREATE INDEX ix_report_jobs_status_created_at ON report_jobs (status, created_at);
+
+-- Pre-aggregated reservation counts (day x start hour x equipment type x sector x status) read by the dashboard
+CREATE TABLE reservation_rollups (
+    id SERIAL PRIMARY KEY,
+    day DATE NOT NULL, -- Creation day, in ANALYTICS_TIMEZONE
+    start_hour SMALLINT NOT NULL, -- Hour (0-23) of the reservation start, in ANALYTICS_TIMEZONE
+    equipment_type_id INTEGER NOT NULL,
+    sector_id INTEGER NOT NULL DEFAULT 0, -- 0 = user without sector
+    status VARCHAR(20) NOT NULL,
+    reservation_count INTEGER NOT NULL DEFAULT 0,
+    reserved_hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+    CONSTRAINT uq_reservation_rollups_bucket UNIQUE (day, start_hour, equipment_type_id, sector_id, status)
+);
+
+-- Pre-aggregated reservation counts (day x user x equipment type x sector) read by the dashboard's top users ranking
+CREATE TABLE user_reservation_rollups (
+    id SERIAL PRIMARY KEY,
+    day DATE NOT NULL, -- Creation day, in ANALYTICS_TIMEZONE
+    user_id INTEGER NOT NULL,
+    equipment_type_id INTEGER NOT NULL,
+    sector_id INTEGER NOT NULL DEFAULT 0, -- 0 = user without sector
+    reservation_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_user_reservation_rollups_bucket UNIQUE (day, user_id, equipment_type_id, sector_id)
+);
+
+-- Weekly demand forecasts per equipment type, generated by the scheduled forecasting job
+CREATE TABLE demand_forecasts (
+    id SERIAL PRIMARY KEY,
+    equipment_type_id INTEGER NOT NULL,
+    week_start DATE NOT NULL, -- Monday of the forecast week
+    predicted_peak DOUBLE PRECISION NOT NULL, -- Predicted peak of concurrent reservations
+    predicted_reservations DOUBLE PRECISION NOT NULL,
+    model VARCHAR(20) NOT NULL, -- 'holt_winters', 'holt' or 'naive'
+    generated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    CONSTRAINT fk_demand_forecast_type FOREIGN KEY(equipment_type_id) REFERENCES equipment_types(id) ON DELETE CASCADE,
+    CONSTRAINT uq_demand_forecast_type_week UNIQUE (equipment_type_id, week_start)
+);
+
+-- Maintenance tickets: a unit is in maintenance while it has an open ticket (closed_at IS NULL)
+CREATE TABLE maintenance_tickets (
+    id SERIAL PRIMARY KEY,
+    unit_id INTEGER NOT NULL,
+    reservation_id INTEGER, -- Reservation whose defective return opened the ticket, if any
+    status VARCHAR(20) NOT NULL DEFAULT 'open', -- 'open', 'in_progress' or 'closed'
+    priority SMALLINT NOT NULL DEFAULT 2, -- 0 (urgent) to 3 (low)
+    description TEXT,
+    resolution_notes TEXT,
+    opened_by_id INTEGER,
+    assignee_id INTEGER, -- Technician responsible for the repair
+    closed_by_id INTEGER,
+    opened_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    closed_at TIMESTAMP WITH TIME ZONE,
+    CONSTRAINT fk_maintenance_unit FOREIGN KEY(unit_id) REFERENCES equipment_units(id) ON DELETE CASCADE,
+    CONSTRAINT fk_maintenance_reservation FOREIGN KEY(reservation_id) REFERENCES reservations(id) ON DELETE SET NULL,
+    CONSTRAINT fk_maintenance_opened_by FOREIGN KEY(opened_by_id) REFERENCES users(id) ON DELETE SET NULL,
+    CONSTRAINT fk_maintenance_assignee FOREIGN KEY(assignee_id) REFERENCES users(id) ON DELETE SET NULL,
+    CONSTRAINT fk_maintenance_closed_by FOREIGN KEY(closed_by_id) REFERENCES users(id) ON DELETE SET NULL
+);
+
+-- Partial indexes of the open tickets only: the work queue (priority, then oldest first) and open tickets by age
+CREATE INDEX ix_maintenance_tickets_queue ON maintenance_tickets (priority, opened_at, id) WHERE closed_at IS NULL;
+CREATE INDEX ix_maintenance_tickets_open_age ON maintenance_tickets (opened_at, id) WHERE closed_at IS NULL;
+-- At most one open ticket per unit
+CREATE UNIQUE INDEX uq_maintenance_tickets_open_unit ON maintenance_tickets (unit_id) WHERE closed_at IS NULL;
+CREATE INDEX ix_maintenance_tickets_unit_id ON maintenance_tickets (unit_id, opened_at);
+
+-- Pre-aggregated closed tickets (closing day x equipment type x priority) for throughput and repair time metrics
+CREATE TABLE maintenance_rollups (
+    id SERIAL PRIMARY KEY,
+    day DATE NOT NULL, -- Closing day, in ANALYTICS_TIMEZONE
+    equipment_type_id INTEGER NOT NULL,
+    priority SMALLINT NOT NULL,
+    tickets_closed INTEGER NOT NULL DEFAULT 0,
+    repair_hours DOUBLE PRECISION NOT NULL DEFAULT 0, -- Sum of (closed_at - opened_at), in hours
+    CONSTRAINT uq_maintenance_rollups_bucket UNIQUE (day, equipment_type_id, priority)
+);
+
+-- Open a ticket for the units already in maintenance before the tickets existed
+INSERT INTO maintenance_tickets (unit_id, status, priority, description)
+SELECT id, 'open', 2, 'Unidade já estava em manutenção antes da criação dos chamados.'
+FROM equipment_units WHERE status = 'maintenance';
+
+-- Existing installations: pickups were not recorded before picked_up_at existed, so
+-- reservations already under way count as picked up (otherwise the sweeper would expire them as no-shows)
+ALTER TABLE reservations ADD COLUMN IF NOT EXISTS picked_up_at TIMESTAMP WITH TIME ZONE;
+UPDATE reservations SET picked_up_at = start_time
+WHERE picked_up_at IS NULL AND status IN ('approved', 'returned') AND start_time <= NOW();
+
+-- Existing installations: index used by the slow query retention purge
+CREATE INDEX IF NOT EXISTS ix_slow_query_logs_created_at ON slow_query_logs (created_at);
@@ -31,7 +31,7 @@ import { renderAdminReservationActions, renderUserActions } from './renderers.js
 import { loadManageInventoryView } from './inventoryViews.js';
 
 /**
- * Lida com as ações de gerenciamento de uma reserva (aprovar, rejeitar, devolver, notificar).
+ * Lida com as ações de gerenciamento de uma reserva (aprovar, rejeitar, registrar a retirada, devolver, notificar).
  * @param {HTMLElement} button - O botão que acionou a ação.
  * @param {string} token - O token de autenticação.
  */
@@ -58,9 +58,14 @@ export async function handleUpdateReservationStatus(button, token) {
             await apiFetch(`${API_URL}/admin/reservations/${reservationId}/notify-overdue`, token, { method: 'POST' });
             showToast('Notificação de atraso enviada!', 'success');
         } else {
-            // Para outras ações (approved, rejected), atualiza o status.
-            updated = await apiFetch(`${API_URL}/admin/reservations/${reservationId}`, token, { method: 'PATCH', body: { status: action } });
-            
+            if (action === 'pickup') {
+                // Registra a retirada da unidade (reservas aprovadas não retiradas expiram automaticamente).
+                updated = await apiFetch(`${API_URL}/admin/reservations/${reservationId}/pickup`, token, { method: 'POST' });
+            } else {
+                // Para outras ações (approved, rejected), atualiza o status.
+                updated = await apiFetch(`${API_URL}/admin/reservations/${reservationId}`, token, { method: 'PATCH', body: { status: action } });
+            }
+
             // Atualiza a linha da tabela dinamicamente com os novos dados.
             const row = document.getElementById(`reservation-row-${updated.id}`);
             if (row) {
@@ -42,9 +42,14 @@ export function renderAdminReservationActions(reservation) {
             <button class="btn btn-danger btn-sm admin-action-btn" data-reservation-id="${reservation.id}" data-action="rejected" title="Rejeitar"><i class="bi bi-x-lg"></i></button>
         `;
     }
-    // Se a reserva está aprovada, mostra o botão para marcar como devolvida.
+    // Se a reserva está aprovada, mostra o botão para registrar a retirada (enquanto não registrada)
+    // e o botão para marcar como devolvida.
     if (reservation.status === 'approved') {
-        let buttons = `<button class="btn btn-info btn-sm text-white admin-action-btn" data-reservation-id="${reservation.id}" data-action="returned" data-unit-identifier="${reservation.equipment_unit.identifier_code || `ID ${reservation.equipment_unit.id}`}" data-user-identifier="${reservation.user.username}" title="Marcar como Devolvido"><i class="bi bi-box-arrow-down"></i></button>`;
+        let buttons = '';
+        if (!reservation.picked_up_at) {
+            buttons += `<button class="btn btn-primary btn-sm me-1 admin-action-btn" data-reservation-id="${reservation.id}" data-action="pickup" title="Registrar Retirada"><i class="bi bi-box-arrow-up"></i></button>`;
+        }
+        buttons += `<button class="btn btn-info btn-sm text-white admin-action-btn" data-reservation-id="${reservation.id}" data-action="returned" data-unit-identifier="${reservation.equipment_unit.identifier_code || `ID ${reservation.equipment_unit.id}`}" data-user-identifier="${reservation.user.username}" title="Marcar como Devolvido"><i class="bi bi-box-arrow-down"></i></button>`;
         // Se, além de aprovada, a reserva estiver atrasada, adiciona o botão de notificação.
         if (isOverdue) {
             buttons += ` <button class="btn btn-warning btn-sm admin-action-btn" data-reservation-id="${reservation.id}" data-action="notify-overdue" title="Notificar Atraso"><i class="bi bi-envelope-at"></i></button>`;
@@ -101,7 +101,8 @@ export async function loadManageReservationsView(token, params = {}) {
         { key: 'approved', text: 'Aprovadas' },
         { key: 'overdue', text: 'Atrasadas' },
         { key: 'returned', text: 'Devolvidas' },
-        { key: 'rejected', text: 'Rejeitadas' }
+        { key: 'rejected', text: 'Rejeitadas' },
+        { key: 'expired', text: 'Expiradas' }
     ];
 
     const sortOptions = [
@@ -35,6 +35,7 @@ export function renderStatusBadge(status) {
         'approved': { bg: 'success', text: 'Aprovada' },
         'rejected': { bg: 'danger', text: 'Rejeitada' },
         'returned': { bg: 'secondary', text: 'Devolvida' },
+        'expired': { bg: 'dark', text: 'Expirada' },
         'available': { bg: 'success', text: 'Disponível' },
         'maintenance': { bg: 'warning', text: 'Manutenção' },
         'reserved': { bg: 'info', text: 'Reservado' }
@@ -224,8 +225,40 @@ export function resetUnitForm() {
     document.getElementById('cancelEditUnitBtn').classList.add('d-none');
 }
 
+/**
+ * Monta o HTML dos eventos de uma página do histórico de uma unidade.
+ * @param {Array} events - Os eventos da página.
+ * @returns {string} - Os itens da lista de eventos.
+ */
+function renderUnitHistoryItems(events) {
+    const eventTypeTranslations = {
+        created: { text: "Criação", class: "primary" },
+        returned_ok: { text: "Devolvido (OK)", class: "success" },
+        sent_to_maintenance: { text: "Manutenção", class: "danger" },
+        reservation_expired: { text: "Reserva Expirada", class: "dark" },
+        status_released: { text: "Liberada", class: "info" },
+        maintenance_completed: { text: "Reparo Concluído", class: "success" },
+        history_compacted: { text: "Resumo", class: "secondary" },
+    };
+
+    return events.map(entry => {
+        const eventInfo = eventTypeTranslations[entry.event_type] || { text: entry.event_type, class: "secondary" };
+        return `
+            <li class="list-group-item">
+                <div class="d-flex w-100 justify-content-between">
+                    <h6 class="mb-1"><span class="badge bg-${eventInfo.class}">${eventInfo.text}</span></h6>
+                    <small>${new Date(entry.created_at).toLocaleString('pt-BR')}</small>
+                </div>
+                <p class="mb-1">${entry.notes || '<i>Sem observações.</i>'}</p>
+                <small class="text-muted">Registrado por: ${entry.user ? entry.user.username : 'Sistema'}</small>
+            </li>
+        `;
+    }).join('');
+}
+
 /**
  * Abre o modal e busca o histórico de eventos de uma unidade específica.
+ * Os eventos mais antigos são carregados sob demanda, página a página.
  * @param {string} unitId - O ID da unidade.
  * @param {string} token - O token de autenticação.
  */
@@ -239,36 +272,36 @@ export async function openUnitHistoryModal(unitId, token) {
     modal.show();
 
     try {
-        const history = await apiFetch(`${API_URL}/equipments/units/${unitId}/history`, token);
-        if (history.length === 0) {
+        const page = await apiFetch(`${API_URL}/equipments/units/${unitId}/history`, token);
+        if (page.items.length === 0) {
             modalBody.innerHTML = '<p class="text-muted">Nenhum evento registrado para esta unidade.</p>';
             return;
         }
 
-        const eventTypeTranslations = {
-            created: { text: "Criação", class: "primary" },
-            returned_ok: { text: "Devolvido (OK)", class: "success" },
-            sent_to_maintenance: { text: "Manutenção", class: "danger" },
-        };
-
         // Monta a lista de eventos do histórico.
         modalBody.innerHTML = `
-            <ul class="list-group">
-                ${history.map(entry => {
-                    const eventInfo = eventTypeTranslations[entry.event_type] || { text: entry.event_type, class: "secondary" };
-                    return `
-                        <li class="list-group-item">
-                            <div class="d-flex w-100 justify-content-between">
-                                <h6 class="mb-1"><span class="badge bg-${eventInfo.class}">${eventInfo.text}</span></h6>
-                                <small>${new Date(entry.created_at).toLocaleString('pt-BR')}</small>
-                            </div>
-                            <p class="mb-1">${entry.notes || '<i>Sem observações.</i>'}</p>
-                            <small class="text-muted">Registrado por: ${entry.user ? entry.user.username : 'Sistema'}</small>
-                        </li>
-                    `;
-                }).join('')}
-            </ul>
+            <ul class="list-group" id="unitHistoryList">${renderUnitHistoryItems(page.items)}</ul>
+            <div class="text-center mt-3">
+                <button type="button" class="btn btn-outline-secondary btn-sm ${page.next_cursor ? '' : 'd-none'}" id="unitHistoryMoreBtn">Carregar mais</button>
+            </div>
         `;
+
+        // Cada clique busca a página seguinte a partir do cursor da anterior.
+        let nextCursor = page.next_cursor;
+        const moreBtn = document.getElementById('unitHistoryMoreBtn');
+        moreBtn.addEventListener('click', async () => {
+            moreBtn.disabled = true;
+            try {
+                const next = await apiFetch(`${API_URL}/equipments/units/${unitId}/history?cursor=${encodeURIComponent(nextCursor)}`, token);
+                document.getElementById('unitHistoryList').insertAdjacentHTML('beforeend', renderUnitHistoryItems(next.items));
+                nextCursor = next.next_cursor;
+                moreBtn.classList.toggle('d-none', !nextCursor);
+            } catch (e) {
+                moreBtn.insertAdjacentHTML('afterend', `<div class="alert alert-danger mt-2">${e.message}</div>`);
+            } finally {
+                moreBtn.disabled = false;
+            }
+        });
     } catch (e) {
         modalBody.innerHTML = `<div class="alert alert-danger">${e.message}</div>`;
     }
@@ -35,7 +35,8 @@ export async function loadMyReservationsView(token, params = {}) {
         { key: 'approved', text: 'Aprovadas' },
         { key: 'overdue', text: 'Atrasadas' },
         { key: 'returned', text: 'Devolvidas' },
-        { key: 'rejected', text: 'Rejeitadas' }
+        { key: 'rejected', text: 'Rejeitadas' },
+        { key: 'expired', text: 'Expiradas' }
     ];
 
     const sortOptions = [
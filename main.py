@@ -10,22 +10,47 @@ que compõem a API do sistema EquipControl.
 Dependências:
 - FastAPI: O framework principal para a construção da API.
 - CORSMiddleware: Para permitir que o frontend acesse a API.
+- app.metrics: Middleware de instrumentação (latência, tamanho das respostas e SQL por rota).
+- app.compression: Middleware de compressão gzip/Brotli das respostas.
+- app.scheduler: Para iniciar as tarefas periódicas (quando habilitadas).
+- app.audit_journal: Para fechar o diário de auditoria no desligamento.
 - Módulos de Rota (app.routes): Cada módulo contém um conjunto de endpoints
   relacionados a uma funcionalidade específica (ex: auth, users, equipments).
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
+from app.scheduler import start_scheduler, stop_scheduler
+from app.audit_journal import close_journal
+from app.metrics import MetricsMiddleware
+from app.compression import CompressionMiddleware
+from app.schemas.common import MessageOut
+
 # Importa todos os módulos de rotas da aplicação
-from app.routes import auth, equipments, reservations, admin, users, google_auth, two_factor_auth, sectors, legal, dashboard
+from app.routes import auth, equipments, reservations, admin, users, google_auth, two_factor_auth, sectors, legal, dashboard, metrics, reports, maintenance
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação: inicia as tarefas periódicas na subida do
+    servidor (se SCHEDULER_ENABLED estiver ativo) e as encerra no desligamento.
+    """
+    if settings.SCHEDULER_ENABLED:
+        start_scheduler()
+    yield
+    await stop_scheduler()
+    close_journal()
 
 # Cria a instância principal da aplicação FastAPI
 # Os metadados como 'title', 'description' e 'version' são usados na documentação automática (Swagger/OpenAPI)
 app = FastAPI(
     title="EquipControl: Sistema de Gestão de Equipamentos",
     description="API para gerenciar reservas de equipamentos.",
-    version="1.5.0"
+    version="1.5.0",
+    lifespan=lifespan
 )
 
 # Lista de origens permitidas para fazer requisições à API.
@@ -46,6 +71,22 @@ app.add_middleware(
     allow_headers=["*"],         # Permite todos os cabeçalhos HTTP
 )
 
+# Comprime as respostas grandes (JSON e texto) conforme o Accept-Encoding do cliente.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        brotli_enabled=settings.COMPRESSION_BROTLI_ENABLED
+    )
+
+# Adiciona o middleware de métricas por último, para que ele envolva os demais
+# e meça o tempo total de cada requisição (e o tamanho já comprimido das respostas).
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Inclui os roteadores na aplicação principal.
 # Cada roteador agrupa um conjunto de endpoints relacionados a uma funcionalidade.
 # Por exemplo, todos os endpoints de autenticação estão em `auth.router`.
@@ -59,9 +100,13 @@ app.include_router(google_auth.router)
 app.include_router(two_factor_auth.router)
 app.include_router(legal.router)
 app.include_router(dashboard.router)
+app.include_router(reports.router)
+app.include_router(maintenance.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
-@app.get("/", tags=["Root"])
+@app.get("/", response_model=MessageOut, tags=["Root"])
 def read_root():
     """
     Endpoint raiz da API.
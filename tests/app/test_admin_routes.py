@@ -7,12 +7,16 @@ Este módulo testa os endpoints de gerenciamento acessíveis por Gerentes e Admi
 como aprovação de reservas, gerenciamento de usuários e logs.
 """
 
+import time
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 import pytest
 from app.models.user import User
 from app.models.reservation import Reservation
 from app.models.equipment_unit import EquipmentUnit
+from app.models.activity_log import ActivityLog
+from app.models.slow_query_log import SlowQueryLog
+from app.models.sector import Sector
 
 # Fixtures: client, db_session, test_user, test_requester_user, test_manager_user,
 # test_admin_user, admin_auth_headers, manager_auth_headers, 
@@ -42,6 +46,29 @@ def test_manager_can_list_all_reservations(
     assert data["items"][0]["id"] == test_pending_reservation.id
     assert data["items"][0]["status"] == "pending"
 
+def test_manager_can_list_reservations_with_selected_fields(
+    client: TestClient,
+    manager_auth_headers: dict,
+    test_pending_reservation: Reservation
+):
+    """Testa o parâmetro `fields`: apenas os campos e objetos aninhados pedidos são retornados."""
+    fields = "id,status,user.username,equipment_unit.equipment_type"
+    response = client.get("/admin/reservations", params={"fields": fields}, headers=manager_auth_headers)
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item.keys() == {"id", "status", "user", "equipment_unit"}
+    assert item["user"] == {"username": test_pending_reservation.user.username}
+    # Objeto aninhado sem subcampos é retornado completo
+    assert item["equipment_unit"]["equipment_type"]["name"] == test_pending_reservation.equipment_unit.equipment_type.name
+    assert item["equipment_unit"].keys() == {"equipment_type"}
+
+def test_list_reservations_rejects_unknown_fields(client: TestClient, manager_auth_headers: dict):
+    """Testa se campos inexistentes no schema são rejeitados com 400."""
+    response = client.get("/admin/reservations", params={"fields": "id,user.password_hash"}, headers=manager_auth_headers)
+    assert response.status_code == 400
+    assert "user.password_hash" in response.json()["detail"]
+
 def test_manager_can_approve_reservation(
     client: TestClient, 
     manager_auth_headers: dict, 
@@ -65,7 +92,30 @@ def test_manager_can_approve_reservation(
     db_res = db_session.get(Reservation, res_id)
     db_unit = db_session.get(EquipmentUnit, unit_id)
     assert db_res.status == "approved"
-    assert db_unit.status == "reserved" # Unidade deve ser marcada como reservada
+    assert db_unit.status == "available" # O estado operacional não muda; a ocupação vem da reserva
+
+def test_status_change_is_logged_with_structured_fields(
+    client: TestClient,
+    manager_auth_headers: dict,
+    admin_auth_headers: dict,
+    test_manager_user: User,
+    test_pending_reservation: Reservation
+):
+    """Testa se a alteração de status gera um log estruturado, filtrável pela entidade."""
+    res_id = test_pending_reservation.id
+    client.patch(f"/admin/reservations/{res_id}", headers=manager_auth_headers, json={"status": "approved"})
+
+    response = client.get(
+        "/admin/logs", headers=admin_auth_headers,
+        params={"entity_type": "reservation", "entity_id": res_id, "action": "reservation.status_changed"}
+    )
+    assert response.status_code == 200
+    (log,) = response.json()["items"]
+    assert log["user_id"] == test_manager_user.id
+    assert log["payload"] == {"old_status": "pending", "new_status": "approved", "unit_id": test_pending_reservation.unit_id}
+
+    response = client.get("/admin/logs", headers=admin_auth_headers, params={"entity_type": "reservation", "entity_id": res_id + 1})
+    assert response.json()["total"] == 0
 
 def test_manager_can_reject_reservation(
     client: TestClient, 
@@ -175,4 +225,163 @@ def test_admin_cannot_delete_user_with_active_reservation(
     response = client.delete(f"/admin/users/{user_to_delete_id}", headers=admin_auth_headers)
     
     assert response.status_code == 409 # HTTP 409 Conflict
-    assert "reservas pendentes ou aprovadas" in response.json()["detail"].lower()
\ No newline at end of file
+    assert "reservas pendentes ou aprovadas" in response.json()["detail"].lower()
+def test_expired_reservation_cannot_be_reapproved(
+    client: TestClient, manager_auth_headers: dict, test_pending_reservation: Reservation, db_session: Session
+):
+    """Testa que uma reserva expirada não volta a ser aprovada (o horário pode já ter sido reservado de novo)."""
+    test_pending_reservation.status = "expired"
+    db_session.commit()
+    response = client.patch(f"/admin/reservations/{test_pending_reservation.id}", headers=manager_auth_headers, json={"status": "approved"})
+    assert response.status_code == 409
+
+def test_approving_rechecks_overlapping_reservations(
+    client: TestClient, manager_auth_headers: dict, test_pending_reservation: Reservation, db_session: Session
+):
+    """Testa que reaprovar uma reserva rejeitada cujo horário foi reservado de novo é recusado."""
+    test_pending_reservation.status = "rejected"
+    db_session.add(Reservation(
+        user_id=test_pending_reservation.user_id, unit_id=test_pending_reservation.unit_id, status="approved",
+        start_time=test_pending_reservation.start_time, end_time=test_pending_reservation.end_time
+    ))
+    db_session.commit()
+    response = client.patch(f"/admin/reservations/{test_pending_reservation.id}", headers=manager_auth_headers, json={"status": "approved"})
+    assert response.status_code == 409
+
+def test_manager_registers_pickup(
+    client: TestClient, manager_auth_headers: dict, test_approved_reservation: Reservation, test_pending_reservation: Reservation
+):
+    """Testa o registro da retirada, que só vale uma vez e apenas para reservas aprovadas."""
+    response = client.post(f"/admin/reservations/{test_approved_reservation.id}/pickup", headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["picked_up_at"] is not None
+    assert client.post(f"/admin/reservations/{test_approved_reservation.id}/pickup", headers=manager_auth_headers).status_code == 409
+    assert client.post(f"/admin/reservations/{test_pending_reservation.id}/pickup", headers=manager_auth_headers).status_code == 409
+
+def test_admin_can_bulk_update_users(
+    client: TestClient,
+    admin_auth_headers: dict,
+    test_user: User,
+    test_requester_user: User,
+    test_admin_user: User,
+    db_session: Session
+):
+    """Testa a atualização em lote de permissão, status e setor, com relatório de erros."""
+    response = client.post(
+        "/admin/users/bulk-update",
+        headers=admin_auth_headers,
+        json={"changes": [
+            {"user_id": test_user.id, "role": "requester", "sector_id": None},
+            {"user_id": test_requester_user.id, "is_active": False},
+            {"user_id": test_admin_user.id, "role": "user"}, # Admin não pode rebaixar a si mesmo
+            {"user_id": 9999, "role": "manager"}             # Usuário inexistente
+        ]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["updated"] == 2
+    assert sorted(error["user_id"] for error in data["errors"]) == [test_admin_user.id, 9999]
+
+    db_session.refresh(test_user)
+    db_session.refresh(test_requester_user)
+    assert test_user.role == "requester"
+    assert test_user.sector_id is None
+    assert test_requester_user.is_active is False
+
+    # Os logs do lote são gravados com os campos estruturados
+    logs = db_session.query(ActivityLog).filter(ActivityLog.entity_type == "user", ActivityLog.entity_id == test_requester_user.id).all()
+    assert [(log.action, log.payload) for log in logs] == [("user.status_changed", {"is_active": False, "bulk": True})]
+
+def test_bulk_update_logs_only_real_sector_changes(
+    client: TestClient,
+    admin_auth_headers: dict,
+    test_requester_user: User,
+    test_admin_user: User,
+    test_sector: Sector,
+    db_session: Session
+):
+    """Testa que o setor inalterado não gera log, o nome do setor antigo no log e o bloqueio do próprio status."""
+    other_sector = Sector(name="Laboratório")
+    db_session.add(other_sector)
+    db_session.commit()
+
+    response = client.post(
+        "/admin/users/bulk-update",
+        headers=admin_auth_headers,
+        json={"changes": [
+            {"user_id": test_requester_user.id, "sector_id": test_sector.id}, # Mesmo setor: nada a fazer
+            {"user_id": test_admin_user.id, "is_active": True}                # Próprio status: recusado
+        ]}
+    )
+    assert response.json() == {"updated": 0, "errors": [
+        {"user_id": test_admin_user.id, "detail": "Um administrador não pode inativar a própria conta."}
+    ]}
+
+    response = client.post(
+        "/admin/users/bulk-update",
+        headers=admin_auth_headers,
+        json={"changes": [{"user_id": test_requester_user.id, "sector_id": other_sector.id}]}
+    )
+    assert response.json()["updated"] == 1
+    logs = db_session.query(ActivityLog).filter(ActivityLog.action == "user.sector_changed").all()
+    assert len(logs) == 1
+    assert f"de '{test_sector.name}' para 'Laboratório'" in logs[0].message
+
+def test_admin_can_list_slow_queries(client: TestClient, admin_auth_headers: dict, db_session: Session, monkeypatch):
+    """Testa se os comandos lentos são registrados com a rota de origem e agrupados por tempo total."""
+    from app.config import settings
+    from app.slow_query_log import install_slow_query_log, uninstall_slow_query_log
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0) # Considera todo comando como lento
+    install_slow_query_log(db_session.get_bind())
+    try:
+        assert client.get("/admin/users?search=test", headers=admin_auth_headers).status_code == 200
+        response = client.get("/admin/slow-queries", headers=admin_auth_headers)
+    finally:
+        uninstall_slow_query_log(db_session.get_bind())
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data and data == sorted(data, key=lambda q: q["total_ms"], reverse=True)
+    assert any(q["route"] == "GET /admin/users" and "LIKE" in q["statement"].upper() for q in data)
+
+def test_slow_queries_are_flushed_when_the_buffer_fills(db_session: Session, monkeypatch):
+    """Testa a gravação do buffer ao atingir SLOW_QUERY_FLUSH_THRESHOLD, sem depender do agendador."""
+    from sqlalchemy.orm import sessionmaker
+    from app.config import settings
+    from app.slow_query_log import install_slow_query_log, uninstall_slow_query_log
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(settings, "SLOW_QUERY_FLUSH_THRESHOLD", 3)
+    monkeypatch.setattr("app.database.SessionLocal", sessionmaker(bind=db_session.get_bind()))
+    install_slow_query_log(db_session.get_bind())
+    try:
+        for _ in range(3):
+            db_session.query(User).count()
+    finally:
+        uninstall_slow_query_log(db_session.get_bind())
+
+    deadline = time.monotonic() + 5
+    while db_session.query(SlowQueryLog).count() < 3 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert db_session.query(SlowQueryLog).count() >= 3
+
+def test_slow_query_parameters_are_redacted_and_old_entries_purged(db_session: Session, monkeypatch):
+    """Testa que os valores dos parâmetros não são gravados por padrão e que os registros antigos são removidos."""
+    from datetime import datetime, timedelta, timezone
+    from app.config import settings
+    from app.slow_query_log import describe_parameters, purge_old_slow_queries
+
+    assert describe_parameters({"email_1": "ana@exemplo.com", "id_1": 3}) == "{'email_1': 'str', 'id_1': 'int'}"
+    assert "ana@exemplo.com" not in describe_parameters([("ana@exemplo.com", 3), ("bia@exemplo.com", 4)])
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_PARAMETERS", True)
+    assert "ana@exemplo.com" in describe_parameters({"email_1": "ana@exemplo.com"})
+
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        SlowQueryLog(fingerprint="a" * 40, statement="SELECT 1", duration_ms=500, created_at=now - timedelta(days=settings.SLOW_QUERY_RETENTION_DAYS + 1)),
+        SlowQueryLog(fingerprint="b" * 40, statement="SELECT 2", duration_ms=500, created_at=now),
+    ])
+    db_session.commit()
+    assert purge_old_slow_queries(db_session, now) == 1
+    assert [log.statement for log in db_session.query(SlowQueryLog).all()] == ["SELECT 2"]
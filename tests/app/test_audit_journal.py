@@ -0,0 +1,201 @@
+# tests/app/test_audit_journal.py
+
+"""
+Testes do Diário de Auditoria (app/audit_journal.py, a gravação pelo
+app/logging_utils.py e as rotas /admin/audit-journal)
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.activity_log import ActivityLog
+from app.logging_utils import create_log, create_logs, LogEntry
+from app.audit_journal import (
+    AuditJournal, SEGMENT_HEADER, RECORD_HEADER, close_journal, iter_records, list_segments, scan_journal, verify_journal
+)
+
+# Fixtures: client, db_session, admin_auth_headers
+
+T0 = datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def journal_dir(tmp_path, monkeypatch):
+    """Habilita o diário de auditoria em um diretório temporário."""
+    monkeypatch.setattr(settings, "AUDIT_JOURNAL_ENABLED", True)
+    monkeypatch.setattr(settings, "AUDIT_JOURNAL_DIR", str(tmp_path / "journal"))
+    close_journal()
+    yield tmp_path / "journal"
+    close_journal()
+
+def _entry(i: int, **fields) -> dict:
+    return {"level": "INFO", "message": f"Evento {i}", "user_id": None, "action": "unit.updated", "entity_type": "unit", "entity_id": i, **fields}
+
+def test_entries_are_chained_across_segments(journal_dir):
+    """Testa a gravação, a rotação dos segmentos e a verificação da cadeia."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=400)
+    for i in range(10):
+        journal.append([_entry(i)], T0 + timedelta(minutes=i))
+    journal.close()
+
+    assert len(list_segments(journal_dir)) > 1
+    assert [record.entry["entity_id"] for record in iter_records(journal_dir)] == list(range(10))
+    result = verify_journal(journal_dir)
+    assert result.ok
+    assert result.records == 10
+
+def test_tampering_breaks_the_chain(journal_dir):
+    """Testa que alterar um único byte de um registro é detectado."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=1024 * 1024)
+    journal.append([_entry(i) for i in range(3)], T0)
+    journal.close()
+
+    (_, path), = list_segments(journal_dir)
+    data = bytearray(path.read_bytes())
+    position = data.index(b"Evento 1")
+    data[position:position + 8] = b"Evento 9"
+    path.write_bytes(bytes(data))
+
+    result = verify_journal(journal_dir)
+    assert not result.ok
+    assert result.records == 1
+    assert result.offset > SEGMENT_HEADER.size
+
+def test_removed_segment_is_detected(journal_dir):
+    """Testa que a remoção de um segmento inteiro quebra a cadeia."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=300)
+    for i in range(6):
+        journal.append([_entry(i)], T0)
+    journal.close()
+
+    segments = list_segments(journal_dir)
+    segments[0][1].unlink()
+    assert not verify_journal(journal_dir).ok
+
+def test_removed_tail_is_detected_by_the_anchor(journal_dir):
+    """Testa que remover os últimos registros (mantendo a cadeia íntegra) é detectado pela âncora."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=300)
+    for i in range(6):
+        journal.append([_entry(i)], T0)
+    journal.close()
+    assert verify_journal(journal_dir).ok
+
+    # Remove o último segmento inteiro: o restante da cadeia continua válido
+    segments = list_segments(journal_dir)
+    segments[-1][1].unlink()
+    result = verify_journal(journal_dir)
+    assert not result.ok
+    assert "âncora" in result.error
+
+    # Um novo escritor não apaga a evidência atualizando a âncora
+    journal = AuditJournal(journal_dir, segment_max_bytes=300)
+    journal.append([_entry(6)], T0)
+    journal.close()
+    assert not verify_journal(journal_dir).ok
+
+def test_missing_anchor_is_detected(journal_dir):
+    """Testa que um diário com registros e sem a âncora não passa na verificação."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=1024 * 1024)
+    journal.append([_entry(0)], T0)
+    journal.close()
+
+    (journal_dir / "journal.head").unlink()
+    assert not verify_journal(journal_dir).ok
+
+def test_writers_share_the_journal_and_torn_tail_is_discarded(journal_dir):
+    """Testa dois escritores no mesmo diário e o descarte de um registro incompleto."""
+    first = AuditJournal(journal_dir, segment_max_bytes=1024 * 1024)
+    second = AuditJournal(journal_dir, segment_max_bytes=1024 * 1024)
+    first.append([_entry(0)], T0)
+    second.append([_entry(1)], T0)
+    first.append([_entry(2)], T0)
+    second.close()
+
+    # Simula uma gravação interrompida no meio de um registro
+    (_, path), = list_segments(journal_dir)
+    with open(path, "ab") as segment:
+        segment.write(RECORD_HEADER.pack(100, 0, bytes(32))[:10])
+    first.close()
+
+    third = AuditJournal(journal_dir, segment_max_bytes=1024 * 1024)
+    third.append([_entry(3)], T0)
+    third.close()
+
+    assert [record.entry["entity_id"] for record in iter_records(journal_dir)] == [0, 1, 2, 3]
+    assert verify_journal(journal_dir).ok
+
+def test_timestamps_never_go_back(journal_dir):
+    """Testa que um escritor com um instante atrasado não quebra a ordem cronológica do diário."""
+    first = AuditJournal(journal_dir, segment_max_bytes=300)
+    second = AuditJournal(journal_dir, segment_max_bytes=300)
+    first.append([_entry(0)], T0 + timedelta(minutes=5))
+    second.append([_entry(1)], T0)
+    for i in range(2, 6):
+        first.append([_entry(i)], T0 + timedelta(minutes=i))
+    second.append([_entry(6)], T0 + timedelta(minutes=1))
+    first.close()
+    second.close()
+
+    timestamps = [record.timestamp for record in iter_records(journal_dir)]
+    assert len(list_segments(journal_dir)) > 1
+    assert timestamps == sorted(timestamps)
+    assert timestamps[-1] == T0 + timedelta(minutes=5)
+    in_window = iter_records(journal_dir, start=T0 + timedelta(minutes=5))
+    assert [record.entry["entity_id"] for record in in_window] == list(range(7))
+    assert verify_journal(journal_dir).ok
+
+def test_filtered_scan(journal_dir):
+    """Testa a busca por período e pelos campos estruturados."""
+    journal = AuditJournal(journal_dir, segment_max_bytes=500)
+    for i in range(12):
+        journal.append([_entry(i, level="WARNING" if i % 3 == 0 else "INFO")], T0 + timedelta(hours=i))
+    journal.close()
+
+    in_window = scan_journal(journal_dir, start=T0 + timedelta(hours=2), end=T0 + timedelta(hours=7))
+    assert [record.entry["entity_id"] for record in in_window] == [2, 3, 4, 5, 6, 7]
+    warnings = scan_journal(journal_dir, level="warning")
+    assert [record.entry["entity_id"] for record in warnings] == [0, 3, 6, 9]
+    (record,) = scan_journal(journal_dir, entity_type="unit", entity_id=5)
+    assert record.timestamp == T0 + timedelta(hours=5)
+
+def test_logs_go_to_the_journal_with_the_table_disabled(db_session: Session, journal_dir, monkeypatch):
+    """Testa a gravação pelos utilitários de log, sem a tabela do banco."""
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_DB_ENABLED", False)
+    create_log(db_session, None, "info", "Unidade atualizada", action="unit.updated", entity_type="unit", entity_id=7, payload={"fields": ["status"]})
+    create_logs(db_session, [LogEntry(None, "warning", "Unidades liberadas", action="unit.released")])
+
+    assert db_session.query(ActivityLog).count() == 0
+    entries = [record.entry for record in iter_records(journal_dir)]
+    assert [(entry["level"], entry["action"]) for entry in entries] == [("INFO", "unit.updated"), ("WARNING", "unit.released")]
+    assert entries[0]["payload"] == {"fields": ["status"]}
+
+def test_audit_journal_routes(client: TestClient, db_session: Session, admin_auth_headers: dict, journal_dir):
+    """Testa a exportação em JSON Lines e a verificação pela API."""
+    create_logs(db_session, [LogEntry(None, "INFO", f"Evento {i}", action="sector.created", entity_type="sector", entity_id=i) for i in range(3)])
+
+    response = client.get("/admin/audit-journal/export", headers=admin_auth_headers, params={"entity_type": "sector", "entity_id": 1})
+    assert response.status_code == 200
+    (line,) = response.text.splitlines()
+    assert json.loads(line)["message"] == "Evento 1"
+
+    response = client.get("/admin/audit-journal/verify", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["ok"] is True
+    assert response.json()["records"] >= 3
+
+def test_audit_journal_routes_require_the_journal(client: TestClient, admin_auth_headers: dict, monkeypatch):
+    """Testa que as rotas respondem 404 com o diário desabilitado."""
+    monkeypatch.setattr(settings, "AUDIT_JOURNAL_ENABLED", False)
+    assert client.get("/admin/audit-journal/verify", headers=admin_auth_headers).status_code == 404
+
+def test_activity_log_routes_require_the_table(client: TestClient, admin_auth_headers: dict, monkeypatch):
+    """Testa que a listagem e a exportação dos logs respondem 404 com a tabela desabilitada."""
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_DB_ENABLED", False)
+    response = client.get("/admin/logs", headers=admin_auth_headers)
+    assert response.status_code == 404
+    assert "/admin/audit-journal/export" in response.json()["detail"]
+    assert client.get("/admin/logs/export", headers=admin_auth_headers).status_code == 404
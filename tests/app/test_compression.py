@@ -0,0 +1,99 @@
+# tests/app/test_compression.py
+
+"""
+Testes do Middleware de Compressão das Respostas (app/compression.py)
+
+Verifica a escolha da codificação a partir do Accept-Encoding, o limite de
+tamanho mínimo, a lista de tipos de conteúdo comprimíveis e a compressão
+incremental das respostas em streaming (exportação de logs).
+"""
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.compression import choose_encoding
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+
+# --- Escolha da codificação ---
+
+def test_choose_encoding_respects_quality_values():
+    """Testa a escolha pela qualidade (q) declarada e a recusa explícita com q=0."""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert choose_encoding("br, gzip", brotli_enabled=False) == "gzip"
+
+def test_choose_encoding_prefers_brotli():
+    """Testa se o Brotli é preferido quando o cliente aceita as duas codificações."""
+    pytest.importorskip("brotli")
+    assert choose_encoding("gzip, deflate, br") == "br"
+
+# --- Middleware ---
+
+@pytest.fixture
+def many_logs(db_session: Session, test_admin_user: User):
+    """Cria logs suficientes para que a listagem ultrapasse o tamanho mínimo de compressão."""
+    db_session.add_all([
+        ActivityLog(user_id=test_admin_user.id, level="INFO", message=f"Mensagem de teste número {i} para a compressão.")
+        for i in range(60)
+    ])
+    db_session.commit()
+
+def test_large_json_response_is_gzipped(client: TestClient, admin_auth_headers: dict, many_logs):
+    """Testa se uma listagem JSON grande é comprimida com gzip."""
+    response = client.get("/admin/logs", headers={**admin_auth_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    # O httpx descomprime o corpo automaticamente
+    assert response.json()["total"] >= 60
+    assert int(response.headers["content-length"]) < len(response.content)
+
+def test_large_json_response_uses_brotli(client: TestClient, admin_auth_headers: dict, many_logs):
+    """Testa se o Brotli é usado quando aceito pelo cliente."""
+    pytest.importorskip("brotli")
+    response = client.get("/admin/logs", headers={**admin_auth_headers, "Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json()["total"] >= 60
+
+def test_small_response_is_not_compressed(client: TestClient):
+    """Testa se respostas abaixo do tamanho mínimo são enviadas sem compressão."""
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+def test_response_without_accept_encoding_is_not_compressed(client: TestClient, admin_auth_headers: dict, many_logs):
+    """Testa se nenhuma compressão é aplicada quando o cliente não a aceita."""
+    response = client.get("/admin/logs", headers={**admin_auth_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json()["total"] >= 60
+
+def test_non_allowed_content_type_is_not_compressed(client: TestClient):
+    """Testa se tipos fora da lista permitida (ex: imagem PNG) não são comprimidos."""
+    response = client.get("/2fa/qr-code", params={"provisioning_uri": "otpauth://totp/EquipControl:teste?secret=ABC"}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert "content-encoding" not in response.headers
+
+def test_streaming_export_is_compressed_incrementally(client: TestClient, admin_auth_headers: dict, many_logs, monkeypatch):
+    """
+    Testa se a exportação de logs (resposta em streaming) é comprimida bloco a
+    bloco: sem Content-Length e com um fluxo gzip válido contendo todos os logs.
+    """
+    monkeypatch.setattr("app.routes.admin.LOG_EXPORT_BATCH_SIZE", 7)
+    with client.stream("GET", "/admin/logs/export", headers={**admin_auth_headers, "Accept-Encoding": "gzip"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+
+    report = gzip.decompress(raw).decode("utf-8")
+    assert "RELATÓRIO DE AUDITORIA" in report
+    assert all(f"Mensagem de teste número {i} para" in report for i in range(60))
@@ -0,0 +1,211 @@
+# tests/app/test_dashboard_routes.py
+
+"""
+Testes do Painel de Análise (app/routes/dashboard.py) e dos Agregados de
+Reservas (app/rollups.py e app/jobs/rollup_backfill.py)
+
+Este módulo verifica se os agregados são mantidos nas escritas de reservas
+(criação, mudança de status e expiração automática) e nas mudanças de setor
+dos usuários, se o recálculo produz
+os mesmos baldes e se o painel é montado a partir deles.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.sector import Sector
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation_rollup import ReservationRollup
+from app.models.user_reservation_rollup import UserReservationRollup
+from app.jobs.reservation_sweeper import sweep_reservations
+from app.jobs.rollup_backfill import backfill_rollups, refresh_recent_rollups
+
+# Fixtures: client, db_session, test_requester_user, requester_auth_headers, manager_auth_headers,
+# admin_auth_headers, test_equipment_unit
+
+@pytest.fixture(autouse=True)
+def mock_background_tasks(monkeypatch):
+    """Mocka as funções de segundo plano para não executá-las."""
+    monkeypatch.setattr("app.routes.reservations.task_send_creation_emails", lambda reservation_id: None)
+    monkeypatch.setattr("app.routes.admin.approve_and_create_calendar_event", lambda reservation_id: None)
+    monkeypatch.setattr("app.routes.admin.task_send_reservation_email", lambda reservation_id, email_type: None)
+
+def _create_reservation(client: TestClient, headers: dict, unit_id: int, start: datetime, hours: int = 2) -> dict:
+    response = client.post("/reservations/", headers=headers, json={
+        "unit_id": unit_id, "start_time": start.isoformat(), "end_time": (start + timedelta(hours=hours)).isoformat()
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def _buckets(db: Session) -> dict:
+    """Baldes não vazios, indexados por (hora de início, status)."""
+    db.expire_all()
+    return {
+        (row.start_hour, row.status): (row.reservation_count, row.reserved_hours)
+        for row in db.query(ReservationRollup).filter(ReservationRollup.reservation_count != 0)
+    }
+
+def _user_buckets(db: Session) -> dict:
+    """Baldes por usuário não vazios, indexados por usuário."""
+    db.expire_all()
+    return {
+        row.user_id: row.reservation_count
+        for row in db.query(UserReservationRollup).filter(UserReservationRollup.reservation_count != 0)
+    }
+
+def test_rollups_follow_reservation_writes(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, manager_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit
+):
+    """Testa se a criação e a aprovação de uma reserva atualizam os baldes na mesma transação."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    reservation = _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start, hours=3)
+    assert _buckets(db_session) == {(9, "pending"): (1, 3.0)}
+
+    response = client.patch(f"/admin/reservations/{reservation['id']}", headers=manager_auth_headers, json={"status": "approved"})
+    assert response.status_code == 200
+    assert _buckets(db_session) == {(9, "approved"): (1, 3.0)}
+
+def test_sweeper_moves_expired_reservations_between_buckets(
+    db_session: Session, test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa se a expiração automática atualiza os baldes."""
+    now = datetime.now(timezone.utc)
+    start = (now - timedelta(hours=5)).replace(minute=0, second=0, microsecond=0)
+    db_session.add(Reservation(user_id=test_requester_user.id, unit_id=test_equipment_unit.id, status="pending",
+                               start_time=start, end_time=start + timedelta(hours=1)))
+    db_session.commit()
+    backfill_rollups(db_session)
+    assert _buckets(db_session) == {(start.hour, "pending"): (1, 1.0)}
+
+    sweep_reservations(db_session, now=now)
+    assert _buckets(db_session) == {(start.hour, "expired"): (1, 1.0)}
+
+def test_refresh_matches_incremental_rollups(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, manager_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit
+):
+    """Testa se o recálculo a partir das reservas produz os mesmos baldes das atualizações incrementais."""
+    base = (datetime.now(timezone.utc) + timedelta(days=3)).replace(hour=8, minute=0, second=0, microsecond=0)
+    first = _create_reservation(client, requester_auth_headers, test_equipment_unit.id, base)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, base + timedelta(days=1, hours=6))
+    client.patch(f"/admin/reservations/{first['id']}", headers=manager_auth_headers, json={"status": "rejected"})
+    incremental = _buckets(db_session)
+
+    assert refresh_recent_rollups(db_session) == 2
+    assert _buckets(db_session) == incremental
+
+def test_dashboard_reads_rollups(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, admin_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit
+):
+    """Testa se o painel é montado a partir dos baldes, inclusive os gráficos por hora e por semana."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=14, minute=0, second=0, microsecond=0)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start, hours=2)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start + timedelta(days=1), hours=4)
+
+    response = client.get("/dashboard/stats", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["total_reservations"] == 2
+    assert data["top_equipments"] == [{"name": test_equipment_unit.equipment_type.name, "count": 2}]
+    assert data["top_sectors"][0]["count"] == 2
+    assert data["reservation_status_counts"] == [{"name": "Pendentes", "count": 2}]
+    assert sum(item["count"] for item in data["reservations_by_day"]) == 2
+    assert sum(item["count"] for item in data["reservations_by_week"]) == 2
+    assert len(data["reservations_by_hour"]) == 24
+    assert data["reservations_by_hour"][14] == {"name": "14h", "count": 2, "reserved_hours": 6.0}
+
+def test_dashboard_user_filter_aggregates_reservations(
+    client: TestClient, requester_auth_headers: dict, admin_auth_headers: dict,
+    test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa o filtro por usuário, que agrega as reservas diretamente (os baldes não têm essa dimensão)."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start)
+
+    data = client.get(f"/dashboard/stats?user_id={test_requester_user.id}", headers=admin_auth_headers).json()
+    assert data["total_reservations"] == 1
+    assert data["top_users"] == [{"name": test_requester_user.username, "count": 1}]
+    assert data["reservations_by_hour"][10]["count"] == 1
+
+    other = client.get(f"/dashboard/stats?user_id={test_requester_user.id + 1000}", headers=admin_auth_headers).json()
+    assert other["total_reservations"] == 0
+
+def test_dashboard_date_range_filters_by_day(
+    client: TestClient, requester_auth_headers: dict, admin_auth_headers: dict, test_equipment_unit: EquipmentUnit
+):
+    """Testa se o período do painel é aplicado aos dias dos baldes."""
+    start = datetime.now(timezone.utc) + timedelta(days=2)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start)
+
+    tomorrow = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    data = client.get("/dashboard/stats", headers=admin_auth_headers, params={"start_date": tomorrow}).json()
+    assert data["total_reservations"] == 0
+
+def test_top_users_read_user_rollups(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, manager_auth_headers: dict,
+    admin_auth_headers: dict, test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa o ranking de usuários a partir dos baldes por usuário, que o recálculo reproduz."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    first = _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start)
+    _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start + timedelta(days=1))
+    # A mudança de status não altera a contagem do usuário
+    client.patch(f"/admin/reservations/{first['id']}", headers=manager_auth_headers, json={"status": "rejected"})
+    assert _user_buckets(db_session) == {test_requester_user.id: 2}
+
+    data = client.get("/dashboard/stats", headers=admin_auth_headers).json()
+    assert data["top_users"] == [{"name": test_requester_user.username, "count": 2}]
+    other_type = client.get(f"/dashboard/stats?equipment_type_id={test_equipment_unit.type_id + 1000}", headers=admin_auth_headers).json()
+    assert other_type["top_users"] == []
+
+    refresh_recent_rollups(db_session)
+    assert _user_buckets(db_session) == {test_requester_user.id: 2}
+
+def test_cascade_deletes_are_subtracted_from_rollups(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, manager_auth_headers: dict,
+    admin_auth_headers: dict, test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa que as reservas removidas junto com o usuário são descontadas dos baldes."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=11, minute=0, second=0, microsecond=0)
+    reservation = _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start)
+    client.patch(f"/admin/reservations/{reservation['id']}", headers=manager_auth_headers, json={"status": "rejected"})
+    assert _buckets(db_session) == {(11, "rejected"): (1, 2.0)}
+
+    assert client.delete(f"/admin/users/{test_requester_user.id}", headers=admin_auth_headers).status_code == 204
+    assert _buckets(db_session) == {}
+    assert _user_buckets(db_session) == {}
+
+def test_sector_change_moves_rollups_before_later_status_changes(
+    client: TestClient, db_session: Session, requester_auth_headers: dict, manager_auth_headers: dict,
+    admin_auth_headers: dict, test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa que mudar o setor do usuário move as suas reservas, e que uma aprovação posterior não gera baldes negativos."""
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=13, minute=0, second=0, microsecond=0)
+    reservation = _create_reservation(client, requester_auth_headers, test_equipment_unit.id, start)
+    old_sector_id = test_requester_user.sector_id
+    new_sector = Sector(name="Laboratório")
+    db_session.add(new_sector)
+    db_session.commit()
+
+    response = client.patch(f"/admin/users/{test_requester_user.id}/sector", headers=admin_auth_headers, json={"sector_id": new_sector.id})
+    assert response.status_code == 200
+    client.patch(f"/admin/reservations/{reservation['id']}", headers=manager_auth_headers, json={"status": "approved"})
+
+    db_session.expire_all()
+    rows = db_session.query(ReservationRollup).filter(ReservationRollup.reservation_count != 0).all()
+    assert {(row.sector_id, row.status): row.reservation_count for row in rows} == {(new_sector.id, "approved"): 1}
+    user_rows = db_session.query(UserReservationRollup).filter(UserReservationRollup.reservation_count != 0).all()
+    assert [(row.sector_id, row.reservation_count) for row in user_rows] == [(new_sector.id, 1)]
+    assert old_sector_id != new_sector.id
+
+    incremental = _buckets(db_session)
+    refresh_recent_rollups(db_session)
+    assert _buckets(db_session) == incremental
@@ -7,6 +7,8 @@ Testa o CRUD de Tipos de Equipamentos e Unidades de Equipamentos,
 verificando as permissões de acesso (usuário vs. gerente).
 """
 
+import json
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.models.equipment_type import EquipmentType
@@ -63,6 +65,65 @@ def test_get_type_with_units_as_user(client: TestClient, auth_headers: dict, tes
     assert data["units"][0]["id"] == test_equipment_unit.id
     assert data["units"][0]["identifier_code"] == "NTB-TEST-001"
 
+def test_type_detail_shows_only_the_active_reservation(
+    client: TestClient, auth_headers: dict, manager_auth_headers: dict, db_session: Session,
+    test_equipment_unit: EquipmentUnit, test_approved_reservation: Reservation, monkeypatch
+):
+    """Testa a reserva ativa de cada unidade e a invalidação do detalhe em cache."""
+    monkeypatch.setattr("app.routes.admin.task_send_reservation_email", lambda reservation_id, email_type: None)
+    now = datetime.now(timezone.utc)
+    # Histórico que não deve aparecer como reserva ativa
+    db_session.add_all([
+        Reservation(user_id=test_approved_reservation.user_id, unit_id=test_equipment_unit.id,
+                    start_time=now - timedelta(days=d + 1), end_time=now - timedelta(days=d), status=status)
+        for d, status in ((3, "returned"), (5, "rejected"), (7, "expired"))
+    ])
+    db_session.commit()
+    url = f"/equipments/types/{test_equipment_unit.type_id}"
+
+    unit = client.get(url, headers=auth_headers).json()["units"][0]
+    assert unit["active_reservation"]["end_time"].startswith(test_approved_reservation.end_time.strftime("%Y-%m-%dT%H:%M"))
+    assert unit["active_reservation"]["user"]["id"] == test_approved_reservation.user_id
+
+    # A alteração da unidade pela API descarta o detalhe em cache
+    response = client.put(f"/equipments/units/{test_equipment_unit.id}", headers=manager_auth_headers, json={"identifier_code": "NTB-NOVO"})
+    assert response.status_code == 200
+    assert client.get(url, headers=auth_headers).json()["units"][0]["identifier_code"] == "NTB-NOVO"
+
+    # A aprovação/devolução da reserva também
+    response = client.patch(
+        f"/admin/reservations/{test_approved_reservation.id}", headers=manager_auth_headers,
+        json={"status": "returned", "return_status": "ok", "return_notes": "OK"}
+    )
+    assert response.status_code == 200
+    assert client.get(url, headers=auth_headers).json()["units"][0]["active_reservation"] is None
+
+def test_get_unknown_type_returns_404(client: TestClient, auth_headers: dict):
+    """Testa o detalhe de um tipo inexistente."""
+    assert client.get("/equipments/types/9999", headers=auth_headers).status_code == 404
+
+def test_unit_availability_is_derived_from_reservations(
+    client: TestClient, auth_headers: dict, db_session: Session,
+    test_equipment_unit: EquipmentUnit, test_approved_reservation: Reservation
+):
+    """Testa se o catálogo conta como reservada apenas a unidade ocupada neste momento."""
+    # A reserva do fixture é futura: a unidade continua disponível agora
+    item = client.get("/equipments/types", headers=auth_headers).json()["items"][0]
+    assert (item["available_units"], item["reserved_units"]) == (1, 0)
+
+    # Uma reserva aprovada em andamento ocupa a unidade
+    now = datetime.now(timezone.utc)
+    db_session.add(Reservation(
+        user_id=test_approved_reservation.user_id, unit_id=test_equipment_unit.id,
+        start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1), status="approved"
+    ))
+    db_session.commit()
+
+    item = client.get("/equipments/types", headers=auth_headers).json()["items"][0]
+    assert (item["available_units"], item["reserved_units"]) == (0, 1)
+    units = client.get(f"/equipments/types/{test_equipment_unit.type_id}", headers=auth_headers).json()["units"]
+    assert units[0]["status"] == "reserved"
+
 def test_manager_can_delete_type(client: TestClient, manager_auth_headers: dict, test_equipment_type: EquipmentType):
     """Testa se um gerente pode deletar um tipo de equipamento (sem reservas)."""
     response = client.delete(f"/equipments/types/{test_equipment_type.id}", headers=manager_auth_headers)
@@ -139,6 +200,59 @@ def test_get_unit_history(client: TestClient, manager_auth_headers: dict, test_e
     response = client.get(f"/equipments/units/{new_unit_id}/history", headers=manager_auth_headers)
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 1
-    assert data[0]["event_type"] == "created"
-    assert data[0]["unit_id"] == new_unit_id
\ No newline at end of file
+    assert data["next_cursor"] is None
+    assert len(data["items"]) == 1
+    assert data["items"][0]["event_type"] == "created"
+    assert data["items"][0]["unit_id"] == new_unit_id
+def test_manager_can_import_units_from_csv(
+    client: TestClient,
+    manager_auth_headers: dict,
+    test_equipment_type: EquipmentType,
+    db_session: Session
+):
+    """Testa a importação em lote via CSV, com o histórico de criação de cada unidade."""
+    csv_content = (
+        "identifier_code,serial_number,status\n"
+        "IMP-001,SN-IMP-001,available\n"
+        "IMP-002,SN-IMP-002,maintenance\n"
+    )
+    response = client.post(
+        f"/equipments/units/import?type_id={test_equipment_type.id}",
+        headers=manager_auth_headers,
+        files={"file": ("units.csv", csv_content, "text/csv")}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_rows"] == 2
+    assert data["created"] == 2
+    assert data["errors"] == []
+
+    unit = db_session.query(EquipmentUnit).filter(EquipmentUnit.identifier_code == "IMP-002").first()
+    assert unit.status == "maintenance"
+    assert len(unit.history) == 1
+    assert unit.history[0].event_type == "created"
+
+def test_import_units_reports_duplicates(
+    client: TestClient,
+    manager_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit # Unidade "NTB-TEST-001" já existe
+):
+    """Testa o relatório de erros para duplicidades no arquivo e contra o banco."""
+    rows = [
+        {"identifier_code": "NTB-TEST-001", "serial_number": "SN-NEW-001"}, # Código já existe no banco
+        {"identifier_code": "IMP-010", "serial_number": "SN-IMP-010"},
+        {"identifier_code": "IMP-010", "serial_number": "SN-IMP-011"},      # Código duplicado no arquivo
+        {"identifier_code": "IMP-012", "serial_number": "SN-IMP-012", "type_id": 9999}, # Tipo inexistente
+    ]
+    response = client.post(
+        f"/equipments/units/import?type_id={test_equipment_unit.type_id}",
+        headers=manager_auth_headers,
+        files={"file": ("units.json", json.dumps(rows), "application/json")}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_rows"] == 4
+    assert data["created"] == 1
+    assert [error["row"] for error in data["errors"]] == [1, 3, 4]
+    assert "já está em uso" in data["errors"][0]["detail"]
+    assert "duplicado no arquivo" in data["errors"][1]["detail"]
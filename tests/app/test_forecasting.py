@@ -0,0 +1,120 @@
+# tests/app/test_forecasting.py
+
+"""
+Testes da Previsão de Demanda (app/forecasting.py, app/jobs/demand_forecast.py
+e a rota /dashboard/forecast)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.models.reservation import Reservation
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.demand_forecast import DemandForecast
+from app.forecasting import SEASON_LENGTH, fit_and_forecast, load_weekly_history, week_start
+from app.jobs.demand_forecast import train_demand_forecasts
+
+# Fixtures: client, db_session, test_requester_user, test_equipment_type, test_equipment_unit,
+# admin_auth_headers, manager_auth_headers
+
+NOW = datetime(2025, 6, 4, 12, 0, tzinfo=timezone.utc)  # Uma quarta-feira
+
+def test_seasonal_series_are_forecast_with_holt_winters():
+    """Testa se séries com picos anuais recorrentes são previstas com a sazonalidade."""
+    weeks = np.arange(3 * SEASON_LENGTH)
+    seasonal = 5 + 4 * (weeks % SEASON_LENGTH < 4)  # Pico nas 4 primeiras semanas de cada ano
+    series = np.vstack((seasonal, seasonal * 2, np.full(len(weeks), 3.0)))
+
+    forecast = fit_and_forecast(series, horizon=6)
+
+    assert forecast.model == "holt_winters"
+    assert forecast.values.shape == (3, 6)
+    # As 4 primeiras semanas previstas são o início de um novo ano (pico)
+    assert np.allclose(forecast.values[0, :4], 9, atol=0.5)
+    assert np.allclose(forecast.values[0, 4:], 5, atol=0.5)
+    assert np.allclose(forecast.values[1, :4], 18, atol=1.0)
+    assert np.allclose(forecast.values[2], 3, atol=0.01)
+
+def test_short_history_uses_damped_trend():
+    """Testa se séries curtas usam apenas nível e tendência, sem previsões negativas."""
+    growing = np.arange(20, dtype=float)
+    shrinking = np.arange(20, 0, -1, dtype=float)
+
+    forecast = fit_and_forecast(np.vstack((growing, shrinking)), horizon=4)
+
+    assert forecast.model == "holt"
+    assert np.all(np.diff(forecast.values[0]) > 0)
+    assert forecast.values[0, 0] > 19
+    assert np.all(forecast.values >= 0)
+
+def _reserve(db: Session, user: User, unit: EquipmentUnit, start: datetime, hours: int, status: str = "approved"):
+    db.add(Reservation(user_id=user.id, unit_id=unit.id, start_time=start, end_time=start + timedelta(hours=hours), status=status))
+
+def test_weekly_history_counts_peaks_and_reservations(
+    db_session: Session, test_requester_user: User, test_equipment_type: EquipmentType, test_equipment_unit: EquipmentUnit
+):
+    """Testa a montagem do pico semanal de simultaneidade e das reservas por semana."""
+    second_unit = EquipmentUnit(type_id=test_equipment_type.id, identifier_code="NTB-TEST-002", serial_number="SN-TEST-002", status="available")
+    db_session.add(second_unit)
+    db_session.commit()
+
+    last_week = datetime.combine(week_start(NOW) - timedelta(weeks=1), datetime.min.time(), tzinfo=timezone.utc)
+    # Semana passada: duas reservas simultâneas (pico 2) e uma terceira depois
+    _reserve(db_session, test_requester_user, test_equipment_unit, last_week + timedelta(hours=9), 4)
+    _reserve(db_session, test_requester_user, second_unit, last_week + timedelta(hours=10), 4)
+    _reserve(db_session, test_requester_user, test_equipment_unit, last_week + timedelta(days=2), 2)
+    # Rejeitada: não é demanda
+    _reserve(db_session, test_requester_user, second_unit, last_week + timedelta(days=3), 2, status="rejected")
+    db_session.commit()
+
+    history = load_weekly_history(db_session, weeks=4, now=NOW)
+
+    assert history.type_ids == [test_equipment_type.id]
+    assert history.peak.tolist() == [[0, 0, 0, 2]]
+    assert history.reservations.tolist() == [[0, 0, 0, 3]]
+
+def test_training_job_and_forecast_route(
+    client: TestClient, db_session: Session, admin_auth_headers: dict, monkeypatch,
+    test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa o treinamento agendado e a leitura das previsões pela rota do painel."""
+    monkeypatch.setattr(settings, "FORECAST_HISTORY_WEEKS", 12)
+    monkeypatch.setattr(settings, "FORECAST_HORIZON_WEEKS", 3)
+    # Todas as semanas do histórico com 2 reservas simultâneas, para uma única unidade
+    for week in range(1, 13):
+        start = datetime.combine(week_start(NOW) - timedelta(weeks=week), datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+        _reserve(db_session, test_requester_user, test_equipment_unit, start, 3)
+        _reserve(db_session, test_requester_user, test_equipment_unit, start + timedelta(hours=1), 3)
+    db_session.commit()
+
+    assert train_demand_forecasts(db_session, now=NOW) == 3
+    # O treinamento substitui as previsões anteriores
+    assert train_demand_forecasts(db_session, now=NOW) == 3
+    assert db_session.query(DemandForecast).count() == 3
+
+    response = client.get("/dashboard/forecast", headers=admin_auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["generated_at"] is not None
+    (forecast,) = data["types"]
+    assert forecast["total_units"] == 1
+    assert forecast["model"] == "holt"
+    assert round(forecast["peak_demand"]) == 2
+    assert forecast["shortfall_units"] == 1
+    assert [week["week_start"] for week in forecast["weeks"]] == [
+        (week_start(NOW) + timedelta(weeks=step)).isoformat() for step in range(3)
+    ]
+
+def test_forecast_route_before_training(client: TestClient, admin_auth_headers: dict, manager_auth_headers: dict):
+    """Testa a rota antes do primeiro treinamento e o acesso restrito a administradores."""
+    response = client.get("/dashboard/forecast", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"generated_at": None, "types": []}
+
+    assert client.get("/dashboard/forecast", headers=manager_auth_headers).status_code == 403
@@ -0,0 +1,127 @@
+# tests/app/test_jobs.py
+
+"""
+Testes das Tarefas Agendadas (app/jobs/)
+
+Este módulo executa as tarefas periódicas diretamente sobre a sessão de
+banco de dados de teste, sem iniciar o agendador, verificando os efeitos
+de cada rodada.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation_notification import ReservationNotification
+from app.jobs.overdue_reminders import send_overdue_reminders
+from app.jobs.reservation_sweeper import sweep_reservations
+
+# Fixtures: db_session, test_requester_user, test_equipment_unit, test_pending_reservation
+
+def _create_reservation(db: Session, user: User, unit: EquipmentUnit, status: str, start: datetime, end: datetime) -> Reservation:
+    """Função auxiliar para criar uma reserva diretamente no banco de teste."""
+    reservation = Reservation(user_id=user.id, unit_id=unit.id, start_time=start, end_time=end, status=status)
+    db.add(reservation)
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+# --- Testes da Tarefa de Lembretes de Atraso ---
+
+def test_overdue_reminders_are_sent_only_once(db_session: Session, test_requester_user: User, test_equipment_unit: EquipmentUnit):
+    """Testa se o lembrete de atraso é enviado uma única vez por reserva."""
+    now = datetime.now(timezone.utc)
+    overdue = _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now - timedelta(days=3), now - timedelta(days=1))
+    _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now + timedelta(days=1), now + timedelta(days=2))
+
+    sent_to = []
+    async def fake_send(reminder):
+        sent_to.append(reminder.reservation_id)
+        assert reminder.recipient == test_requester_user.email
+        assert reminder.template_body["unit_identifier"] == test_equipment_unit.identifier_code
+
+    assert asyncio.run(send_overdue_reminders(db_session, send_email=fake_send)) == 1
+    assert sent_to == [overdue.id]
+
+    # Uma segunda execução não deve reenviar o lembrete
+    assert asyncio.run(send_overdue_reminders(db_session, send_email=fake_send)) == 0
+    assert sent_to == [overdue.id]
+
+def test_failed_overdue_reminder_is_retried(db_session: Session, test_requester_user: User, test_equipment_unit: EquipmentUnit):
+    """Testa se um envio que falhou é liberado para a próxima execução."""
+    now = datetime.now(timezone.utc)
+    overdue = _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now - timedelta(days=3), now - timedelta(days=1))
+
+    async def failing_send(reminder):
+        raise RuntimeError("SMTP indisponível")
+
+    assert asyncio.run(send_overdue_reminders(db_session, send_email=failing_send)) == 0
+    assert db_session.query(ReservationNotification).filter_by(reservation_id=overdue.id).count() == 0
+
+# --- Testes da Varredura de Reservas Pendentes ---
+
+def test_sweeper_expires_stale_pending_reservations(db_session: Session, test_requester_user: User, test_equipment_unit: EquipmentUnit):
+    """Testa se uma reserva pendente cujo início já passou é expirada, liberando o horário."""
+    now = datetime.now(timezone.utc)
+    stale = _create_reservation(db_session, test_requester_user, test_equipment_unit, "pending", now - timedelta(hours=2), now + timedelta(hours=4))
+
+    result = sweep_reservations(db_session, now=now)
+    assert result["expired_reservations"] == 1
+
+    db_session.expire_all()
+    assert db_session.get(Reservation, stale.id).status == "expired"
+    assert db_session.get(EquipmentUnit, test_equipment_unit.id).status == "available"
+    assert [h.event_type for h in test_equipment_unit.history] == ["reservation_expired"]
+
+def test_sweeper_keeps_pending_reservations_within_sla(db_session: Session, test_pending_reservation: Reservation):
+    """Testa se uma reserva pendente dentro do prazo não é alterada."""
+    result = sweep_reservations(db_session)
+    assert result == {"expired_reservations": 0, "no_show_reservations": 0, "released_units": 0}
+
+    db_session.refresh(test_pending_reservation)
+    assert test_pending_reservation.status == "pending"
+
+def test_sweeper_expires_approved_reservations_that_were_not_picked_up(
+    db_session: Session, test_requester_user: User, test_equipment_unit: EquipmentUnit
+):
+    """Testa se uma reserva aprovada sem retirada expira após a tolerância, e uma retirada não."""
+    now = datetime.now(timezone.utc)
+    no_show = _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now - timedelta(hours=2), now + timedelta(hours=2))
+    picked_up = _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now - timedelta(hours=2), now + timedelta(hours=2))
+    just_started = _create_reservation(db_session, test_requester_user, test_equipment_unit, "approved", now - timedelta(minutes=10), now + timedelta(hours=2))
+    picked_up.picked_up_at = now - timedelta(hours=2)
+    db_session.commit()
+
+    result = sweep_reservations(db_session, now=now)
+    assert result["no_show_reservations"] == 1
+
+    db_session.expire_all()
+    assert db_session.get(Reservation, no_show.id).status == "expired"
+    assert db_session.get(Reservation, picked_up.id).status == "approved"
+    assert db_session.get(Reservation, just_started.id).status == "approved"
+
+
+# --- Testes do Agendador ---
+
+def test_scheduler_runs_jobs_off_the_event_loop():
+    """Testa se a rodada da tarefa (lock, execução e liberação) roda fora do event loop."""
+    import threading
+    from app.scheduler import PeriodicJob, run_job_once
+
+    seen = []
+
+    def sync_job(db):
+        seen.append(("sync", threading.current_thread() is threading.main_thread()))
+
+    async def async_job(db):
+        seen.append(("async", threading.current_thread() is threading.main_thread()))
+
+    async def run_round():
+        await run_job_once(PeriodicJob("test_sync_job", 60, sync_job))
+        await run_job_once(PeriodicJob("test_async_job", 60, async_job, per_process=True))
+
+    asyncio.run(run_round())
+    assert seen == [("sync", False), ("async", False)]
@@ -0,0 +1,116 @@
+# tests/app/test_log_partitions.py
+
+"""
+Testes da Retenção dos Logs de Atividade (app/log_partitions.py)
+
+O banco de teste (SQLite) não tem particionamento: os testes cobrem os nomes
+e intervalos das partições mensais, os comandos da criação de uma partição
+(com uma sessão que apenas os registra) e o arquivamento por consultas comuns.
+"""
+
+import csv
+import gzip
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.models.activity_log import ActivityLog
+from app.log_partitions import (
+    add_months, month_bounds, partition_name, partition_month, retention_cutoff, maintain_activity_logs, _create_partition
+)
+
+# Fixtures: db_session, test_admin_user
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    """Grava os arquivos de arquivamento em um diretório temporário."""
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_ARCHIVE_DIR", str(tmp_path / "log_archive"))
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_RETENTION_MONTHS", 3)
+    return tmp_path / "log_archive"
+
+def test_partition_names_and_bounds():
+    """Testa os nomes, os meses e os intervalos das partições mensais."""
+    assert partition_name(date(2025, 3, 1)) == "activity_logs_p2025_03"
+    assert partition_month("activity_logs_p2025_03") == date(2025, 3, 1)
+    assert partition_month("activity_logs_default") is None
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert month_bounds(date(2025, 12, 1)) == (
+        datetime(2025, 12, 1, tzinfo=timezone.utc), datetime(2026, 1, 1, tzinfo=timezone.utc)
+    )
+
+class RecordingSession:
+    """Sessão falsa que registra os comandos SQL e responde às consultas da partição padrão."""
+
+    def __init__(self, default_has_rows: bool):
+        self.default_has_rows = default_has_rows
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        result = type("Result", (), {"rowcount": 3})()
+        if sql.startswith("SELECT to_regclass"):
+            result.scalar = lambda: "activity_logs_default"
+        elif sql.startswith("SELECT EXISTS"):
+            result.scalar = lambda: self.default_has_rows
+        return result
+
+def test_create_partition_moves_rows_out_of_the_default_partition():
+    """Testa que os logs do mês na partição padrão são movidos para a nova partição."""
+    db = RecordingSession(default_has_rows=False)
+    _create_partition(db, date(2025, 6, 1))
+    assert db.statements[-1].startswith("CREATE TABLE IF NOT EXISTS activity_logs_p2025_06 PARTITION OF activity_logs")
+
+    db = RecordingSession(default_has_rows=True)
+    _create_partition(db, date(2025, 6, 1))
+    commands = [sql.split(" activity_logs")[0] for sql in db.statements[2:]]
+    assert commands == ["ALTER TABLE", "CREATE TABLE IF NOT EXISTS", "WITH moved AS (DELETE FROM", "ALTER TABLE"]
+    assert "DETACH PARTITION activity_logs_default" in db.statements[2]
+    assert "INSERT INTO activity_logs_p2025_06" in db.statements[4]
+    assert db.statements[5].endswith("ATTACH PARTITION activity_logs_default DEFAULT")
+
+def test_retention_cutoff(archive_dir):
+    """Testa que o mês atual e os ACTIVITY_LOG_RETENTION_MONTHS meses anteriores são mantidos."""
+    assert retention_cutoff(NOW) == date(2025, 3, 1)
+
+def test_expired_months_are_archived_and_removed(db_session: Session, test_admin_user: User, archive_dir):
+    """Testa que os meses fora da retenção vão para arquivos .csv.gz e saem do banco."""
+    db_session.add_all([
+        ActivityLog(user_id=test_admin_user.id, level="INFO", message="Login, de janeiro", created_at=datetime(2025, 1, 10, tzinfo=timezone.utc)),
+        ActivityLog(user_id=None, level="ERROR", message="Falha de janeiro", created_at=datetime(2025, 1, 31, 23, 59, tzinfo=timezone.utc)),
+        ActivityLog(user_id=test_admin_user.id, level="INFO", message="Login de fevereiro", created_at=datetime(2025, 2, 1, tzinfo=timezone.utc)),
+        ActivityLog(user_id=test_admin_user.id, level="INFO", message="Login de março", created_at=datetime(2025, 3, 1, tzinfo=timezone.utc)),
+        ActivityLog(user_id=test_admin_user.id, level="INFO", message="Login de junho", created_at=datetime(2025, 6, 1, tzinfo=timezone.utc)),
+    ])
+    db_session.commit()
+
+    assert maintain_activity_logs(db_session, now=NOW) == 2
+
+    remaining = [log.message for log in db_session.query(ActivityLog).order_by(ActivityLog.created_at)]
+    assert remaining == ["Login de março", "Login de junho"]
+    assert sorted(path.name for path in archive_dir.iterdir()) == ["activity_logs_2025_01.csv.gz", "activity_logs_2025_02.csv.gz"]
+
+    with gzip.open(archive_dir / "activity_logs_2025_01.csv.gz", "rt", encoding="utf-8", newline="") as archive:
+        rows = list(csv.reader(archive))
+    assert rows[0] == ["id", "user_id", "level", "message", "created_at", "action", "entity_type", "entity_id", "payload"]
+    assert [row[3] for row in rows[1:]] == ["Login, de janeiro", "Falha de janeiro"]
+    assert rows[2][1] == ""
+
+    # Uma nova rodada não encontra mais nada para arquivar
+    assert maintain_activity_logs(db_session, now=NOW) == 0
+
+def test_archiving_the_same_month_twice_keeps_both_files(db_session: Session, archive_dir):
+    """Testa que linhas antigas que chegam depois não sobrescrevem o arquivo do mês."""
+    for message in ("Primeira", "Segunda"):
+        db_session.add(ActivityLog(level="INFO", message=message, created_at=datetime(2024, 12, 5, tzinfo=timezone.utc)))
+        db_session.commit()
+        assert maintain_activity_logs(db_session, now=NOW) == 1
+
+    assert sorted(path.name for path in archive_dir.iterdir()) == ["activity_logs_2024_12.1.csv.gz", "activity_logs_2024_12.csv.gz"]
+    assert db_session.query(ActivityLog).count() == 0
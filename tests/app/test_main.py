@@ -53,4 +53,77 @@ def test_get_privacy_policy():
     assert response.status_code == 200
     # Verifica se o conteúdo é HTML e contém o título da página
     assert "text/html" in response.headers["content-type"]
-    assert "<title>Política de Privacidade - EquipControl</title>" in response.text
\ No newline at end of file
+    assert "<title>Política de Privacidade - EquipControl</title>" in response.text
+def test_metrics_endpoint_reports_route_latency_and_sql(client: TestClient, auth_headers: dict):
+    """
+    Testa o endpoint de métricas (/metrics).
+
+    Após uma requisição autenticada a uma rota com parâmetros, as métricas
+    devem usar o modelo da rota como rótulo e contabilizar os comandos SQL.
+    """
+    from app.metrics import registry
+    registry.reset()
+
+    assert client.get("/equipments/types/999", headers=auth_headers).status_code == 404
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    labels = 'method="GET",route="/equipments/types/{type_id}"'
+    assert f'http_requests_total{{{labels},status="404"}} 1' in response.text
+    assert f"http_request_duration_seconds_count{{{labels}}} 1" in response.text
+    sql_line = next(line for line in response.text.splitlines() if line.startswith(f"db_statements_total{{{labels}}}"))
+    assert int(sql_line.split()[-1]) > 0
+
+def test_metrics_stop_before_background_tasks():
+    """
+    Testa se a medição da requisição termina no envio da resposta.
+
+    As tarefas em segundo plano rodam depois da resposta: elas não podem ver
+    as estatísticas da requisição (nem somar comandos SQL à rota) e a
+    requisição já deve constar como concluída quando elas executam.
+    """
+    from fastapi import BackgroundTasks, FastAPI
+    from app.metrics import MetricsMiddleware, active_request_stats, registry
+    registry.reset()
+    seen = {}
+
+    def background_job():
+        seen["stats"] = active_request_stats()
+        seen["in_progress"] = registry.in_progress
+        seen["finished"] = sum(registry.requests_total.values())
+
+    mini_app = FastAPI()
+    mini_app.add_middleware(MetricsMiddleware)
+
+    @mini_app.get("/with-task")
+    def with_task(background_tasks: BackgroundTasks):
+        seen["during"] = active_request_stats()
+        background_tasks.add_task(background_job)
+        return {"ok": True}
+
+    assert TestClient(mini_app).get("/with-task").status_code == 200
+    assert seen["during"] is not None
+    assert seen["stats"] is None
+    assert seen["in_progress"] == 0
+    assert seen["finished"] == 1
+    assert registry.in_progress == 0
+    assert sum(registry.requests_total.values()) == 1
+
+def test_all_json_routes_declare_a_response_model():
+    """
+    Testa se todas as rotas JSON declaram um schema de resposta.
+
+    Com o schema declarado, o FastAPI serializa o retorno diretamente em bytes
+    JSON pelo pydantic-core; sem ele, a resposta passa pelo caminho lento de
+    `jsonable_encoder` + `json.dumps` (e aparece sem schema na documentação).
+    """
+    untyped = [
+        f"{method.upper()} {path}"
+        for path, operations in app.openapi()["paths"].items()
+        for method, operation in operations.items()
+        for code, response in operation["responses"].items()
+        if code.startswith("2") and "application/json" in response.get("content", {})
+        and not response["content"]["application/json"].get("schema")
+    ]
+    assert untyped == []
@@ -0,0 +1,162 @@
+# tests/app/test_maintenance.py
+
+"""
+Testes dos Chamados de Manutenção (app/maintenance.py e as rotas /maintenance)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.reservation import Reservation
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.unit_history import UnitHistory
+from app.models.maintenance_ticket import MaintenanceTicket
+from app.models.maintenance_rollup import MaintenanceRollup
+from app.maintenance import close_ticket, maintenance_stats
+
+# Fixtures: client, db_session, test_manager_user, test_equipment_type, test_equipment_unit,
+# test_approved_reservation, manager_auth_headers, auth_headers
+
+@pytest.fixture(autouse=True)
+def mock_background_tasks(monkeypatch):
+    """Evita o envio de e-mails ao devolver reservas."""
+    monkeypatch.setattr("app.routes.admin.task_send_reservation_email", lambda reservation_id, email_type: None)
+
+def _add_units(db: Session, equipment_type: EquipmentType, count: int) -> list[EquipmentUnit]:
+    units = [
+        EquipmentUnit(type_id=equipment_type.id, identifier_code=f"MNT-{i}", serial_number=f"SN-MNT-{i}", status="available")
+        for i in range(count)
+    ]
+    db.add_all(units)
+    db.commit()
+    return units
+
+def test_defective_return_opens_a_ticket(
+    client: TestClient, db_session: Session, manager_auth_headers: dict,
+    test_approved_reservation: Reservation, test_equipment_unit: EquipmentUnit
+):
+    """Testa a abertura automática do chamado na devolução com defeito e o fechamento, que libera a unidade."""
+    response = client.patch(
+        f"/admin/reservations/{test_approved_reservation.id}", headers=manager_auth_headers,
+        json={"status": "returned", "return_status": "maintenance", "return_notes": "Tela quebrada"}
+    )
+    assert response.status_code == 200
+
+    (ticket,) = client.get("/maintenance/tickets", headers=manager_auth_headers).json()["items"]
+    assert ticket["unit_id"] == test_equipment_unit.id
+    assert ticket["reservation_id"] == test_approved_reservation.id
+    assert ticket["description"] == "Tela quebrada"
+    assert ticket["priority_label"] == "normal"
+    db_session.refresh(test_equipment_unit)
+    assert test_equipment_unit.status == "maintenance"
+
+    response = client.post(f"/maintenance/tickets/{ticket['id']}/close", headers=manager_auth_headers, json={"resolution_notes": "Tela trocada"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "closed"
+    assert response.json()["closed_at"] is not None
+
+    db_session.refresh(test_equipment_unit)
+    assert test_equipment_unit.status == "available"
+    last_event = db_session.query(UnitHistory).order_by(UnitHistory.id.desc()).first()
+    assert last_event.event_type == "maintenance_completed"
+    assert db_session.query(MaintenanceRollup).one().tickets_closed == 1
+
+    # Um chamado fechado não pode ser fechado de novo
+    assert client.post(f"/maintenance/tickets/{ticket['id']}/close", headers=manager_auth_headers, json={}).status_code == 409
+    assert client.get("/maintenance/tickets", headers=manager_auth_headers).json()["total"] == 0
+
+def test_ok_return_keeps_a_unit_with_an_open_ticket_in_maintenance(
+    client: TestClient, db_session: Session, manager_auth_headers: dict,
+    test_approved_reservation: Reservation, test_equipment_unit: EquipmentUnit
+):
+    """Testa que a devolução sem defeito não libera uma unidade com chamado em aberto."""
+    response = client.post("/maintenance/tickets", headers=manager_auth_headers, json={"unit_id": test_equipment_unit.id, "description": "Revisão"})
+    assert response.status_code == 201
+
+    response = client.patch(
+        f"/admin/reservations/{test_approved_reservation.id}", headers=manager_auth_headers,
+        json={"status": "returned", "return_status": "ok", "return_notes": "Sem avarias"}
+    )
+    assert response.status_code == 200
+    db_session.refresh(test_equipment_unit)
+    assert test_equipment_unit.status == "maintenance"
+    (ticket,) = client.get("/maintenance/tickets", headers=manager_auth_headers).json()["items"]
+    assert ticket["status"] == "open"
+
+def test_queue_orders_by_priority_and_age(
+    client: TestClient, db_session: Session, manager_auth_headers: dict, test_manager_user: User, test_equipment_type: EquipmentType
+):
+    """Testa a fila por prioridade (e idade) e por idade, a atribuição e o chamado duplicado."""
+    units = _add_units(db_session, test_equipment_type, 3)
+    for unit, priority in zip(units, ("low", "urgent", "low")):
+        response = client.post("/maintenance/tickets", headers=manager_auth_headers, json={"unit_id": unit.id, "priority": priority})
+        assert response.status_code == 201
+    # Datas de abertura distintas: a primeira unidade é a mais antiga
+    for age, ticket in enumerate(db_session.query(MaintenanceTicket).order_by(MaintenanceTicket.id.desc())):
+        ticket.opened_at = datetime.now(timezone.utc) - timedelta(hours=age + 1)
+    db_session.commit()
+
+    by_priority = client.get("/maintenance/tickets", headers=manager_auth_headers).json()["items"]
+    assert [t["unit_id"] for t in by_priority] == [units[1].id, units[0].id, units[2].id]
+    by_age = client.get("/maintenance/tickets?order=age", headers=manager_auth_headers).json()["items"]
+    assert [t["unit_id"] for t in by_age] == [units[0].id, units[1].id, units[2].id]
+
+    ticket_id = by_priority[0]["id"]
+    response = client.patch(f"/maintenance/tickets/{ticket_id}", headers=manager_auth_headers,
+                            json={"assignee_id": test_manager_user.id, "in_progress": True, "priority": "high"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["assignee"]["id"] == test_manager_user.id
+    assert response.json()["priority_label"] == "high"
+
+    assert client.post("/maintenance/tickets", headers=manager_auth_headers, json={"unit_id": units[0].id}).status_code == 409
+    assert client.get("/maintenance/tickets?order=random", headers=manager_auth_headers).status_code == 400
+
+def test_manual_status_change_opens_and_closes_tickets(
+    client: TestClient, db_session: Session, manager_auth_headers: dict, test_equipment_unit: EquipmentUnit
+):
+    """Testa que a troca manual do status da unidade abre e fecha o chamado."""
+    url = f"/equipments/units/{test_equipment_unit.id}"
+    assert client.put(url, headers=manager_auth_headers, json={"status": "maintenance"}).status_code == 200
+    ticket = db_session.query(MaintenanceTicket).one()
+    assert ticket.closed_at is None
+
+    assert client.put(url, headers=manager_auth_headers, json={"status": "available"}).status_code == 200
+    db_session.refresh(ticket)
+    assert ticket.status == "closed"
+    assert ticket.resolution_notes == "Unidade liberada manualmente."
+
+def test_stats_read_turnaround_from_rollups(
+    client: TestClient, db_session: Session, manager_auth_headers: dict, auth_headers: dict,
+    test_manager_user: User, test_equipment_type: EquipmentType
+):
+    """Testa as métricas da fila atual e do tempo médio de reparo do período."""
+    units = _add_units(db_session, test_equipment_type, 3)
+    now = datetime.now(timezone.utc)
+    tickets = [
+        MaintenanceTicket(unit_id=unit.id, status="open", priority=priority, opened_at=now - timedelta(hours=hours))
+        for unit, priority, hours in zip(units, (0, 2, 2), (10, 4, 30))
+    ]
+    db_session.add_all(tickets)
+    db_session.commit()
+    for ticket in tickets[:2]:
+        close_ticket(db_session, ticket, closed_by_id=test_manager_user.id, now=now)
+    db_session.commit()
+
+    response = client.get("/maintenance/stats", headers=manager_auth_headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["open_tickets"] == 1
+    assert stats["open_by_priority"] == {"urgent": 0, "high": 0, "normal": 1, "low": 0}
+    assert stats["tickets_closed"] == 2
+    assert stats["avg_repair_hours"] == pytest.approx(7.0, abs=0.01)
+    assert stats["by_type"] == [{"type_id": test_equipment_type.id, "type_name": test_equipment_type.name, "tickets_closed": 2, "avg_repair_hours": pytest.approx(7.0, abs=0.01)}]
+
+    # Fora do período, nenhum fechamento
+    assert maintenance_stats(db_session, now.date() - timedelta(days=10), now.date() - timedelta(days=5)).tickets_closed == 0
+    assert client.get("/maintenance/stats", headers=auth_headers).status_code == 403
@@ -0,0 +1,112 @@
+# tests/app/test_popularity.py
+
+"""
+Testes do Ranking de Popularidade (app/popularity.py e a rota /equipments/stats/popular)
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.models.reservation_rollup import ReservationRollup
+from app.popularity import RANKING_SIZE, PopularityIndex, popularity_index
+
+# Fixtures: client, db_session, test_equipment_type, test_equipment_unit, auth_headers, requester_auth_headers
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture(autouse=True)
+def mock_background_tasks(monkeypatch):
+    """Evita o envio de e-mails ao criar reservas pela API."""
+    monkeypatch.setattr("app.routes.reservations.task_send_creation_emails", lambda reservation_id: None)
+
+def _rollup(db: Session, type_id: int, day: date, count: int, status: str = "approved"):
+    db.add(ReservationRollup(day=day, start_hour=9, equipment_type_id=type_id, sector_id=0, status=status,
+                             reservation_count=count, reserved_hours=count * 2.0))
+
+def test_windows_count_only_recent_days(db_session: Session):
+    """Testa as contagens e a ordem de cada janela, carregadas dos agregados."""
+    today = NOW.date()
+    _rollup(db_session, 1, today - timedelta(days=200), 50)   # Só conta em "all"
+    _rollup(db_session, 2, today - timedelta(days=20), 8)     # Entra em 30d e 90d
+    _rollup(db_session, 2, today - timedelta(days=20), 2, status="rejected")
+    _rollup(db_session, 3, today - timedelta(days=6), 4)      # Primeiro dia da janela de 7 dias
+    _rollup(db_session, 4, today - timedelta(days=7), 30)     # Fora da janela de 7 dias
+    db_session.commit()
+
+    index = PopularityIndex()
+    assert index.top(db_session, "all", now=NOW) == [(1, 50), (4, 30), (2, 10), (3, 4)]
+    assert index.top(db_session, "90d", now=NOW) == [(4, 30), (2, 10), (3, 4)]
+    assert index.top(db_session, "30d", now=NOW) == [(4, 30), (2, 10), (3, 4)]
+    assert index.top(db_session, "7d", now=NOW) == [(3, 4)]
+
+def test_recorded_reservations_update_the_ranking_incrementally(db_session: Session):
+    """Testa a atualização do ranking em memória, sem recarregar, e o limite de tipos mantidos."""
+    for type_id in range(1, RANKING_SIZE + 2):
+        _rollup(db_session, type_id, NOW.date(), 10 + type_id)
+    db_session.commit()
+
+    index = PopularityIndex()
+    index.load(db_session, now=NOW)
+    ranking = index.top(db_session, "7d", now=NOW)
+    assert len(ranking) == RANKING_SIZE
+    assert ranking[0] == (RANKING_SIZE + 1, RANKING_SIZE + 11)
+    assert (1, 11) not in ranking
+
+    # O tipo 1 passa à frente dos demais sem nova consulta aos agregados
+    db_session.query(ReservationRollup).delete()
+    db_session.commit()
+    for _ in range(RANKING_SIZE + 1):
+        index.record(1, NOW)
+    assert index.top(db_session, "7d", now=NOW)[0] == (1, RANKING_SIZE + 12)
+
+    # Uma reserva antiga conta apenas no histórico completo
+    top_type = RANKING_SIZE + 1
+    index.record(top_type, NOW - timedelta(days=10))
+    assert dict(index.top(db_session, "all", now=NOW))[top_type] == RANKING_SIZE + 12
+    assert dict(index.top(db_session, "7d", now=NOW))[top_type] == RANKING_SIZE + 11
+
+    # Na virada do dia, o índice é recarregado dos agregados
+    assert index.top(db_session, "7d", now=NOW + timedelta(days=1)) == []
+
+def test_popular_route_uses_window_and_new_reservations(
+    client: TestClient, db_session: Session, auth_headers: dict, requester_auth_headers: dict,
+    test_equipment_type: EquipmentType, test_equipment_unit: EquipmentUnit
+):
+    """Testa a rota com janelas e a entrada de um tipo no ranking após uma nova reserva."""
+    old_type = EquipmentType(name="Projetor Antigo", category="Projetor")
+    db_session.add(old_type)
+    db_session.commit()
+    _rollup(db_session, old_type.id, datetime.now(timezone.utc).date() - timedelta(days=60), 3)
+    db_session.commit()
+
+    response = client.get("/equipments/stats/popular", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()] == ["Projetor Antigo"]
+    assert client.get("/equipments/stats/popular?window=30d", headers=auth_headers).json() == []
+
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    response = client.post("/reservations/", headers=requester_auth_headers, json={
+        "unit_id": test_equipment_unit.id, "start_time": start.isoformat(), "end_time": (start + timedelta(hours=2)).isoformat()
+    })
+    assert response.status_code == 201
+    assert popularity_index.top(db_session, "30d") == [(test_equipment_type.id, 1)]
+
+    response = client.get("/equipments/stats/popular?window=30d", headers=auth_headers)
+    assert [t["name"] for t in response.json()] == ["Notebook Teste"]
+
+    # Tipos removidos deixam o ranking
+    db_session.delete(old_type)
+    db_session.commit()
+    response = client.get("/equipments/stats/popular", headers=auth_headers)
+    assert [t["name"] for t in response.json()] == ["Notebook Teste"]
+
+def test_popular_route_rejects_unknown_window(client: TestClient, auth_headers: dict):
+    """Testa a validação do parâmetro `window`."""
+    response = client.get("/equipments/stats/popular?window=1y", headers=auth_headers)
+    assert response.status_code == 400
+    assert "7d" in response.json()["detail"]
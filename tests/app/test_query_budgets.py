@@ -0,0 +1,97 @@
+# tests/app/test_query_budgets.py
+
+"""
+Testes de Orçamento de Consultas (app/query_budget.py)
+
+Este módulo verifica que as rotas de listagem mais usadas executam uma
+quantidade fixa de comandos SQL, independentemente de quantas reservas,
+unidades e usuários distintos estejam envolvidos (ausência de N+1).
+"""
+
+import logging
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.reservation import Reservation
+from app.models.equipment_unit import EquipmentUnit
+from app.query_budget import QueryBudgetExceeded, enable_lazy_load_logging, disable_lazy_load_logging
+
+# Fixtures: client, db_session, query_budget, manager_auth_headers, test_equipment_unit,
+# test_user, test_requester_user, test_manager_user
+
+# Comandos executados pela autenticação em toda rota protegida (blacklist + usuário).
+AUTH_QUERIES = 2
+
+@pytest.fixture
+def many_reservations(db_session: Session, test_equipment_unit: EquipmentUnit, test_user: User, test_requester_user: User, test_manager_user: User):
+    """Cria várias unidades do mesmo tipo, com reservas de usuários diferentes."""
+    now = datetime.now(timezone.utc)
+    for i, user in enumerate([test_user, test_requester_user, test_manager_user] * 2):
+        unit = EquipmentUnit(type_id=test_equipment_unit.type_id, identifier_code=f"NTB-BUDGET-{i}", serial_number=f"SN-BUDGET-{i}")
+        db_session.add(unit)
+        db_session.flush()
+        db_session.add(Reservation(user_id=user.id, unit_id=unit.id, start_time=now + timedelta(days=i + 1), end_time=now + timedelta(days=i + 2), status="approved"))
+    db_session.commit()
+    db_session.expire_all()
+
+def test_admin_reservations_query_budget(client: TestClient, manager_auth_headers: dict, many_reservations, query_budget):
+    """A listagem de reservas deve usar uma contagem e uma consulta, com os relacionamentos carregados em conjunto."""
+    with query_budget(AUTH_QUERIES + 2):
+        response = client.get("/admin/reservations", headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 6
+
+def test_admin_reservations_projection_fetches_only_requested_fields(client: TestClient, manager_auth_headers: dict, many_reservations, query_budget):
+    """Com `fields`, a consulta deve buscar apenas as colunas e relacionamentos pedidos, sem carregamentos lazy."""
+    with query_budget(AUTH_QUERIES + 2) as counter:
+        response = client.get("/admin/reservations", params={"fields": "id,status,user.username"}, headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert response.json()["items"][0].keys() == {"id", "status", "user"}
+
+    select_sql = counter.statements[-1].lower()
+    assert "join users" in select_sql
+    assert "sectors" not in select_sql and "equipment_units" not in select_sql and "google_oauth_tokens" not in select_sql
+    assert "users.email" not in select_sql and "reservations.created_at" not in select_sql
+
+def test_user_history_query_budget(client: TestClient, manager_auth_headers: dict, many_reservations, test_requester_user: User, query_budget):
+    """O histórico de um usuário não deve carregar setor ou token do Google separadamente."""
+    url = f"/admin/users/{test_requester_user.id}/history"
+    with query_budget(AUTH_QUERIES + 2): # Verificação de existência do usuário + reservas
+        response = client.get(url, headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+def test_type_with_units_query_budget(client: TestClient, manager_auth_headers: dict, many_reservations, test_equipment_unit: EquipmentUnit, query_budget):
+    """O detalhe de um tipo deve carregar unidades, reservas ativas e usuários sem consultas por linha."""
+    url = f"/equipments/types/{test_equipment_unit.type_id}"
+    with query_budget(AUTH_QUERIES + 3): # Tipo e unidades + reservas ativas e usuários + unidades ocupadas agora
+        response = client.get(url, headers=manager_auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["units"]) == 7
+
+    # A segunda requisição é respondida pelo cache do detalhe do tipo
+    with query_budget(AUTH_QUERIES):
+        assert client.get(url, headers=manager_auth_headers).json() == response.json()
+
+def test_query_budget_reports_statements_when_exceeded(db_session: Session, test_user: User, query_budget):
+    """O contador deve falhar listando os comandos executados quando o orçamento é excedido."""
+    with pytest.raises(QueryBudgetExceeded, match="orçamento: 1"):
+        with query_budget(1):
+            db_session.query(User).all()
+            db_session.query(Reservation).all()
+
+def test_lazy_load_logging(db_session: Session, test_user: User, caplog):
+    """No modo de homologação, um carregamento lazy deve ser registrado com a pilha de chamadas."""
+    db_session.expire_all()
+    user = db_session.get(User, test_user.id)
+    enable_lazy_load_logging()
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.query_budget"):
+            user.reservations
+    finally:
+        disable_lazy_load_logging()
+    assert "Carregamento lazy em User" in caplog.text
+    assert "test_lazy_load_logging" in caplog.text
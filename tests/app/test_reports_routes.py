@@ -0,0 +1,186 @@
+# tests/app/test_reports_routes.py
+
+"""
+Testes de Integração para os Relatórios de Reservas (app/routes/reports.py,
+app/reports.py e app/jobs/report_worker.py)
+
+Este módulo testa o fluxo completo de um relatório: a solicitação pela API,
+o processamento pelo worker, o acompanhamento, o download do arquivo e a
+remoção dos arquivos expirados.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.report_job import ReportJob
+from app.models.reservation import Reservation
+from app.jobs.report_worker import process_pending_reports, requeue_stale_jobs
+from app.reports import RENDERERS, purge_expired_reports, report_file_path
+
+# Fixtures: client, db_session, test_admin_user, admin_auth_headers, manager_auth_headers,
+# test_pending_reservation, test_approved_reservation
+
+@pytest.fixture(autouse=True)
+def reports_storage(tmp_path, monkeypatch):
+    """Grava os arquivos dos relatórios em um diretório temporário."""
+    monkeypatch.setattr(settings, "REPORTS_STORAGE_DIR", str(tmp_path / "reports"))
+    return tmp_path / "reports"
+
+def _report_period() -> dict:
+    now = datetime.now(timezone.utc)
+    return {"start_date": (now - timedelta(days=30)).isoformat(), "end_date": (now + timedelta(days=1)).isoformat()}
+
+def _request_report(client: TestClient, headers: dict, **body) -> dict:
+    response = client.post("/reports/", headers=headers, json={**_report_period(), **body})
+    assert response.status_code == 202, response.text
+    return response.json()
+
+def test_request_report_is_queued(client: TestClient, admin_auth_headers: dict):
+    """Testa se a solicitação entra na fila, sem gerar o arquivo na requisição."""
+    data = _request_report(client, admin_auth_headers, format="csv")
+
+    assert data["status"] == "queued"
+    assert data["format"] == "csv"
+    assert data["finished_at"] is None
+
+def test_csv_report_flow(
+    client: TestClient, db_session: Session, admin_auth_headers: dict,
+    test_pending_reservation: Reservation, test_approved_reservation: Reservation
+):
+    """Testa o fluxo completo: solicitação, processamento pelo worker, acompanhamento e download do CSV."""
+    job_id = _request_report(client, admin_auth_headers, format="csv")["id"]
+
+    assert process_pending_reports(db_session) == 1
+
+    data = client.get(f"/reports/{job_id}", headers=admin_auth_headers).json()
+    assert data["status"] == "completed"
+    assert data["file_size"] > 0
+    assert data["expires_at"] is not None
+
+    response = client.get(f"/reports/{job_id}/download", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    content = response.content.decode("utf-8-sig")
+    assert "Total;2" in content
+    assert "Pendentes;1" in content
+    assert "Aprovadas;1" in content
+
+def test_pdf_report_flow(client: TestClient, db_session: Session, admin_auth_headers: dict, test_approved_reservation: Reservation):
+    """Testa a geração e o download de um relatório em PDF."""
+    job_id = _request_report(client, admin_auth_headers, format="pdf")["id"]
+    process_pending_reports(db_session)
+
+    response = client.get(f"/reports/{job_id}/download", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF-1.4")
+    assert response.content.rstrip().endswith(b"%%EOF")
+
+def test_report_filters_by_equipment_type(
+    client: TestClient, db_session: Session, admin_auth_headers: dict,
+    test_approved_reservation: Reservation, test_equipment_type
+):
+    """Testa se o filtro por tipo de equipamento é aplicado no relatório."""
+    job_id = _request_report(client, admin_auth_headers, format="csv", type_id=test_equipment_type.id)["id"]
+    process_pending_reports(db_session)
+
+    content = client.get(f"/reports/{job_id}/download", headers=admin_auth_headers).content.decode("utf-8-sig")
+    assert f"Tipo de equipamento: {test_equipment_type.name}" in content
+    assert "Total;1" in content
+
+def test_download_before_completion_returns_409(client: TestClient, admin_auth_headers: dict):
+    """Testa que o download de um relatório ainda na fila é recusado."""
+    job_id = _request_report(client, admin_auth_headers, format="csv")["id"]
+
+    response = client.get(f"/reports/{job_id}/download", headers=admin_auth_headers)
+    assert response.status_code == 409
+
+def test_expired_reports_are_purged(client: TestClient, db_session: Session, admin_auth_headers: dict):
+    """Testa se a tarefa de retenção remove o arquivo e se o download passa a retornar 410."""
+    job_id = _request_report(client, admin_auth_headers, format="csv")["id"]
+    process_pending_reports(db_session)
+    job = db_session.get(ReportJob, job_id)
+    path = report_file_path(job)
+    assert path.is_file()
+
+    later = datetime.now(timezone.utc) + timedelta(days=settings.REPORT_RETENTION_DAYS + 1)
+    assert purge_expired_reports(db_session, now=later) == 1
+
+    assert not path.exists()
+    response = client.get(f"/reports/{job_id}/download", headers=admin_auth_headers)
+    assert response.status_code == 410
+
+def test_failed_report_records_error(client: TestClient, db_session: Session, admin_auth_headers: dict, monkeypatch):
+    """Testa se uma falha na geração marca a solicitação como 'failed', com a mensagem de erro."""
+    def broken_renderer(data):
+        raise RuntimeError("falha simulada")
+    monkeypatch.setitem(RENDERERS, "csv", broken_renderer)
+
+    job_id = _request_report(client, admin_auth_headers, format="csv")["id"]
+    process_pending_reports(db_session)
+
+    data = client.get(f"/reports/{job_id}", headers=admin_auth_headers).json()
+    assert data["status"] == "failed"
+    assert "falha simulada" in data["error"]
+
+def test_log_failure_keeps_completed_report(client: TestClient, db_session: Session, admin_auth_headers: dict, monkeypatch):
+    """Testa se uma falha ao gravar o log não marca como 'failed' um relatório já gerado."""
+    def broken_log(*args, **kwargs):
+        raise RuntimeError("log indisponível")
+    monkeypatch.setattr("app.jobs.report_worker.create_log", broken_log)
+
+    job_id = _request_report(client, admin_auth_headers, format="csv")["id"]
+    process_pending_reports(db_session)
+
+    data = client.get(f"/reports/{job_id}", headers=admin_auth_headers).json()
+    assert data["status"] == "completed"
+    assert client.get(f"/reports/{job_id}/download", headers=admin_auth_headers).status_code == 200
+
+def test_stale_running_jobs_are_requeued(db_session: Session, test_admin_user):
+    """Testa se uma solicitação interrompida no meio da execução volta para a fila."""
+    now = datetime.now(timezone.utc)
+    job = ReportJob(
+        requested_by=test_admin_user.id, status='running', format='csv',
+        start_date=now - timedelta(days=1), end_date=now,
+        started_at=now - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES + 5)
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    assert requeue_stale_jobs(db_session, now=now) == 1
+    db_session.refresh(job)
+    assert job.status == 'queued'
+
+def test_list_reports_is_paginated(client: TestClient, admin_auth_headers: dict):
+    """Testa a listagem paginada das solicitações do administrador."""
+    for report_format in ("csv", "pdf", "csv"):
+        _request_report(client, admin_auth_headers, format=report_format)
+
+    data = client.get("/reports/?size=2", headers=admin_auth_headers).json()
+    assert data["total"] == 3
+    assert data["pages"] == 2
+    assert len(data["items"]) == 2
+
+def test_invalid_period_returns_400(client: TestClient, admin_auth_headers: dict):
+    """Testa que um período com a data inicial após a final é recusado."""
+    now = datetime.now(timezone.utc)
+    response = client.post("/reports/", headers=admin_auth_headers, json={
+        "format": "csv", "start_date": now.isoformat(), "end_date": (now - timedelta(days=1)).isoformat()
+    })
+    assert response.status_code == 400
+
+    # Uma data com fuso e outra sem fuso (UTC) também são comparadas
+    response = client.post("/reports/", headers=admin_auth_headers, json={
+        "format": "csv", "start_date": now.isoformat(), "end_date": (now - timedelta(days=1)).replace(tzinfo=None).isoformat()
+    })
+    assert response.status_code == 400
+
+def test_manager_cannot_request_reports(client: TestClient, manager_auth_headers: dict):
+    """Testa que apenas administradores podem solicitar relatórios."""
+    response = client.post("/reports/", headers=manager_auth_headers, json={**_report_period(), "format": "csv"})
+    assert response.status_code == 403
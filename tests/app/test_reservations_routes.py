@@ -50,15 +50,69 @@ def test_create_reservation_success(
     assert data["unit_id"] == test_equipment_unit.id
     assert "id" in data
     
-    # Verifica se o status da unidade foi atualizado no DB
+    # O estado operacional da unidade não é alterado: a ocupação é derivada da reserva
     db_unit = client.app.dependency_overrides[get_db]().__next__().get(EquipmentUnit, test_equipment_unit.id)
-    assert db_unit.status == "pending"
+    assert db_unit.status == "available"
+
+def test_create_multiple_future_reservations_for_same_unit(
+    client: TestClient,
+    requester_auth_headers: dict,
+    test_approved_reservation: Reservation
+):
+    """Testa se uma unidade com reserva aprovada aceita novas reservas em outros horários."""
+    now = datetime.now(timezone.utc)
+    for days in (3, 5):
+        response = client.post(
+            "/reservations/",
+            headers=requester_auth_headers,
+            json={
+                "unit_id": test_approved_reservation.unit_id,
+                "start_time": (now + timedelta(days=days)).isoformat(),
+                "end_time": (now + timedelta(days=days + 1)).isoformat(),
+            }
+        )
+        assert response.status_code == 201
+
+def test_create_reservation_invalid_period(
+    client: TestClient,
+    requester_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit
+):
+    """Testa a falha ao criar uma reserva cujo término é anterior ao início."""
+    start_time = datetime.now(timezone.utc) + timedelta(days=4)
+    response = client.post(
+        "/reservations/",
+        headers=requester_auth_headers,
+        json={
+            "unit_id": test_equipment_unit.id,
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time - timedelta(hours=1)).isoformat(),
+        }
+    )
+    assert response.status_code == 400
+
+def test_create_reservation_mixed_timezones(
+    client: TestClient,
+    requester_auth_headers: dict,
+    test_equipment_unit: EquipmentUnit
+):
+    """Testa que um horário com fuso e outro sem fuso (UTC) são comparados sem erro."""
+    start_time = datetime.now(timezone.utc) + timedelta(days=4)
+    response = client.post(
+        "/reservations/",
+        headers=requester_auth_headers,
+        json={
+            "unit_id": test_equipment_unit.id,
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time - timedelta(hours=1)).replace(tzinfo=None).isoformat(),
+        }
+    )
+    assert response.status_code == 400
 
 def test_create_reservation_conflict(
     client: TestClient, 
     requester_auth_headers: dict, 
-    test_approved_reservation: Reservation,
-    db_session: Session  # <-- 1. ADICIONA O db_session
+    test_approved_reservation: Reservation
 ):
     """
     Testa a falha ao tentar criar uma reserva que conflita
@@ -67,17 +121,6 @@ def test_create_reservation_conflict(
     # Pega os dados da reserva fixture (que é de days=1 a days=2)
     existing_res = test_approved_reservation
 
-    # --- INÍCIO DA CORREÇÃO ---
-    # O fixture 'test_approved_reservation' define o status da unidade como 'reserved'.
-    # Isso faria a rota /reservations retornar 400 (Bad Request) antes de
-    # checar o conflito de horário (que retorna 409).
-    # Manualmente, redefinimos o status para 'available' para que o teste
-    # possa de fato testar a lógica de CONFLITO (409).
-    unit = db_session.get(EquipmentUnit, existing_res.unit_id)
-    unit.status = "available"
-    db_session.commit()
-    # --- FIM DA CORREÇÃO ---
-    
     # Tenta reservar no mesmo horário
     response = client.post(
         "/reservations/",
@@ -133,6 +176,22 @@ def test_get_my_reservations(
     assert data["items"][0]["id"] == test_approved_reservation.id
     assert data["items"][0]["status"] == "approved"
 
+def test_get_my_reservations_with_selected_fields(
+    client: TestClient,
+    requester_auth_headers: dict,
+    test_approved_reservation: Reservation
+):
+    """Testa o parâmetro `fields` em /my-reservations, incluindo um atributo computado do usuário."""
+    params = {"fields": "id,start_time,equipment_unit.identifier_code,user.has_google_token", "sort_by": "code"}
+    response = client.get("/reservations/my-reservations", params=params, headers=requester_auth_headers)
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["id"] == test_approved_reservation.id
+    assert item["equipment_unit"] == {"identifier_code": test_approved_reservation.equipment_unit.identifier_code}
+    assert item["user"] == {"has_google_token": False}
+    assert "status" not in item
+
 def test_get_my_upcoming_reservations(
     client: TestClient, 
     requester_auth_headers: dict, 
@@ -9,6 +9,7 @@ corretos e rejeitem dados inválidos (ex: tipos errados, campos obrigatórios
 ausentes, formatos inválidos como e-mail).
 """
 
+import json
 import pytest
 from pydantic import ValidationError
 from datetime import datetime, timedelta
@@ -19,6 +20,8 @@ from app.schemas.sector import SectorCreate
 from app.schemas.reservation import ReservationCreate, ReservationOut
 from app.schemas.equipment import EquipmentTypeCreate, EquipmentUnitCreate
 from app.schemas.admin import ReservationStatusUpdate, UserRoleUpdate
+from app.schemas.pagination import Page
+from app.serialization import page_json
 
 # --- Testes de Schemas de Usuário (user.py) ---
 
@@ -154,4 +157,22 @@ def test_reservation_status_update_invalid_enum():
 def test_user_role_update_valid():
     """Testa se o schema UserRoleUpdate aceita os valores do Enum de permissões."""
     update = UserRoleUpdate(role="manager")
-    assert update.role == "manager"
\ No newline at end of file
+    assert update.role == "manager"
+
+# --- Testes da Serialização Rápida (app/serialization.py) ---
+
+def test_page_json_matches_default_serialization(test_approved_reservation):
+    """
+    Testa se o JSON gerado por page_json, a partir de objetos ORM, é o mesmo
+    produzido pela validação e serialização padrão do schema Page[ReservationOut].
+    """
+    expected = Page[ReservationOut].model_validate(
+        {"items": [test_approved_reservation], "total": 1, "page": 1, "size": 10, "pages": 1},
+        from_attributes=True
+    ).model_dump(mode="json")
+
+    result = json.loads(page_json(ReservationOut, [test_approved_reservation], total=1, page=1, size=10))
+
+    assert result == expected
+    assert result["items"][0]["user"]["email"] == test_approved_reservation.user.email
+    assert "password_hash" not in result["items"][0]["user"]
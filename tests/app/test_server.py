@@ -0,0 +1,87 @@
+# tests/app/test_server.py
+
+"""
+Testes do Servidor de Produção (app/server.py)
+
+Cobrem os auxiliares do supervisor (quantidade de processos e de threads,
+aquecimento e abertura do pool), sem criar processos.
+"""
+
+import asyncio
+
+import anyio.to_thread
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.schemas.reservation import ReservationOut
+from app.serialization import page_adapter
+from app.server import (
+    WorkerServer, build_worker_config, check_connection_budget, connection_budget, prime_pool,
+    resolve_threadpool_size, resolve_worker_count, warmup,
+)
+from main import app
+
+def test_resolve_worker_and_threadpool_sizes():
+    """Testa os valores configurados e os padrões (um processo por CPU; threads = conexões do pool)."""
+    assert resolve_worker_count(3) == 3
+    assert resolve_worker_count(0) >= 1
+    assert resolve_threadpool_size(8) == 8
+    assert resolve_threadpool_size(0) == settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+def test_automatic_worker_count_fits_the_connection_budget(monkeypatch):
+    """Testa que, com SERVER_WORKERS=0, a quantidade de processos é limitada por DB_MAX_CONNECTIONS."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 20)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 90)
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    assert resolve_worker_count(0) == 3
+    assert resolve_worker_count(8) == 8
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 0)
+    assert resolve_worker_count(0) == 16
+
+def test_connection_budget_fails_fast_above_the_limit(monkeypatch):
+    """Testa que o servidor recusa iniciar quando processos × (pool + extras) excede DB_MAX_CONNECTIONS."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 20)
+    assert connection_budget(3) == 90
+    check_connection_budget(3, max_connections=90)
+    check_connection_budget(8, max_connections=0)
+    with pytest.raises(ValueError, match="DB_MAX_CONNECTIONS=90"):
+        check_connection_budget(4, max_connections=90)
+
+def test_warmup_compiles_schemas_and_disposes_pool(tmp_path):
+    """Testa que o aquecimento gera o OpenAPI, compila as páginas e deixa o pool vazio para o fork."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}")
+    page_adapter.cache_clear()
+    app.openapi_schema = None
+
+    warmup(app, engine)
+
+    assert app.openapi_schema is not None
+    assert page_adapter.cache_info().currsize > 0
+    hits = page_adapter.cache_info().hits
+    page_adapter(ReservationOut)
+    assert page_adapter.cache_info().hits == hits + 1
+    assert engine.pool.checkedin() == 0
+
+def test_prime_pool_keeps_connections_open(tmp_path):
+    """Testa que o pool do processo fica com todas as conexões abertas."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3)
+    assert prime_pool(engine) == 3
+    assert engine.pool.checkedin() == 3
+    engine.dispose()
+
+def test_worker_server_sets_threadpool_size(monkeypatch):
+    """Testa que o processo ajusta o pool de threads das rotas síncronas antes de subir a aplicação."""
+    async def fake_startup(self, sockets=None):
+        pass
+    monkeypatch.setattr("uvicorn.Server.startup", fake_startup)
+
+    async def start():
+        server = WorkerServer(build_worker_config(app), threadpool_size=7)
+        await server.startup()
+        return anyio.to_thread.current_default_thread_limiter().total_tokens
+
+    assert asyncio.run(start()) == 7
@@ -0,0 +1,115 @@
+# tests/app/test_unit_history.py
+
+"""
+Testes da Linha do Tempo das Unidades (app/unit_history.py e a rota
+/equipments/units/{unit_id}/history)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.unit_history import UnitHistory
+from app.models.equipment_unit import EquipmentUnit
+from app.unit_history import COMPACTED_EVENT, compact_unit_history
+
+# Fixtures: client, db_session, test_equipment_unit, manager_auth_headers
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+def _event(db: Session, unit: EquipmentUnit, event_type: str, created_at: datetime | None = None):
+    event = UnitHistory(unit_id=unit.id, event_type=event_type, notes=event_type)
+    if created_at is not None:
+        event.created_at = created_at
+    db.add(event)
+    return event
+
+def test_history_is_paginated_by_cursor(
+    client: TestClient, db_session: Session, manager_auth_headers: dict, test_equipment_unit: EquipmentUnit
+):
+    """Testa a leitura completa do histórico em páginas, incluindo eventos com a mesma data."""
+    same_moment = datetime.now(timezone.utc) - timedelta(days=1)
+    for _ in range(4):
+        _event(db_session, test_equipment_unit, "returned_ok", same_moment)
+    for index in range(3):
+        _event(db_session, test_equipment_unit, "sent_to_maintenance", same_moment + timedelta(hours=index + 1))
+    # Datas geradas pelo banco, no mesmo segundo
+    for _ in range(2):
+        _event(db_session, test_equipment_unit, "status_released")
+    db_session.commit()
+    expected = [
+        event.id for event in db_session.query(UnitHistory)
+        .filter(UnitHistory.unit_id == test_equipment_unit.id)
+        .order_by(UnitHistory.created_at.desc(), UnitHistory.id.desc())
+    ]
+
+    url = f"/equipments/units/{test_equipment_unit.id}/history"
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, headers=manager_auth_headers, params={"size": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen += [event["id"] for event in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_history_rejects_invalid_cursor(client: TestClient, manager_auth_headers: dict, test_equipment_unit: EquipmentUnit):
+    """Testa a validação do cursor e a unidade inexistente."""
+    url = f"/equipments/units/{test_equipment_unit.id}/history"
+    assert client.get(url, headers=manager_auth_headers, params={"cursor": "não-é-um-cursor"}).status_code == 400
+    assert client.get("/equipments/units/9999/history", headers=manager_auth_headers).status_code == 404
+
+def test_old_routine_events_are_compacted(db_session: Session, test_equipment_unit: EquipmentUnit):
+    """Testa o resumo dos eventos rotineiros antigos, mês a mês e sem atravessar eventos relevantes."""
+    january = datetime(2024, 1, 5, tzinfo=timezone.utc)
+    _event(db_session, test_equipment_unit, "created", january - timedelta(days=1))
+    for day in range(3):
+        _event(db_session, test_equipment_unit, "returned_ok", january + timedelta(days=day))
+    _event(db_session, test_equipment_unit, "reservation_expired", january + timedelta(days=4))
+    _event(db_session, test_equipment_unit, "sent_to_maintenance", january + timedelta(days=5))
+    _event(db_session, test_equipment_unit, "returned_ok", january + timedelta(days=6))      # Sozinho: mantido
+    _event(db_session, test_equipment_unit, "returned_ok", datetime(2024, 2, 1, tzinfo=timezone.utc))
+    _event(db_session, test_equipment_unit, "returned_ok", datetime(2024, 2, 2, tzinfo=timezone.utc))
+    _event(db_session, test_equipment_unit, "returned_ok", NOW - timedelta(days=1))           # Recente: mantido
+    _event(db_session, test_equipment_unit, "returned_ok", NOW - timedelta(days=2))
+    db_session.commit()
+
+    assert compact_unit_history(db_session, now=NOW) == 6
+
+    timeline = [
+        (event.event_type, event.event_counts) for event in db_session.query(UnitHistory)
+        .filter(UnitHistory.unit_id == test_equipment_unit.id)
+        .order_by(UnitHistory.created_at, UnitHistory.id)
+    ]
+    assert timeline == [
+        ("created", None),
+        (COMPACTED_EVENT, {"returned_ok": 3, "reservation_expired": 1}),
+        ("sent_to_maintenance", None),
+        ("returned_ok", None),
+        (COMPACTED_EVENT, {"returned_ok": 2}),
+        ("returned_ok", None),
+        ("returned_ok", None),
+    ]
+    summary = db_session.query(UnitHistory).filter(UnitHistory.event_type == COMPACTED_EVENT).order_by(UnitHistory.created_at).first()
+    assert summary.notes == "Resumo de 4 evento(s) de 01/2024: 1 reserva(s) expirada(s), 3 devolução(ões) sem defeito."
+
+    # Nada mais a resumir
+    assert compact_unit_history(db_session, now=NOW) == 0
+
+def test_compaction_extends_the_summary_of_the_month(db_session: Session, test_equipment_unit: EquipmentUnit):
+    """Testa que eventos do mesmo mês que envelhecem depois são somados ao resumo existente."""
+    for day in (1, 2, 20):
+        _event(db_session, test_equipment_unit, "returned_ok", datetime(2024, 3, day, tzinfo=timezone.utc))
+    db_session.commit()
+
+    assert compact_unit_history(db_session, now=datetime(2024, 3, 10, tzinfo=timezone.utc) + timedelta(days=180)) == 2
+    assert compact_unit_history(db_session, now=datetime(2024, 3, 25, tzinfo=timezone.utc) + timedelta(days=180)) == 1
+
+    (summary,) = db_session.query(UnitHistory).all()
+    assert summary.event_type == COMPACTED_EVENT
+    assert summary.event_counts == {"returned_ok": 3}
+    assert summary.created_at.day == 20
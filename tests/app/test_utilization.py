@@ -0,0 +1,138 @@
+# tests/app/test_utilization.py
+
+"""
+Testes da Análise de Utilização das Unidades (app/utilization.py e as rotas
+/dashboard/utilization)
+
+Os resultados vetorizados são comparados com cálculos diretos, feitos
+intervalo a intervalo, sobre reservas criadas no banco de teste.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.reservation import Reservation
+from app.models.equipment_type import EquipmentType
+from app.models.equipment_unit import EquipmentUnit
+from app.utilization import compute_utilization, get_utilization
+
+# Fixtures: client, db_session, test_requester_user, test_equipment_type, admin_auth_headers, manager_auth_headers
+
+WINDOW_START = datetime(2025, 3, 3, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(days=7)
+
+def _add_units(db: Session, eq_type: EquipmentType, count: int, prefix: str = "UT") -> list[EquipmentUnit]:
+    units = [EquipmentUnit(type_id=eq_type.id, identifier_code=f"{prefix}-{i:03d}", serial_number=f"SN-{prefix}-{i:03d}", status="available") for i in range(count)]
+    db.add_all(units)
+    db.commit()
+    return units
+
+def _book(db: Session, user: User, unit: EquipmentUnit, start: datetime, hours: float, status: str = "approved"):
+    db.add(Reservation(user_id=user.id, unit_id=unit.id, start_time=start, end_time=start + timedelta(hours=hours), status=status))
+
+def test_unit_and_type_utilization(db_session: Session, test_requester_user: User, test_equipment_type: EquipmentType):
+    """Testa horas reservadas, ociosidade e pico de simultaneidade em um cenário conhecido."""
+    busy, half, idle = _add_units(db_session, test_equipment_type, 3)
+    # Unidade ocupada durante toda a janela (a reserva começa antes e termina depois dela)
+    _book(db_session, test_requester_user, busy, WINDOW_START - timedelta(days=1), 24 * 9)
+    # Duas reservas sobrepostas (união de 36h) e uma reserva pendente, que não conta
+    _book(db_session, test_requester_user, half, WINDOW_START + timedelta(days=1), 24)
+    _book(db_session, test_requester_user, half, WINDOW_START + timedelta(days=1, hours=12), 24, status="returned")
+    _book(db_session, test_requester_user, idle, WINDOW_START + timedelta(days=2), 24, status="pending")
+    db_session.commit()
+
+    result = compute_utilization(db_session, WINDOW_START, WINDOW_END)
+    units = {row["identifier_code"]: row for row in result.units}
+
+    assert units["UT-000"]["utilization_pct"] == 100.0
+    assert units["UT-000"]["longest_idle_hours"] == 0.0
+    assert units["UT-001"]["booked_hours"] == 36.0
+    assert units["UT-001"]["longest_idle_hours"] == 24 * 7 - 60  # do fim da última reserva até o fim da janela
+    assert units["UT-001"]["idle_hours_at_end"] == 24 * 7 - 60
+    assert units["UT-002"]["booked_hours"] == 0.0
+    assert units["UT-002"]["longest_idle_hours"] == 24 * 7
+
+    (type_row,) = result.types
+    assert type_row["total_units"] == 3
+    assert type_row["idle_units"] == 1
+    assert type_row["saturated_units"] == 1
+    assert type_row["booked_hours"] == 24 * 7 + 36
+    # Pico: a reserva longa + as duas reservas sobrepostas da segunda unidade
+    assert type_row["peak_concurrency"] == 3
+    assert type_row["peak_at"] == WINDOW_START + timedelta(days=1, hours=12)
+
+def test_vectorized_results_match_direct_calculation(db_session: Session, test_requester_user: User, test_equipment_type: EquipmentType):
+    """Compara as horas reservadas e os maiores períodos ociosos com um cálculo direto por unidade."""
+    rng = random.Random(42)
+    units = _add_units(db_session, test_equipment_type, 12)
+    bookings = {unit.id: [] for unit in units}
+    for unit in units:
+        for _ in range(rng.randint(0, 6)):
+            start = WINDOW_START + timedelta(hours=rng.randint(-48, 24 * 7))
+            hours = rng.randint(1, 60)
+            _book(db_session, test_requester_user, unit, start, hours)
+            bookings[unit.id].append((start, start + timedelta(hours=hours)))
+    db_session.commit()
+
+    result = compute_utilization(db_session, WINDOW_START, WINDOW_END)
+
+    for row in result.units:
+        # União dos intervalos e lacunas, hora a hora
+        hours = [
+            any(start <= WINDOW_START + timedelta(hours=h) < end for start, end in bookings[row["unit_id"]])
+            for h in range(24 * 7)
+        ]
+        longest, current = 0, 0
+        for booked in hours:
+            current = 0 if booked else current + 1
+            longest = max(longest, current)
+        assert row["booked_hours"] == sum(hours)
+        assert row["longest_idle_hours"] == longest
+
+def test_utilization_is_cached_per_window(db_session: Session, test_requester_user: User, test_equipment_type: EquipmentType):
+    """Testa se o resultado de uma janela é reaproveitado do cache."""
+    (unit,) = _add_units(db_session, test_equipment_type, 1)
+    first = get_utilization(db_session, WINDOW_START, WINDOW_END)
+
+    _book(db_session, test_requester_user, unit, WINDOW_START, 10)
+    db_session.commit()
+
+    assert get_utilization(db_session, WINDOW_START, WINDOW_END) is first
+    assert get_utilization(db_session, WINDOW_START, WINDOW_END - timedelta(days=1)).units[0]["booked_hours"] == 10
+
+def test_utilization_routes(client: TestClient, db_session: Session, admin_auth_headers: dict, test_requester_user: User, test_equipment_type: EquipmentType):
+    """Testa as rotas de utilização por tipo e por unidade."""
+    units = _add_units(db_session, test_equipment_type, 3)
+    _book(db_session, test_requester_user, units[1], WINDOW_START, 84)
+    db_session.commit()
+    params = {"start_date": WINDOW_START.isoformat(), "end_date": WINDOW_END.isoformat()}
+
+    response = client.get("/dashboard/utilization", headers=admin_auth_headers, params=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["window_hours"] == 168
+    assert data["types"][0]["utilization_pct"] == round(84 / (3 * 168) * 100, 2)
+    assert data["types"][0]["idle_units"] == 2
+
+    response = client.get("/dashboard/utilization/units", headers=admin_auth_headers, params={**params, "sort_dir": "desc", "size": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert page["total"] == 3
+    assert page["pages"] == 2
+    assert page["items"][0]["identifier_code"] == "UT-001"
+    assert page["items"][0]["utilization_pct"] == 50.0
+
+def test_utilization_rejects_invalid_window(client: TestClient, admin_auth_headers: dict):
+    """Testa que uma janela com o início após o fim e uma ordenação desconhecida são recusadas."""
+    params = {"start_date": WINDOW_END.isoformat(), "end_date": WINDOW_START.isoformat()}
+    assert client.get("/dashboard/utilization", headers=admin_auth_headers, params=params).status_code == 400
+    response = client.get("/dashboard/utilization/units", headers=admin_auth_headers, params={"sort_dir": "down"})
+    assert response.status_code == 400
+
+def test_utilization_requires_admin(client: TestClient, manager_auth_headers: dict):
+    """Testa que apenas administradores acessam a análise de utilização."""
+    assert client.get("/dashboard/utilization", headers=manager_auth_headers).status_code == 403
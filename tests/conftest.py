@@ -11,6 +11,7 @@ Principais Fixtures:
 - db_session: Cria um banco de dados de teste limpo (em arquivo) para cada
   função de teste, garantindo o isolamento.
 - client: Fornece um 'TestClient' do FastAPI que usa o banco de dados de teste.
+- query_budget: Conta os comandos SQL de um bloco e falha se um orçamento for excedido.
 - Vários usuários (test_user, test_requester_user, test_manager_user, test_admin_user):
   Cria usuários com diferentes perfis.
 - Cabeçalhos de Autenticação (auth_headers, requester_auth_headers, etc.):
@@ -32,6 +33,9 @@ from datetime import datetime, timedelta, timezone
 TEST_DB_FILE = "./test.db"
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_FILE}"
 
+# A rota /metrics vem desativada por padrão; os testes a habilitam antes de importar a aplicação.
+os.environ.setdefault("METRICS_ENABLED", "true")
+
 # --- Ordem de Importação Crítica ---
 
 # 1. Importa a 'Base' e 'get_db' da aplicação principal.
@@ -47,9 +51,23 @@ from app.models.token_blacklist import TokenBlacklist
 from app.models.equipment_type import EquipmentType
 from app.models.equipment_unit import EquipmentUnit
 from app.models.unit_history import UnitHistory
+from app.models.reservation_notification import ReservationNotification
+from app.models.slow_query_log import SlowQueryLog
+from app.models.report_job import ReportJob
+from app.models.reservation_rollup import ReservationRollup
+from app.models.user_reservation_rollup import UserReservationRollup
+from app.models.demand_forecast import DemandForecast
+from app.models.maintenance_ticket import MaintenanceTicket
+from app.models.maintenance_rollup import MaintenanceRollup
 
 # 3. Importa dependências necessárias para as fixtures.
 from app.security import get_password_hash
+from app.availability import invalidate_availability_cache
+from app.utilization import invalidate_utilization_cache
+from app.type_details import invalidate_type_detail_cache
+from app.popularity import popularity_index
+from app.metrics import instrument_engine
+from app.query_budget import QueryCounter
 from main import app # Importa a app principal
 
 # --- Configuração do Engine e Sessão de Teste ---
@@ -57,6 +75,7 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine) # Conta os comandos SQL das requisições, como na engine da aplicação
 
 
 @pytest.fixture(scope="function")
@@ -72,6 +91,10 @@ def db_session() -> Generator[Session, None, None]:
             pass
 
     Base.metadata.create_all(bind=engine)
+    invalidate_availability_cache() # Descarta dados em cache de testes anteriores
+    invalidate_utilization_cache()
+    invalidate_type_detail_cache()
+    popularity_index.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -101,6 +124,20 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
     
     app.dependency_overrides.clear()
 
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    Fixture que fornece um contador de consultas na engine de teste.
+
+    Uso:
+        with query_budget(5):
+            client.get(...)
+    O teste falha se o bloco executar mais comandos SQL do que o orçamento.
+    """
+    def factory(budget: int | None = None) -> QueryCounter:
+        return QueryCounter(engine, budget)
+    return factory
+
 # --- Fixtures de Entidades Base ---
 
 @pytest.fixture(scope="function")
@@ -257,7 +294,6 @@ def test_pending_reservation(db_session: Session, test_requester_user: User, tes
         end_time=datetime.now(timezone.utc) + timedelta(days=2),
         status="pending"
     )
-    test_equipment_unit.status = "pending" # Marca a unidade como pendente
     db_session.add(res)
     db_session.commit()
     db_session.refresh(res)
@@ -273,7 +309,6 @@ def test_approved_reservation(db_session: Session, test_requester_user: User, te
         end_time=datetime.now(timezone.utc) + timedelta(days=2),
         status="approved"
     )
-    test_equipment_unit.status = "reserved" # Marca a unidade como reservada
     db_session.add(res)
     db_session.commit()
     db_session.refresh(res)